@@ -21,6 +21,7 @@ from .settings import (
     accent_options,
     cfg,
     download_concurrency_options,
+    download_engine_options,
     failed_record_retention_options,
     filename_template_options,
     font_size_options,
@@ -69,6 +70,7 @@ __all__ = [
     "accent_options",
     "cfg",
     "download_concurrency_options",
+    "download_engine_options",
     "failed_record_retention_options",
     "filename_template_options",
     "font_size_options",
@@ -0,0 +1,145 @@
+"""配置项的可选值表：GUI、WebUI 与配置校验共用同一份选项。"""
+
+from __future__ import annotations
+
+CURRENT_FILENAME_TEMPLATE = "current"
+DEFAULT_OPEN_MODE = "builtin_player"
+
+FILENAME_TEMPLATE_OPTIONS: tuple[dict[str, str], ...] = (
+    {"value": CURRENT_FILENAME_TEMPLATE, "label": "\u9ed8\u8ba4"},
+    {"value": "{title}", "label": "\u6807\u9898"},
+    {"value": "{platform}_{title}", "label": "\u5e73\u53f0_\u6807\u9898"},
+    {"value": "{platform}_{title}_{date}", "label": "\u5e73\u53f0_\u6807\u9898_\u65e5\u671f"},
+    {"value": "{platform}_{title}_{index}", "label": "\u5e73\u53f0_\u6807\u9898_\u5e8f\u53f7"},
+)
+OPEN_MODE_OPTIONS: tuple[dict[str, str], ...] = (
+    {"value": DEFAULT_OPEN_MODE, "label": "\u5185\u7f6e\u64ad\u653e\u5668"},
+    {"value": "system_default", "label": "\u7cfb\u7edf\u9ed8\u8ba4\u6253\u5f00\u65b9\u5f0f"},
+)
+PLAYBACK_PLAYER_OPTIONS: tuple[dict[str, str], ...] = (
+    {"value": DEFAULT_OPEN_MODE, "label": "\u5185\u7f6e\u64ad\u653e\u5668"},
+    {"value": "system_default", "label": "\u7cfb\u7edf\u9ed8\u8ba4\u64ad\u653e\u5668"},
+)
+IMAGE_AUTO_ADVANCE_INTERVAL_OPTIONS: tuple[dict[str, str], ...] = (
+    {"value": "1", "label": "1 \u79d2"},
+    {"value": "3", "label": "3 \u79d2"},
+    {"value": "5", "label": "5 \u79d2\uff08\u63a8\u8350\uff09"},
+    {"value": "10", "label": "10 \u79d2"},
+)
+LOG_LEVEL_OPTIONS: tuple[dict[str, str], ...] = (
+    {"value": "debug", "label": "\u8c03\u8bd5"},
+    {"value": "info", "label": "\u4fe1\u606f"},
+    {"value": "warning", "label": "\u8b66\u544a"},
+    {"value": "error", "label": "\u9519\u8bef"},
+)
+ACCENT_OPTIONS: tuple[dict[str, str], ...] = (
+    {"value": "blue", "label": "\u84dd\u8272"},
+    {"value": "green", "label": "\u7eff\u8272"},
+    {"value": "purple", "label": "\u7d2b\u8272"},
+    {"value": "orange", "label": "\u6a59\u8272"},
+    {"value": "red", "label": "\u7ea2\u8272"},
+)
+SCALE_OPTIONS: tuple[dict[str, str], ...] = (
+    {"value": "90%", "label": "90%"},
+    {"value": "100%", "label": "100%\uff08\u63a8\u8350\uff09"},
+    {"value": "110%", "label": "110%"},
+    {"value": "125%", "label": "125%"},
+)
+FONT_SIZE_OPTIONS: tuple[dict[str, str], ...] = (
+    {"value": "small", "label": "\u5c0f"},
+    {"value": "medium", "label": "\u4e2d\uff08\u63a8\u8350\uff09"},
+    {"value": "large", "label": "\u5927"},
+)
+LANGUAGE_OPTIONS: tuple[dict[str, str], ...] = (
+    {"value": "zh-CN", "label": "\u7b80\u4f53\u4e2d\u6587\uff08\u63a8\u8350\uff09"},
+    {"value": "en-US", "label": "English"},
+    {"value": "zh-TW", "label": "\u7e41\u9ad4\u4e2d\u6587"},
+)
+DOWNLOAD_CONCURRENCY_OPTIONS: tuple[dict[str, str], ...] = (
+    {"value": "1", "label": "1"},
+    {"value": "3", "label": "3\uff08\u63a8\u8350\uff09"},
+    {"value": "5", "label": "5"},
+)
+DOWNLOAD_ENGINE_OPTIONS: tuple[dict[str, str], ...] = (
+    {"value": "thread", "label": "\u7ebf\u7a0b\uff08\u9ed8\u8ba4\uff09"},
+    {"value": "asyncio", "label": "asyncio \u534f\u7a0b"},
+)
+REQUEST_TIMEOUT_OPTIONS: tuple[dict[str, str], ...] = (
+    {"value": "30", "label": "30 \u79d2"},
+    {"value": "60", "label": "60 \u79d2\uff08\u63a8\u8350\uff09"},
+    {"value": "90", "label": "90 \u79d2"},
+    {"value": "120", "label": "120 \u79d2"},
+    {"value": "180", "label": "180 \u79d2"},
+    {"value": "300", "label": "300 \u79d2"},
+)
+RETRY_OPTIONS: tuple[dict[str, str], ...] = (
+    {"value": "0", "label": "0\uff08\u4e0d\u91cd\u8bd5\uff09"},
+    {"value": "1", "label": "1"},
+    {"value": "2", "label": "2"},
+    {"value": "3", "label": "3\uff08\u63a8\u8350\uff09"},
+    {"value": "5", "label": "5"},
+    {"value": "10", "label": "10"},
+)
+SPEED_LIMIT_OPTIONS: tuple[dict[str, str], ...] = (
+    {"value": "0", "label": "\u65e0\u9650\u5236"},
+    {"value": "512", "label": "512 KB/s"},
+    {"value": "1024", "label": "1 MB/s"},
+    {"value": "2048", "label": "2 MB/s"},
+    {"value": "5120", "label": "5 MB/s"},
+    {"value": "10240", "label": "10 MB/s"},
+    {"value": "20480", "label": "20 MB/s"},
+)
+PLATFORM_COUNT_OPTIONS: tuple[dict[str, str], ...] = (
+    {"value": "10", "label": "10 \u4e2a\u89c6\u9891"},
+    {"value": "20", "label": "20 \u4e2a\u89c6\u9891\uff08\u63a8\u8350\uff09"},
+    {"value": "30", "label": "30 \u4e2a\u89c6\u9891"},
+    {"value": "50", "label": "50 \u4e2a\u89c6\u9891"},
+    {"value": "9999", "label": "max"},
+)
+PLATFORM_NOTE_COUNT_OPTIONS: tuple[dict[str, str], ...] = (
+    {"value": "10", "label": "10 \u7bc7\u7b14\u8bb0"},
+    {"value": "20", "label": "20 \u7bc7\u7b14\u8bb0\uff08\u63a8\u8350\uff09"},
+    {"value": "30", "label": "30 \u7bc7\u7b14\u8bb0"},
+    {"value": "50", "label": "50 \u7bc7\u7b14\u8bb0"},
+    {"value": "9999", "label": "max"},
+)
+PLATFORM_PAGE_COUNT_OPTIONS: tuple[dict[str, str], ...] = (
+    {"value": "1", "label": "1 \u9875\uff08\u63a8\u8350\uff09"},
+    {"value": "2", "label": "2 \u9875"},
+    {"value": "3", "label": "3 \u9875"},
+    {"value": "5", "label": "5 \u9875"},
+    {"value": "9999", "label": "max"},
+)
+LOG_RETENTION_OPTIONS: tuple[dict[str, str], ...] = (
+    {"value": "1", "label": "1 \u5929\uff08\u63a8\u8350\uff09"},
+    {"value": "3", "label": "3 \u5929"},
+    {"value": "5", "label": "5 \u5929"},
+    {"value": "7", "label": "7 \u5929"},
+)
+LOG_WRITER_OVERFLOW_OPTIONS: tuple[dict[str, str], ...] = (
+    {"value": "drop_oldest", "label": "\u4e22\u5f03\u6700\u65e7\u65e5\u5fd7\uff08\u9ed8\u8ba4\uff09"},
+    {"value": "block", "label": "\u7b49\u5f85\u5199\u5165"},
+)
+FAILED_RECORD_RETENTION_OPTIONS: tuple[dict[str, str], ...] = (
+    {"value": "3", "label": "3 \u5929"},
+    {"value": "7", "label": "7 \u5929\uff08\u63a8\u8350\uff09"},
+    {"value": "14", "label": "14 \u5929"},
+    {"value": "30", "label": "30 \u5929"},
+)
+UI_LOG_MAX_DISPLAY_OPTIONS: tuple[dict[str, str], ...] = (
+    {"value": "100", "label": "100 \u6761"},
+    {"value": "300", "label": "300 \u6761\uff08\u63a8\u8350\uff09"},
+    {"value": "500", "label": "500 \u6761"},
+)
+UI_LOG_MAX_DISPLAY_DEFAULT = 300
+PROXY_APP_OPTIONS: tuple[dict[str, str], ...] = (
+    {"value": "\u7cfb\u7edf\u4ee3\u7406", "label": "\u7cfb\u7edf\u4ee3\u7406"},
+    {"value": "\u76f4\u8fde", "label": "\u76f4\u8fde\uff08\u4e0d\u4f7f\u7528\u4ee3\u7406\uff09"},
+    {"value": "Clash (7890)", "label": "Clash (7890)"},
+    {"value": "Clash Verge (7897)", "label": "Clash Verge (7897)"},
+    {"value": "v2rayN (10809)", "label": "v2rayN (10809)"},
+    {"value": "V2Ray / Qv2ray (10808)", "label": "V2Ray / Qv2ray (10808)"},
+    {"value": "sing-box (2080)", "label": "sing-box (2080)"},
+    {"value": "NekoRay (2080)", "label": "NekoRay (2080)"},
+    {"value": "\u81ea\u5b9a\u4e49", "label": "\u81ea\u5b9a\u4e49 HTTP/SOCKS5 \u7aef\u70b9"},
+)
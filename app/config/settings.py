@@ -24,147 +24,42 @@ from app.config.constants import (
     DEFAULT_USER_AGENT,
     SUPPORTED_THEMES,
 )
+from app.config.options import (
+    ACCENT_OPTIONS,
+    CURRENT_FILENAME_TEMPLATE,
+    DEFAULT_OPEN_MODE,
+    DOWNLOAD_CONCURRENCY_OPTIONS,
+    DOWNLOAD_ENGINE_OPTIONS,
+    FAILED_RECORD_RETENTION_OPTIONS,
+    FILENAME_TEMPLATE_OPTIONS,
+    FONT_SIZE_OPTIONS,
+    IMAGE_AUTO_ADVANCE_INTERVAL_OPTIONS,
+    LANGUAGE_OPTIONS,
+    LOG_LEVEL_OPTIONS,
+    LOG_RETENTION_OPTIONS,
+    LOG_WRITER_OVERFLOW_OPTIONS,
+    OPEN_MODE_OPTIONS,
+    PLATFORM_COUNT_OPTIONS,
+    PLATFORM_NOTE_COUNT_OPTIONS,
+    PLATFORM_PAGE_COUNT_OPTIONS,
+    PLAYBACK_PLAYER_OPTIONS,
+    PROXY_APP_OPTIONS,
+    REQUEST_TIMEOUT_OPTIONS,
+    RETRY_OPTIONS,
+    SCALE_OPTIONS,
+    SPEED_LIMIT_OPTIONS,
+    UI_LOG_MAX_DISPLAY_DEFAULT,
+    UI_LOG_MAX_DISPLAY_OPTIONS,
+)
 from app.core.event_bus import EventBus
 from app.exceptions import ConfigReadError, ConfigValidationError, ConfigWriteError
 from app.utils.runtime_paths import is_temporary_path, resolve_user_file
 
-CURRENT_FILENAME_TEMPLATE = "current"
-DEFAULT_OPEN_MODE = "builtin_player"
 LOCK_WARN_SECONDS = 1.0
 CONFIG_FILE_LOCK_TIMEOUT_SECONDS = 3.0
 CONFIG_FILE_LOCK_STALE_SECONDS = 30.0
 CONFIG_EXTERNAL_SYNC_INTERVAL_SECONDS = 0.5
 
-FILENAME_TEMPLATE_OPTIONS: tuple[dict[str, str], ...] = (
-    {"value": CURRENT_FILENAME_TEMPLATE, "label": "\u9ed8\u8ba4"},
-    {"value": "{title}", "label": "\u6807\u9898"},
-    {"value": "{platform}_{title}", "label": "\u5e73\u53f0_\u6807\u9898"},
-    {"value": "{platform}_{title}_{date}", "label": "\u5e73\u53f0_\u6807\u9898_\u65e5\u671f"},
-    {"value": "{platform}_{title}_{index}", "label": "\u5e73\u53f0_\u6807\u9898_\u5e8f\u53f7"},
-)
-OPEN_MODE_OPTIONS: tuple[dict[str, str], ...] = (
-    {"value": DEFAULT_OPEN_MODE, "label": "\u5185\u7f6e\u64ad\u653e\u5668"},
-    {"value": "system_default", "label": "\u7cfb\u7edf\u9ed8\u8ba4\u6253\u5f00\u65b9\u5f0f"},
-)
-PLAYBACK_PLAYER_OPTIONS: tuple[dict[str, str], ...] = (
-    {"value": DEFAULT_OPEN_MODE, "label": "\u5185\u7f6e\u64ad\u653e\u5668"},
-    {"value": "system_default", "label": "\u7cfb\u7edf\u9ed8\u8ba4\u64ad\u653e\u5668"},
-)
-IMAGE_AUTO_ADVANCE_INTERVAL_OPTIONS: tuple[dict[str, str], ...] = (
-    {"value": "1", "label": "1 \u79d2"},
-    {"value": "3", "label": "3 \u79d2"},
-    {"value": "5", "label": "5 \u79d2\uff08\u63a8\u8350\uff09"},
-    {"value": "10", "label": "10 \u79d2"},
-)
-LOG_LEVEL_OPTIONS: tuple[dict[str, str], ...] = (
-    {"value": "debug", "label": "\u8c03\u8bd5"},
-    {"value": "info", "label": "\u4fe1\u606f"},
-    {"value": "warning", "label": "\u8b66\u544a"},
-    {"value": "error", "label": "\u9519\u8bef"},
-)
-ACCENT_OPTIONS: tuple[dict[str, str], ...] = (
-    {"value": "blue", "label": "\u84dd\u8272"},
-    {"value": "green", "label": "\u7eff\u8272"},
-    {"value": "purple", "label": "\u7d2b\u8272"},
-    {"value": "orange", "label": "\u6a59\u8272"},
-    {"value": "red", "label": "\u7ea2\u8272"},
-)
-SCALE_OPTIONS: tuple[dict[str, str], ...] = (
-    {"value": "90%", "label": "90%"},
-    {"value": "100%", "label": "100%\uff08\u63a8\u8350\uff09"},
-    {"value": "110%", "label": "110%"},
-    {"value": "125%", "label": "125%"},
-)
-FONT_SIZE_OPTIONS: tuple[dict[str, str], ...] = (
-    {"value": "small", "label": "\u5c0f"},
-    {"value": "medium", "label": "\u4e2d\uff08\u63a8\u8350\uff09"},
-    {"value": "large", "label": "\u5927"},
-)
-LANGUAGE_OPTIONS: tuple[dict[str, str], ...] = (
-    {"value": "zh-CN", "label": "\u7b80\u4f53\u4e2d\u6587\uff08\u63a8\u8350\uff09"},
-    {"value": "en-US", "label": "English"},
-    {"value": "zh-TW", "label": "\u7e41\u9ad4\u4e2d\u6587"},
-)
-DOWNLOAD_CONCURRENCY_OPTIONS: tuple[dict[str, str], ...] = (
-    {"value": "1", "label": "1"},
-    {"value": "3", "label": "3\uff08\u63a8\u8350\uff09"},
-    {"value": "5", "label": "5"},
-)
-REQUEST_TIMEOUT_OPTIONS: tuple[dict[str, str], ...] = (
-    {"value": "30", "label": "30 \u79d2"},
-    {"value": "60", "label": "60 \u79d2\uff08\u63a8\u8350\uff09"},
-    {"value": "90", "label": "90 \u79d2"},
-    {"value": "120", "label": "120 \u79d2"},
-    {"value": "180", "label": "180 \u79d2"},
-    {"value": "300", "label": "300 \u79d2"},
-)
-RETRY_OPTIONS: tuple[dict[str, str], ...] = (
-    {"value": "0", "label": "0\uff08\u4e0d\u91cd\u8bd5\uff09"},
-    {"value": "1", "label": "1"},
-    {"value": "2", "label": "2"},
-    {"value": "3", "label": "3\uff08\u63a8\u8350\uff09"},
-    {"value": "5", "label": "5"},
-    {"value": "10", "label": "10"},
-)
-SPEED_LIMIT_OPTIONS: tuple[dict[str, str], ...] = (
-    {"value": "0", "label": "\u65e0\u9650\u5236"},
-    {"value": "512", "label": "512 KB/s"},
-    {"value": "1024", "label": "1 MB/s"},
-    {"value": "2048", "label": "2 MB/s"},
-    {"value": "5120", "label": "5 MB/s"},
-    {"value": "10240", "label": "10 MB/s"},
-    {"value": "20480", "label": "20 MB/s"},
-)
-PLATFORM_COUNT_OPTIONS: tuple[dict[str, str], ...] = (
-    {"value": "10", "label": "10 \u4e2a\u89c6\u9891"},
-    {"value": "20", "label": "20 \u4e2a\u89c6\u9891\uff08\u63a8\u8350\uff09"},
-    {"value": "30", "label": "30 \u4e2a\u89c6\u9891"},
-    {"value": "50", "label": "50 \u4e2a\u89c6\u9891"},
-    {"value": "9999", "label": "max"},
-)
-PLATFORM_NOTE_COUNT_OPTIONS: tuple[dict[str, str], ...] = (
-    {"value": "10", "label": "10 \u7bc7\u7b14\u8bb0"},
-    {"value": "20", "label": "20 \u7bc7\u7b14\u8bb0\uff08\u63a8\u8350\uff09"},
-    {"value": "30", "label": "30 \u7bc7\u7b14\u8bb0"},
-    {"value": "50", "label": "50 \u7bc7\u7b14\u8bb0"},
-    {"value": "9999", "label": "max"},
-)
-PLATFORM_PAGE_COUNT_OPTIONS: tuple[dict[str, str], ...] = (
-    {"value": "1", "label": "1 \u9875\uff08\u63a8\u8350\uff09"},
-    {"value": "2", "label": "2 \u9875"},
-    {"value": "3", "label": "3 \u9875"},
-    {"value": "5", "label": "5 \u9875"},
-    {"value": "9999", "label": "max"},
-)
-LOG_RETENTION_OPTIONS: tuple[dict[str, str], ...] = (
-    {"value": "1", "label": "1 \u5929\uff08\u63a8\u8350\uff09"},
-    {"value": "3", "label": "3 \u5929"},
-    {"value": "5", "label": "5 \u5929"},
-    {"value": "7", "label": "7 \u5929"},
-)
-FAILED_RECORD_RETENTION_OPTIONS: tuple[dict[str, str], ...] = (
-    {"value": "3", "label": "3 \u5929"},
-    {"value": "7", "label": "7 \u5929\uff08\u63a8\u8350\uff09"},
-    {"value": "14", "label": "14 \u5929"},
-    {"value": "30", "label": "30 \u5929"},
-)
-UI_LOG_MAX_DISPLAY_OPTIONS: tuple[dict[str, str], ...] = (
-    {"value": "100", "label": "100 \u6761"},
-    {"value": "300", "label": "300 \u6761\uff08\u63a8\u8350\uff09"},
-    {"value": "500", "label": "500 \u6761"},
-)
-UI_LOG_MAX_DISPLAY_DEFAULT = 300
-PROXY_APP_OPTIONS: tuple[dict[str, str], ...] = (
-    {"value": "\u7cfb\u7edf\u4ee3\u7406", "label": "\u7cfb\u7edf\u4ee3\u7406"},
-    {"value": "\u76f4\u8fde", "label": "\u76f4\u8fde\uff08\u4e0d\u4f7f\u7528\u4ee3\u7406\uff09"},
-    {"value": "Clash (7890)", "label": "Clash (7890)"},
-    {"value": "Clash Verge (7897)", "label": "Clash Verge (7897)"},
-    {"value": "v2rayN (10809)", "label": "v2rayN (10809)"},
-    {"value": "V2Ray / Qv2ray (10808)", "label": "V2Ray / Qv2ray (10808)"},
-    {"value": "sing-box (2080)", "label": "sing-box (2080)"},
-    {"value": "NekoRay (2080)", "label": "NekoRay (2080)"},
-    {"value": "\u81ea\u5b9a\u4e49", "label": "\u81ea\u5b9a\u4e49 HTTP/SOCKS5 \u7aef\u70b9"},
-)
 _INVALID_PATH_CHARS_RE = re.compile(r'[<>:"|?*\x00-\x1f]')
 _QUOTE_CHARS = "\"'`\u201c\u201d\u2018\u2019"
 
@@ -221,6 +116,10 @@ def normalize_download_concurrency(value: int | str | None, default: int = 3) ->
     return 5
 
 
+def download_engine_options() -> list[dict[str, str]]:
+    return [dict(option) for option in DOWNLOAD_ENGINE_OPTIONS]
+
+
 def request_timeout_options() -> list[dict[str, str]]:
     return [dict(option) for option in REQUEST_TIMEOUT_OPTIONS]
 
@@ -386,6 +285,36 @@ def normalize_platform_timeout(value: Any, *, default: int = 60) -> int:
     return max(30, min(timeout, 300))
 
 
+def normalize_platform_weights(value: Any) -> dict[str, float]:
+    """规范 {平台: 带宽权重} 映射：丢弃非数值项，权重限制在 0.1..10。"""
+    if not isinstance(value, Mapping):
+        return {}
+    weights: dict[str, float] = {}
+    for platform, weight in value.items():
+        if not platform or isinstance(weight, bool):
+            continue
+        try:
+            weights[str(platform)] = max(0.1, min(float(weight), 10.0))
+        except (TypeError, ValueError):
+            continue
+    return weights
+
+
+def normalize_platform_limits(value: Any) -> dict[str, int]:
+    """规范 {平台: 并发上限} 映射：丢弃非整数项，上限限制在 0..32（0 表示不限）。"""
+    if not isinstance(value, Mapping):
+        return {}
+    limits: dict[str, int] = {}
+    for platform, limit in value.items():
+        if not platform or isinstance(limit, bool):
+            continue
+        try:
+            limits[str(platform)] = max(0, min(int(limit), 32))
+        except (TypeError, ValueError):
+            continue
+    return limits
+
+
 @dataclass
 class CommonSettings:
     """保存下载目录、命名、打开行为和主题等跨平台通用设置。"""
@@ -395,6 +324,8 @@ class CommonSettings:
     open_after_download: bool = False
     default_open_mode: str = DEFAULT_OPEN_MODE
     show_browser_window: bool = True
+    browser_pool_size: int = 2
+    browser_pool_recycle_after: int = 20
     theme: str = "light"
     dark_theme: bool = False
     theme_schema_version: int = 2
@@ -415,6 +346,8 @@ class CommonSettings:
         if self.default_open_mode not in valid_open_modes:
             self.default_open_mode = DEFAULT_OPEN_MODE
         self.show_browser_window = bool(self.show_browser_window)
+        self.browser_pool_size = max(0, min(self.browser_pool_size, 4))
+        self.browser_pool_recycle_after = max(1, min(self.browser_pool_recycle_after, 200))
         if self.theme not in SUPPORTED_THEMES:
             self.theme = "dark" if self.dark_theme else "light"
         self.dark_theme = self.theme != "light" if isinstance(self.dark_theme, bool) else False
@@ -449,6 +382,8 @@ class BilibiliSettings:
     max_items: int = 9999
     timeout: int = 60
     api_workers: int = 8
+    stream_mux: bool = False
+    range_connections: int = 1
 
     def normalize(self) -> None:
 
@@ -544,6 +479,16 @@ class DownloadSettings:
     video_only: bool = False
     image_respects_concurrency: bool = False
     image_fast_lane_limit: int = 10
+    hls_segment_workers: int = 8
+    hls_inflight_limit_mb: int = 64
+    chunked_preallocate: bool = True
+    engine: str = "thread"
+    # {平台: 带宽权重}，未列出的平台按 1.0；共享全局限速时权重越高分到的份额越大。
+    platform_bandwidth_weights: dict[str, float] = field(default_factory=dict)
+    # 排队调度的并发上限，0 表示不限；platform_concurrency_limits 按平台覆盖默认值。
+    platform_concurrency: int = 0
+    platform_concurrency_limits: dict[str, int] = field(default_factory=dict)
+    host_concurrency: int = 0
 
     def normalize(self) -> None:
 
@@ -559,6 +504,14 @@ class DownloadSettings:
         except (TypeError, ValueError):
             image_limit = 10
         self.image_fast_lane_limit = max(1, min(image_limit, 10))
+        self.hls_segment_workers = max(1, min(self.hls_segment_workers, 32))
+        self.hls_inflight_limit_mb = max(8, min(self.hls_inflight_limit_mb, 1024))
+        if self.engine not in _option_values(DOWNLOAD_ENGINE_OPTIONS):
+            self.engine = "thread"
+        self.platform_bandwidth_weights = normalize_platform_weights(self.platform_bandwidth_weights)
+        self.platform_concurrency = max(0, min(self.platform_concurrency, 32))
+        self.platform_concurrency_limits = normalize_platform_limits(self.platform_concurrency_limits)
+        self.host_concurrency = max(0, min(self.host_concurrency, 32))
 
 @dataclass
 class PlaybackSettings:
@@ -590,6 +543,7 @@ class LogSettings:
     ui_log_max_display_count: int = 300
     auto_copy_trace_on_error: bool = True
     cleanup_old_logs_on_start: bool = False
+    writer_overflow: str = "drop_oldest"
 
     def normalize(self) -> None:
 
@@ -600,6 +554,8 @@ class LogSettings:
         self.ui_log_max_display_count = normalize_ui_log_max_display_count(self.ui_log_max_display_count)
         if self.level not in _option_values(LOG_LEVEL_OPTIONS):
             self.level = "info"
+        if self.writer_overflow not in _option_values(LOG_WRITER_OVERFLOW_OPTIONS):
+            self.writer_overflow = "drop_oldest"
 
 @dataclass
 class AppearanceSettings:
@@ -33,6 +33,8 @@ from app.services.cache_service import CacheService
 from app.services.debug_service import DebugArtifactsService
 from app.services.file_service import MediaLibraryService
 from app.services.frontend_state_service import FrontendStateService
+from app.services.media_library_index import MediaLibraryIndex
+from app.services.media_metadata_store import MediaMetadataStore
 from app.services.media_release_coordination import (
     normalize_media_path,
     poll_media_release_request,
@@ -73,7 +75,11 @@ class ApplicationController(
         self.launch_media_paths = self._collect_launch_media_paths(launch_args or ())
         self.app = self._create_application()
         self._install_exception_hooks()
-        self.file_service = MediaLibraryService(self.VIDEO_EXTENSIONS, self.IMAGE_EXTENSIONS)
+        self.file_service = MediaLibraryService(
+            self.VIDEO_EXTENSIONS,
+            self.IMAGE_EXTENSIONS,
+            library_index=MediaLibraryIndex(metadata_store=MediaMetadataStore()),
+        )
         self.debug_service = DebugArtifactsService()
         self.spider_session = SpiderSession(registry)
         self.event_bus = EventBus()
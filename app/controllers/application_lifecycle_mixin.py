@@ -14,6 +14,16 @@ class ApplicationLifecycleMixin:
             spider.stop()
             spider.wait(2000)
 
+    @staticmethod
+    def _close_async_download_loop() -> None:
+        """下载停止后关闭 asyncio 引擎的共享客户端和循环线程；未启用时是空操作。"""
+        from app.core.downloaders.async_engine import async_download_loop
+
+        try:
+            async_download_loop.close()
+        except Exception as exc:
+            debug_logger.log_exception("ApplicationController", "shutdown_async_download_loop", exc)
+
     def shutdown(self):
         """在应用退出前停止媒体播放、爬虫线程和下载线程。"""
         debug_logger.log(
@@ -112,6 +122,9 @@ class ApplicationLifecycleMixin:
             stop_thread = threading.Thread(target=dl_manager.stop_all, daemon=True, name="download-stop-all")
             stop_thread.start()
             stop_thread.join(timeout=2.0)
+        self._close_async_download_loop()
+        # 下载线程退出时的最后一批日志也要在进程结束前落盘。
+        debug_logger.flush()
 
     def run(self):
         sys.exit(self.app.exec())
@@ -12,7 +12,7 @@ from app.exceptions import FileOperationError, MediaScanError
 from app.models import VideoItem
 from app.services import frontend_video_adapter as video_adapter
 from app.services.media_release_coordination import normalize_media_path
-from app.services.media_directory_monitor import media_directory_monitor
+from app.services.media_directory_monitor import MediaEntryChanges, media_directory_monitor
 from app.ui.task_runtime import ShortTaskRunner
 
 class _UiCallbackInvoker(QObject):
@@ -245,16 +245,22 @@ class MediaHostControllerMixin:
         def on_directory_changed(path: str) -> None:
             invoker.invoke(lambda path=path: self._queue_external_media_rescan(path))
 
+        def on_entries_changed(changes: MediaEntryChanges) -> None:
+            invoker.invoke(lambda changes=changes: self._queue_external_media_changes(changes))
+
         directory = self._host().current_save_dir
         self._media_directory_watch_handle = media_directory_monitor.watch(
             self._media_watch_directories(directory),
             on_directory_changed,
+            on_entries=on_entries_changed,
         )
 
     def stop_media_directory_watch(self) -> None:
         self._media_directory_watch_closed = True
         self._external_media_rescan_deferred = False
         self._external_media_rescan_retry_pending = False
+        self._external_media_full_rescan = False
+        self._external_media_changes = {}
         handle = getattr(self, "_media_directory_watch_handle", None)
         self._media_directory_watch_handle = None
         close = getattr(handle, "close", None)
@@ -292,9 +298,29 @@ class MediaHostControllerMixin:
             self._schedule_deferred_media_rescan_retry()
             return
         self._external_media_rescan_deferred = False
-        self._queue_external_media_rescan(self._host().current_save_dir)
+        self._schedule_external_media_refresh()
 
     def _queue_external_media_rescan(self, _changed_directory: str) -> None:
+        if bool(getattr(self, "_media_directory_watch_closed", False)):
+            return
+        self._external_media_full_rescan = True
+        self._schedule_external_media_refresh()
+
+    def _queue_external_media_changes(self, changes: MediaEntryChanges) -> None:
+        """按目录合并监控批次；溢出批次或缺少增量对账能力的宿主退回整目录扫描。"""
+        if bool(getattr(self, "_media_directory_watch_closed", False)):
+            return
+        if changes.overflow or not callable(getattr(self, "_collect_media_entry_changes", None)):
+            self._queue_external_media_rescan(changes.directory)
+            return
+        pending = getattr(self, "_external_media_changes", None)
+        if pending is None:
+            pending = self._external_media_changes = {}
+        previous = pending.get(changes.directory)
+        pending[changes.directory] = changes if previous is None else previous.merge(changes)
+        self._schedule_external_media_refresh()
+
+    def _schedule_external_media_refresh(self) -> None:
         if bool(getattr(self, "_media_directory_watch_closed", False)):
             return
         if self._download_work_pending():
@@ -317,7 +343,56 @@ class MediaHostControllerMixin:
             self._external_media_rescan_deferred = True
             self._schedule_deferred_media_rescan_retry()
             return
-        self.scan_local_dir(announce=False)
+        batches = list((getattr(self, "_external_media_changes", None) or {}).values())
+        self._external_media_changes = {}
+        if bool(getattr(self, "_external_media_full_rescan", False)):
+            # 整目录扫描会覆盖所有已累积的差异。
+            self._external_media_full_rescan = False
+            self.scan_local_dir(announce=False)
+        elif batches:
+            self._apply_external_media_changes(batches)
+
+    def _apply_external_media_changes(self, batches) -> None:
+        """只 stat 变化的文件；与目录扫描共用扫描锁，结果回到 Qt 主线程提交。"""
+        directory = self._host().current_save_dir
+
+        def finish(new_items, removed_paths) -> None:
+            if normalize_media_path(directory) != normalize_media_path(self._host().current_save_dir):
+                return
+            self._reconcile_media_entry_changes(new_items, removed_paths)
+            self._refresh_media_directory_watch_paths(directory)
+
+        def fail(exc: Exception) -> None:
+            debug_logger.log_exception(
+                "ApplicationController",
+                "apply_external_media_changes",
+                exc,
+                context={"directory": directory, "batches": len(batches)},
+            )
+            self._queue_external_media_rescan(directory)
+
+        if not self._should_scan_local_dir_in_background():
+            try:
+                new_items, removed_paths = self._collect_media_entry_changes(directory, batches)
+            except Exception as exc:
+                fail(exc)
+                return
+            finish(new_items, removed_paths)
+            return
+        invoker = self._ensure_ui_callback_invoker()
+
+        def collect_in_background(cancel_token) -> None:
+            with self._ensure_local_scan_lock():
+                if cancel_token.is_cancelled():
+                    return
+                try:
+                    new_items, removed_paths = self._collect_media_entry_changes(directory, batches)
+                except Exception as exc:
+                    invoker.invoke(lambda exc=exc: fail(exc))
+                    return
+            invoker.invoke(lambda: finish(new_items, removed_paths))
+
+        self._ensure_short_task_runner().submit(name="apply-media-entry-changes", fn=collect_in_background)
 
     def on_dir_changed(self):
         """目录变化后刷新宿主媒体列表。"""
@@ -0,0 +1,428 @@
+"""进程级 Playwright 浏览器池：保留预热的 Chromium 进程，按租约交出隔离的浏览器连接。
+
+同步版 Playwright 对象只能在创建它的线程使用，因此池里保存的不是 ``Browser`` 对象，
+而是开启了远程调试端口的 Chromium 进程。每次租用时由调用线程自己的 Playwright 实例
+``connect_over_cdp`` 接入，平台代码照常 ``new_context`` 并注入各自的反检测脚本与 Cookie；
+归还时关闭本租约创建的全部上下文并断开连接，进程留给下一次租用。
+"""
+
+from __future__ import annotations
+
+import atexit
+import bisect
+import os
+import subprocess
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Any
+
+from app.config import cfg
+from app.debug_logger import debug_logger
+from app.utils.runtime_paths import user_cache_root
+
+DEFAULT_POOL_SIZE = 2
+DEFAULT_RECYCLE_AFTER = 20
+CDP_READY_TIMEOUT_SECONDS = 15.0
+CDP_CONNECT_TIMEOUT_MS = 30_000
+TERMINATE_WAIT_SECONDS = 5.0
+LEASE_LATENCY_BUCKETS_MS = (10, 50, 100, 250, 500, 1000, 3000, 10000)
+# 只有这些启动参数能由独立进程等价复现；channel、executable_path 等仍走 Playwright 冷启动。
+POOLABLE_LAUNCH_KEYS = frozenset({"headless", "args", "proxy"})
+# 对齐 Playwright 默认启动参数中与自动化稳定性相关的部分，但不带 --enable-automation。
+CHROMIUM_BASE_ARGS = (
+    "--no-first-run",
+    "--no-default-browser-check",
+    "--no-startup-window",
+    "--no-service-autorun",
+    "--disable-background-networking",
+    "--disable-component-update",
+    "--disable-default-apps",
+    "--disable-sync",
+    "--disable-breakpad",
+    "--disable-dev-shm-usage",
+    "--password-store=basic",
+    "--use-mock-keychain",
+)
+CHROMIUM_HEADLESS_ARGS = ("--headless", "--hide-scrollbars", "--mute-audio")
+
+LaunchKey = tuple[bool, tuple[str, ...], str]
+
+
+class BrowserPoolError(RuntimeError):
+    """预热浏览器进程无法启动或未在限定时间内开放调试端口。"""
+
+
+def configured_pool_size() -> int:
+    """``common.browser_pool_size`` 为池保留的 Chromium 进程数（含租出中的），``0`` 表示关闭浏览器池。"""
+    try:
+        size = int(cfg.get("common", "browser_pool_size", DEFAULT_POOL_SIZE))
+    except (TypeError, ValueError):
+        size = DEFAULT_POOL_SIZE
+    return max(0, size)
+
+
+def configured_recycle_after() -> int:
+    try:
+        limit = int(cfg.get("common", "browser_pool_recycle_after", DEFAULT_RECYCLE_AFTER))
+    except (TypeError, ValueError):
+        limit = DEFAULT_RECYCLE_AFTER
+    return max(1, limit)
+
+
+def launch_key(launch_kwargs: dict[str, Any]) -> LaunchKey | None:
+    """把 ``chromium.launch`` 参数归一成池键；无法由独立进程复现时返回 ``None``。"""
+    if set(launch_kwargs) - POOLABLE_LAUNCH_KEYS:
+        return None
+    proxy = launch_kwargs.get("proxy")
+    proxy_server = ""
+    if proxy:
+        # 带认证或 bypass 的代理需要 Playwright 在连接层处理，不能只靠 --proxy-server。
+        if not isinstance(proxy, dict) or set(proxy) - {"server"}:
+            return None
+        proxy_server = str(proxy.get("server") or "")
+    args = tuple(str(item) for item in launch_kwargs.get("args") or ())
+    return bool(launch_kwargs.get("headless", True)), args, proxy_server
+
+
+class LeaseLatencyHistogram:
+    """固定桶的租约耗时直方图（毫秒）。"""
+
+    def __init__(self) -> None:
+        self.counts = [0] * (len(LEASE_LATENCY_BUCKETS_MS) + 1)
+        self.total = 0
+        self.sum_ms = 0.0
+        self.max_ms = 0.0
+
+    def observe(self, elapsed_ms: float) -> None:
+        elapsed_ms = max(0.0, float(elapsed_ms))
+        self.counts[bisect.bisect_left(LEASE_LATENCY_BUCKETS_MS, elapsed_ms)] += 1
+        self.total += 1
+        self.sum_ms += elapsed_ms
+        self.max_ms = max(self.max_ms, elapsed_ms)
+
+    def snapshot(self) -> dict[str, Any]:
+        return {
+            "buckets": [*LEASE_LATENCY_BUCKETS_MS, "inf"],
+            "counts": list(self.counts),
+            "count": self.total,
+            "avg_ms": round(self.sum_ms / self.total, 1) if self.total else 0.0,
+            "max_ms": round(self.max_ms, 1),
+        }
+
+
+class WarmBrowser:
+    """一个开放本地调试端口的 Chromium 进程及其临时用户目录。"""
+
+    def __init__(
+        self,
+        key: LaunchKey,
+        process: subprocess.Popen,
+        endpoint: str,
+        profile: tempfile.TemporaryDirectory[str] | None = None,
+    ) -> None:
+        self.key = key
+        self.process = process
+        self.endpoint = endpoint
+        self.profile = profile
+        self.contexts_served = 0
+
+    def alive(self) -> bool:
+        return self.process.poll() is None
+
+    def terminate(self) -> None:
+        """终止进程树并清理用户目录；退出阶段尽力而为。"""
+        process = self.process
+        if process.poll() is None:
+            try:
+                if os.name == "nt":
+                    subprocess.run(
+                        ["taskkill", "/PID", str(process.pid), "/T", "/F"],
+                        check=False,
+                        capture_output=True,
+                    )
+                else:
+                    process.terminate()
+                    try:
+                        process.wait(timeout=TERMINATE_WAIT_SECONDS)
+                    except subprocess.TimeoutExpired:
+                        process.kill()
+            except OSError:
+                pass
+        if self.profile is not None:
+            self.profile.cleanup()
+            self.profile = None
+
+
+def spawn_warm_browser(executable: str, key: LaunchKey) -> WarmBrowser:
+    """启动一个 Chromium 进程，等待其写出 ``DevToolsActivePort`` 后返回。"""
+    headless, args, proxy_server = key
+    profile_root = user_cache_root() / "browser_profiles"
+    profile_root.mkdir(parents=True, exist_ok=True)
+    profile = tempfile.TemporaryDirectory(prefix="pool-", dir=profile_root, ignore_cleanup_errors=True)
+    command = [
+        executable,
+        # 端口 0 由 Chromium 自选并写入用户目录，避免预分配端口与其它进程竞争。
+        "--remote-debugging-port=0",
+        f"--user-data-dir={profile.name}",
+        *CHROMIUM_BASE_ARGS,
+    ]
+    if headless:
+        command.extend(CHROMIUM_HEADLESS_ARGS)
+    if proxy_server:
+        command.append(f"--proxy-server={proxy_server}")
+    command.extend(args)
+    try:
+        process = subprocess.Popen(
+            command,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            creationflags=getattr(subprocess, "CREATE_NEW_PROCESS_GROUP", 0),
+        )
+    except OSError as exc:
+        profile.cleanup()
+        raise BrowserPoolError(f"无法启动预热浏览器: {exc}") from exc
+    warm = WarmBrowser(key, process, "", profile)
+    port_file = Path(profile.name) / "DevToolsActivePort"
+    deadline = time.monotonic() + CDP_READY_TIMEOUT_SECONDS
+    while time.monotonic() < deadline and warm.alive():
+        try:
+            port = int(port_file.read_text(encoding="utf-8").splitlines()[0])
+        except (OSError, ValueError, IndexError):
+            time.sleep(0.05)
+            continue
+        warm.endpoint = f"http://127.0.0.1:{port}"
+        return warm
+    exited = not warm.alive()
+    warm.terminate()
+    raise BrowserPoolError("预热浏览器异常退出" if exited else "预热浏览器未在限定时间内开放调试端口")
+
+
+class PooledBrowser:
+    """``connect_over_cdp`` 得到的 Browser 包装；其余属性与方法透传给真实对象。
+
+    ``close()`` 关闭本租约创建的上下文并断开连接，再把进程交还浏览器池；因此
+    ``_track_playwright_browser`` / ``_close_tracked_playwright_browser`` 的停止语义不变。
+    """
+
+    def __init__(self, pool: BrowserPool, warm: WarmBrowser, browser: Any) -> None:
+        self._pool = pool
+        self._warm = warm
+        self._browser = browser
+        self._contexts: list[Any] = []
+        self._released = False
+
+    def new_context(self, **kwargs: Any) -> Any:
+        context = self._browser.new_context(**kwargs)
+        self._contexts.append(context)
+        return context
+
+    def new_page(self, **kwargs: Any) -> Any:
+        page = self._browser.new_page(**kwargs)
+        self._contexts.append(page.context)
+        return page
+
+    def close(self, **_kwargs: Any) -> None:
+        if self._released:
+            return
+        self._released = True
+        healthy = True
+        for context in self._contexts:
+            try:
+                context.close()
+            except Exception as exc:
+                # 驱动已被停止或浏览器崩溃；进程不再可信，归还时直接回收。
+                healthy = False
+                debug_logger.log_exception("BrowserPool", "close_context", exc)
+        try:
+            self._browser.close()
+        except Exception as exc:
+            healthy = False
+            debug_logger.log_exception("BrowserPool", "disconnect", exc)
+        self._pool.release(self._warm, contexts=len(self._contexts), healthy=healthy)
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._browser, name)
+
+
+class BrowserPool:
+    """进程级预热 Chromium 池，所有爬虫与下载器的浏览器回退共享。
+
+    池按启动参数（无头、命令行参数、代理）分键；租用命中空闲进程时只需一次本地 CDP
+    连接，未命中时同步冷启动。池按需增长：冷启动的进程归还后留作空闲进程，总数以池大小为上限，
+    不在首次使用前预先启动；只有租用中的进程被回收或崩溃时才在后台补一个同键进程。
+    进程在服务 ``recycle_after`` 个上下文、连接失败或关闭异常后回收。
+    """
+
+    def __init__(self, *, spawn=spawn_warm_browser) -> None:
+        self._spawn = spawn
+        self._lock = threading.Lock()
+        self._idle: list[WarmBrowser] = []
+        self._leased: set[WarmBrowser] = set()
+        self._warming: dict[LaunchKey, int] = {}
+        self._executable = ""
+        self._leases = 0
+        self._hits = 0
+        self._misses = 0
+        self._fallbacks = 0
+        self._recycled = 0
+        self._crashed = 0
+        self._latency = LeaseLatencyHistogram()
+
+    def launch(self, playwright: Any, **launch_kwargs: Any) -> Any:
+        """替代 ``playwright.chromium.launch``；不可池化时按原参数冷启动。"""
+        key = launch_key(launch_kwargs)
+        executable = self._executable_for(playwright) if key is not None and configured_pool_size() > 0 else ""
+        if key is None or not executable:
+            return self._fallback_launch(playwright, launch_kwargs)
+        started = time.perf_counter()
+        for _attempt in range(2):
+            try:
+                warm, hit = self._checkout(key, executable)
+            except BrowserPoolError as exc:
+                debug_logger.log_exception("BrowserPool", "spawn", exc)
+                break
+            try:
+                browser = playwright.chromium.connect_over_cdp(warm.endpoint, timeout=CDP_CONNECT_TIMEOUT_MS)
+            except Exception as exc:
+                debug_logger.log_exception("BrowserPool", "connect_over_cdp", exc)
+                self.release(warm, contexts=0, healthy=False)
+                continue
+            self._record_lease(hit, (time.perf_counter() - started) * 1000)
+            return PooledBrowser(self, warm, browser)
+        return self._fallback_launch(playwright, launch_kwargs)
+
+    def release(self, warm: WarmBrowser, *, contexts: int, healthy: bool) -> None:
+        """归还租约；不健康、已崩溃、达到回收阈值或超出空闲上限的进程直接终止。"""
+        with self._lock:
+            self._leased.discard(warm)
+            warm.contexts_served += max(0, int(contexts))
+            alive = warm.alive()
+            keep = (
+                healthy
+                and alive
+                and warm.contexts_served < configured_recycle_after()
+                and len(self._idle) < configured_pool_size()
+            )
+            if keep:
+                self._idle.append(warm)
+            elif not alive:
+                self._crashed += 1
+            else:
+                self._recycled += 1
+        if not keep:
+            warm.terminate()
+            self._schedule_refill(warm.key)
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            leases = self._leases
+            return {
+                "size": configured_pool_size(),
+                "idle": len(self._idle),
+                "leased": len(self._leased),
+                "warming": sum(self._warming.values()),
+                "leases": leases,
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate": round(self._hits / leases, 4) if leases else 0.0,
+                "fallbacks": self._fallbacks,
+                "recycled": self._recycled,
+                "crashed": self._crashed,
+                "lease_latency_ms": self._latency.snapshot(),
+            }
+
+    def close(self) -> None:
+        """终止所有预热与租出的进程；用于进程退出。"""
+        with self._lock:
+            browsers = [*self._idle, *self._leased]
+            self._idle.clear()
+            self._leased.clear()
+        for warm in browsers:
+            warm.terminate()
+
+    def _executable_for(self, playwright: Any) -> str:
+        if self._executable:
+            return self._executable
+        try:
+            executable = playwright.chromium.executable_path
+        except Exception as exc:
+            debug_logger.log_exception("BrowserPool", "executable_path", exc)
+            return ""
+        if isinstance(executable, str) and os.path.isfile(executable):
+            self._executable = executable
+            return executable
+        return ""
+
+    def _fallback_launch(self, playwright: Any, launch_kwargs: dict[str, Any]) -> Any:
+        with self._lock:
+            self._fallbacks += 1
+        return playwright.chromium.launch(**launch_kwargs)
+
+    def _checkout(self, key: LaunchKey, executable: str) -> tuple[WarmBrowser, bool]:
+        dead: list[WarmBrowser] = []
+        leased: WarmBrowser | None = None
+        with self._lock:
+            for warm in [item for item in self._idle if item.key == key]:
+                self._idle.remove(warm)
+                if warm.alive():
+                    leased = warm
+                    break
+                self._crashed += 1
+                dead.append(warm)
+            if leased is not None:
+                self._leased.add(leased)
+        for warm in dead:
+            warm.terminate()
+        if leased is not None:
+            return leased, True
+        warm = self._spawn(executable, key)
+        with self._lock:
+            self._leased.add(warm)
+        return warm, False
+
+    def _schedule_refill(self, key: LaunchKey) -> None:
+        """替换被回收或崩溃的进程：空闲、租出与预热中的进程总数低于池大小时，后台补一个同键进程。"""
+        executable = self._executable
+        with self._lock:
+            pending = len(self._idle) + len(self._leased) + sum(self._warming.values())
+            if not executable or pending >= configured_pool_size() or self._warming.get(key):
+                return
+            self._warming[key] = 1
+        threading.Thread(target=self._refill, args=(key, executable), name="ucrawl-browser-warmup", daemon=True).start()
+
+    def _refill(self, key: LaunchKey, executable: str) -> None:
+        try:
+            warm = self._spawn(executable, key)
+        except BrowserPoolError as exc:
+            debug_logger.log_exception("BrowserPool", "warmup", exc)
+            with self._lock:
+                self._warming.pop(key, None)
+            return
+        with self._lock:
+            self._warming.pop(key, None)
+            keep = len(self._idle) < configured_pool_size()
+            if keep:
+                self._idle.append(warm)
+        if not keep:
+            warm.terminate()
+
+    def _record_lease(self, hit: bool, elapsed_ms: float) -> None:
+        with self._lock:
+            self._leases += 1
+            if hit:
+                self._hits += 1
+            else:
+                self._misses += 1
+            self._latency.observe(elapsed_ms)
+            hit_rate = round(self._hits / self._leases, 4)
+        debug_logger.log(
+            "BrowserPool",
+            "lease",
+            details={"hit": hit, "latency_ms": round(elapsed_ms, 1), "hit_rate": hit_rate},
+        )
+
+
+browser_pool = BrowserPool()
+atexit.register(browser_pool.close)
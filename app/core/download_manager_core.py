@@ -6,7 +6,6 @@ import os
 import queue
 import threading
 import time
-from collections import deque
 from typing import Any, Iterable
 
 from app.config import cfg, normalize_download_concurrency
@@ -14,137 +13,29 @@ from app.debug_logger import debug_logger
 from app.exceptions import AppError
 from app.core.media_filter import is_image_like_resource, should_skip_for_video_only
 from app.core.download_path_policy import resolve_task_save_directory
+from app.core.download_queue import LANE_HEAVY, LANE_LIGHT, PendingDownloadQueue
 from app.models import VideoItem
 from app.services.download_recovery_store import DownloadRecoveryStore
 
-class PendingDownloadQueue:
-    """支持取消与一致性快照的线程安全先进先出队列。
-
-    内部 deque 没有容量上限；管理器的槽位只限制任务执行并发，不限制排队任务在
-    内存中的积压量。
-    """
-
-    def __init__(self) -> None:
-        self._items: deque[tuple[VideoItem, str]] = deque()
-        self._condition = threading.Condition()
-        # 这里存的是“排队中的 id 计数”而不是 set，避免同一资源被重复加入时取消/快照漏算。
-        self._queued_ids: dict[str, int] = {}
-
-    def _track_enqueue(self, video_id: str) -> None:
-        if video_id:
-            self._queued_ids[video_id] = self._queued_ids.get(video_id, 0) + 1
-
-    def _track_dequeue(self, video_id: str) -> None:
-        if not video_id:
-            return
-        count = self._queued_ids.get(video_id, 0)
-        if count <= 1:
-            self._queued_ids.pop(video_id, None)
-        else:
-            self._queued_ids[video_id] = count - 1
-
-    def put(self, item: tuple[VideoItem, str]) -> None:
-        with self._condition:
-            self._items.append(item)
-            self._track_enqueue(getattr(item[0], "id", ""))
-            self._condition.notify()
-
-    def put_many(self, items: Iterable[tuple[VideoItem, str]]) -> int:
-        count = 0
-        with self._condition:
-            for item in items:
-                self._items.append(item)
-                self._track_enqueue(getattr(item[0], "id", ""))
-                count += 1
-            if count:
-                self._condition.notify_all()
-        return count
-
-    def get(self, timeout: float | None = None) -> tuple[VideoItem, str]:
-        deadline = None if timeout is None else time.monotonic() + max(0.0, timeout)
-        with self._condition:
-            while not self._items:
-                if timeout is None:
-                    self._condition.wait()
-                    continue
-                remaining = deadline - time.monotonic() if deadline is not None else 0.0
-                if remaining <= 0:
-                    raise queue.Empty
-                self._condition.wait(remaining)
-            item = self._items.popleft()
-            self._track_dequeue(getattr(item[0], "id", ""))
-            return item
-
-    def get_nowait(self) -> tuple[VideoItem, str]:
-        return self.get(timeout=0.0)
-
-    def empty(self) -> bool:
-        with self._condition:
-            return not self._items
-
-    def qsize(self) -> int:
-        with self._condition:
-            return len(self._items)
-
-    def drain(self) -> list[tuple[VideoItem, str]]:
-        with self._condition:
-            items = list(self._items)
-            self._items.clear()
-            self._queued_ids.clear()
-            return items
-
-    def remove_video(self, video_id: str) -> VideoItem | None:
-        removed = self.remove_videos({video_id})
-        return removed[0] if removed else None
-
-    def remove_video_instance(self, video: VideoItem) -> int:
-        """只移除与捕获对象相同的排队项，保留复用同一 ID 的新任务。"""
-        with self._condition:
-            retained: deque[tuple[VideoItem, str]] = deque()
-            removed_count = 0
-            while self._items:
-                queued_video, save_dir = self._items.popleft()
-                if queued_video is video:
-                    removed_count += 1
-                    self._track_dequeue(queued_video.id)
-                    continue
-                retained.append((queued_video, save_dir))
-            self._items = retained
-            return removed_count
-
-    def remove_videos(self, video_ids: Iterable[str]) -> list[VideoItem]:
-        ids = {str(video_id) for video_id in video_ids if video_id}
-        if not ids:
-            return []
-        with self._condition:
-            retained: deque[tuple[VideoItem, str]] = deque()
-            removed: list[VideoItem] = []
-            while self._items:
-                queued_video, save_dir = self._items.popleft()
-                if queued_video.id in ids:
-                    removed.append(queued_video)
-                    self._track_dequeue(queued_video.id)
-                    continue
-                retained.append((queued_video, save_dir))
-            self._items = retained
-            return removed
-
-    def snapshot_video_ids(self) -> set[str]:
-        with self._condition:
-            return set(self._queued_ids)
-
 class DownloadManagerCore:
     """统一管理入队、并发槽位、取消操作及工作线程生命周期。"""
 
     WORKER_STOP_TIMEOUT_MS = 2000
     LIGHTWEIGHT_MIN_CONCURRENT = 10
     LIGHTWEIGHT_CONCURRENCY_CAP = 10
+    # 平台/主机并发上限，0 表示只受 max_concurrent 约束；可通过 set_runtime_options 调整。
+    DEFAULT_PLATFORM_CONCURRENCY = 0
+    HOST_CONCURRENCY_LIMIT = 0
     _GUARD_INIT_LOCK = threading.RLock()
     _STARTUP_MAINTENANCE_LOCK = threading.RLock()
     _STARTUP_MAINTENANCE_ROOTS: set[str] = set()
 
     def __init__(self, max_concurrent: int | None = None):
-        self.queue = PendingDownloadQueue()
+        self.queue = PendingDownloadQueue(lane_of=self._download_lane)
+        self.queue.set_limits(
+            default_platform_limit=self.DEFAULT_PLATFORM_CONCURRENCY,
+            host_limit=self.HOST_CONCURRENCY_LIMIT,
+        )
         self.workers: list[Any] = []
         self._dispatching_tasks: list[tuple[VideoItem, str]] = []
         self.max_concurrent = normalize_download_concurrency(max_concurrent or cfg.get("download", "max_concurrent", 3))
@@ -497,8 +388,69 @@ class DownloadManagerCore:
             )
         if "image_fast_lane_limit" in options:
             applied["image_fast_lane_limit"] = self.set_image_fast_lane_limit(options["image_fast_lane_limit"])
+        if {"platform_concurrency", "platform_concurrency_limits", "host_concurrency"} & options.keys():
+            applied.update(
+                self.set_scheduler_limits(
+                    platform_concurrency=options.get("platform_concurrency"),
+                    platform_concurrency_limits=options.get("platform_concurrency_limits"),
+                    host_concurrency=options.get("host_concurrency"),
+                )
+            )
         return applied
 
+    def set_scheduler_limits(
+        self,
+        *,
+        platform_concurrency: Any = None,
+        platform_concurrency_limits: Any = None,
+        host_concurrency: Any = None,
+    ) -> dict[str, Any]:
+        """设置排队调度的平台/主机并发上限。
+
+        ``platform_concurrency`` 是所有平台的默认上限（兼容旧调用也可直接传
+        ``{平台: 上限}`` 映射），``platform_concurrency_limits`` 按平台覆盖；0 表示不限。
+        队列不支持上限时原样返回空结果。
+        """
+        set_limits = getattr(self.queue, "set_limits", None)
+        if not callable(set_limits):
+            return {}
+        if isinstance(platform_concurrency, dict) and platform_concurrency_limits is None:
+            platform_concurrency, platform_concurrency_limits = None, platform_concurrency
+        kwargs: dict[str, Any] = {}
+        try:
+            if isinstance(platform_concurrency_limits, dict):
+                kwargs["platform_limits"] = {
+                    str(key): int(value) for key, value in platform_concurrency_limits.items()
+                }
+            if platform_concurrency is not None:
+                kwargs["default_platform_limit"] = int(platform_concurrency)
+            if host_concurrency is not None:
+                kwargs["host_limit"] = int(host_concurrency)
+        except (TypeError, ValueError):
+            return {}
+        set_limits(**kwargs)
+        limits = self.queue.limits()
+        return {
+            "platform_concurrency": limits["default_platform_limit"],
+            "platform_concurrency_limits": limits["platform_limits"],
+            "host_concurrency": limits["host_limit"],
+        }
+
+    def set_task_priority(self, video_ids: Iterable[str], priority: int) -> int:
+        """调整排队任务的优先级（数值越大越先下载），返回受影响的任务数。"""
+        set_priority = getattr(self.queue, "set_priority", None)
+        if not callable(set_priority):
+            return 0
+        try:
+            return int(set_priority(video_ids, int(priority)))
+        except (TypeError, ValueError):
+            return 0
+
+    def scheduler_stats(self) -> dict[str, Any]:
+        """排队调度快照：各车道积压、挂起分组、运行中名额和排队等待直方图。"""
+        stats = getattr(getattr(self, "queue", None), "stats", None)
+        return stats() if callable(stats) else {}
+
     def _get_dispatch_slot_gate(self) -> threading.Event:
         gate = getattr(self, "_dispatch_slot_gate", None)
         if gate is None:
@@ -546,6 +498,35 @@ class DownloadManagerCore:
     def _is_lightweight_download(self, video: VideoItem | None) -> bool:
         return is_image_like_resource(video)
 
+    def _download_lane(self, video: VideoItem) -> str:
+        return LANE_LIGHT if self._is_lightweight_download(video) else LANE_HEAVY
+
+    def _open_download_lanes(self) -> set[str]:
+        """返回当前还有空位的车道，规则与 ``_has_capacity_for`` 一致。
+
+        由排队调度在持有队列锁时调用，因此不做 prune，只读取已登记的 worker。
+        """
+        with self._workers_lock:
+            if len(self.workers) >= self._slot_capacity():
+                return set()
+            lanes = {LANE_LIGHT}
+            if self._active_heavy_worker_count_unlocked() < int(getattr(self, "max_concurrent", 1) or 1):
+                lanes.add(LANE_HEAVY)
+            return lanes
+
+    def _release_queue_limits(self, video: VideoItem | None) -> None:
+        release = getattr(getattr(self, "queue", None), "release", None)
+        if video is not None and callable(release):
+            release(video)
+
+    def _requeue_task(self, video: VideoItem, save_dir: str) -> bool:
+        """出队后未能启动的任务放回原位；普通队列退化为追加到队尾并返回 False。"""
+        requeue = getattr(self.queue, "requeue", None)
+        if callable(requeue) and requeue(video):
+            return True
+        self.queue.put((video, save_dir))
+        return False
+
     def _should_skip_for_video_only(self, video: VideoItem | None) -> bool:
         return bool(getattr(self, "video_only", False)) and should_skip_for_video_only(video)
 
@@ -877,6 +858,9 @@ class DownloadManagerCore:
                 break
         if not self.is_running:
             return
+        bind_capacity = getattr(self.queue, "bind_capacity", None)
+        if callable(bind_capacity):
+            bind_capacity(self._open_download_lanes)
         while self.is_running:
             slot_acquired = False
             recovery_registered = False
@@ -897,18 +881,22 @@ class DownloadManagerCore:
 
                 with self._start_stop_guard():
                     if not self.is_running:
-                        self.queue.put((video, save_dir))
+                        self._requeue_task(video, save_dir)
                         self._clear_dispatching(video)
                         self._release_dispatch_slot("dispatch_slot_manager_stopped")
                         slot_acquired = False
+                        video = None
                         break
 
                 if not self._has_capacity_for(video):
-                    self.queue.put((video, save_dir))
+                    requeued_in_place = self._requeue_task(video, save_dir)
                     self._clear_dispatching(video)
                     self._release_dispatch_slot("dispatch_slot_task_capacity_full")
                     slot_acquired = False
-                    time.sleep(0.02)
+                    video = None
+                    if not requeued_in_place:
+                        # 普通 FIFO 队列无法按车道挑选，短暂退让避免空转。
+                        time.sleep(0.02)
                     continue
 
                 if video.meta.get("user_cancel_requested"):
@@ -964,6 +952,8 @@ class DownloadManagerCore:
                     self._clear_dispatching(video)
                     worker.start()
                 slot_acquired = False
+                # 交给 worker 后由槽位释放负责归还平台/主机名额。
+                video = None
             except queue.Empty:
                 continue
             except Exception as e:
@@ -989,6 +979,7 @@ class DownloadManagerCore:
                     self._emit_task_error(failed_video.id, f"\u8c03\u5ea6\u5931\u8d25: {e}")
             finally:
                 self._clear_dispatching(video)
+                self._release_queue_limits(video)
                 if slot_acquired:
                     self._release_dispatch_slot("dispatch_slot_finally")
 
@@ -1228,6 +1219,7 @@ class DownloadManagerCore:
             return
         if worker is not None:
             worker._slot_released = True
+            self._release_queue_limits(getattr(worker, "video", None))
         try:
             with self._slot_semaphore_guard():
                 self.slot_semaphore.release()
@@ -1259,10 +1251,29 @@ class DownloadManagerCore:
                 message="Released download concurrency slot",
                 status_code="DL_SLOT_RELEASE",
                 context=context,
-                details={"reason": reason},
+                details={
+                    "reason": reason,
+                    "http_pool": self._http_pool_stats(),
+                    "bandwidth": self._bandwidth_stats(),
+                    "scheduler": self.scheduler_stats(),
+                },
                 trace_id=trace_id,
             )
 
+    @staticmethod
+    def _http_pool_stats() -> dict[str, Any]:
+        """附带共享下载会话池的握手/复用计数，便于在日志里观察高并发下的连接复用率。"""
+        from app.core.downloaders.http_pool import download_session_pool
+
+        return download_session_pool.stats()
+
+    @staticmethod
+    def _bandwidth_stats() -> dict[str, Any]:
+        """附带全局带宽调度的分配速度与实际速度，排查“限速不准”时对照各任务份额。"""
+        from app.core.downloaders.bandwidth import bandwidth_scheduler
+
+        return bandwidth_scheduler.stats()
+
     def _handle_worker_completion(self, worker: Any, reason: str) -> None:
         with self._workers_lock:
             if worker in self.workers:
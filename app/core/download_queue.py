@@ -0,0 +1,479 @@
+"""下载排队调度：按车道、优先级和分组轮转挑选下一项，并施加平台/主机并发上限。"""
+
+from __future__ import annotations
+
+import bisect
+import heapq
+import itertools
+import queue
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Iterable
+from urllib.parse import urlparse
+
+from app.core.media_filter import is_image_like_resource
+from app.models import VideoItem
+
+LANE_HEAVY = "heavy"
+LANE_LIGHT = "light"
+LANES = (LANE_HEAVY, LANE_LIGHT)
+# 排队等待时长直方图的桶上界（秒），最后一个桶收纳更长的等待。
+WAIT_BUCKETS_SECONDS = (0.1, 0.5, 1.0, 5.0, 15.0, 60.0, 300.0, 900.0)
+
+CapacityProbe = Callable[[], Iterable[str]]
+
+
+@dataclass(eq=False, slots=True)
+class _Entry:
+    seq: int
+    video: VideoItem
+    save_dir: str
+    priority: int
+    lane: str
+    group: _Group
+    enqueued_at: float
+    alive: bool = True
+
+
+@dataclass(eq=False, slots=True)
+class _Group:
+    """同一车道内同一批次/来源的任务；组内按 (优先级, 入队顺序) 出队。"""
+
+    key: tuple[str, str]
+    order: int
+    vtime: int
+    items: list[tuple[int, int, _Entry]] = field(default_factory=list)
+    version: int = 0
+    parked: bool = False
+
+    def head(self) -> _Entry | None:
+        while self.items and not self.items[0][2].alive:
+            heapq.heappop(self.items)
+        return self.items[0][2] if self.items else None
+
+
+class WaitHistogram:
+    """固定桶的等待时长直方图，记录一次 O(log 桶数)。"""
+
+    def __init__(self) -> None:
+        self.counts = [0] * (len(WAIT_BUCKETS_SECONDS) + 1)
+        self.total = 0
+        self.sum_seconds = 0.0
+        self.max_seconds = 0.0
+
+    def observe(self, seconds: float) -> None:
+        seconds = max(0.0, float(seconds))
+        self.counts[bisect.bisect_left(WAIT_BUCKETS_SECONDS, seconds)] += 1
+        self.total += 1
+        self.sum_seconds += seconds
+        self.max_seconds = max(self.max_seconds, seconds)
+
+    def snapshot(self) -> dict[str, Any]:
+        return {
+            "buckets": [*WAIT_BUCKETS_SECONDS, "inf"],
+            "counts": list(self.counts),
+            "count": self.total,
+            "avg_seconds": round(self.sum_seconds / self.total, 3) if self.total else 0.0,
+            "max_seconds": round(self.max_seconds, 3),
+        }
+
+
+class PendingDownloadQueue:
+    """线程安全的下载排队调度器，同时保留原先队列的取消与快照接口。
+
+    任务按资源类型分进重资源和图片两条车道，每条车道内以分组为单位排在一个堆里：
+    堆键是 ``(-组头优先级, 轮转时钟, 组头序号)``，每次出队后该组的轮转时钟推进到
+    车道时钟，同优先级下各分组轮流出队，一个平台的大批量任务不会饿死其他批次。
+    分组取自 ``meta["queue_group"]``，缺省按来源平台分组。
+
+    ``bind_capacity`` 绑定的探针返回当前还能接收任务的车道；组头命中平台或主机
+    并发上限时整组挂起到对应的键上，``release`` 释放名额时再放回堆里，所以
+    出队和挂起都是 O(log n)，被跳过的任务也不会重新入队。
+
+    内部没有容量上限；管理器的槽位只限制任务执行并发，不限制排队积压量。
+    """
+
+    def __init__(self, *, lane_of: Callable[[VideoItem], str] | None = None) -> None:
+        self._condition = threading.Condition()
+        self._lane_of = lane_of or self.default_lane
+        self._seq = itertools.count()
+        self._group_order = itertools.count()
+        self._entries: dict[int, _Entry] = {}
+        self._groups: dict[tuple[str, str], _Group] = {}
+        self._heaps: dict[str, list[tuple[int, int, int, int, int, _Group]]] = {lane: [] for lane in LANES}
+        self._clocks: dict[str, int] = {lane: 0 for lane in LANES}
+        self._parked: dict[tuple[str, str], list[_Group]] = {}
+        # 这里存的是“排队中的 id 计数”而不是 set，避免同一资源被重复加入时取消/快照漏算。
+        self._queued_ids: dict[str, int] = {}
+        self._capacity_probe: CapacityProbe | None = None
+        self._platform_limits: dict[str, int] = {}
+        self._default_platform_limit = 0
+        self._host_limit = 0
+        self._running: dict[tuple[str, str], int] = {}
+        self._dispatched: dict[int, _Entry] = {}
+        self._wait_histograms = {lane: WaitHistogram() for lane in LANES}
+
+    @staticmethod
+    def default_lane(video: VideoItem) -> str:
+        return LANE_LIGHT if is_image_like_resource(video) else LANE_HEAVY
+
+    @staticmethod
+    def _group_name(video: VideoItem) -> str:
+        meta = getattr(video, "meta", None) or {}
+        return str(meta.get("queue_group") or getattr(video, "source", "") or "default")
+
+    @staticmethod
+    def _priority(video: VideoItem) -> int:
+        meta = getattr(video, "meta", None) or {}
+        try:
+            return int(meta.get("queue_priority") or 0)
+        except (TypeError, ValueError):
+            return 0
+
+    @staticmethod
+    def _limit_keys(video: VideoItem) -> tuple[tuple[str, str], tuple[str, str]]:
+        host = urlparse(str(getattr(video, "url", "") or "")).hostname or ""
+        return ("platform", str(getattr(video, "source", "") or "")), ("host", host.lower())
+
+    # ---- 配置 -------------------------------------------------------------
+
+    def bind_capacity(self, probe: CapacityProbe | None) -> None:
+        """绑定车道容量探针；未绑定时所有车道都视为可用。"""
+        with self._condition:
+            self._capacity_probe = probe
+            self._condition.notify_all()
+
+    def set_limits(
+        self,
+        *,
+        platform_limits: dict[str, int] | None = None,
+        default_platform_limit: int | None = None,
+        host_limit: int | None = None,
+    ) -> None:
+        """设置平台/主机并发上限，0 表示不限；变更后所有挂起分组重新参与调度。"""
+        with self._condition:
+            if platform_limits is not None:
+                self._platform_limits = {
+                    str(name): max(0, int(limit)) for name, limit in platform_limits.items() if name
+                }
+            if default_platform_limit is not None:
+                self._default_platform_limit = max(0, int(default_platform_limit))
+            if host_limit is not None:
+                self._host_limit = max(0, int(host_limit))
+            for key in list(self._parked):
+                self._unpark(key)
+            self._condition.notify_all()
+
+    def limits(self) -> dict[str, Any]:
+        with self._condition:
+            return {
+                "platform_limits": dict(self._platform_limits),
+                "default_platform_limit": self._default_platform_limit,
+                "host_limit": self._host_limit,
+            }
+
+    def wake(self) -> None:
+        """外部容量变化（如 worker 结束）后唤醒等待中的 ``get``。"""
+        with self._condition:
+            self._condition.notify_all()
+
+    # ---- 入队与出队 -------------------------------------------------------
+
+    def put(self, item: tuple[VideoItem, str]) -> None:
+        with self._condition:
+            self._enqueue(item[0], item[1], time.monotonic())
+            self._condition.notify()
+
+    def put_many(self, items: Iterable[tuple[VideoItem, str]]) -> int:
+        count = 0
+        now = time.monotonic()
+        with self._condition:
+            for video, save_dir in items:
+                self._enqueue(video, save_dir, now)
+                count += 1
+            if count:
+                self._condition.notify_all()
+        return count
+
+    def get(self, timeout: float | None = None) -> tuple[VideoItem, str]:
+        deadline = None if timeout is None else time.monotonic() + max(0.0, timeout)
+        with self._condition:
+            while True:
+                entry = self._select()
+                if entry is not None:
+                    return entry.video, entry.save_dir
+                if timeout is None:
+                    self._condition.wait()
+                    continue
+                remaining = deadline - time.monotonic() if deadline is not None else 0.0
+                if remaining <= 0:
+                    raise queue.Empty
+                self._condition.wait(remaining)
+
+    def get_nowait(self) -> tuple[VideoItem, str]:
+        return self.get(timeout=0.0)
+
+    def release(self, video: VideoItem) -> None:
+        """任务结束或未能启动时归还平台/主机名额；重复调用无副作用。"""
+        with self._condition:
+            entry = self._dispatched.pop(id(video), None)
+            if entry is None:
+                return
+            self._release_limits(entry.video)
+            self._condition.notify_all()
+
+    def requeue(self, video: VideoItem) -> bool:
+        """把刚出队但没能启动的任务放回原位置，保留原优先级、序号和入队时间。"""
+        with self._condition:
+            entry = self._dispatched.pop(id(video), None)
+            if entry is None:
+                return False
+            self._release_limits(entry.video)
+            entry.alive = True
+            self._entries[entry.seq] = entry
+            self._track_enqueue(getattr(video, "id", ""))
+            self._attach(entry)
+            self._condition.notify_all()
+            return True
+
+    def set_priority(self, video_ids: Iterable[str], priority: int) -> int:
+        """调整排队任务的优先级，返回受影响的任务数。"""
+        ids = {str(video_id) for video_id in video_ids if video_id}
+        if not ids:
+            return 0
+        changed = 0
+        with self._condition:
+            for entry in [entry for entry in self._entries.values() if entry.video.id in ids]:
+                if entry.priority == int(priority):
+                    continue
+                if not isinstance(getattr(entry.video, "meta", None), dict):
+                    entry.video.meta = {}
+                entry.video.meta["queue_priority"] = int(priority)
+                entry.alive = False
+                replacement = _Entry(
+                    entry.seq,
+                    entry.video,
+                    entry.save_dir,
+                    int(priority),
+                    entry.lane,
+                    entry.group,
+                    entry.enqueued_at,
+                )
+                self._entries[entry.seq] = replacement
+                self._attach(replacement)
+                changed += 1
+            if changed:
+                self._condition.notify_all()
+        return changed
+
+    # ---- 查询与移除 -------------------------------------------------------
+
+    def empty(self) -> bool:
+        with self._condition:
+            return not self._entries
+
+    def qsize(self) -> int:
+        with self._condition:
+            return len(self._entries)
+
+    def drain(self) -> list[tuple[VideoItem, str]]:
+        with self._condition:
+            items = [(entry.video, entry.save_dir) for _seq, entry in sorted(self._entries.items())]
+            for entry in self._entries.values():
+                entry.alive = False
+            self._entries.clear()
+            self._groups.clear()
+            self._parked.clear()
+            for lane in LANES:
+                self._heaps[lane].clear()
+            self._queued_ids.clear()
+            return items
+
+    def remove_video(self, video_id: str) -> VideoItem | None:
+        removed = self.remove_videos({video_id})
+        return removed[0] if removed else None
+
+    def remove_video_instance(self, video: VideoItem) -> int:
+        """只移除与捕获对象相同的排队项，保留复用同一 ID 的新任务。"""
+        with self._condition:
+            return len(self._remove_where(lambda queued: queued is video))
+
+    def remove_videos(self, video_ids: Iterable[str]) -> list[VideoItem]:
+        ids = {str(video_id) for video_id in video_ids if video_id}
+        if not ids:
+            return []
+        with self._condition:
+            return self._remove_where(lambda queued: queued.id in ids)
+
+    def snapshot_video_ids(self) -> set[str]:
+        with self._condition:
+            return set(self._queued_ids)
+
+    def stats(self) -> dict[str, Any]:
+        with self._condition:
+            queued = {lane: 0 for lane in LANES}
+            for entry in self._entries.values():
+                queued[entry.lane] += 1
+            return {
+                "queued": queued,
+                "groups": len(self._groups),
+                "parked_groups": sum(len(groups) for groups in self._parked.values()),
+                "running": {f"{kind}:{name}": count for (kind, name), count in self._running.items() if count},
+                "limits": {
+                    "platform_limits": dict(self._platform_limits),
+                    "default_platform_limit": self._default_platform_limit,
+                    "host_limit": self._host_limit,
+                },
+                "wait_seconds": {lane: histogram.snapshot() for lane, histogram in self._wait_histograms.items()},
+            }
+
+    # ---- 内部实现 ---------------------------------------------------------
+
+    def _track_enqueue(self, video_id: str) -> None:
+        if video_id:
+            self._queued_ids[video_id] = self._queued_ids.get(video_id, 0) + 1
+
+    def _track_dequeue(self, video_id: str) -> None:
+        if not video_id:
+            return
+        count = self._queued_ids.get(video_id, 0)
+        if count <= 1:
+            self._queued_ids.pop(video_id, None)
+        else:
+            self._queued_ids[video_id] = count - 1
+
+    def _enqueue(self, video: VideoItem, save_dir: str, now: float) -> None:
+        lane = self._lane_of(video)
+        lane = lane if lane in self._heaps else LANE_HEAVY
+        key = (lane, self._group_name(video))
+        group = self._groups.get(key)
+        if group is None:
+            group = _Group(key, next(self._group_order), self._clocks[lane])
+            self._groups[key] = group
+        entry = _Entry(next(self._seq), video, save_dir, self._priority(video), lane, group, now)
+        self._entries[entry.seq] = entry
+        self._track_enqueue(getattr(video, "id", ""))
+        self._attach(entry)
+
+    def _attach(self, entry: _Entry) -> None:
+        group = entry.group
+        registered = self._groups.get(group.key)
+        if registered is None:
+            # 分组已因排空被回收：沿用对象但重新登记，轮转时钟不早于车道当前时钟。
+            group.vtime = max(group.vtime, self._clocks[group.key[0]])
+            self._groups[group.key] = group
+        elif registered is not group:
+            entry.group = group = registered
+        previous_head = group.head()
+        heapq.heappush(group.items, (-entry.priority, entry.seq, entry))
+        if not group.parked and group.head() is not previous_head:
+            self._push_group(group)
+
+    def _push_group(self, group: _Group) -> None:
+        head = group.head()
+        group.version += 1
+        if head is None:
+            if self._groups.get(group.key) is group:
+                del self._groups[group.key]
+            return
+        heapq.heappush(
+            self._heaps[group.key[0]],
+            (-head.priority, group.vtime, head.seq, group.order, group.version, group),
+        )
+
+    def _open_lanes(self) -> set[str]:
+        probe = self._capacity_probe
+        if probe is None:
+            return set(LANES)
+        try:
+            return set(probe())
+        except Exception:
+            return set(LANES)
+
+    def _select(self) -> _Entry | None:
+        if not self._entries:
+            return None
+        best: tuple[tuple[int, int], str] | None = None
+        for lane in self._open_lanes():
+            heap = self._heaps.get(lane)
+            while heap:
+                neg_priority, _vtime, head_seq, _order, version, group = heap[0]
+                if version != group.version or group.parked:
+                    heapq.heappop(heap)
+                    continue
+                blocker = self._limit_blocker(group.head())
+                if blocker is not None:
+                    heapq.heappop(heap)
+                    group.parked = True
+                    group.version += 1
+                    self._parked.setdefault(blocker, []).append(group)
+                    continue
+                rank = (neg_priority, head_seq)
+                if best is None or rank < best[0]:
+                    best = (rank, lane)
+                break
+        if best is None:
+            return None
+        lane = best[1]
+        group = heapq.heappop(self._heaps[lane])[-1]
+        _neg_priority, _seq, entry = heapq.heappop(group.items)
+        entry.alive = False
+        del self._entries[entry.seq]
+        self._track_dequeue(getattr(entry.video, "id", ""))
+        # 出队的分组排到车道时钟之后，同优先级下其余分组先轮到。
+        self._clocks[lane] += 1
+        group.vtime = self._clocks[lane]
+        self._push_group(group)
+        for key in self._limit_keys(entry.video):
+            self._running[key] = self._running.get(key, 0) + 1
+        self._dispatched[id(entry.video)] = entry
+        self._wait_histograms[lane].observe(time.monotonic() - entry.enqueued_at)
+        return entry
+
+    def _limit_for(self, key: tuple[str, str]) -> int:
+        kind, name = key
+        if kind == "platform":
+            return self._platform_limits.get(name, self._default_platform_limit)
+        return self._host_limit if name else 0
+
+    def _limit_blocker(self, entry: _Entry | None) -> tuple[str, str] | None:
+        if entry is None:
+            return None
+        for key in self._limit_keys(entry.video):
+            limit = self._limit_for(key)
+            if limit and self._running.get(key, 0) >= limit:
+                return key
+        return None
+
+    def _release_limits(self, video: VideoItem) -> None:
+        for key in self._limit_keys(video):
+            count = self._running.get(key, 0) - 1
+            if count > 0:
+                self._running[key] = count
+            else:
+                self._running.pop(key, None)
+            self._unpark(key)
+
+    def _unpark(self, key: tuple[str, str]) -> None:
+        for group in self._parked.pop(key, []):
+            group.parked = False
+            self._push_group(group)
+
+    def _remove_where(self, predicate: Callable[[VideoItem], bool]) -> list[VideoItem]:
+        removed: list[VideoItem] = []
+        touched: dict[int, _Group] = {}
+        for seq, entry in sorted(self._entries.items()):
+            if not predicate(entry.video):
+                continue
+            entry.alive = False
+            del self._entries[seq]
+            self._track_dequeue(getattr(entry.video, "id", ""))
+            removed.append(entry.video)
+            touched[id(entry.group)] = entry.group
+        for group in touched.values():
+            if not group.parked:
+                self._push_group(group)
+            elif group.head() is None:
+                self._groups.pop(group.key, None)
+        return removed
@@ -0,0 +1,370 @@
+"""可选的 asyncio 下载引擎：一个事件循环线程承载普通 HTTP、分块和 Python HLS 的网络传输。
+
+线程引擎下每个分片、每个 HLS 分段抓取都占一个 OS 线程；``download.engine = "asyncio"``
+时这些传输改为共享事件循环上的协程，``DownloadWorker`` 线程只负责等待结果、推进度和
+发布文件。下载器对外契约（``BaseDownloader.download``、策略链、进度回调）保持不变，
+两种引擎可以随时切换对比。
+"""
+
+from __future__ import annotations
+
+import asyncio
+import threading
+import urllib.parse
+from contextlib import AbstractContextManager, asynccontextmanager
+from concurrent.futures import Future
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from http.cookiejar import CookieJar, DefaultCookiePolicy
+from typing import Any, AsyncIterator, Awaitable, Callable, TypeVar
+
+import requests
+
+from app.config import cfg
+from app.debug_logger import debug_logger
+from app.exceptions import DownloaderStoppedError, ExternalToolError
+
+from .base import StopCheck
+from .http_pool import configured_pool_maxsize
+
+try:  # pragma: no cover - httpx 是声明的运行依赖，缺失时只能回退线程引擎
+    import httpx
+except ImportError:  # pragma: no cover
+    httpx = None  # type: ignore[assignment]
+
+ENGINE_THREAD = "thread"
+ENGINE_ASYNCIO = "asyncio"
+# 等待协程结果时的轮询间隔：既是停止请求的响应时间，也是进度回调的节拍。
+RUN_POLL_SECONDS = 0.1
+# 停止后等待协程退出（关闭文件句柄）的上限。
+CANCEL_JOIN_SECONDS = 5.0
+# 网络分块先攒进本地缓冲区，攒够这么多才进一次线程池写盘，避免每个小分块都跳一次线程。
+WRITE_BUFFER_BYTES = 1024 * 1024
+SENSITIVE_REDIRECT_HEADERS = frozenset({"authorization", "cookie", "host", "proxy-authorization"})
+REDIRECT_STATUS_CODES = frozenset({301, 302, 303, 307, 308})
+# 协程传输中需要换成 AsyncTransportError 的底层异常；StreamError 不在 HTTPError 层级内。
+HTTPX_ERRORS: tuple[type[BaseException], ...] = (httpx.HTTPError, httpx.StreamError) if httpx is not None else ()
+
+T = TypeVar("T")
+
+
+class AsyncTransportError(requests.RequestException):
+    """异步请求的网络或 HTTP 状态错误；继承 requests 异常，线程引擎的重试分支原样适用。"""
+
+
+def configured_engine() -> str:
+    engine = str(cfg.get("download", "engine", ENGINE_THREAD) or "").strip().lower()
+    return engine if engine in {ENGINE_THREAD, ENGINE_ASYNCIO} else ENGINE_THREAD
+
+
+def asyncio_engine_enabled(domain_policy: Any = None, proxy: object = None) -> bool:
+    """配置选择 asyncio 且本次传输能在协程里完成时返回 True。
+
+    公网访问策略依赖 requests 的逐跳重定向钩子，SOCKS 代理需要可选的 ``socksio``，
+    这两种情况继续走线程引擎。
+    """
+    if httpx is None or domain_policy is not None or configured_engine() != ENGINE_ASYNCIO:
+        return False
+    if str(proxy or "").lower().startswith("socks"):
+        try:
+            import socksio  # noqa: F401
+        except ImportError:
+            return False
+    return True
+
+
+@asynccontextmanager
+async def thread_context(factory: Callable[..., AbstractContextManager[T]], *args: Any) -> AsyncIterator[T]:
+    """在默认线程池里创建、进入和退出同步上下文（打开文件、分片写入器），事件循环线程不碰磁盘。"""
+    context = await asyncio.to_thread(factory, *args)
+    value = await asyncio.to_thread(context.__enter__)
+    try:
+        yield value
+    except BaseException as exc:
+        if not await asyncio.to_thread(context.__exit__, type(exc), exc, exc.__traceback__):
+            raise
+    else:
+        await asyncio.to_thread(context.__exit__, None, None, None)
+
+
+class AsyncTaskHandle:
+    """事件循环上一个协程的线程侧句柄。
+
+    ``is_alive``/``join`` 与 ``threading.Thread`` 对齐，``result``/``cancel``/``add_done_callback``
+    等与 ``concurrent.futures.Future`` 对齐，分块下载的监控循环和 HLS 预取窗口可以原样复用。
+    ``join`` 等到协程真正退出（文件句柄已关闭），而不仅仅是 Future 被标记取消。
+    """
+
+    def __init__(self, future: Future, finished: threading.Event) -> None:
+        self.future = future
+        self._finished = finished
+
+    def is_alive(self) -> bool:
+        return not self._finished.is_set()
+
+    def join(self, timeout: float | None = None) -> None:
+        self._finished.wait(timeout)
+
+    def done(self) -> bool:
+        return self.future.done()
+
+    def cancel(self) -> bool:
+        return self.future.cancel()
+
+    def cancelled(self) -> bool:
+        return self.future.cancelled()
+
+    def result(self, timeout: float | None = None) -> Any:
+        return self.future.result(timeout)
+
+    def exception(self, timeout: float | None = None) -> BaseException | None:
+        return self.future.exception(timeout)
+
+    def add_done_callback(self, fn: Callable[["AsyncTaskHandle"], object]) -> None:
+        """Future 完成时以句柄本身回调；回调可能在事件循环线程执行，不能做阻塞 I/O。"""
+        self.future.add_done_callback(lambda _future: fn(self))
+
+
+class AsyncDownloadLoop:
+    """进程级下载事件循环，首次使用时在守护线程中启动。
+
+    ``httpx.AsyncClient`` 按代理缓存并只在循环线程上创建和使用；客户端禁用 Cookie
+    持久化和环境代理发现，与 ``DownloadSessionPool`` 的 requests 会话语义一致。
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._thread: threading.Thread | None = None
+        self._clients: dict[str, Any] = {}
+        self._submitted = 0
+
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            if self._loop is not None and self._thread is not None and self._thread.is_alive():
+                return self._loop
+            loop = asyncio.new_event_loop()
+            ready = threading.Event()
+
+            def run() -> None:
+                asyncio.set_event_loop(loop)
+                loop.call_soon(ready.set)
+                loop.run_forever()
+
+            thread = threading.Thread(target=run, name="ucrawl-async-download", daemon=True)
+            thread.start()
+            ready.wait()
+            self._loop, self._thread = loop, thread
+            return loop
+
+    def submit(self, coro: Awaitable[T]) -> AsyncTaskHandle:
+        finished = threading.Event()
+
+        async def guarded() -> T:
+            try:
+                return await coro
+            finally:
+                finished.set()
+
+        loop = self._ensure_loop()
+        with self._lock:
+            self._submitted += 1
+        return AsyncTaskHandle(asyncio.run_coroutine_threadsafe(guarded(), loop), finished)
+
+    def run(
+        self,
+        coro: Awaitable[T],
+        check_stop_func: StopCheck | None = None,
+        *,
+        on_tick: Callable[[], None] | None = None,
+    ) -> T:
+        """在循环上执行协程并阻塞当前线程等待结果。
+
+        等待期间按 ``RUN_POLL_SECONDS`` 检查停止请求并调用 ``on_tick``；进度回调因此
+        始终在调用线程触发，不会在事件循环上执行 GUI/Web 的回调。
+        """
+        handle = self.submit(coro)
+        while True:
+            if check_stop_func is not None and check_stop_func():
+                handle.cancel()
+                handle.join(CANCEL_JOIN_SECONDS)
+                raise DownloaderStoppedError("用户停止下载")
+            try:
+                result = handle.result(timeout=RUN_POLL_SECONDS)
+            except FutureTimeoutError:
+                if on_tick is not None:
+                    on_tick()
+                continue
+            if on_tick is not None:
+                on_tick()
+            return result
+
+    def client(self, proxy: object = None) -> Any:
+        """返回当前代理对应的共享 ``httpx.AsyncClient``；只能在循环线程内调用。"""
+        if httpx is None:  # pragma: no cover
+            raise AsyncTransportError("httpx 不可用，无法使用 asyncio 下载引擎")
+        key = str(proxy or "")
+        client = self._clients.get(key)
+        if client is not None:
+            return client
+        pool_size = configured_pool_maxsize()
+        client = httpx.AsyncClient(
+            proxy=key or None,
+            trust_env=False,
+            follow_redirects=True,
+            cookies=CookieJar(policy=DefaultCookiePolicy(allowed_domains=[])),
+            limits=httpx.Limits(max_connections=pool_size * 2, max_keepalive_connections=pool_size),
+        )
+        # 代理配置只有少数几种，客户端不做淘汰：关闭仍有协程在读流的客户端会打断传输。
+        self._clients[key] = client
+        return client
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            loop = self._loop
+            running = loop is not None and self._thread is not None and self._thread.is_alive()
+            submitted = self._submitted
+        pending = 0
+        if running and loop is not None:
+            try:
+                pending = len(asyncio.all_tasks(loop))
+            except RuntimeError:
+                pending = 0
+        return {
+            "engine": configured_engine(),
+            "running": running,
+            "submitted": submitted,
+            "pending_tasks": pending,
+            "clients": len(self._clients),
+        }
+
+    def close(self) -> None:
+        with self._lock:
+            loop, thread = self._loop, self._thread
+            self._loop = self._thread = None
+        if loop is None or thread is None or not thread.is_alive():
+            return
+
+        async def shutdown() -> None:
+            clients = list(self._clients.values())
+            self._clients.clear()
+            for client in clients:
+                await client.aclose()
+            await loop.shutdown_default_executor()
+
+        try:
+            asyncio.run_coroutine_threadsafe(shutdown(), loop).result(timeout=CANCEL_JOIN_SECONDS)
+        except Exception as exc:  # pragma: no cover - 退出阶段尽力而为
+            debug_logger.log_exception("AsyncDownloadLoop", "close_clients", exc)
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join(CANCEL_JOIN_SECONDS)
+
+
+async_download_loop = AsyncDownloadLoop()
+
+
+class AsyncSegmentFetcher:
+    """asyncio 引擎下 Python HLS 回退路径的分段抓取。
+
+    用 curl_cffi ``AsyncSession`` 保留浏览器指纹，信号量限制同时在途的分段数；
+    重定向逐跳处理，跨源时剥离认证头，与同步会话的规则一致。``submit`` 返回的句柄
+    可直接放进 ``HlsSegmentWriter`` 的预取窗口。
+    """
+
+    def __init__(
+        self,
+        headers: dict[str, str],
+        proxy: str | None,
+        *,
+        max_concurrency: int,
+        timeout: float = 60,
+        max_redirects: int = 5,
+        max_response_bytes: int = 256 * 1024 * 1024,
+        loop: AsyncDownloadLoop | None = None,
+    ) -> None:
+        self._headers = dict(headers)
+        self._proxy = proxy
+        self._max_concurrency = max(1, int(max_concurrency))
+        self._timeout = timeout
+        self._max_redirects = max(0, int(max_redirects))
+        self._max_response_bytes = max_response_bytes
+        self._loop = loop or async_download_loop
+        self._session: Any = None
+        self._semaphore: asyncio.Semaphore | None = None
+        self._handles: list[AsyncTaskHandle] = []
+
+    def submit(self, url: str) -> AsyncTaskHandle:
+        handle = self._loop.submit(self._fetch(url))
+        self._handles = [item for item in self._handles if item.is_alive()]
+        self._handles.append(handle)
+        return handle
+
+    def close(self) -> None:
+        """取消并等待所有在途抓取，再关闭会话。"""
+        for handle in self._handles:
+            handle.cancel()
+        for handle in self._handles:
+            handle.join(CANCEL_JOIN_SECONDS)
+        self._handles.clear()
+        if self._session is not None:
+            session, self._session = self._session, None
+            try:
+                self._loop.run(session.close())
+            except Exception as exc:
+                debug_logger.log_exception("AsyncSegmentFetcher", "close_session", exc)
+
+    def _ensure_session(self) -> Any:
+        if self._session is None:
+            from curl_cffi.requests import AsyncSession
+
+            kwargs: dict[str, Any] = {"impersonate": "chrome", "max_clients": self._max_concurrency}
+            if self._proxy:
+                kwargs["proxy"] = self._proxy
+            else:
+                from curl_cffi.const import CurlOpt
+
+                kwargs["curl_options"] = {CurlOpt.PROXY: ""}
+            try:
+                self._session = AsyncSession(**kwargs)
+            except TypeError:
+                kwargs.pop("impersonate", None)
+                self._session = AsyncSession(**kwargs)
+            self._semaphore = asyncio.Semaphore(self._max_concurrency)
+        return self._session
+
+    async def _fetch(self, url: str) -> bytes:
+        session = self._ensure_session()
+        assert self._semaphore is not None
+        async with self._semaphore:
+            current_url = str(url)
+            request_headers = dict(self._headers)
+            for _redirect in range(self._max_redirects + 1):
+                response = await session.get(
+                    current_url,
+                    headers=request_headers,
+                    timeout=self._timeout,
+                    allow_redirects=False,
+                )
+                status = int(getattr(response, "status_code", 0) or 0)
+                location = (response.headers or {}).get("Location") or (response.headers or {}).get("location")
+                if status in REDIRECT_STATUS_CODES and location:
+                    target_url = urllib.parse.urljoin(current_url, str(location))
+                    if _origin(current_url) != _origin(target_url):
+                        request_headers = {
+                            key: value
+                            for key, value in request_headers.items()
+                            if str(key).lower() not in SENSITIVE_REDIRECT_HEADERS
+                        }
+                    current_url = target_url
+                    continue
+                if status not in (200, 206):
+                    raise ExternalToolError(f"curl_cffi HLS request failed ({status}) for {url}")
+                content = bytes(response.content or b"")
+                if len(content) > self._max_response_bytes:
+                    raise ExternalToolError(f"curl_cffi HLS response exceeds size limit for {url}")
+                return content
+        raise ExternalToolError("curl_cffi HLS redirect limit exceeded")
+
+
+def _origin(url: str) -> tuple[str, str, int | None]:
+    parsed = urllib.parse.urlsplit(url)
+    return parsed.scheme.lower(), (parsed.hostname or "").lower(), parsed.port
@@ -0,0 +1,288 @@
+"""进程级带宽调度：所有下载任务共享一个全局令牌桶，按权重公平分配速度上限。"""
+
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+import weakref
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, cast
+
+from app.config import cfg
+from app.exceptions import DownloaderStoppedError
+
+# 最近一次出现传输需求后多久仍视为活跃；超时的任务不再占用份额，余量自动让给其他任务。
+ACTIVE_WINDOW_SECONDS = 1.0
+# 每个任务最多积攒这么多秒的额度，空闲后恢复时的突发不会明显超过全局上限。
+BURST_SECONDS = 0.25
+MIN_BURST_BYTES = 64 * 1024
+# 等待额度时的最长单次睡眠，保证停止请求和份额变化都能及时生效。
+WAIT_SLICE_SECONDS = 0.1
+# 实际速度按该时间窗口统计。
+RATE_WINDOW_SECONDS = 1.0
+MAX_RECENT_REPORTS = 32
+
+StopCheck = Callable[[], bool]
+
+
+def _normalize_limit_kb(speed_limit_kb: object) -> int:
+    try:
+        return max(0, int(cast(Any, speed_limit_kb or 0)))
+    except (TypeError, ValueError):
+        return 0
+
+
+def configured_platform_weights() -> dict[str, float]:
+    """读取 ``download.platform_bandwidth_weights``；非法项忽略，设置页修改后下一个任务即生效。"""
+    raw = cfg.get("download", "platform_bandwidth_weights", {})
+    weights: dict[str, float] = {}
+    for platform, value in (raw.items() if isinstance(raw, dict) else ()):
+        try:
+            weights[str(platform)] = float(value)
+        except (TypeError, ValueError):
+            continue
+    return weights
+
+
+def task_weight(video_item: Any, platform_weights: dict[str, float] | None = None) -> float:
+    """任务权重 = 平台权重 × 2^priority。
+
+    ``priority`` 与排队调度共用 ``meta["queue_priority"]``，限制在 -2..2；平台权重默认
+    取自配置 ``download.platform_bandwidth_weights``。
+    """
+    meta = getattr(video_item, "meta", None)
+    meta = meta if isinstance(meta, dict) else {}
+    try:
+        priority = max(-2, min(int(meta.get("queue_priority", 0) or 0), 2))
+    except (TypeError, ValueError):
+        priority = 0
+    weights = configured_platform_weights() if platform_weights is None else platform_weights
+    platform = str(getattr(video_item, "source", "") or "")
+    return max(0.01, float(weights.get(platform, 1.0))) * (2.0**priority)
+
+
+@dataclass(slots=True)
+class _LeaseState:
+    label: str
+    weight: float
+    started_at: float
+    tokens: float = 0.0
+    last_demand: float = float("-inf")
+    allocated_bps: float = 0.0
+    total_bytes: int = 0
+    window_started: float = 0.0
+    window_bytes: int = 0
+    achieved_bps: float = 0.0
+
+    def report(self, now: float) -> dict[str, Any]:
+        elapsed = max(now - self.started_at, 1e-6)
+        return {
+            "label": self.label,
+            "weight": round(self.weight, 3),
+            "allocated_bps": int(self.allocated_bps),
+            "achieved_bps": int(self.achieved_bps),
+            "average_bps": int(self.total_bytes / elapsed),
+            "bytes": self.total_bytes,
+        }
+
+
+class BandwidthScheduler:
+    """全局令牌桶：上限为 ``download.speed_limit_kb``，由所有活跃任务按权重分享。
+
+    每个任务有自己的小令牌桶，补充速率 = 全局上限 × 权重 / 活跃任务总权重。空闲任务
+    不参与分配；活跃但用不完份额的任务，溢出的令牌转给正在等待的任务，因此任一时刻
+    整体吞吐不超过上限，也不会因为某个任务慢而浪费额度。上限为 0 时只统计不限速。
+    """
+
+    def __init__(
+        self,
+        *,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ) -> None:
+        self._clock = clock
+        self._sleep = sleep
+        self._lock = threading.Lock()
+        self._states: dict[int, _LeaseState] = {}
+        self._recent: OrderedDict[int, dict[str, Any]] = OrderedDict()
+        self._next_id = 0
+        self._last_refill = clock()
+        self.limit_bps = 0
+
+    def _register(self, limiter: TransferRateLimiter, speed_limit_kb: object, label: str, weight: float) -> int:
+        with self._lock:
+            now = self._clock()
+            self._refill_locked(now)
+            # 全局上限随最新一次任务启动时的设置生效，设置页修改后无需重启。
+            self.limit_bps = _normalize_limit_kb(speed_limit_kb) * 1024
+            lease_id = self._next_id
+            self._next_id += 1
+            self._states[lease_id] = _LeaseState(
+                label=str(label or f"task-{lease_id}"),
+                weight=max(0.01, float(weight)),
+                started_at=now,
+                window_started=now,
+            )
+        weakref.finalize(limiter, self._retire, lease_id)
+        return lease_id
+
+    def _retire(self, lease_id: int) -> None:
+        with self._lock:
+            state = self._states.pop(lease_id, None)
+            if state is None or state.total_bytes <= 0:
+                return
+            self._recent[lease_id] = state.report(self._clock())
+            while len(self._recent) > MAX_RECENT_REPORTS:
+                self._recent.popitem(last=False)
+
+    def _burst_bytes(self, state: _LeaseState) -> float:
+        return max(float(MIN_BURST_BYTES), state.allocated_bps * BURST_SECONDS)
+
+    def _refill_locked(self, now: float) -> None:
+        elapsed = max(0.0, now - self._last_refill)
+        self._last_refill = now
+        if self.limit_bps <= 0:
+            for state in self._states.values():
+                state.allocated_bps = 0.0
+                state.tokens = 0.0
+            return
+        active = [
+            state
+            for state in self._states.values()
+            if state.tokens < 0 or now - state.last_demand <= ACTIVE_WINDOW_SECONDS
+        ]
+        total_weight = sum(state.weight for state in active)
+        for state in self._states.values():
+            state.allocated_bps = 0.0
+        overflow = 0.0
+        for state in active:
+            state.allocated_bps = self.limit_bps * state.weight / total_weight
+            state.tokens += state.allocated_bps * elapsed
+            burst = self._burst_bytes(state)
+            if state.tokens > burst:
+                overflow += state.tokens - burst
+                state.tokens = burst
+        waiting = [state for state in active if state.tokens < 0]
+        waiting_weight = sum(state.weight for state in waiting)
+        for state in waiting:
+            state.tokens += overflow * state.weight / waiting_weight
+
+    def _observe_locked(self, state: _LeaseState, byte_count: int, now: float) -> None:
+        state.total_bytes += byte_count
+        state.window_bytes += byte_count
+        window = now - state.window_started
+        if window >= RATE_WINDOW_SECONDS:
+            state.achieved_bps = state.window_bytes / window
+            state.window_started = now
+            state.window_bytes = 0
+
+    def _charge(self, lease_id: int, byte_count: int) -> _LeaseState | None:
+        """记账并扣除额度；返回需要等待额度的租约，不限速或租约已退出时返回 None。"""
+        with self._lock:
+            state = self._states.get(lease_id)
+            if state is None:
+                return None
+            now = self._clock()
+            self._refill_locked(now)
+            self._observe_locked(state, byte_count, now)
+            if self.limit_bps <= 0:
+                return None
+            state.last_demand = now
+            state.tokens -= byte_count
+            return state
+
+    def _wait_slice(self, state: _LeaseState) -> float:
+        """欠额还需等待的单次时长，0 表示额度已补足。"""
+        with self._lock:
+            self._refill_locked(self._clock())
+            if state.tokens >= 0 or self.limit_bps <= 0:
+                return 0.0
+            rate = max(state.allocated_bps, 1.0)
+            remaining = -state.tokens / rate
+        # 下限避免浮点误差留下的极小欠额变成忙等。
+        return max(0.001, min(remaining, WAIT_SLICE_SECONDS))
+
+    def _consume(self, lease_id: int, byte_count: int, check_stop_func: StopCheck | None) -> None:
+        state = self._charge(lease_id, byte_count)
+        while state is not None:
+            if check_stop_func is not None and check_stop_func():
+                raise DownloaderStoppedError("用户停止下载")
+            delay = self._wait_slice(state)
+            if delay <= 0:
+                return
+            self._sleep(delay)
+
+    async def _consume_async(self, lease_id: int, byte_count: int, check_stop_func: StopCheck | None) -> None:
+        state = self._charge(lease_id, byte_count)
+        while state is not None:
+            if check_stop_func is not None and check_stop_func():
+                raise DownloaderStoppedError("用户停止下载")
+            delay = self._wait_slice(state)
+            if delay <= 0:
+                return
+            await asyncio.sleep(delay)
+
+    def stats(self) -> dict[str, Any]:
+        """全局上限与各任务的分配速度、实际速度；``recent`` 保留最近结束任务的汇总。"""
+        with self._lock:
+            now = self._clock()
+            self._refill_locked(now)
+            for state in self._states.values():
+                # 长时间没有新数据时，上一个窗口的速度已经过时。
+                if now - state.window_started > RATE_WINDOW_SECONDS * 2:
+                    state.achieved_bps = 0.0
+            return {
+                "limit_bps": self.limit_bps,
+                "tasks": [state.report(now) for state in self._states.values()],
+                "recent": list(self._recent.values()),
+            }
+
+    def report(self, lease_id: int) -> dict[str, Any]:
+        with self._lock:
+            state = self._states.get(lease_id)
+            if state is not None:
+                return state.report(self._clock())
+            return dict(self._recent.get(lease_id, {}))
+
+
+bandwidth_scheduler = BandwidthScheduler()
+
+
+class TransferRateLimiter:
+    """单个下载任务在全局带宽调度器上的租约。
+
+    同一任务的所有线程（分片、HLS 分段、DASH 音视频流）必须共享同一个实例，
+    份额才按任务而不是按连接计算；实例被回收后自动退出调度并留下速度汇总。
+    """
+
+    def __init__(
+        self,
+        speed_limit_kb: object,
+        *,
+        label: str = "",
+        weight: float = 1.0,
+        scheduler: BandwidthScheduler | None = None,
+    ) -> None:
+        self._scheduler = scheduler or bandwidth_scheduler
+        self.lease_id = self._scheduler._register(self, speed_limit_kb, label, weight)
+
+    @property
+    def bytes_per_second(self) -> int:
+        return self._scheduler.limit_bps
+
+    def throttle(self, byte_count: int, check_stop_func: StopCheck | None = None) -> None:
+        """记录本次传输并等待额度；在下一次网络读取前调用才能形成背压。"""
+        if byte_count <= 0:
+            return
+        self._scheduler._consume(self.lease_id, int(byte_count), check_stop_func)
+
+    async def athrottle(self, byte_count: int, check_stop_func: StopCheck | None = None) -> None:
+        """``throttle`` 的协程版本：等待额度时让出事件循环，不阻塞同一循环上的其他传输。"""
+        if byte_count <= 0:
+            return
+        await self._scheduler._consume_async(self.lease_id, int(byte_count), check_stop_func)
+
+    def report(self) -> dict[str, Any]:
+        return self._scheduler.report(self.lease_id)
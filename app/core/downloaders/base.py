@@ -2,10 +2,11 @@
 
 from __future__ import annotations
 
+import asyncio
 import os
 import re
-import threading
 import time
+from dataclasses import dataclass
 from typing import Any, Callable, cast
 
 import requests
@@ -22,38 +23,24 @@ from shared.runtime_options import (
 )
 from shared.network_proxy import requests_proxy_mapping
 
+from .bandwidth import TransferRateLimiter
+from .http_pool import pooled_get
+from .stream_io import ProgressThrottle, iter_response_buffers
+
 ProgressCallback = Callable[..., None]
+# 停止检查必须线程安全且不阻塞：asyncio 引擎在事件循环线程上逐块调用它。
+# DownloadWorker 传入的是 ``threading.Event`` 读取，满足这一约束。
 StopCheck = Callable[[], bool]
 
 
-class TransferRateLimiter:
-    """按所有调用线程的累计字节数限制单个下载任务的平均传输速度。"""
-
-    def __init__(self, speed_limit_kb: object) -> None:
-        try:
-            normalized = max(0, int(cast(Any, speed_limit_kb or 0)))
-        except (TypeError, ValueError):
-            normalized = 0
-        self.bytes_per_second = normalized * 1024
-        self._started_at = time.monotonic()
-        self._scheduled_bytes = 0
-        self._lock = threading.Lock()
-
-    def throttle(self, byte_count: int, check_stop_func: StopCheck | None = None) -> None:
-        """等待到累计字节对应的时间点；共享实例可限制多分片的合计速度。"""
-        if self.bytes_per_second <= 0 or byte_count <= 0:
-            return
-        with self._lock:
-            self._scheduled_bytes += int(byte_count)
-            deadline = self._started_at + (self._scheduled_bytes / self.bytes_per_second)
+@dataclass(slots=True)
+class _HttpAttemptState:
+    """asyncio 引擎下单次 HTTP 尝试的进度，协程写入、调用线程读取以续传和推进度。"""
 
-        while True:
-            if check_stop_func is not None and check_stop_func():
-                raise DownloaderStoppedError("用户停止下载")
-            remaining = deadline - time.monotonic()
-            if remaining <= 0:
-                return
-            time.sleep(min(remaining, 0.1))
+    existing_size: int = 0
+    downloaded: int = 0
+    total_size: int = 0
+    discard_partial: bool = False
 
 
 class BaseDownloader:
@@ -249,14 +236,22 @@ class BaseDownloader:
         proxy: str | None = None,
         trace_id: str | None = None,
         domain_policy: DomainPolicyEngine | None = None,
+        bandwidth_weight: float = 1.0,
     ) -> None:
         """按配置执行普通 HTTP 下载，支持基于 `.downloading` 临时文件的续传重试。"""
+        from .async_engine import asyncio_engine_enabled
+
         # 只在最后 rename 到 save_path，避免失败或中断时把半成品暴露成可播放文件。
         temp_path = save_path + ".downloading"
         success = False
+        use_async = asyncio_engine_enabled(domain_policy, proxy)
         proxies = requests_proxy_mapping(proxy)
         retry_count = self._coerce_retry_count(max_retries)
-        rate_limiter = TransferRateLimiter(cfg.get("download", "speed_limit_kb", 0))
+        rate_limiter = TransferRateLimiter(
+            cfg.get("download", "speed_limit_kb", 0),
+            label=trace_id or os.path.basename(save_path),
+            weight=bandwidth_weight,
+        )
 
         # retry_count 表示失败后的重试次数，因此总尝试次数是 retry_count + 1。
         for attempt in range(retry_count + 1):
@@ -286,7 +281,30 @@ class BaseDownloader:
                         trace_id=trace_id,
                     )
 
-                with requests.get(
+                if use_async:
+                    attempt_state = _HttpAttemptState(existing_size=existing_size)
+                    try:
+                        self._run_http_attempt_async(
+                            attempt_state,
+                            url=url,
+                            temp_path=temp_path,
+                            request_headers=request_headers,
+                            timeout=timeout,
+                            proxy=proxy,
+                            support_resume=support_resume,
+                            rate_limiter=rate_limiter,
+                            check_stop_func=check_stop_func,
+                            progress_callback=progress_callback,
+                        )
+                    finally:
+                        existing_size = attempt_state.existing_size
+                        downloaded = attempt_state.downloaded
+                        total_size = attempt_state.total_size
+                        discard_partial_on_error = attempt_state.discard_partial
+                    success = True
+                    break
+
+                with pooled_get(
                     url,
                     headers=request_headers,
                     stream=True,
@@ -311,17 +329,26 @@ class BaseDownloader:
 
                     mode = "ab" if support_resume and existing_size > 0 and response.status_code == 206 else "wb"
                     downloaded = existing_size
+                    progress_throttle = ProgressThrottle()
                     with open(temp_path, mode) as fp:
-                        for chunk in response.iter_content(chunk_size=chunk_size):
+                        for chunk in iter_response_buffers(
+                            response,
+                            fallback_chunk_size=chunk_size,
+                            rate_limiter=rate_limiter,
+                        ):
                             if check_stop_func():
                                 raise DownloaderStoppedError("用户停止下载")
                             if chunk:
                                 fp.write(chunk)
-                                # iter_content 下一轮读取前等待，才能对网络读取形成背压；
-                                # 只限制本任务，不会让一个慢任务阻塞其他下载 worker。
+                                # 下一轮读取前等待，才能对网络读取形成背压；
+                                # 全局额度按任务权重分配，等待只阻塞本任务的读取。
                                 rate_limiter.throttle(len(chunk), check_stop_func)
                                 downloaded += len(chunk)
-                                if progress_callback and total_size > 0:
+                                if (
+                                    progress_callback
+                                    and total_size > 0
+                                    and progress_throttle.ready(force=downloaded >= total_size)
+                                ):
                                     self._emit_progress(progress_callback, int(downloaded / total_size * 100), bytes_downloaded=downloaded, bytes_total=total_size)
                     if total_size > 0 and downloaded < total_size:
                         raise StreamDownloadError(
@@ -413,6 +440,119 @@ class BaseDownloader:
         if progress_callback:
             self._emit_progress(progress_callback, 100, bytes_downloaded=total_size or downloaded, bytes_total=total_size or downloaded)
 
+    def _run_http_attempt_async(
+        self,
+        state: _HttpAttemptState,
+        *,
+        url: str,
+        temp_path: str,
+        request_headers: dict[str, str],
+        timeout: int,
+        proxy: str | None,
+        support_resume: bool,
+        rate_limiter: TransferRateLimiter,
+        check_stop_func: StopCheck,
+        progress_callback: ProgressCallback | None,
+    ) -> None:
+        """在共享事件循环上执行一次 HTTP 尝试；进度由当前线程按节拍读取状态后回调。"""
+        from .async_engine import async_download_loop
+
+        progress_throttle = ProgressThrottle()
+
+        def report_progress() -> None:
+            if progress_callback and state.total_size > 0 and progress_throttle.ready():
+                self._emit_progress(
+                    progress_callback,
+                    int(state.downloaded / state.total_size * 100),
+                    bytes_downloaded=state.downloaded,
+                    bytes_total=state.total_size,
+                )
+
+        async_download_loop.run(
+            self._stream_http_attempt_async(
+                state,
+                url=url,
+                temp_path=temp_path,
+                request_headers=request_headers,
+                timeout=timeout,
+                proxy=proxy,
+                support_resume=support_resume,
+                rate_limiter=rate_limiter,
+                check_stop_func=check_stop_func,
+            ),
+            check_stop_func,
+            on_tick=report_progress,
+        )
+
+    async def _stream_http_attempt_async(
+        self,
+        state: _HttpAttemptState,
+        *,
+        url: str,
+        temp_path: str,
+        request_headers: dict[str, str],
+        timeout: int,
+        proxy: str | None,
+        support_resume: bool,
+        rate_limiter: TransferRateLimiter,
+        check_stop_func: StopCheck,
+    ) -> None:
+        """``_download_http_file`` 单次尝试的协程版本，响应校验与续传写入规则和同步分支一致。"""
+        from .async_engine import (
+            HTTPX_ERRORS,
+            WRITE_BUFFER_BYTES,
+            AsyncTransportError,
+            async_download_loop,
+            thread_context,
+        )
+
+        existing_size = state.existing_size
+        try:
+            client = async_download_loop.client(proxy)
+            async with client.stream("GET", url, headers=request_headers, timeout=timeout) as response:
+                if response.status_code >= 400:
+                    raise AsyncTransportError(f"HTTP {response.status_code} for {url}")
+                total_size = int(response.headers.get("content-length", 0))
+                if response.status_code == 206:
+                    content_range = response.headers.get("content-range")
+                    parsed_range = self._parse_content_range_header(content_range)
+                    if parsed_range is None or parsed_range[0] != existing_size:
+                        state.discard_partial = True
+                        raise StreamDownloadError(
+                            f"断点续传响应范围不匹配: expected {existing_size}, got {content_range!r}"
+                        )
+                    total_size = parsed_range[2] or (total_size + existing_size)
+                elif support_resume and existing_size > 0 and response.status_code == 200:
+                    existing_size = 0
+                mode = "ab" if support_resume and existing_size > 0 and response.status_code == 206 else "wb"
+                state.existing_size = existing_size
+                state.total_size = total_size
+                state.downloaded = existing_size
+                async with thread_context(open, temp_path, mode) as fp:
+                    buffer = bytearray()
+                    try:
+                        async for chunk in response.aiter_bytes():
+                            if check_stop_func():
+                                raise DownloaderStoppedError("用户停止下载")
+                            if chunk:
+                                buffer += chunk
+                                await rate_limiter.athrottle(len(chunk), check_stop_func)
+                                if len(buffer) >= WRITE_BUFFER_BYTES:
+                                    data, buffer = buffer, bytearray()
+                                    await asyncio.to_thread(fp.write, data)
+                                    state.downloaded += len(data)
+                    finally:
+                        # 出错或停止时也写出已收到的字节，续传从真正的断点继续。
+                        if buffer:
+                            await asyncio.to_thread(fp.write, buffer)
+                            state.downloaded += len(buffer)
+        except HTTPX_ERRORS as exc:
+            raise AsyncTransportError(f"{type(exc).__name__}: {exc}") from exc
+        if state.total_size > 0 and state.downloaded < state.total_size:
+            raise StreamDownloadError(
+                f"HTTP response ended early: received {state.downloaded} of {state.total_size} bytes"
+            )
+
     def download(
         self,
         video_item: VideoItem,
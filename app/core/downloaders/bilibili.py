@@ -6,6 +6,8 @@ import os
 import subprocess
 import threading
 import time
+from contextlib import nullcontext
+from typing import Callable
 
 import requests
 
@@ -19,12 +21,18 @@ from app.exceptions import (
     StreamDownloadError,
 )
 from app.models import VideoItem
+from app.utils.bilibili_streams import dash_backup_urls
 from app.utils.bilibili_wbi import BILIBILI_WBI_SIGNER
 from shared.network_proxy import explicit_requests_proxies, requests_proxy_mapping
 from shared.runtime_options import DomainPolicyViolation
 
+from .bandwidth import task_weight
 from .base import BaseDownloader, ProgressCallback, StopCheck, TransferRateLimiter
+from .dash_stream_mux import DashStreamMuxer, StreamMuxInput, StreamMuxUnavailable
 from .external import FFmpegExternalTool, build_hidden_startupinfo
+from .http_pool import pooled_get
+from .mirror_ranges import MIN_RANGED_BYTES, MirrorPool, MirrorRangeFetcher, probe_total_size
+from .range_store import PreallocatedFileStore
 
 class BilibiliDownloader(BaseDownloader):
     """下载 Bilibili DASH 音视频双流，并用 ffmpeg 合并为最终媒体文件。"""
@@ -43,6 +51,20 @@ class BilibiliDownloader(BaseDownloader):
         B站 CDN URL 签名有时效，重试时必须重新获取。
         返回 (video_url, audio_url)，失败返回 (None, None)。
         """
+        streams = BilibiliDownloader._fetch_bilibili_play_streams(bvid, cid, headers, trace_id, proxies=proxies)
+        if streams is None:
+            return None, None
+        return streams["video"], streams["audio"]
+
+    @staticmethod
+    def _fetch_bilibili_play_streams(
+        bvid: str,
+        cid: str,
+        headers: dict,
+        trace_id: str | None = None,
+        proxies: dict[str, str] | None = None,
+    ) -> dict | None:
+        """同 ``_fetch_bilibili_play_url``，额外带回首个音视频流的 ``backupUrl`` 镜像列表。"""
         effective_proxies = explicit_requests_proxies(proxies)
         for fnval in (4048, 80):
             endpoint = "https://api.bilibili.com/x/player/wbi/playurl"
@@ -78,6 +100,12 @@ class BilibiliDownloader(BaseDownloader):
                     v_url = v.get("baseUrl")
                     a_url = a.get("baseUrl")
                     if v_url:
+                        streams = {
+                            "video": v_url,
+                            "audio": a_url,
+                            "video_backup_urls": dash_backup_urls(v),
+                            "audio_backup_urls": dash_backup_urls(a),
+                        }
                         debug_logger.log(
                             component="BilibiliDownloader",
                             action="play_url_refresh",
@@ -86,7 +114,7 @@ class BilibiliDownloader(BaseDownloader):
                             details={"fnval": fnval, "bvid": bvid, "cid": cid, "wbi_signed": signed},
                             trace_id=trace_id,
                         )
-                        return v_url, a_url
+                        return streams
             except Exception as exc:
                 debug_logger.log_exception(
                     "BilibiliDownloader",
@@ -96,7 +124,7 @@ class BilibiliDownloader(BaseDownloader):
                     trace_id=trace_id,
                 )
                 continue
-        return None, None
+        return None
 
     def download(
         self,
@@ -138,13 +166,20 @@ class BilibiliDownloader(BaseDownloader):
         temp_a = os.path.join(save_dir, f"{base_name}_audio.m4s")
         merging_path = f"{save_path}.merging"
         stream_temp_files = [temp_v, temp_a] if audio_url else [temp_v]
-        video_item.meta["download_temp_files"] = [*stream_temp_files, merging_path]
+        range_connections = self._range_connections()
+        # 多镜像分段下载先写预分配文件，完整后才改名为 m4s，避免续传把带空洞的文件当成前缀。
+        ranged_paths = [f"{path}.ranges" for path in stream_temp_files] if range_connections > 1 else []
+        video_item.meta["download_temp_files"] = [*stream_temp_files, *ranged_paths, merging_path]
         chunk_size = max(cfg.get("download", "chunk_size", 65536), 256 * 1024)
         max_retries = self._coerce_retry_count(cfg.get("download", "max_retries", 3))
         resume_raw = cfg.get("download", "resume_enabled", True)
         resume_enabled = self._coerce_bool_setting(resume_raw)
-        # DASH 的音频和视频并行下载，共享额度后总吞吐才符合设置页的 KB/s 语义。
-        rate_limiter = TransferRateLimiter(cfg.get("download", "speed_limit_kb", 0))
+        # DASH 的音频和视频并行下载，共享一个租约后按整个任务参与全局带宽分配。
+        rate_limiter = TransferRateLimiter(
+            cfg.get("download", "speed_limit_kb", 0),
+            label=str(video_item.meta.get("trace_id") or base_name),
+            weight=task_weight(video_item),
+        )
         debug_logger.log(
             component="BilibiliDownloader",
             action="prepare_download",
@@ -177,7 +212,7 @@ class BilibiliDownloader(BaseDownloader):
 
         def cleanup_temp_files() -> None:
             """合并成功、用户停止或失败后清理本任务的音视频分流缓存。"""
-            for temp_path in (temp_v, temp_a, merging_path):
+            for temp_path in (temp_v, temp_a, *ranged_paths, merging_path):
                 last_error: OSError | None = None
                 for attempt in range(3):
                     try:
@@ -217,6 +252,10 @@ class BilibiliDownloader(BaseDownloader):
 
         # 线程安全的 URL store，重试时可刷新
         _urls = {"video": video_url, "audio": audio_url}
+        _mirrors = {
+            "video": list(video_item.meta.get("video_backup_urls") or []),
+            "audio": list(video_item.meta.get("audio_backup_urls") or []),
+        }
         _url_lock = threading.Lock()
         # 第一次尝试走代理，后续重试直连 CDN（避免代理干扰）
         _use_proxy = [proxy is not None]
@@ -227,17 +266,23 @@ class BilibiliDownloader(BaseDownloader):
                 return False
             # API 请求仍走代理（如果配置了），但 CDN 下载不走代理
             api_proxies = requests_proxy_mapping(proxy)
-            new_v, new_a = BilibiliDownloader._fetch_bilibili_play_url(
+            streams = BilibiliDownloader._fetch_bilibili_play_streams(
                 bvid, cid, headers, trace_id, proxies=api_proxies,
             )
-            if new_v:
+            if streams:
                 with _url_lock:
-                    _urls["video"] = new_v
-                    _urls["audio"] = new_a
+                    _urls["video"] = streams["video"]
+                    _urls["audio"] = streams["audio"]
+                    _mirrors["video"] = streams["video_backup_urls"]
+                    _mirrors["audio"] = streams["audio_backup_urls"]
                 _use_proxy[0] = False  # 重试直连 CDN
                 return True
             return False
 
+        def stream_mirrors(name: str) -> list[str]:
+            with _url_lock:
+                return [url for url in (_urls[name], *_mirrors[name]) if url]
+
         def emit_combined_progress() -> None:
             """按音频和视频累计字节合成 10-90 的下载阶段进度。"""
             total = sum(item["total"] for item in stream_stats.values() if item["total"] > 0)
@@ -259,9 +304,106 @@ class BilibiliDownloader(BaseDownloader):
                     merge_status="等待合并",
                 )
 
-        def download_stream(name: str, path: str) -> None:
-            """下载单个流（video/audio），失败时重新获取 CDN URL 后重试。"""
+        def fetch_ranged_stream(name: str, path: str, domain_policy) -> bool:
+            """按镜像吞吐多连接分段拉取一路流；返回 False 时由单连接路径接手。"""
+            mirrors = stream_mirrors(name)
+            if not mirrors:
+                return False
+            proxies = requests_proxy_mapping(proxy if _use_proxy[0] else None)
+
+            def open_range(url: str, start: int, end: int):
+                return pooled_get(
+                    url,
+                    headers={**headers, "Range": f"bytes={start}-{end}"},
+                    stream=True,
+                    timeout=(15, 120),
+                    proxies=proxies,
+                    **self._domain_policy_request_kwargs(domain_policy, url),
+                )
+
+            def on_bytes(byte_count: int) -> None:
+                with progress_lock:
+                    stream_stats[name]["downloaded"] += byte_count
+                    emit_combined_progress()
+                rate_limiter.throttle(byte_count, lambda: stop_event.is_set() or check_stop_func())
+
+            def refreshed_mirrors() -> list[str] | None:
+                return stream_mirrors(name) if _refresh_urls() else None
+
+            ranged_path = f"{path}.ranges"
+            store: PreallocatedFileStore | None = None
+            fetcher: MirrorRangeFetcher | None = None
+            try:
+                total = probe_total_size(open_range, mirrors[0])
+                if total < MIN_RANGED_BYTES:
+                    return False
+                with progress_lock:
+                    stream_stats[name].update(total=total, downloaded=0)
+                store = PreallocatedFileStore(ranged_path, total)
+                store.open(reuse=False)
+                fetcher = MirrorRangeFetcher(
+                    MirrorPool(mirrors),
+                    store,
+                    open_range=open_range,
+                    connections=range_connections,
+                    max_retries=max_retries,
+                    should_stop=lambda: stop_event.is_set() or check_stop_func(),
+                    on_bytes=on_bytes,
+                    refresh=refreshed_mirrors if bvid and cid else None,
+                )
+                fetcher.run()
+                store.close()
+                os.replace(ranged_path, path)
+            except DownloaderStoppedError:
+                raise
+            except (requests.RequestException, OSError, RuntimeError, DomainPolicyViolation) as exc:
+                debug_logger.log(
+                    component="BilibiliDownloader",
+                    action="stream_ranged_fallback",
+                    level="WARNING",
+                    message=f"B站 {name} 流多镜像分段下载不可用，改用单连接: {exc}",
+                    status_code="BILI_RANGED_FALLBACK",
+                    details={"mirrors": len(mirrors), "error": str(exc)},
+                    trace_id=trace_id,
+                )
+                with progress_lock:
+                    stream_stats[name].update(total=0, downloaded=0)
+                return False
+            finally:
+                if store is not None:
+                    store.close()
+                if os.path.exists(ranged_path):
+                    os.remove(ranged_path)
+            debug_logger.log(
+                component="BilibiliDownloader",
+                action="stream_ranged_done",
+                message=f"B站 {name} 流多镜像分段下载完成",
+                status_code="BILI_RANGED_OK",
+                details={
+                    "total": total,
+                    "connections": range_connections,
+                    "splits": fetcher.scheduler.split_count,
+                    "mirror_switches": fetcher.mirror_switches,
+                    "mirrors": fetcher.pool.snapshot(),
+                },
+                trace_id=trace_id,
+            )
+            return True
+
+        def download_stream(name: str, path: str, sink: StreamMuxInput | None = None) -> None:
+            """下载单个流（video/audio），失败时重新获取 CDN URL 后重试。
+
+            传入 ``sink`` 时字节直接交给流式合并；重试从已发送的偏移用 Range 续传，
+            服务端不支持续传时抛出 ``StreamMuxUnavailable`` 让调用方回退临时文件路径。
+            """
             domain_policy = self._domain_policy_for_item(video_item)
+            if sink is None and range_connections > 1 and not (resume_enabled and os.path.exists(path)):
+                try:
+                    if fetch_ranged_stream(name, path, domain_policy):
+                        return
+                except DownloaderStoppedError:
+                    stop_event.set()
+                    return
             for attempt in range(max_retries + 1):
                 if stop_event.is_set():
                     return
@@ -274,7 +416,10 @@ class BilibiliDownloader(BaseDownloader):
                 discard_partial_on_error = False
                 try:
                     request_kwargs = self._domain_policy_request_kwargs(domain_policy, url)
-                    existing_size = os.path.getsize(path) if resume_enabled and os.path.exists(path) else 0
+                    if sink is not None:
+                        existing_size = sink.written
+                    else:
+                        existing_size = os.path.getsize(path) if resume_enabled and os.path.exists(path) else 0
                     request_headers = dict(headers)
                     if existing_size > 0:
                         # 每个流独立续传；服务端若不返回 206，下面会回退为覆盖写。
@@ -287,7 +432,7 @@ class BilibiliDownloader(BaseDownloader):
                             details={"url": url, "attempt": attempt + 1, "resume_offset": existing_size},
                             trace_id=trace_id,
                         )
-                    with requests.get(
+                    with pooled_get(
                         url,
                         headers=request_headers,
                         stream=True,
@@ -314,6 +459,8 @@ class BilibiliDownloader(BaseDownloader):
                                 downloaded = existing_size
                                 resumed = True
                         elif existing_size > 0:
+                            if sink is not None:
+                                raise StreamMuxUnavailable(f"B站 {name} 流不支持 Range，无法在流式合并中续传")
                             # CDN 忽略 Range 时不能继续追加旧 m4s，否则合并后音画流会损坏。
                             existing_size = 0
                         debug_logger.log_api(
@@ -339,7 +486,7 @@ class BilibiliDownloader(BaseDownloader):
                             stream_stats[name]["total"] = total
                             stream_stats[name]["downloaded"] = downloaded
                             emit_combined_progress()
-                        with open(path, mode) as fp:
+                        with nullcontext(sink) if sink is not None else open(path, mode) as fp:
                             for chunk in response.iter_content(chunk_size=chunk_size):
                                 if stop_event.is_set():
                                     return
@@ -357,7 +504,13 @@ class BilibiliDownloader(BaseDownloader):
                             raise StreamDownloadError(
                                 f"Bilibili {name} stream ended early: received {downloaded} of {total} bytes"
                             )
+                    if sink is not None:
+                        sink.close()
                     return  # 成功，退出重试循环
+                except StreamMuxUnavailable as exc:
+                    stop_event.set()
+                    error_holder.append(exc)
+                    return
                 except DomainPolicyViolation as exc:
                     stop_event.set()
                     error_holder.append(StreamDownloadError(f"Bilibili 下载地址违反公网访问策略: {exc}"))
@@ -420,20 +573,90 @@ class BilibiliDownloader(BaseDownloader):
             write_status="写入中",
             merge_status="等待合并",
         )
-        try:
-            threads = [threading.Thread(target=download_stream, args=("video", temp_v), daemon=True)]
+
+        def run_stream_threads(muxer: DashStreamMuxer | None = None) -> None:
+            """并行下载音视频流；流式合并时出错或停止会立即中止 ffmpeg，解除另一路写入阻塞。"""
+            sinks = muxer.inputs if muxer is not None else {}
+            threads = [threading.Thread(target=download_stream, args=("video", temp_v, sinks.get("video")), daemon=True)]
             if audio_url:
-                threads.append(threading.Thread(target=download_stream, args=("audio", temp_a), daemon=True))
+                threads.append(
+                    threading.Thread(target=download_stream, args=("audio", temp_a, sinks.get("audio")), daemon=True)
+                )
 
             for thread in threads:
                 thread.start()
             while any(thread.is_alive() for thread in threads):
                 if check_stop_func():
                     stop_event.set()
-                    break
+                    if muxer is None:
+                        break
+                if stop_event.is_set() and muxer is not None:
+                    muxer.abort()
                 for thread in threads:
                     thread.join(timeout=0.2)
 
+        def run_stream_mux() -> bool:
+            """边下载边合并；返回 False 表示需要回退到临时文件 + 单独合并。"""
+            try:
+                muxer = DashStreamMuxer(ffmpeg_path, merging_path, has_audio=bool(audio_url), trace_id=trace_id)
+                muxer.start()
+            except StreamMuxUnavailable as exc:
+                fall_back_from_stream_mux(exc)
+                return False
+            try:
+                run_stream_threads(muxer)
+                if error_holder and isinstance(error_holder[0], StreamMuxUnavailable):
+                    raise error_holder[0]
+                if error_holder or (stop_event.is_set() and check_stop_func()):
+                    muxer.abort()
+                    return True
+                self._emit_progress(
+                    progress_callback,
+                    95,
+                    bytes_downloaded=sum(item["downloaded"] for item in stream_stats.values()) or None,
+                    bytes_total=sum(item["total"] for item in stream_stats.values() if item["total"] > 0) or None,
+                    phase="merging",
+                    phase_message="音视频流已传完，等待 ffmpeg 收尾",
+                    write_status="写入完成",
+                    merge_status="合并中",
+                )
+                muxer.finish(timeout=self._merge_timeout_seconds())
+            except StreamMuxUnavailable as exc:
+                muxer.abort()
+                if check_stop_func():
+                    raise DownloaderStoppedError("用户停止下载") from exc
+                fall_back_from_stream_mux(exc, stderr_tail=muxer.stderr_tail())
+                return False
+            except BaseException:
+                muxer.abort()
+                raise
+            return True
+
+        def fall_back_from_stream_mux(exc: Exception, *, stderr_tail: str = "") -> None:
+            debug_logger.log(
+                component="BilibiliDownloader",
+                action="stream_mux_fallback",
+                level="WARNING",
+                message=f"B站流式合并不可用，改为先落盘再合并: {exc}",
+                status_code="BILI_STREAM_MUX_FALLBACK",
+                details={"save_path": save_path, "error": str(exc), "stderr_tail": stderr_tail},
+                trace_id=trace_id,
+            )
+            error_holder.clear()
+            stop_event.clear()
+            last_progress[0] = 9
+            for stats in stream_stats.values():
+                stats.update(downloaded=0, total=0)
+            if os.path.exists(merging_path):
+                os.remove(merging_path)
+
+        try:
+            streamed = False
+            if self._should_stream_mux(resume_enabled, stream_temp_files):
+                streamed = run_stream_mux()
+            if not streamed:
+                run_stream_threads()
+
             if error_holder:
                 first_error = error_holder[0]
                 if isinstance(first_error, DownloaderStoppedError):
@@ -442,14 +665,29 @@ class BilibiliDownloader(BaseDownloader):
             if stop_event.is_set() and check_stop_func():
                 raise DownloaderStoppedError("用户停止下载")
 
+            total_bytes = sum(item["total"] for item in stream_stats.values() if item["total"] > 0)
+            downloaded_bytes = sum(item["downloaded"] for item in stream_stats.values())
+            if streamed:
+                self._finish_merged_output(
+                    video_item,
+                    merging_path,
+                    save_path,
+                    progress_callback=progress_callback,
+                    check_stop_func=check_stop_func,
+                    cleanup=cleanup_temp_files,
+                    total_bytes=total_bytes,
+                    downloaded_bytes=downloaded_bytes,
+                    trace_id=trace_id,
+                    streamed=True,
+                )
+                return
+
             if not os.path.exists(temp_v) or os.path.getsize(temp_v) <= 0:
                 raise StreamDownloadError("Bilibili 视频流写入失败或文件为空")
             if audio_url and (not os.path.exists(temp_a) or os.path.getsize(temp_a) <= 0):
                 raise StreamDownloadError("Bilibili 音频流写入失败或文件为空")
 
             # 到这里仅代表两个分流落盘成功；最终文件必须等 ffmpeg 合并完成后才算成功。
-            total_bytes = sum(item["total"] for item in stream_stats.values() if item["total"] > 0)
-            downloaded_bytes = sum(item["downloaded"] for item in stream_stats.values())
             self._emit_progress(
                 progress_callback,
                 90,
@@ -495,30 +733,15 @@ class BilibiliDownloader(BaseDownloader):
                 bytes_total=total_bytes or None,
                 trace_id=trace_id,
             )
-            if not os.path.exists(merging_path) or os.path.getsize(merging_path) <= 0:
-                raise MergeError("Bilibili 音视频合并完成后未生成有效文件")
-            self._publish_merged_file(
+            self._finish_merged_output(
+                video_item,
                 merging_path,
                 save_path,
+                progress_callback=progress_callback,
                 check_stop_func=check_stop_func,
-            )
-            cleanup_temp_files()
-            self._emit_progress(
-                progress_callback,
-                100,
-                bytes_downloaded=total_bytes or downloaded_bytes or None,
-                bytes_total=total_bytes or downloaded_bytes or None,
-                phase="completed",
-                phase_message="Bilibili 音视频合并完成",
-                write_status="写入完成",
-                merge_status="合并完成",
-            )
-            debug_logger.log(
-                component="BilibiliDownloader",
-                action="merge_finished",
-                message="Bilibili 音视频合并完成",
-                status_code="BILI_MERGE_OK",
-                details={"title": video_item.title, "save_path": save_path},
+                cleanup=cleanup_temp_files,
+                total_bytes=total_bytes,
+                downloaded_bytes=downloaded_bytes,
                 trace_id=trace_id,
             )
         except DownloaderStoppedError:
@@ -550,6 +773,63 @@ class BilibiliDownloader(BaseDownloader):
                 raise
             raise StreamDownloadError(f"B站下载失败: {exc}") from exc
 
+    def _finish_merged_output(
+        self,
+        video_item: VideoItem,
+        merging_path: str,
+        save_path: str,
+        *,
+        progress_callback: ProgressCallback,
+        check_stop_func: StopCheck,
+        cleanup: Callable[[], None],
+        total_bytes: int,
+        downloaded_bytes: int,
+        trace_id: str | None,
+        streamed: bool = False,
+    ) -> None:
+        if not os.path.exists(merging_path) or os.path.getsize(merging_path) <= 0:
+            raise MergeError("Bilibili 音视频合并完成后未生成有效文件")
+        self._publish_merged_file(
+            merging_path,
+            save_path,
+            check_stop_func=check_stop_func,
+        )
+        cleanup()
+        self._emit_progress(
+            progress_callback,
+            100,
+            bytes_downloaded=total_bytes or downloaded_bytes or None,
+            bytes_total=total_bytes or downloaded_bytes or None,
+            phase="completed",
+            phase_message="Bilibili 音视频合并完成",
+            write_status="写入完成",
+            merge_status="合并完成",
+        )
+        debug_logger.log(
+            component="BilibiliDownloader",
+            action="merge_finished",
+            message="Bilibili 音视频合并完成",
+            status_code="BILI_MERGE_OK",
+            details={"title": video_item.title, "save_path": save_path, "streamed": streamed},
+            trace_id=trace_id,
+        )
+
+    @staticmethod
+    def _range_connections() -> int:
+        """单路流的分段连接数；1 表示关闭多镜像分段下载。"""
+        try:
+            connections = int(cfg.get("bilibili", "range_connections", 1))
+        except (TypeError, ValueError):
+            connections = 1
+        return max(1, min(connections, 16))
+
+    @staticmethod
+    def _should_stream_mux(resume_enabled: bool, stream_temp_files: list[str]) -> bool:
+        """开启流式合并且没有上次留下的分流缓存时才边下边合；需要续传旧 m4s 时仍走临时文件。"""
+        if not BaseDownloader._coerce_bool_setting(cfg.get("bilibili", "stream_mux", False), default=False):
+            return False
+        return not (resume_enabled and any(os.path.exists(path) for path in stream_temp_files))
+
     def _run_merge_process(
         self,
         command: list[str],
@@ -2,8 +2,10 @@
 
 from __future__ import annotations
 
+import asyncio
 import json
 import os
+import re
 import tempfile
 import threading
 import time
@@ -17,13 +19,31 @@ from app.models import VideoItem
 from shared.network_proxy import requests_proxy_mapping
 from shared.runtime_options import DomainPolicyViolation
 
+from .bandwidth import task_weight
+from .async_engine import (
+    HTTPX_ERRORS,
+    WRITE_BUFFER_BYTES,
+    AsyncTaskHandle,
+    AsyncTransportError,
+    async_download_loop,
+    asyncio_engine_enabled,
+    thread_context,
+)
 from .base import BaseDownloader, ProgressCallback, StopCheck, TransferRateLimiter
+from .http_pool import pooled_get, pooled_head
+from .range_scheduler import RangeScheduler, RangeTask, ThroughputTuner, plan_ranges
+from .range_store import PartFileStore, PreallocatedFileStore
+from .stream_io import iter_response_buffers
 
 class ChunkedDownloader(BaseDownloader):
     """适用于大文件的 Range 分块下载器，支持每个分片独立续传和重试。"""
 
     THREAD_COUNT = 8
     CHUNK_SIZE = 8 * 1024 * 1024
+    RANGES_PER_WORKER = 4
+    MANIFEST_VERSION = 2
+    SINGLE_FILE_MANIFEST_VERSION = 3
+    MANIFEST_INTERVAL_SECONDS = 1.0
     SIZE_THRESHOLD_MB = 200
     DURATION_THRESHOLD_SEC = 600
 
@@ -71,7 +91,7 @@ class ChunkedDownloader(BaseDownloader):
         domain_policy = self._domain_policy_for_item(video_item)
         try:
             request_kwargs = self._domain_policy_request_kwargs(domain_policy, url)
-            resp = requests.head(
+            resp = pooled_head(
                 url,
                 headers=headers,
                 timeout=timeout,
@@ -95,46 +115,40 @@ class ChunkedDownloader(BaseDownloader):
         if "bytes" not in accept_ranges:
             raise StreamDownloadError("服务器不支持 Range 分块下载")
 
-        chunk_count = max(1, total_size // self.CHUNK_SIZE)
-        thread_budget = self._effective_thread_count()
-        if chunk_count > thread_budget:
-            chunk_count = thread_budget
-        chunk_size = total_size // chunk_count
-
-        # 每个分片使用 HTTP Range 的闭区间 [start, end]，最后一片吸收除不尽的尾部字节。
-        chunks: list[tuple[int, int]] = []
-        for i in range(chunk_count):
-            start = i * chunk_size
-            end = start + chunk_size - 1
-            if i == chunk_count - 1:
-                end = total_size - 1
-            chunks.append((start, end))
-
+        initial_workers = self._effective_thread_count()
+        max_workers = self._max_thread_count(initial_workers)
         temp_dir = os.path.dirname(save_path)
         base_name = os.path.basename(save_path)
         # 分片临时文件隐藏在目标目录下，删除媒体时可以按 `.<filename>.partN` 精准清理。
-        temp_files = [os.path.join(temp_dir, f".{base_name}.part{i}") for i in range(chunk_count)]
         manifest_file = os.path.join(temp_dir, f".{base_name}.parts.json")
-        resume_manifest = {
-            "version": 1,
+        single_file = self._coerce_bool_setting(cfg.get("download", "chunked_preallocate", True))
+        store: PartFileStore | PreallocatedFileStore
+        if single_file:
+            store = PreallocatedFileStore(os.path.join(temp_dir, f".{base_name}.ranges.downloading"), total_size)
+        else:
+            store = PartFileStore(temp_dir, base_name)
+        resume_identity = {
             "url": str(getattr(resp, "url", "") or url),
             "total_size": total_size,
             "etag": str(source_etag or ""),
             "last_modified": str(source_last_modified or ""),
-            "chunks": [[start, end] for start, end in chunks],
         }
 
-        downloaded_bytes = [0] * chunk_count
-        # 所有 Range 线程共享一个 limiter，配置含义是“单任务总速度”，不是每个分片各自一份额度。
-        rate_limiter = TransferRateLimiter(cfg.get("download", "speed_limit_kb", 0))
+        # 所有 Range 线程共享一个租约，按任务而不是按连接参与全局带宽分配。
+        rate_limiter = TransferRateLimiter(
+            cfg.get("download", "speed_limit_kb", 0),
+            label=str((video_item.meta or {}).get("trace_id") or base_name),
+            weight=task_weight(video_item),
+        )
         lock = threading.Lock()
         error_event = threading.Event()
         stop_event = threading.Event()
         error_holder: list[Exception] = []
 
         def cleanup_temp_files() -> None:
-            """只清理本次分配出的分片文件，避免误删同目录其他下载缓存。"""
-            for temp_file in [*temp_files, manifest_file]:
+            """只清理本文件名的分片、预分配文件和清单，避免误删同目录其他下载缓存。"""
+            store.close()
+            for temp_file in [*self._existing_part_files(temp_dir, base_name), *store.owned_paths(), manifest_file]:
                 try:
                     os.remove(temp_file)
                 except OSError:
@@ -145,79 +159,107 @@ class ChunkedDownloader(BaseDownloader):
                 error_holder.append(exc)
             error_event.set()
 
-        def has_matching_resume_manifest() -> bool:
-            if not source_etag and not source_last_modified:
-                return False
-            try:
-                with open(manifest_file, encoding="utf-8") as fp:
-                    return json.load(fp) == resume_manifest
-            except (OSError, TypeError, ValueError, json.JSONDecodeError):
-                return False
+        resumed_tasks = None
+        if resume_enabled and (source_etag or source_last_modified):
+            if isinstance(store, PreallocatedFileStore):
+                resumed_tasks = self._load_resume_intervals(manifest_file, resume_identity, store.path, total_size)
+            else:
+                resumed_tasks = self._load_resume_ranges(manifest_file, resume_identity)
+        if resumed_tasks is None:
+            cleanup_temp_files()
+        # 初始区间数是最大并发的若干倍，既能让线程从共享队列取小区间，又不会产生过多分片文件。
+        range_count = max(1, min(total_size // self.CHUNK_SIZE, max_workers * self.RANGES_PER_WORKER))
+        scheduler = RangeScheduler(resumed_tasks or plan_ranges(total_size, range_count))
+        persisted_state: tuple[int, int] | None = None
+        persisted_at = 0.0
+
+        def persist_manifest() -> None:
+            nonlocal persisted_state, persisted_at
+            if not resume_enabled:
+                return
+            if isinstance(store, PreallocatedFileStore):
+                state = (scheduler.version, scheduler.written_bytes())
+                if state == persisted_state or time.monotonic() - persisted_at < self.MANIFEST_INTERVAL_SECONDS:
+                    return
+                # 先把已写字节刷到磁盘再记录区间，清单永远不会声称拥有尚未落盘的数据。
+                store.sync()
+                manifest = {
+                    "version": self.SINGLE_FILE_MANIFEST_VERSION,
+                    **resume_identity,
+                    "completed": scheduler.written_intervals(),
+                }
+            else:
+                state = (scheduler.version, 0)
+                if state == persisted_state:
+                    return
+                manifest = {"version": self.MANIFEST_VERSION, **resume_identity, "ranges": scheduler.layout()}
+            self._write_resume_manifest(manifest_file, manifest)
+            persisted_state = state
+            persisted_at = time.monotonic()
 
-        if not resume_enabled or not has_matching_resume_manifest():
+        try:
+            if isinstance(store, PreallocatedFileStore):
+                store.open(reuse=resumed_tasks is not None)
+            persist_manifest()
+        except OSError as exc:
             cleanup_temp_files()
+            raise StreamDownloadError(f"无法创建分片续传清单: {exc}") from exc
 
-        if resume_enabled:
-            manifest_parent = temp_dir or "."
-            os.makedirs(manifest_parent, exist_ok=True)
-            manifest_temp: str | None = None
-            try:
-                with tempfile.NamedTemporaryFile(
-                    mode="w",
-                    encoding="utf-8",
-                    prefix=f".{base_name}.parts.",
-                    suffix=".tmp",
-                    dir=manifest_parent,
-                    delete=False,
-                ) as fp:
-                    manifest_temp = fp.name
-                    json.dump(resume_manifest, fp, separators=(",", ":"), ensure_ascii=True)
-                    fp.flush()
-                    os.fsync(fp.fileno())
-                os.replace(manifest_temp, manifest_file)
-                manifest_temp = None
-            except OSError as exc:
-                cleanup_temp_files()
-                raise StreamDownloadError(f"无法创建分片续传清单: {exc}") from exc
-            finally:
-                if manifest_temp:
-                    try:
-                        os.remove(manifest_temp)
-                    except OSError:
-                        pass
+        def range_retry_delay(exc: Exception, task: RangeTask, attempt: int, existing_size: int) -> float | None:
+            """区间尝试失败后的处理：可重试时返回等待秒数，否则记录错误并返回 None。"""
+            if isinstance(exc, DownloaderStoppedError):
+                record_error(DownloaderStoppedError("用户停止下载"))
+                return None
+            if isinstance(exc, DomainPolicyViolation):
+                record_error(StreamDownloadError(f"分块下载地址违反公网访问策略: {exc}"))
+                return None
+            if not isinstance(exc, (requests.RequestException, OSError, ValueError, RuntimeError, StreamDownloadError)):
+                debug_logger.log_exception("ChunkedDownloader", "download_chunk", exc)
+                record_error(StreamDownloadError(f"分片线程异常: {type(exc).__name__}: {exc}"))
+                return None
+            if attempt >= retry_count:
+                record_error(exc)
+                return None
+            debug_logger.log(
+                component="ChunkedDownloader",
+                action="chunk_retry",
+                level="WARN",
+                message=f"分块下载失败，准备重试 ({attempt + 1}/{retry_count})",
+                status_code="DL_CHUNK_RETRY",
+                details={
+                    "chunk_index": task.part_id,
+                    "attempt": attempt + 1,
+                    "max_retries": retry_count,
+                    "resume_enabled": resume_enabled,
+                    "resume_offset": existing_size,
+                    "start_byte": task.start,
+                    "end_byte": task.end,
+                    "error": str(exc),
+                },
+                trace_id=video_item.meta.get("trace_id") if video_item.meta else None,
+            )
+            return 1 if retry_count <= 3 else 3
 
-        def download_chunk(idx: int, start_byte: int, end_byte: int, temp_file: str) -> bool | None:
-            chunk_length = end_byte - start_byte + 1
-            last_error: Exception | None = None
+        def download_range(task: RangeTask) -> bool:
+            existing_size = 0
 
             for attempt in range(retry_count + 1):
                 if stop_event.is_set() or error_event.is_set():
-                    return None
+                    return False
                 try:
                     request_kwargs = self._domain_policy_request_kwargs(domain_policy, url)
-                    existing_size = 0
-                    if resume_enabled and os.path.exists(temp_file):
-                        actual_size = os.path.getsize(temp_file)
-                        if actual_size > chunk_length:
-                            # 旧任务或不同资源留下的超长分片不能直接参与合并。
-                            with open(temp_file, "wb"):
-                                pass
-                            actual_size = 0
-                        existing_size = actual_size
-                    if existing_size >= chunk_length:
-                        with lock:
-                            downloaded_bytes[idx] = chunk_length
+                    existing_size = store.prepare_attempt(task, resume_enabled=resume_enabled)
+                    scheduler.rewind(task, existing_size)
+                    request_start, request_end = scheduler.bounds(task)
+                    if request_start > request_end:
                         return True
 
-                    request_start = start_byte + existing_size if resume_enabled else start_byte
                     request_headers = headers.copy()
                     # 分块下载强依赖 206；如果服务端回 200，说明 Range 没生效，应立即失败回退。
-                    request_headers["Range"] = f"bytes={request_start}-{end_byte}"
+                    request_headers["Range"] = f"bytes={request_start}-{request_end}"
                     if source_etag:
                         request_headers["If-Range"] = str(source_etag)
-                    with lock:
-                        downloaded_bytes[idx] = existing_size if resume_enabled else 0
-                    with requests.get(
+                    with pooled_get(
                         url,
                         headers=request_headers,
                         stream=True,
@@ -230,79 +272,173 @@ class ChunkedDownloader(BaseDownloader):
                         response.raise_for_status()
                         content_range = response.headers.get("content-range") or response.headers.get("Content-Range")
                         parsed_range = self._parse_content_range_header(content_range)
-                        if parsed_range != (request_start, end_byte, total_size):
+                        if parsed_range != (request_start, request_end, total_size):
                             raise StreamDownloadError(
                                 "分块响应范围不匹配: "
-                                f"expected bytes {request_start}-{end_byte}/{total_size}, got {content_range!r}"
+                                f"expected bytes {request_start}-{request_end}/{total_size}, got {content_range!r}"
                             )
-                        mode = "ab" if resume_enabled and existing_size > 0 else "wb"
-                        with open(temp_file, mode) as fp:
-                            for chunk_data in response.iter_content(chunk_size=65536):
+                        with store.open_range(task, existing_size) as write_at:
+                            for chunk_data in iter_response_buffers(
+                                response,
+                                fallback_chunk_size=65536,
+                                rate_limiter=rate_limiter,
+                            ):
                                 if stop_event.is_set() or error_event.is_set():
-                                    return None
+                                    return False
                                 if check_stop_func():
                                     stop_event.set()
                                     raise DownloaderStoppedError("用户停止下载")
-                                if chunk_data:
-                                    fp.write(chunk_data)
+                                if not chunk_data:
+                                    continue
+                                # 先在调度器里声明再写盘：区间被其他线程拆走后半段时，这里只写到新的终点。
+                                offset = task.next_offset
+                                allowed = scheduler.claim(task, len(chunk_data))
+                                if allowed:
+                                    write_at(offset, chunk_data[:allowed])
+                                    scheduler.commit(task, allowed)
                                     rate_limiter.throttle(
-                                        len(chunk_data),
+                                        allowed,
                                         lambda: stop_event.is_set() or check_stop_func(),
                                     )
-                                    with lock:
-                                        downloaded_bytes[idx] += len(chunk_data)
-                        if os.path.getsize(temp_file) != chunk_length:
-                            raise StreamDownloadError(
-                                f"分块长度不完整: expected {chunk_length}, got {os.path.getsize(temp_file)}"
-                            )
+                                if allowed < len(chunk_data) or task.complete:
+                                    break
+                    actual_size = store.written_length(task)
+                    if actual_size != task.length:
+                        raise StreamDownloadError(
+                            f"分块长度不完整: expected {task.length}, got {actual_size}"
+                        )
                     return True
-                except DownloaderStoppedError:
-                    record_error(DownloaderStoppedError("用户停止下载"))
-                    return False
-                except DomainPolicyViolation as exc:
-                    record_error(StreamDownloadError(f"分块下载地址违反公网访问策略: {exc}"))
+                except Exception as exc:
+                    delay = range_retry_delay(exc, task, attempt, existing_size)
+                    if delay is None:
+                        return False
+                    time.sleep(delay)
+            return False
+
+        async def download_range_async(task: RangeTask) -> bool:
+            """``download_range`` 的协程版本：续传、响应校验和重试规则相同，传输跑在共享事件循环上。"""
+            existing_size = 0
+            for attempt in range(retry_count + 1):
+                if stop_event.is_set() or error_event.is_set():
                     return False
-                except (requests.RequestException, OSError, ValueError, RuntimeError, StreamDownloadError) as exc:
-                    last_error = exc
-                    if attempt < retry_count:
-                        debug_logger.log(
-                            component="ChunkedDownloader",
-                            action="chunk_retry",
-                            level="WARN",
-                            message=f"分块下载失败，准备重试 ({attempt + 1}/{retry_count})",
-                            status_code="DL_CHUNK_RETRY",
-                            details={
-                                "chunk_index": idx,
-                                "attempt": attempt + 1,
-                                "max_retries": retry_count,
-                                "resume_enabled": resume_enabled,
-                                "resume_offset": existing_size,
-                                "start_byte": start_byte,
-                                "end_byte": end_byte,
-                                "error": str(exc),
-                            },
-                            trace_id=video_item.meta.get("trace_id") if video_item.meta else None,
+                try:
+                    existing_size = await asyncio.to_thread(
+                        store.prepare_attempt, task, resume_enabled=resume_enabled
+                    )
+                    scheduler.rewind(task, existing_size)
+                    request_start, request_end = scheduler.bounds(task)
+                    if request_start > request_end:
+                        return True
+
+                    request_headers = headers.copy()
+                    request_headers["Range"] = f"bytes={request_start}-{request_end}"
+                    if source_etag:
+                        request_headers["If-Range"] = str(source_etag)
+                    try:
+                        client = async_download_loop.client(proxy)
+                        async with client.stream("GET", url, headers=request_headers, timeout=timeout) as response:
+                            if response.status_code != 206:
+                                raise StreamDownloadError(f"分块请求未返回 206: {response.status_code}")
+                            content_range = response.headers.get("content-range")
+                            parsed_range = self._parse_content_range_header(content_range)
+                            if parsed_range != (request_start, request_end, total_size):
+                                raise StreamDownloadError(
+                                    "分块响应范围不匹配: "
+                                    f"expected bytes {request_start}-{request_end}/{total_size}, got {content_range!r}"
+                                )
+                            async with thread_context(store.open_range, task, existing_size) as write_at:
+                                buffer = bytearray()
+
+                                async def flush() -> bool:
+                                    """按缓冲区声明并写入；返回 False 表示区间已被拆分截断或写满。"""
+                                    nonlocal buffer
+                                    data, buffer = buffer, bytearray()
+                                    offset = task.next_offset
+                                    allowed = scheduler.claim(task, len(data))
+                                    if allowed:
+                                        await asyncio.to_thread(
+                                            write_at, offset, data if allowed == len(data) else data[:allowed]
+                                        )
+                                        scheduler.commit(task, allowed)
+                                    return allowed == len(data) and not task.complete
+
+                                async for chunk_data in response.aiter_bytes():
+                                    if stop_event.is_set() or error_event.is_set():
+                                        return False
+                                    if check_stop_func():
+                                        stop_event.set()
+                                        raise DownloaderStoppedError("用户停止下载")
+                                    if not chunk_data:
+                                        continue
+                                    buffer += chunk_data
+                                    await rate_limiter.athrottle(
+                                        len(chunk_data),
+                                        lambda: stop_event.is_set() or check_stop_func(),
+                                    )
+                                    if len(buffer) >= min(WRITE_BUFFER_BYTES, task.remaining) and not await flush():
+                                        break
+                                if buffer:
+                                    await flush()
+                    except HTTPX_ERRORS as exc:
+                        raise AsyncTransportError(f"{type(exc).__name__}: {exc}") from exc
+                    actual_size = await asyncio.to_thread(store.written_length, task)
+                    if actual_size != task.length:
+                        raise StreamDownloadError(
+                            f"分块长度不完整: expected {task.length}, got {actual_size}"
                         )
-                        time.sleep(1 if retry_count <= 3 else 3)
-                        continue
-                    record_error(exc)
-                    return False
+                    return True
                 except Exception as exc:
-                    debug_logger.log_exception("ChunkedDownloader", "download_chunk", exc)
-                    record_error(StreamDownloadError(f"分片线程异常: {type(exc).__name__}: {exc}"))
-                    return False
-            if last_error is not None:
-                record_error(last_error)
+                    delay = range_retry_delay(exc, task, attempt, existing_size)
+                    if delay is None:
+                        return False
+                    await asyncio.sleep(delay)
             return False
 
-        threads: list[threading.Thread] = []
-        completed = False
-        try:
-            for index, (start, end) in enumerate(chunks):
-                thread = threading.Thread(target=download_chunk, args=(index, start, end, temp_files[index]), daemon=True)
+        def run_worker() -> None:
+            try:
+                while not (stop_event.is_set() or error_event.is_set()):
+                    # 只在区间边界退出，降并发时不会丢弃已建立的传输。
+                    if scheduler.should_retire():
+                        return
+                    task = scheduler.acquire()
+                    if task is None or not download_range(task):
+                        break
+            finally:
+                scheduler.unregister_worker()
+
+        async def run_worker_async() -> None:
+            try:
+                while not (stop_event.is_set() or error_event.is_set()):
+                    if scheduler.should_retire():
+                        return
+                    task = scheduler.acquire()
+                    if task is None or not await download_range_async(task):
+                        break
+            except asyncio.CancelledError:
+                stop_event.set()
+                raise
+            finally:
+                scheduler.unregister_worker()
+
+        # asyncio 引擎下分片是事件循环上的协程，句柄提供与线程相同的 is_alive/join。
+        use_async = asyncio_engine_enabled(domain_policy, proxy)
+        threads: list[threading.Thread | AsyncTaskHandle] = []
+
+        def spawn_workers(count: int) -> None:
+            for _ in range(count):
+                scheduler.register_worker()
+                if use_async:
+                    threads.append(async_download_loop.submit(run_worker_async()))
+                    continue
+                thread = threading.Thread(target=run_worker, daemon=True)
                 thread.start()
                 threads.append(thread)
 
+        tuner = ThroughputTuner(initial=initial_workers, maximum=max_workers)
+        completed = False
+        try:
+            spawn_workers(min(tuner.target, len(scheduler.tasks)))
+
             last_progress = -1
             while any(thread.is_alive() for thread in threads):
                 if stop_event.is_set():
@@ -318,8 +454,16 @@ class ChunkedDownloader(BaseDownloader):
                         raise first_error
                     raise StreamDownloadError(f"分块下载失败: {first_error}") from first_error
 
-                with lock:
-                    total_downloaded = sum(downloaded_bytes)
+                total_downloaded = scheduler.downloaded_bytes()
+                try:
+                    persist_manifest()
+                except OSError as exc:
+                    debug_logger.log_exception("ChunkedDownloader", "persist_manifest", exc)
+                target = tuner.observe(total_downloaded, time.monotonic())
+                alive_count = sum(1 for thread in threads if thread.is_alive())
+                if target > alive_count and scheduler.has_work():
+                    spawn_workers(target - alive_count)
+                scheduler.set_retire_target(alive_count - target)
                 percent = int(total_downloaded / total_size * 100) if total_size > 0 else 0
                 if percent != last_progress:
                     try:
@@ -340,34 +484,44 @@ class ChunkedDownloader(BaseDownloader):
                 if isinstance(first_error, DownloaderStoppedError):
                     raise first_error
                 raise StreamDownloadError(f"分块下载失败: {first_error}") from first_error
+            if not scheduler.all_complete():
+                raise StreamDownloadError("分块下载失败: 仍有区间未完成")
 
             try:
                 self._emit_progress(progress_callback, 98, bytes_downloaded=total_size, bytes_total=total_size)
-                for temp_file, (start, end) in zip(temp_files, chunks):
-                    expected_size = end - start + 1
-                    try:
-                        actual_size = os.path.getsize(temp_file)
-                    except OSError as exc:
-                        raise StreamDownloadError(f"分片文件缺失: {temp_file}") from exc
-                    if actual_size != expected_size:
-                        raise StreamDownloadError(
-                            f"分片合并前校验失败: {temp_file}, expected {expected_size}, got {actual_size}"
-                        )
-                # 所有分片成功后再串行合并，保证最终文件只在数据完整时出现。
-                self._merge_temp_files_atomically(
-                    temp_files,
-                    save_path,
-                    check_stop_func=check_stop_func,
-                )
+                if isinstance(store, PreallocatedFileStore):
+                    self._publish_preallocated_file(store, save_path, check_stop_func=check_stop_func)
+                else:
+                    self._merge_part_files(store, scheduler, save_path, check_stop_func=check_stop_func)
             except DownloaderStoppedError:
                 raise
             except Exception as exc:
                 raise StreamDownloadError(f"分块下载合并失败: {exc}") from exc
             self._emit_progress(progress_callback, 100, bytes_downloaded=total_size, bytes_total=total_size)
             completed = True
+            debug_logger.log(
+                component="ChunkedDownloader",
+                action="range_schedule",
+                message="Chunked download finished with dynamic range scheduling",
+                status_code="DL_CHUNK_SCHEDULE",
+                details={
+                    "ranges": len(scheduler.tasks),
+                    "splits": scheduler.split_count,
+                    "initial_workers": initial_workers,
+                    "final_workers": tuner.target,
+                    "resumed": resumed_tasks is not None,
+                    "single_file": store.single_file,
+                    "engine": "asyncio" if use_async else "thread",
+                },
+                trace_id=video_item.meta.get("trace_id") if video_item.meta else None,
+            )
         finally:
             if not completed:
                 stop_event.set()
+                for thread in threads:
+                    if isinstance(thread, AsyncTaskHandle):
+                        # 协程可能正等待网络数据而看不到停止标志，直接取消。
+                        thread.cancel()
                 for thread in threads:
                     if thread.is_alive():
                         thread.join(timeout=5)
@@ -385,6 +539,159 @@ class ChunkedDownloader(BaseDownloader):
                     details={"save_path": save_path, "alive_threads": sum(1 for thread in threads if thread.is_alive())},
                     trace_id=video_item.meta.get("trace_id") if video_item.meta else None,
                 )
+
+    @classmethod
+    def _merge_part_files(
+        cls,
+        store: PartFileStore,
+        scheduler: RangeScheduler,
+        save_path: str,
+        *,
+        check_stop_func: StopCheck,
+    ) -> None:
+        temp_files: list[str] = []
+        for task in scheduler.tasks:
+            temp_file = store.part_path(task.part_id)
+            try:
+                actual_size = os.path.getsize(temp_file)
+            except OSError as exc:
+                raise StreamDownloadError(f"分片文件缺失: {temp_file}") from exc
+            if actual_size != task.length:
+                raise StreamDownloadError(
+                    f"分片合并前校验失败: {temp_file}, expected {task.length}, got {actual_size}"
+                )
+            temp_files.append(temp_file)
+        # 所有分片成功后再按偏移串行合并，保证最终文件只在数据完整时出现。
+        cls._merge_temp_files_atomically(temp_files, save_path, check_stop_func=check_stop_func)
+
+    @staticmethod
+    def _publish_preallocated_file(
+        store: PreallocatedFileStore,
+        save_path: str,
+        *,
+        check_stop_func: StopCheck,
+    ) -> None:
+        """预分配文件已按偏移写满，落盘后一次 rename 发布，不再复制数据。"""
+        store.sync()
+        store.close()
+        actual_size = os.path.getsize(store.path)
+        if actual_size != store.total_size:
+            raise StreamDownloadError(f"预分配文件长度异常: expected {store.total_size}, got {actual_size}")
+        if check_stop_func():
+            raise DownloaderStoppedError("User stopped download before chunk publication")
+        os.replace(store.path, save_path)
+
+    @classmethod
+    def _max_thread_count(cls, initial_workers: int) -> int:
+        """吞吐调优允许的单任务并发上限：最多翻倍，且不超过 THREAD_COUNT。"""
+        return max(1, min(cls.THREAD_COUNT, initial_workers * 2))
+
+    @staticmethod
+    def _existing_part_files(temp_dir: str, base_name: str) -> list[str]:
+        pattern = re.compile(rf"^\.{re.escape(base_name)}\.part\d+$")
+        try:
+            with os.scandir(temp_dir or ".") as entries:
+                return [entry.path for entry in entries if pattern.match(entry.name) and entry.is_file()]
+        except OSError:
+            return []
+
+    @classmethod
+    def _load_resume_ranges(cls, manifest_file: str, identity: dict[str, object]) -> list[RangeTask] | None:
+        """读取与当前资源身份一致的续传清单；v1 的固定分片布局按 part 序号升级为区间列表。"""
+        try:
+            with open(manifest_file, encoding="utf-8") as fp:
+                manifest = json.load(fp)
+        except (OSError, TypeError, ValueError, json.JSONDecodeError):
+            return None
+        if not isinstance(manifest, dict) or any(manifest.get(key) != value for key, value in identity.items()):
+            return None
+        try:
+            if manifest.get("version") == 1:
+                ranges = [(index, int(start), int(end)) for index, (start, end) in enumerate(manifest["chunks"])]
+            elif manifest.get("version") == cls.MANIFEST_VERSION:
+                ranges = [(int(part_id), int(start), int(end)) for part_id, start, end in manifest["ranges"]]
+            else:
+                return None
+        except (KeyError, TypeError, ValueError):
+            return None
+        ranges.sort(key=lambda item: item[1])
+        # 区间必须从 0 开始首尾相接覆盖整个文件，分片编号不能重复，否则合并结果不可信。
+        expected_start = 0
+        for _part_id, start, end in ranges:
+            if start != expected_start or end < start:
+                return None
+            expected_start = end + 1
+        if expected_start != identity["total_size"] or len({item[0] for item in ranges}) != len(ranges):
+            return None
+        return [RangeTask(part_id, start, end) for part_id, start, end in ranges]
+
+    @classmethod
+    def _load_resume_intervals(
+        cls,
+        manifest_file: str,
+        identity: dict[str, object],
+        range_file: str,
+        total_size: int,
+    ) -> list[RangeTask] | None:
+        """读取单文件模式的已完成区间，把空洞还原为待下载区间；预分配文件长度不符时放弃续传。"""
+        try:
+            with open(manifest_file, encoding="utf-8") as fp:
+                manifest = json.load(fp)
+            range_file_size = os.path.getsize(range_file)
+        except (OSError, TypeError, ValueError, json.JSONDecodeError):
+            return None
+        if (
+            not isinstance(manifest, dict)
+            or manifest.get("version") != cls.SINGLE_FILE_MANIFEST_VERSION
+            or any(manifest.get(key) != value for key, value in identity.items())
+            or range_file_size != total_size
+        ):
+            return None
+        try:
+            completed = sorted((int(start), int(end)) for start, end in manifest["completed"])
+        except (KeyError, TypeError, ValueError):
+            return None
+        tasks: list[RangeTask] = []
+        cursor = 0
+        for start, end in completed:
+            if start < cursor or end < start or end >= total_size:
+                return None
+            if start > cursor:
+                tasks.append(RangeTask(len(tasks), cursor, start - 1))
+            length = end - start + 1
+            tasks.append(RangeTask(len(tasks), start, end, done=length, written=length))
+            cursor = end + 1
+        if cursor < total_size:
+            tasks.append(RangeTask(len(tasks), cursor, total_size - 1))
+        return tasks if completed else None
+
+    @staticmethod
+    def _write_resume_manifest(manifest_file: str, manifest: dict[str, object]) -> None:
+        manifest_parent = os.path.dirname(manifest_file) or "."
+        os.makedirs(manifest_parent, exist_ok=True)
+        manifest_temp: str | None = None
+        try:
+            with tempfile.NamedTemporaryFile(
+                mode="w",
+                encoding="utf-8",
+                prefix=f"{os.path.basename(manifest_file)[:-len('.json')]}.",
+                suffix=".tmp",
+                dir=manifest_parent,
+                delete=False,
+            ) as fp:
+                manifest_temp = fp.name
+                json.dump(manifest, fp, separators=(",", ":"), ensure_ascii=True)
+                fp.flush()
+                os.fsync(fp.fileno())
+            os.replace(manifest_temp, manifest_file)
+            manifest_temp = None
+        finally:
+            if manifest_temp:
+                try:
+                    os.remove(manifest_temp)
+                except OSError:
+                    pass
+
     @staticmethod
     def _merge_temp_files_atomically(
         temp_files: list[str],
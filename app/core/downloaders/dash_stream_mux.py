@@ -0,0 +1,226 @@
+"""DASH 音视频流边下载边交给 ffmpeg 合并，最终 MP4 只写一次。"""
+
+from __future__ import annotations
+
+import socket
+import subprocess
+import threading
+import time
+
+from app.debug_logger import debug_logger
+from app.exceptions import MergeError
+
+from .external import FFmpegExternalTool, build_hidden_startupinfo
+
+# ffmpeg 按输入顺序探测，音频输入要等视频探测完成后才会被连接。
+ACCEPT_TIMEOUT_SECONDS = 60.0
+# 发送阻塞时的单次等待，保证中止请求能及时打断写入。
+SEND_SLICE_SECONDS = 0.5
+
+
+class StreamMuxUnavailable(RuntimeError):
+    """流式合并无法继续，调用方应改走临时文件 + 单独合并的路径。"""
+
+
+class StreamMuxInput:
+    """一路 DASH 流的写入端：ffmpeg 以 ``tcp://127.0.0.1:<port>`` 连接后按顺序接收字节。"""
+
+    def __init__(self, name: str, aborted: threading.Event) -> None:
+        self.name = name
+        self.written = 0
+        self._aborted = aborted
+        self._listener = socket.create_server(("127.0.0.1", 0), backlog=1)
+        self._listener.settimeout(SEND_SLICE_SECONDS)
+        self._conn: socket.socket | None = None
+        self._closed = False
+
+    @property
+    def url(self) -> str:
+        return f"tcp://127.0.0.1:{self._listener.getsockname()[1]}"
+
+    def __enter__(self) -> StreamMuxInput:
+        return self
+
+    def __exit__(self, *_exc: object) -> None:
+        return None
+
+    def write(self, data: bytes | bytearray | memoryview) -> None:
+        conn = self._accept()
+        view = memoryview(data)
+        while view:
+            if self._aborted.is_set():
+                raise StreamMuxUnavailable("流式合并已中止")
+            try:
+                sent = conn.send(view)
+            except socket.timeout:
+                continue
+            except OSError as exc:
+                raise StreamMuxUnavailable(f"ffmpeg 已断开 {self.name} 输入: {exc}") from exc
+            view = view[sent:]
+            self.written += sent
+
+    def close(self) -> None:
+        """发送 EOF；ffmpeg 据此结束这一路输入。"""
+        if self._closed:
+            return
+        self._closed = True
+        conn = self._conn
+        if conn is not None:
+            try:
+                conn.shutdown(socket.SHUT_WR)
+            except OSError:
+                pass
+            conn.close()
+        self._listener.close()
+
+    def _accept(self) -> socket.socket:
+        if self._conn is not None:
+            return self._conn
+        deadline = time.monotonic() + ACCEPT_TIMEOUT_SECONDS
+        while True:
+            if self._aborted.is_set() or self._closed:
+                raise StreamMuxUnavailable("流式合并已中止")
+            try:
+                conn, _address = self._listener.accept()
+                break
+            except socket.timeout:
+                if time.monotonic() > deadline:
+                    raise StreamMuxUnavailable(f"ffmpeg 未连接 {self.name} 输入") from None
+            except OSError as exc:
+                raise StreamMuxUnavailable(f"等待 ffmpeg 连接 {self.name} 输入失败: {exc}") from exc
+        conn.settimeout(SEND_SLICE_SECONDS)
+        self._conn = conn
+        return conn
+
+
+class DashStreamMuxer:
+    """一个常驻 ffmpeg 进程，边接收音视频字节边用 ``-c copy`` 写出最终 MP4。
+
+    输入走本机回环 TCP 而不是匿名管道：ffmpeg 的 stdin 只有一路，命名管道在
+    Windows 上又需要额外的系统 API，回环 socket 在各平台行为一致。
+    """
+
+    def __init__(
+        self,
+        ffmpeg_path: str,
+        output_path: str,
+        *,
+        has_audio: bool,
+        trace_id: str | None = None,
+    ) -> None:
+        self._ffmpeg_path = ffmpeg_path
+        self._output_path = output_path
+        self._trace_id = trace_id
+        self._aborted = threading.Event()
+        self.inputs: dict[str, StreamMuxInput] = {}
+        self._process: subprocess.Popen | None = None
+        self._stderr_tail: list[str] = []
+        self._reader: threading.Thread | None = None
+        try:
+            self.inputs["video"] = StreamMuxInput("video", self._aborted)
+            if has_audio:
+                self.inputs["audio"] = StreamMuxInput("audio", self._aborted)
+        except OSError as exc:
+            self._close_inputs()
+            raise StreamMuxUnavailable(f"无法创建流式合并输入: {exc}") from exc
+
+    def command(self) -> list[str]:
+        audio = self.inputs.get("audio")
+        return FFmpegExternalTool.build_stream_mux_command(
+            self._ffmpeg_path,
+            self.inputs["video"].url,
+            audio.url if audio is not None else None,
+            self._output_path,
+        )
+
+    def start(self) -> None:
+        command = self.command()
+        debug_logger.log_command(
+            component="BilibiliDownloader",
+            tool_name="ffmpeg",
+            command_args=command,
+            message="启动 Bilibili 流式合并",
+            context={"save_path": self._output_path},
+            trace_id=self._trace_id,
+        )
+        try:
+            self._process = subprocess.Popen(
+                command,
+                startupinfo=build_hidden_startupinfo(),
+                stdin=subprocess.DEVNULL,
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.PIPE,
+                text=True,
+                encoding="utf-8",
+                errors="replace",
+            )
+        except OSError as exc:
+            self._close_inputs()
+            raise StreamMuxUnavailable(f"启动 ffmpeg 流式合并失败: {exc}") from exc
+        self._reader = threading.Thread(target=self._read_stderr, daemon=True, name="BilibiliStreamMuxStderr")
+        self._reader.start()
+
+    def input(self, name: str) -> StreamMuxInput:
+        return self.inputs[name]
+
+    def finish(self, timeout: float) -> None:
+        """所有输入写完后等待 ffmpeg 收尾；非零退出视为合并失败。"""
+        self._close_inputs()
+        process = self._process
+        if process is None:
+            raise MergeError("ffmpeg 流式合并进程未启动")
+        try:
+            return_code = process.wait(timeout=timeout)
+        except subprocess.TimeoutExpired:
+            self.abort()
+            raise MergeError(f"Bilibili 流式合并收尾超时（{int(timeout)}s）{self._tail_suffix()}") from None
+        self._join_reader()
+        if return_code != 0:
+            raise MergeError(f"Bilibili 流式合并失败 (code={return_code}){self._tail_suffix()}")
+
+    def abort(self) -> None:
+        """中止写入与 ffmpeg；可重复调用。"""
+        self._aborted.set()
+        self._close_inputs()
+        process = self._process
+        if process is not None and process.poll() is None:
+            process.kill()
+            try:
+                process.wait(timeout=2)
+            except subprocess.TimeoutExpired:
+                pass
+        self._join_reader()
+
+    def stderr_tail(self) -> str:
+        return "\n".join(self._stderr_tail[-8:])
+
+    def _tail_suffix(self) -> str:
+        tail = self.stderr_tail()
+        return f": {tail}" if tail else ""
+
+    def _close_inputs(self) -> None:
+        for sink in self.inputs.values():
+            sink.close()
+
+    def _join_reader(self) -> None:
+        if self._reader is not None:
+            self._reader.join(timeout=1.0)
+
+    def _read_stderr(self) -> None:
+        process = self._process
+        stream = process.stderr if process is not None else None
+        if stream is None:
+            return
+        try:
+            for line in stream:
+                text = line.strip()
+                if text:
+                    self._stderr_tail.append(text)
+                    del self._stderr_tail[:-20]
+        except (OSError, ValueError) as exc:
+            debug_logger.log_exception(
+                "BilibiliDownloader",
+                "stream_mux_stderr_reader_error",
+                exc,
+                trace_id=self._trace_id,
+            )
@@ -207,6 +207,27 @@ class FFmpegExternalTool:
         command.extend(["-c", "copy", "-movflags", "+faststart", "-f", "mp4", save_path])
         return command
 
+    @classmethod
+    def build_stream_mux_command(
+        cls,
+        executable: str,
+        video_input: str,
+        audio_input: str | None,
+        save_path: str,
+    ) -> list[str]:
+        """构造边下载边合并的命令，输入是下载器提供的本机 TCP 流。
+
+        不加 ``+faststart``：它会在结束时把整个输出再读写一遍，正好抵消流式合并省下的 I/O。
+        """
+        command = [executable, "-y", "-nostdin", "-hide_banner", "-loglevel", "error", "-i", video_input]
+        if audio_input:
+            command.extend(["-i", audio_input])
+            command.extend(["-map", "0:v:0", "-map", "1:a:0?"])
+        else:
+            command.extend(["-map", "0:v:0?"])
+        command.extend(["-c", "copy", "-f", "mp4", save_path])
+        return command
+
 class NM3U8DLREExternalTool:
     EXE_PATH = "N_m3u8DL-RE.exe"
     DISPLAY_NAME = "N_m3u8DL-RE"
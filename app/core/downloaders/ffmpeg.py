@@ -22,6 +22,7 @@ from shared.subprocess_env import isolated_media_subprocess_env
 
 from .base import BaseDownloader, ProgressCallback, StopCheck
 from .external import FFmpegExternalTool, build_hidden_startupinfo
+from .http_pool import pooled_head
 
 # 基于 external.py 封装命令构建和可执行文件解析，这里只负责进程生命周期与进度解析。
 class FFmpegDownloader(BaseDownloader):
@@ -196,7 +197,7 @@ class FFmpegDownloader(BaseDownloader):
             resolved_size = expected_size_bytes
             try:
                 request_kwargs = self._domain_policy_request_kwargs(domain_policy, source_url)
-                resp = requests.head(
+                resp = pooled_head(
                     source_url,
                     headers=headers,
                     timeout=request_timeout,
@@ -0,0 +1,89 @@
+"""HLS AES-128 分段解密：解密结果直接写入预分配缓冲区，并可在独立解密线程里与抓取流水线并行。"""
+
+from __future__ import annotations
+
+import os
+from typing import Callable
+
+from app.exceptions import ExternalToolError, ExternalToolNotFoundError
+
+AES_BLOCK_BYTES = 16
+DEFAULT_DECRYPT_WORKERS = 4
+
+Aes128CbcDecryptInto = Callable[[bytes, bytes, bytes, bytearray], None]
+
+_backend: Aes128CbcDecryptInto | None = None
+
+
+def _pycryptodome_decrypt_into(data: bytes, key: bytes, iv: bytes, output: bytearray) -> None:
+    # ``Crypto`` 实际由持续维护的 PyCryptodome 提供；B413 只识别到了兼容命名空间。
+    from Crypto.Cipher import AES  # nosec B413
+
+    # ``output=`` 让 C 实现直接写入调用方缓冲区，并在运算期间释放 GIL；长度须与密文一致。
+    AES.new(key, AES.MODE_CBC, iv).decrypt(data, output=memoryview(output)[: len(data)])
+
+
+def _cryptography_decrypt_into(data: bytes, key: bytes, iv: bytes, output: bytearray) -> None:
+    from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
+
+    decryptor = Cipher(algorithms.AES(key), modes.CBC(iv)).decryptor()
+    # update_into 要求输出缓冲区多留一个分组；调用方按此分配，避免 update()+finalize() 拼接新 bytes。
+    written = decryptor.update_into(data, output)
+    decryptor.finalize()
+    if written != len(data):
+        raise ExternalToolError("AES-128 HLS segment decryption was incomplete")
+
+
+def _resolve_backend() -> Aes128CbcDecryptInto:
+    global _backend
+    if _backend is not None:
+        return _backend
+    try:
+        import Crypto.Cipher.AES  # noqa: F401  # nosec B413
+    except ImportError:
+        try:
+            import cryptography.hazmat.primitives.ciphers  # noqa: F401
+        except ImportError as exc:
+            raise ExternalToolNotFoundError("pycryptodome or cryptography is required for AES-128 HLS") from exc
+        _backend = _cryptography_decrypt_into
+    else:
+        _backend = _pycryptodome_decrypt_into
+    return _backend
+
+
+def aes_backend_available() -> bool:
+    try:
+        _resolve_backend()
+    except ExternalToolNotFoundError:
+        return False
+    return True
+
+
+def pkcs7_unpad_length(data: bytes | bytearray | memoryview) -> int:
+    """返回去掉 PKCS7 填充后的长度；填充不合法时视为生产端已按 TS 包对齐、不含填充。"""
+    size = len(data)
+    if not size:
+        return 0
+    pad = data[-1]
+    if pad < 1 or pad > AES_BLOCK_BYTES or pad > size:
+        return size
+    if any(byte != pad for byte in data[size - pad : size]):
+        return size
+    return size - pad
+
+
+def aes_128_cbc_decrypt(data: bytes, key: bytes, iv: bytes) -> bytearray:
+    """解密单个 AES-128-CBC 分段，结果就地截断填充后返回，不产生中间拷贝。"""
+    if len(data) % AES_BLOCK_BYTES:
+        raise ExternalToolError(f"AES-128 HLS segment is not block aligned ({len(data)} bytes)")
+    decrypt_into = _resolve_backend()
+    output = bytearray(len(data) + AES_BLOCK_BYTES)
+    decrypt_into(data, key, iv, output)
+    del output[len(data):]
+    del output[pkcs7_unpad_length(output):]
+    return output
+
+
+def configured_decrypt_workers() -> int:
+    """解密线程数：不超过 CPU 核数，避免与抓取线程争抢过多核心。"""
+    return max(1, min(DEFAULT_DECRYPT_WORKERS, os.cpu_count() or 1))
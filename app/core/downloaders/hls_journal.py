@@ -0,0 +1,315 @@
+"""Python HLS 回退路径的分段续传日志：记录已落盘分段在裸 TS 中的偏移、长度和摘要。"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import shutil
+import time
+from pathlib import Path
+from typing import Any, BinaryIO
+
+from app.debug_logger import debug_logger
+
+JOURNAL_VERSION = 1
+JOURNAL_FILE_NAME = "segments.journal.jsonl"
+# 超过保留期的工作目录即使日志完整也交给启动清扫删除，避免放弃的任务长期占用磁盘。
+JOURNAL_MAX_AGE_SECONDS = 7 * 24 * 3600
+FAILURE_FILE_NAME = "failures.count"
+_SWEEP_COMPONENT = "HlsWorkspaceSweep"
+
+
+def segment_digest(data: bytes | bytearray | memoryview) -> str:
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+class HlsSegmentJournal:
+    """按播放列表顺序追加的 JSONL 日志；首行是与 ``.parts.json`` 同构的身份清单。
+
+    身份清单由播放列表 URL、媒体序号和分段数组成，任何一项变化都视为不同资源并整体
+    丢弃旧进度。每条分段记录只在对应字节写入并 flush 到裸 TS 之后追加，因此日志永远
+    描述裸文件的一个连续前缀；续传时按最后一条记录截断文件并校验其摘要。
+    """
+
+    def __init__(self, workspace: Path, raw_path: Path, manifest: dict[str, Any]) -> None:
+        self.workspace = Path(workspace)
+        self.raw_path = Path(raw_path)
+        self.path = self.workspace / JOURNAL_FILE_NAME
+        self.manifest = manifest
+        self.records: list[dict[str, Any]] = []
+        self._fp: BinaryIO | None = None
+
+    @staticmethod
+    def build_manifest(playlist_url: str, playlist: Any) -> dict[str, Any]:
+        return {
+            "version": JOURNAL_VERSION,
+            "playlist_url": str(playlist_url),
+            "media_sequence": int(getattr(playlist, "media_sequence", 0) or 0),
+            "segment_count": len(getattr(playlist, "segments", None) or []),
+        }
+
+    @classmethod
+    def open(
+        cls,
+        workspace: Path,
+        raw_path: Path,
+        *,
+        playlist_url: str,
+        playlist: Any,
+        resume_enabled: bool = True,
+        trace_id: str | None = None,
+    ) -> "HlsSegmentJournal":
+        """加载可续传的旧日志；身份不匹配、摘要不符或禁用续传时从零开始。"""
+        journal = cls(workspace, raw_path, cls.build_manifest(playlist_url, playlist))
+        if resume_enabled and journal._load_matching_records():
+            debug_logger.log(
+                component="HlsSegmentJournal",
+                action="hls_resume",
+                message="Resuming Python HLS fallback from segment journal",
+                status_code="M3U8_SEGMENT_RESUME",
+                details={
+                    "workspace": str(workspace),
+                    "completed_segments": journal.completed_count,
+                    "resume_offset": journal.resume_offset,
+                    "segment_count": journal.manifest["segment_count"],
+                },
+                trace_id=trace_id,
+            )
+        else:
+            journal.records = []
+        return journal
+
+    @property
+    def completed_count(self) -> int:
+        return len(self.records)
+
+    @property
+    def resume_offset(self) -> int:
+        if not self.records:
+            return 0
+        last = self.records[-1]
+        return int(last["offset"]) + int(last["length"])
+
+    @property
+    def written_maps(self) -> set[str]:
+        return {str(record["map"]) for record in self.records if record.get("map")}
+
+    @property
+    def resumable(self) -> bool:
+        """至少落盘了一个分段时才值得保留工作目录。"""
+        return bool(self.records)
+
+    def open_output(self) -> BinaryIO:
+        """返回定位到续传偏移的裸 TS 句柄，并把日志重写为与之对应的干净前缀。"""
+        if self.records:
+            output = self.raw_path.open("r+b")
+            output.truncate(self.resume_offset)
+            output.seek(self.resume_offset)
+        else:
+            output = self.raw_path.open("wb")
+        # 旧日志尾部可能有半行或已丢弃的记录，直接追加会让后续记录在下次读取时被忽略。
+        self._fp = self.path.open("wb")
+        for entry in (self.manifest, *self.records):
+            self._append(entry)
+        return output
+
+    def record(self, index: int, offset: int, data: bytes, init_uri: str | None = None) -> None:
+        entry: dict[str, Any] = {
+            "index": int(index),
+            "offset": int(offset),
+            "length": len(data),
+            "digest": segment_digest(data),
+        }
+        if init_uri:
+            entry["map"] = str(init_uri)
+        self.records.append(entry)
+        self._append(entry)
+
+    def close(self) -> None:
+        if self._fp is not None:
+            try:
+                self._fp.close()
+            finally:
+                self._fp = None
+
+    def _append(self, entry: dict[str, Any]) -> None:
+        if self._fp is None:
+            return
+        self._fp.write(json.dumps(entry, separators=(",", ":"), ensure_ascii=True).encode("ascii") + b"\n")
+        self._fp.flush()
+
+    def _load_matching_records(self) -> bool:
+        header, records = read_journal(self.path)
+        if header != self.manifest or not records:
+            return False
+        try:
+            raw_size = self.raw_path.stat().st_size
+        except OSError:
+            return False
+        # 崩溃可能发生在“写入裸 TS 之后、追加日志之前”，因此只丢弃超出日志的尾部字节；
+        # 日志描述的最后一段必须完整且摘要一致，否则旧进度不可信。
+        while records:
+            last = records[-1]
+            end = int(last["offset"]) + int(last["length"])
+            if end <= raw_size and self._digest_at(int(last["offset"]), int(last["length"])) == last["digest"]:
+                break
+            records.pop()
+        self.records = records
+        return bool(records)
+
+    def _digest_at(self, offset: int, length: int) -> str | None:
+        try:
+            with self.raw_path.open("rb") as fp:
+                fp.seek(offset)
+                data = fp.read(length)
+        except OSError:
+            return None
+        return segment_digest(data) if len(data) == length else None
+
+
+def read_journal(path: Path) -> tuple[dict[str, Any] | None, list[dict[str, Any]]]:
+    """读取日志首行身份和连续分段记录；半行或不连续记录之后的内容全部忽略。"""
+    try:
+        with Path(path).open("rb") as fp:
+            lines = fp.read().splitlines()
+    except OSError:
+        return None, []
+    if not lines:
+        return None, []
+    try:
+        header = json.loads(lines[0])
+    except (TypeError, ValueError):
+        return None, []
+    if not isinstance(header, dict) or header.get("version") != JOURNAL_VERSION:
+        return None, []
+    records: list[dict[str, Any]] = []
+    expected_offset = None
+    for line in lines[1:]:
+        try:
+            entry = json.loads(line)
+            index = int(entry["index"])
+            offset = int(entry["offset"])
+            length = int(entry["length"])
+            str(entry["digest"])
+        except (KeyError, TypeError, ValueError):
+            break
+        if index != len(records) or length < 0 or (expected_offset is not None and offset < expected_offset):
+            break
+        records.append(entry)
+        expected_offset = offset + length
+    return header, records
+
+
+def is_resumable_workspace(workspace: str | os.PathLike[str], *, now: float | None = None) -> bool:
+    """启动清扫用的轻量检查：日志首行有效、至少一段已落盘、裸文件够长且未过保留期。
+
+    这里不读取媒体数据计算摘要，启动清扫有时间预算；完整的尾段校验在任务续传时进行。
+    """
+    path = Path(workspace)
+    journal_path = path / JOURNAL_FILE_NAME
+    try:
+        modified_at = journal_path.stat().st_mtime
+    except OSError:
+        return False
+    if (now if now is not None else time.time()) - modified_at > JOURNAL_MAX_AGE_SECONDS:
+        return False
+    header, records = read_journal(journal_path)
+    if header is None or not records:
+        return False
+    resume_offset = int(records[-1]["offset"]) + int(records[-1]["length"])
+    try:
+        raw_sizes = [child.stat().st_size for child in path.iterdir() if child.suffix.lower() == ".ts"]
+    except OSError:
+        return False
+    return any(size >= resume_offset for size in raw_sizes)
+
+
+def record_workspace_failure(workspace: str | os.PathLike[str], *, max_failures: int) -> bool:
+    """为一次非停止的失败计数；次数仍在 ``max_failures`` 以内返回 True，工作目录留给下次重试续传。
+
+    计数写在工作目录里，跨重启累计；任务成功或目录被删除时随之清零。
+    """
+    path = Path(workspace) / FAILURE_FILE_NAME
+    try:
+        failures = int(path.read_text(encoding="ascii").strip() or 0) + 1
+    except (OSError, ValueError):
+        failures = 1
+    if failures > max_failures:
+        return False
+    try:
+        path.write_text(str(failures), encoding="ascii")
+    except OSError:
+        return False
+    return True
+
+
+def sweep_orphaned_hls_workspaces(download_dirs: list[str | os.PathLike[str]], *, temp_root_name: str) -> int:
+    """清理统一临时根目录和目标目录下遗留的 *_hls 工作目录；仍可续传的 curl_cffi 目录保留。"""
+    cleaned_count = 0
+    kept_count = 0
+    errors: list[dict[str, str]] = []
+
+    for raw_dir in download_dirs:
+        try:
+            base_dir = Path(raw_dir).expanduser()
+        except (OSError, RuntimeError, TypeError, ValueError) as exc:
+            errors.append({"path": str(raw_dir), "error": str(exc)})
+            debug_logger.log_exception(
+                _SWEEP_COMPONENT,
+                "orphan_workspace_sweep_path_error",
+                exc,
+                details={"path": str(raw_dir)},
+            )
+            continue
+
+        try:
+            if not base_dir.exists() or not base_dir.is_dir():
+                continue
+            # 既扫统一根目录，也扫旧版回退路径（fallback）留在目标目录下的 *_hls 目录。
+            candidates = [base_dir / temp_root_name]
+            candidates.extend(
+                child
+                for child in base_dir.iterdir()
+                if child.is_dir()
+                and (child.name.endswith("_curl_cffi_hls") or child.name.endswith("_playwright_hls"))
+            )
+        except OSError as exc:
+            errors.append({"path": str(base_dir), "error": str(exc)})
+            debug_logger.log_exception(
+                _SWEEP_COMPONENT,
+                "orphan_workspace_sweep_scan_error",
+                exc,
+                details={"path": str(base_dir)},
+            )
+            continue
+
+        for path in candidates:
+            try:
+                if not path.exists() or not path.is_dir():
+                    continue
+                if path.name.endswith("_curl_cffi_hls") and is_resumable_workspace(path):
+                    kept_count += 1
+                    continue
+                shutil.rmtree(path, ignore_errors=True)
+                if path.exists():
+                    errors.append({"path": str(path), "error": "directory still exists after cleanup"})
+                    continue
+                cleaned_count += 1
+            except OSError as exc:
+                errors.append({"path": str(path), "error": str(exc)})
+                debug_logger.log_exception(
+                    _SWEEP_COMPONENT,
+                    "orphan_workspace_sweep_remove_error",
+                    exc,
+                    details={"path": str(path)},
+                )
+
+    debug_logger.log(
+        component=_SWEEP_COMPONENT,
+        action="orphan_workspace_sweep",
+        message="Swept stale HLS workspaces at application startup",
+        status_code="M3U8_TMP_SWEEP",
+        details={"cleaned_count": cleaned_count, "kept_resumable_count": kept_count, "errors": errors},
+    )
+    return cleaned_count
@@ -2,24 +2,32 @@
 
 from __future__ import annotations
 
+import asyncio
 import base64
 import binascii
+import concurrent.futures
+import contextlib
+import email.utils
 import hashlib
 import hmac
+import http.client
 import http.server
+import io
 import re
 import secrets
-import socketserver
 import threading
 import time
 import urllib.parse
 from collections.abc import Callable
+from collections import OrderedDict
 from dataclasses import dataclass, field
 from typing import TYPE_CHECKING, Any
 
 from app.debug_logger import debug_logger
 from app.exceptions import ExternalToolError
 from shared.network.pinned_transport import (
+    PinnedSessionPool,
+    PinnedStreamResponse,
     canonicalize_request_target,
     curl_resolve_options as _pinned_curl_resolve_options,
 )
@@ -39,6 +47,10 @@ _MAX_PLAYLIST_LINES = 50_000
 _MAX_TASK_MEMBERS = 50_000
 _MAX_PLAYLIST_DEPTH = 16
 _CLIENT_SOCKET_TIMEOUT_SECONDS = 10.0
+_REQUEST_SLOTS = 16
+_UPSTREAM_CONNECTIONS_PER_ORIGIN = 16
+_UPSTREAM_SLOT_WAIT_SECONDS = 60.0
+_SEGMENT_CACHE_WAIT_SECONDS = 30.0
 _URI_ATTRIBUTE = re.compile(r'(?<![A-Z0-9-])URI=(["\'])(.*?)\1', re.IGNORECASE)
 _UNQUOTED_URI_ATTRIBUTE = re.compile(r'(?<![A-Z0-9-])URI\s*=', re.IGNORECASE)
 _SIGNATURE = re.compile(r"[0-9a-f]{64}\Z")
@@ -114,7 +126,17 @@ def response_content_bytes(response) -> bytes:
     return b"".join(chunks)
 
 
+def response_preview_bytes(response, size: int = 4096) -> bytes:
+    """读取响应开头用于类型嗅探；流式响应只预读前缀，不把整段主体读入内存。"""
+    if isinstance(response, PinnedStreamResponse):
+        return response.peek(size)
+    return bytes(getattr(response, "content", b"") or b"")[:size]
+
+
 def response_iter_bytes(response, chunk_size: int = 256 * 1024):
+    if isinstance(response, PinnedStreamResponse):
+        yield from response.iter_content(chunk_size)
+        return
     content = getattr(response, "content", None)
     if content:
         payload = bytes(content)
@@ -186,64 +208,406 @@ def rewrite_hls_attribute_uris(line: str, base_url: str, local_url_for) -> str:
     return _URI_ATTRIBUTE.sub(replace_uri, line)
 
 
-class _ThreadingHlsProxyServer(socketserver.ThreadingMixIn, http.server.HTTPServer):
-    daemon_threads = True
-    allow_reuse_address = True
-    request_queue_size = 32
+@dataclass(frozen=True, slots=True)
+class _CachedHlsResource:
+    status: int
+    headers: tuple[tuple[str, str], ...]
+    body: bytes
+    url: str
+    redirect_chain: tuple[str, ...]
+    stored_at: float
 
-    def process_request(self, request: Any, client_address: Any) -> None:
-        owner = getattr(self, "owner", None)
-        if owner is None or not owner.acquire_request_slot():
-            self.shutdown_request(request)
-            return
-        try:
-            request.settimeout(_CLIENT_SOCKET_TIMEOUT_SECONDS)
-            super().process_request(request, client_address)
-        except Exception:
-            owner.release_request_slot()
-            self.shutdown_request(request)
-            raise
 
-    def process_request_thread(self, request: Any, client_address: Any) -> None:
+class _HlsSegmentCache:
+    """进程内共享的小型分片缓存，让同一条流的预览与下载不重复拉取同一资源。
+
+    键由上游 URL、实际发出的上游请求头和上游代理共同决定，凭据不同的请求互不命中；
+    同一键同时只允许一个请求回源，其余请求等待其结果（single-flight）。
+    """
+
+    def __init__(
+        self,
+        *,
+        max_bytes: int = 64 * 1024 * 1024,
+        max_entry_bytes: int = 8 * 1024 * 1024,
+        ttl_seconds: float = 120.0,
+        clock: Callable[[], float] | None = None,
+    ) -> None:
+        self.max_bytes = int(max_bytes)
+        self.max_entry_bytes = int(max_entry_bytes)
+        self._ttl_seconds = float(ttl_seconds)
+        self._clock = clock or time.monotonic
+        self._condition = threading.Condition()
+        self._entries: OrderedDict[str, _CachedHlsResource] = OrderedDict()
+        self._inflight: set[str] = set()
+        self._bytes = 0
+        self._hits = 0
+        self._misses = 0
+        self._waits = 0
+
+    @staticmethod
+    def key(upstream_url: str, headers: dict[str, str], upstream_proxy: str | None) -> str:
+        digest = hashlib.sha256()
+        for part in (upstream_url, str(upstream_proxy or "")):
+            digest.update(part.encode("utf-8") + b"\0")
+        for name, value in sorted((str(key).lower(), str(value)) for key, value in headers.items()):
+            digest.update(f"{name}:{value}".encode("utf-8") + b"\0")
+        return digest.hexdigest()
+
+    def _fresh(self, key: str) -> _CachedHlsResource | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if float(self._clock()) - entry.stored_at > self._ttl_seconds:
+            self._drop(key)
+            return None
+        self._entries.move_to_end(key)
+        return entry
+
+    def _drop(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._bytes -= len(entry.body)
+
+    def acquire(self, key: str, *, wait_seconds: float) -> tuple[_CachedHlsResource | None, bool]:
+        """返回 (缓存条目, 是否由调用方回源)；回源方必须随后调用 ``complete``。"""
+        deadline = float(self._clock()) + max(0.0, wait_seconds)
+        with self._condition:
+            waited = False
+            while True:
+                entry = self._fresh(key)
+                if entry is not None:
+                    self._hits += 1
+                    return entry, False
+                if key not in self._inflight:
+                    self._inflight.add(key)
+                    self._misses += 1
+                    return None, True
+                remaining = deadline - float(self._clock())
+                if remaining <= 0:
+                    self._misses += 1
+                    return None, False
+                if not waited:
+                    self._waits += 1
+                    waited = True
+                self._condition.wait(remaining)
+
+    def complete(self, key: str, entry: _CachedHlsResource | None) -> None:
+        with self._condition:
+            self._inflight.discard(key)
+            if entry is not None and len(entry.body) <= self.max_entry_bytes:
+                self._drop(key)
+                self._entries[key] = entry
+                self._bytes += len(entry.body)
+                while self._bytes > self.max_bytes and self._entries:
+                    self._drop(next(iter(self._entries)))
+            self._condition.notify_all()
+
+    def clear(self) -> None:
+        with self._condition:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> dict[str, int]:
+        with self._condition:
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "inflight": len(self._inflight),
+                "hits": self._hits,
+                "misses": self._misses,
+                "waits": self._waits,
+            }
+
+
+class _HlsUpstreamSlots:
+    """按上游源站限制同时在用的连接数；预览与下载共享同一额度。"""
+
+    def __init__(self, per_origin: int) -> None:
+        self._per_origin = max(1, int(per_origin))
+        self._lock = threading.Lock()
+        self._slots: dict[tuple[str, str, int], threading.BoundedSemaphore] = {}
+
+    @contextlib.contextmanager
+    def hold(self, origin: tuple[str, str, int], timeout: float):
+        with self._lock:
+            slots = self._slots.setdefault(origin, threading.BoundedSemaphore(self._per_origin))
+        if not slots.acquire(timeout=timeout):
+            raise ExternalToolError("local HLS proxy upstream connection limit reached")
         try:
-            super().process_request_thread(request, client_address)
+            yield
         finally:
-            owner = getattr(self, "owner", None)
-            if owner is not None:
-                owner.release_request_slot()
+            slots.release()
+
 
+class _HlsUpstreamSessions:
+    """未走固定解析的上游请求（显式上游代理或未启用访问策略）按源站与代理复用 curl 会话。
 
-class _HlsProxyHandler(http.server.BaseHTTPRequestHandler):
-    server: _ThreadingHlsProxyServer
-    server_version = "UniversalCrawlerHLS"
-    sys_version = ""
+    会话一次只租给一个请求；归还时清空 Cookie，请求头仍由每次调用单独传入。
+    """
 
-    def do_GET(self) -> None:
-        owner = getattr(self.server, "owner", None)
-        if owner is None:
-            self.send_error(500)
+    def __init__(self, per_key: int, *, max_keys: int = 64) -> None:
+        self._per_key = max(0, int(per_key))
+        self._max_keys = max(1, int(max_keys))
+        self._lock = threading.Lock()
+        self._idle: OrderedDict[tuple[Any, ...], list[Any]] = OrderedDict()
+
+    @contextlib.contextmanager
+    def lease(self, curl_requests: Any, url: str, proxy: str | None):
+        factory = getattr(curl_requests, "Session", None)
+        if not callable(factory):
+            yield curl_requests
             return
-        upstream_url = owner.verify_path(self.path)
-        if upstream_url is None:
-            self.send_error(403)
+        target = canonicalize_request_target(url)
+        key = (target.scheme, target.host, target.port, proxy or "")
+        with self._lock:
+            idle = self._idle.get(key)
+            session = idle.pop() if idle else None
+        if session is None:
+            session = factory(impersonate="chrome", use_thread_local_curl=False)
+        reusable = False
+        try:
+            yield session
+            reusable = True
+        finally:
+            self._release(key, session, reusable)
+
+    def _release(self, key: tuple[Any, ...], session: Any, reusable: bool) -> None:
+        evicted: list[Any] = []
+        if reusable:
+            with contextlib.suppress(Exception):
+                session.cookies.clear()
+        with self._lock:
+            idle = self._idle.setdefault(key, [])
+            self._idle.move_to_end(key)
+            if reusable and len(idle) < self._per_key:
+                idle.append(session)
+            else:
+                evicted.append(session)
+            if not idle:
+                del self._idle[key]
+            while len(self._idle) > self._max_keys:
+                _old_key, stale = self._idle.popitem(last=False)
+                evicted.extend(stale)
+        for stale_session in evicted:
+            with contextlib.suppress(Exception):
+                stale_session.close()
+
+    def idle_count(self) -> int:
+        with self._lock:
+            return sum(len(idle) for idle in self._idle.values())
+
+
+hls_segment_cache = _HlsSegmentCache()
+_upstream_slots = _HlsUpstreamSlots(_UPSTREAM_CONNECTIONS_PER_ORIGIN)
+# 空闲会话数与每源站并发上限一致：N_m3u8DL-RE 满额并发时每个请求都能复用已建立的连接。
+hls_pinned_session_pool = PinnedSessionPool(max_idle_per_key=_UPSTREAM_CONNECTIONS_PER_ORIGIN)
+hls_upstream_sessions = _HlsUpstreamSessions(_UPSTREAM_CONNECTIONS_PER_ORIGIN)
+
+
+class _HlsClientDisconnected(ConnectionError):
+    """本地客户端已断开，或在写超时内一直没有读取。"""
+
+
+class _AsyncHlsResponseWriter:
+    """在工作线程中以 BaseHTTPRequestHandler 的接口写回客户端。
+
+    每次写入都等待事件循环把数据排空到 socket，慢客户端会直接反压上游读取。
+    """
+
+    def __init__(
+        self,
+        loop: asyncio.AbstractEventLoop,
+        writer: asyncio.StreamWriter,
+        headers: Any,
+    ) -> None:
+        self.headers = headers
+        self.wfile = self
+        self.headers_sent = False
+        self._loop = loop
+        self._writer = writer
+        self._head = bytearray()
+
+    def send_response(self, code: int, message: str | None = None) -> None:
+        try:
+            phrase = message or http.HTTPStatus(code).phrase
+        except ValueError:
+            phrase = ""
+        self._head += f"HTTP/1.0 {int(code)} {phrase}\r\n".encode("latin-1")
+        self.send_header("Server", "UniversalCrawlerHLS")
+        self.send_header("Date", email.utils.formatdate(usegmt=True))
+
+    def send_header(self, name: str, value: str) -> None:
+        self._head += f"{name}: {value}\r\n".encode("latin-1")
+
+    def end_headers(self) -> None:
+        head = bytes(self._head) + b"\r\n"
+        self._head.clear()
+        self.headers_sent = True
+        self.write(head)
+
+    def send_error(self, code: int) -> None:
+        if self.headers_sent:
             return
+        self.headers_sent = True
+        self.write(self.error_response(code))
+
+    @staticmethod
+    def error_response(code: int) -> bytes:
+        """完整的纯文本错误响应；事件循环线程上也能直接写出。"""
+        phrase = http.HTTPStatus(code).phrase
+        body = f"{int(code)} {phrase}\n".encode("ascii")
+        head = (
+            f"HTTP/1.0 {int(code)} {phrase}\r\n"
+            "Server: UniversalCrawlerHLS\r\n"
+            f"Date: {email.utils.formatdate(usegmt=True)}\r\n"
+            "Content-Type: text/plain; charset=utf-8\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            "Connection: close\r\n\r\n"
+        )
+        return head.encode("latin-1") + body
+
+    def write(self, data: bytes) -> int:
+        async def send() -> None:
+            self._writer.write(data)
+            await self._writer.drain()
+
         try:
-            owner.serve(self, upstream_url)
-        except HlsClientRequestError:
-            self.send_error(400)
-        except Exception as exc:
-            debug_logger.log_exception(
-                "N_m3u8DL_RE_Downloader",
-                "local_hls_proxy_error",
-                _diagnostic_exception(exc),
-                context={"task_id": owner.capability.task_id},
-            )
-            self.send_error(502)
+            asyncio.run_coroutine_threadsafe(send(), self._loop).result(_CLIENT_SOCKET_TIMEOUT_SECONDS)
+        except (ConnectionError, concurrent.futures.TimeoutError) as exc:
+            raise _HlsClientDisconnected(type(exc).__name__) from exc
+        return len(data)
 
-    def log_message(self, _format: str, *args: Any) -> None:
+    def flush(self) -> None:
         return
 
 
+class _AsyncHlsProxyServer:
+    """单个事件循环线程承接全部本地连接。
+
+    准入仍走 ``acquire_request_slot``：连接建立时占用名额，请求结束或客户端断开后归还；
+    上游读取在有界线程池中执行并复用线程，不再为每个请求新建 OS 线程。
+    """
+
+    def __init__(self, owner: "_LocalHlsProxy", address: tuple[str, int], *, workers: int) -> None:
+        self.owner = owner
+        self._loop = asyncio.new_event_loop()
+        self._executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=max(1, int(workers)),
+            thread_name_prefix="ucp-hls-upstream",
+        )
+        self._connections: set[asyncio.Task[Any]] = set()
+        self._stopped = threading.Event()
+        try:
+            self._server = self._loop.run_until_complete(
+                asyncio.start_server(self._handle_connection, address[0], address[1], backlog=32)
+            )
+        except BaseException:
+            self._executor.shutdown(wait=False)
+            self._loop.close()
+            raise
+        self.server_address = self._server.sockets[0].getsockname()
+
+    def serve_forever(self) -> None:
+        asyncio.set_event_loop(self._loop)
+        try:
+            self._loop.run_forever()
+        finally:
+            self._stopped.set()
+
+    async def _close(self) -> None:
+        self._server.close()
+        for task in list(self._connections):
+            task.cancel()
+        await asyncio.gather(*self._connections, return_exceptions=True)
+        self._loop.stop()
+
+    def shutdown(self) -> None:
+        if self._loop.is_closed():
+            return
+        asyncio.run_coroutine_threadsafe(self._close(), self._loop)
+        self._stopped.wait(timeout=2)
+
+    def server_close(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        self._server.close()
+        if self._stopped.is_set() and not self._loop.is_closed():
+            self._loop.close()
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        owner = self.owner
+        admitted = owner.acquire_request_slot()
+        task = asyncio.current_task()
+        if task is not None:
+            self._connections.add(task)
+        try:
+            if not admitted:
+                await self._reject_busy(reader, writer)
+                return
+            try:
+                head = await asyncio.wait_for(
+                    reader.readuntil(b"\r\n\r\n"),
+                    _CLIENT_SOCKET_TIMEOUT_SECONDS,
+                )
+            except (asyncio.TimeoutError, asyncio.IncompleteReadError, asyncio.LimitOverrunError, OSError):
+                return
+            request_line, _separator, header_block = head.partition(b"\r\n")
+            parts = request_line.decode("latin-1").split()
+            headers = http.client.parse_headers(io.BytesIO(header_block))
+            response = _AsyncHlsResponseWriter(self._loop, writer, headers)
+            await self._loop.run_in_executor(self._executor, self._dispatch, parts, response)
+        except (asyncio.CancelledError, RuntimeError, OSError):
+            return
+        finally:
+            if admitted:
+                owner.release_request_slot()
+            if task is not None:
+                self._connections.discard(task)
+            writer.close()
+            with contextlib.suppress(Exception):
+                await writer.wait_closed()
+
+    @staticmethod
+    async def _reject_busy(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """名额已满时读完请求头再回 503，播放器会按普通错误重试，而不是当作连接被重置。"""
+        with contextlib.suppress(asyncio.TimeoutError, asyncio.IncompleteReadError, asyncio.LimitOverrunError, OSError):
+            await asyncio.wait_for(reader.readuntil(b"\r\n\r\n"), _CLIENT_SOCKET_TIMEOUT_SECONDS)
+            writer.write(_AsyncHlsResponseWriter.error_response(503))
+            await asyncio.wait_for(writer.drain(), _CLIENT_SOCKET_TIMEOUT_SECONDS)
+
+    def _dispatch(self, request_parts: list[str], response: _AsyncHlsResponseWriter) -> None:
+        owner = self.owner
+        try:
+            if len(request_parts) != 3 or not request_parts[2].startswith("HTTP/"):
+                response.send_error(400)
+                return
+            if request_parts[0] != "GET":
+                response.send_error(501)
+                return
+            upstream_url = owner.verify_path(request_parts[1])
+            if upstream_url is None:
+                response.send_error(403)
+                return
+            try:
+                owner.serve(response, upstream_url)
+            except HlsClientRequestError:
+                response.send_error(400)
+            except _HlsClientDisconnected:
+                # 播放器拖动或关闭时主动断开是常态，不是上游故障。
+                return
+            except Exception as exc:
+                debug_logger.log_exception(
+                    "N_m3u8DL_RE_Downloader",
+                    "local_hls_proxy_error",
+                    _diagnostic_exception(exc),
+                    context={"task_id": owner.capability.task_id},
+                )
+                response.send_error(502)
+        except (concurrent.futures.TimeoutError, RuntimeError, OSError):
+            # 客户端已断开或事件循环已停止，写回失败无需再上报。
+            return
+
+
 class _LocalHlsProxy:
     """把本地 HTTP 服务绑定到 loopback，并代理调用方编码进本地 URL 的上游地址。
 
@@ -283,7 +647,7 @@ class _LocalHlsProxy:
         self._monotonic_deadline = float(self._monotonic_clock()) + max(
             0.0, self.capability.expires_at - now
         )
-        self.server: _ThreadingHlsProxyServer | None = None
+        self.server: _AsyncHlsProxyServer | None = None
         self.thread: threading.Thread | None = None
         self.base_url = ""
         self.url = ""
@@ -294,7 +658,7 @@ class _LocalHlsProxy:
         }
         self._revoked = False
         self._credential_origin = self._url_origin(self.root_url)
-        self._request_slots = threading.BoundedSemaphore(16)
+        self._request_slots = threading.BoundedSemaphore(_REQUEST_SLOTS)
         self._completed_members: set[str] = set()
         self._segment_total = 0
         self._segment_completed = 0
@@ -306,8 +670,7 @@ class _LocalHlsProxy:
                 raise HlsCapabilityError("local HLS capability is revoked")
             if self.server is not None:
                 return self
-            server = _ThreadingHlsProxyServer(("127.0.0.1", 0), _HlsProxyHandler)
-            server.owner = self  # type: ignore[attr-defined]
+            server = _AsyncHlsProxyServer(self, ("127.0.0.1", 0), workers=_REQUEST_SLOTS)
             host, port = server.server_address[:2]
             host_text = host.decode("ascii") if isinstance(host, bytes) else str(host)
             self.base_url = f"http://{host_text}:{port}"
@@ -704,6 +1067,35 @@ class _LocalHlsProxy:
                     upstream_headers[header_name] = self._validate_forwarded_header(
                         header_name, header_value
                     )
+        cache_key = ""
+        if requested_member.kind != "playlist" and not looks_like_hls_playlist_url(requested_url, ""):
+            cache_key = hls_segment_cache.key(requested_url, upstream_headers, self.upstream_proxy)
+            cached, owns_fetch = hls_segment_cache.acquire(
+                cache_key,
+                wait_seconds=_SEGMENT_CACHE_WAIT_SECONDS,
+            )
+            if cached is not None:
+                self._serve_cached(handler, requested_url, cached)
+                return
+            if not owns_fetch:
+                cache_key = ""
+        entry: _CachedHlsResource | None = None
+        try:
+            with _upstream_slots.hold(self._url_origin(requested_url), _UPSTREAM_SLOT_WAIT_SECONDS):
+                entry = self._serve_upstream(handler, requested_member, upstream_headers, cacheable=bool(cache_key))
+        finally:
+            if cache_key:
+                hls_segment_cache.complete(cache_key, entry)
+
+    def _serve_upstream(
+        self,
+        handler: http.server.BaseHTTPRequestHandler,
+        requested_member: _HlsMember,
+        upstream_headers: dict[str, str],
+        *,
+        cacheable: bool,
+    ) -> _CachedHlsResource | None:
+        requested_url = requested_member.url
         response = self.downloader._hls_proxy_open_upstream(
             requested_url,
             upstream_headers,
@@ -718,7 +1110,7 @@ class _LocalHlsProxy:
                 for key, value in (getattr(response, "headers", {}) or {}).items()
             }
             content_type = response_headers.get("content-type", "")
-            body_preview = bytes(getattr(response, "content", b"") or b"")[:4096]
+            body_preview = response_preview_bytes(response)
             is_playlist = requested_member.kind == "playlist" or looks_like_hls_playlist(
                 resolved_url,
                 content_type,
@@ -734,10 +1126,9 @@ class _LocalHlsProxy:
                 handler.send_header("Content-Length", str(len(payload)))
                 handler.end_headers()
                 handler.wfile.write(payload)
-                return
+                return None
 
-            handler.send_response(status)
-            handler.send_header("Content-Type", content_type or "application/octet-stream")
+            forwarded_headers = [("Content-Type", content_type or "application/octet-stream")]
             for header_name in (
                 "Content-Length",
                 "Content-Range",
@@ -748,9 +1139,24 @@ class _LocalHlsProxy:
             ):
                 header_value = response_headers.get(header_name.lower(), "").strip()
                 if header_value:
-                    handler.send_header(header_name, header_value)
+                    forwarded_headers.append((header_name, header_value))
+            handler.send_response(status)
+            for header_name, header_value in forwarded_headers:
+                handler.send_header(header_name, header_value)
             handler.end_headers()
-            self._stream_response_body(handler, resolved_url, response)
+            capture = cacheable and status in (200, 206) and self._cacheable_length(response_headers)
+            body = self._stream_response_body(handler, resolved_url, response, capture=capture)
+            # 上游提前断流时不能入缓存：之后的命中会在原 Content-Length 下发出短主体。
+            if body is None or len(body) != int(response_headers["content-length"]):
+                return None
+            return _CachedHlsResource(
+                status=status,
+                headers=tuple(forwarded_headers),
+                body=body,
+                url=resolved_url,
+                redirect_chain=tuple(getattr(response, "redirect_chain", ()) or ()),
+                stored_at=time.monotonic(),
+            )
         finally:
             close = getattr(response, "close", None)
             if callable(close):
@@ -764,6 +1170,29 @@ class _LocalHlsProxy:
                         details={"task_id": self.capability.task_id},
                     )
 
+    @staticmethod
+    def _cacheable_length(response_headers: dict[str, str]) -> bool:
+        try:
+            length = int(response_headers.get("content-length", ""))
+        except ValueError:
+            return False
+        return 0 < length <= hls_segment_cache.max_entry_bytes
+
+    def _serve_cached(
+        self,
+        handler: http.server.BaseHTTPRequestHandler,
+        requested_url: str,
+        cached: _CachedHlsResource,
+    ) -> None:
+        # 缓存命中同样要把重定向链登记为本任务成员，授权边界与回源时一致。
+        resolved_url = self._authorize_redirect_metadata(requested_url, cached.url, cached.redirect_chain)
+        handler.send_response(cached.status)
+        for header_name, header_value in cached.headers:
+            handler.send_header(header_name, header_value)
+        handler.end_headers()
+        handler.wfile.write(cached.body)
+        self._record_resource(resolved_url, len(cached.body))
+
     @staticmethod
     def _validate_forwarded_header(name: str, value: str) -> str:
         if len(value) > 256 or "\r" in value or "\n" in value:
@@ -787,12 +1216,20 @@ class _LocalHlsProxy:
         handler: http.server.BaseHTTPRequestHandler,
         upstream_url: str,
         response,
-    ) -> None:
+        *,
+        capture: bool = False,
+    ) -> bytes | None:
+        """边读边写回客户端；capture=True 时同时保留完整主体供分片缓存使用。"""
         completed = False
+        captured = bytearray() if capture else None
         for chunk in response_iter_bytes(response):
             if not chunk:
                 continue
             handler.wfile.write(chunk)
+            if captured is not None:
+                captured.extend(chunk)
+                if len(captured) > hls_segment_cache.max_entry_bytes:
+                    captured = None
             try:
                 handler.wfile.flush()
             except (BrokenPipeError, OSError, RuntimeError) as exc:
@@ -806,6 +1243,7 @@ class _LocalHlsProxy:
             completed = True
         if completed:
             self._record_resource_complete(upstream_url)
+        return bytes(captured) if completed and captured is not None else None
 
     def _record_playlist_progress(self, playlist_text: str) -> None:
         segment_total = count_hls_media_entries(playlist_text)
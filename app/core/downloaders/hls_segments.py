@@ -0,0 +1,241 @@
+"""HLS Python 回退路径的分段写入：有界并发抓取 + 按播放列表顺序落盘的重排缓冲。"""
+
+from __future__ import annotations
+
+import threading
+from concurrent.futures import Future, InvalidStateError, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from functools import partial
+from typing import Any, BinaryIO, Callable, Sequence
+
+from app.config import cfg
+from app.exceptions import DownloaderStoppedError
+
+from .base import StopCheck, TransferRateLimiter
+from .hls_journal import HlsSegmentJournal
+
+FetchBytes = Callable[[str], bytes]
+# asyncio 引擎下提交一次分段抓取，返回可 result(timeout)/cancel 的句柄。
+SubmitFetch = Callable[[str], Any]
+SegmentDecoder = Callable[[Any, bytes], bytes]
+SegmentWrittenCallback = Callable[[int, int], None]
+
+DEFAULT_SEGMENT_WORKERS = 8
+DEFAULT_INFLIGHT_LIMIT_MB = 64
+# 尚未观测到真实分段大小时，按常见 2 MiB TS 分段估算在途内存。
+INITIAL_SEGMENT_ESTIMATE_BYTES = 2 * 1024 * 1024
+RESULT_POLL_SECONDS = 0.1
+
+
+def configured_segment_workers() -> int:
+    """读取 Python HLS 回退路径的并发分段数，非法值回退默认值。"""
+    try:
+        value = int(cfg.get("download", "hls_segment_workers", DEFAULT_SEGMENT_WORKERS))
+    except (TypeError, ValueError):
+        value = DEFAULT_SEGMENT_WORKERS
+    return max(1, min(value, 32))
+
+
+def configured_inflight_limit_bytes() -> int:
+    """读取已抓取未落盘分段的内存上限（MiB 配置换算为字节）。"""
+    try:
+        value = int(cfg.get("download", "hls_inflight_limit_mb", DEFAULT_INFLIGHT_LIMIT_MB))
+    except (TypeError, ValueError):
+        value = DEFAULT_INFLIGHT_LIMIT_MB
+    return max(8, min(value, 1024)) * 1024 * 1024
+
+
+class HlsSegmentWriter:
+    """并发抓取 HLS 分段，但始终在调用线程按播放列表顺序解密、写入和限速。
+
+    抓取线程只负责网络 I/O；解密、fMP4 初始化段去重、限速和进度都留在写入线程，
+    因此 key 缓存和输出文件不需要额外加锁。``max_workers=1`` 时完全在调用线程内串行
+    执行，供 Playwright 这类只能在创建线程使用的抓取函数复用同一写入逻辑。
+    传入 ``submit_fetch`` 时预取窗口里的分段改由事件循环上的协程抓取，不再创建线程池。
+    ``decode_workers`` 大于 0 时（例如 AES-128 加密流）每个分段抓取完成后立即交给解密线程，
+    解密与后续分段的抓取、写入流水线并行；写入线程只按顺序落盘已解密的数据。
+    """
+
+    def __init__(
+        self,
+        *,
+        fetch_bytes: FetchBytes,
+        decode_segment: SegmentDecoder,
+        rate_limiter: TransferRateLimiter,
+        check_stop_func: StopCheck,
+        max_workers: int = DEFAULT_SEGMENT_WORKERS,
+        max_inflight_bytes: int = DEFAULT_INFLIGHT_LIMIT_MB * 1024 * 1024,
+        journal: HlsSegmentJournal | None = None,
+        submit_fetch: SubmitFetch | None = None,
+        decode_workers: int = 0,
+    ) -> None:
+        self._fetch_bytes = fetch_bytes
+        self._submit_fetch = submit_fetch
+        self._decode_segment = decode_segment
+        self.decode_workers = max(0, int(decode_workers))
+        self._rate_limiter = rate_limiter
+        self._check_stop_func = check_stop_func
+        self.max_workers = max(1, int(max_workers))
+        self.max_inflight_bytes = max(1, int(max_inflight_bytes))
+        self._journal = journal
+        # 续传时从日志恢复已写字节和 MAP 初始化段，保证跳过的前缀与新写入部分衔接一致。
+        self.bytes_written = journal.resume_offset if journal is not None else 0
+        self._written_maps: set[str] = journal.written_maps if journal is not None else set()
+        self._fetched_segments = 0
+        self._fetched_bytes = 0
+        self._stop_event = threading.Event()
+
+    def write(
+        self,
+        segments: Sequence[Any],
+        output: BinaryIO,
+        on_segment_written: SegmentWrittenCallback | None = None,
+    ) -> int:
+        """写入日志尚未覆盖的分段并返回累计字节数；回调参数为 (1 起始序号, 累计字节)。"""
+        first_index = self._journal.completed_count if self._journal is not None else 0
+        if self.max_workers <= 1 or len(segments) - first_index <= 1:
+            for index in range(first_index, len(segments)):
+                self._raise_if_stopped()
+                segment_bytes = self._fetch_bytes(segments[index].absolute_uri)
+                self._write_segment(index, segments[index], segment_bytes, output)
+                if on_segment_written is not None:
+                    on_segment_written(index + 1, self.bytes_written)
+            return self.bytes_written
+
+        executor: ThreadPoolExecutor | None = None
+        submit = self._submit_fetch
+        if submit is None:
+            executor = ThreadPoolExecutor(
+                max_workers=min(self.max_workers, len(segments) - first_index),
+                thread_name_prefix="hls-segment",
+            )
+            submit = partial(executor.submit, self._fetch_segment)
+        decoder: ThreadPoolExecutor | None = None
+        if self.decode_workers:
+            decoder = ThreadPoolExecutor(max_workers=self.decode_workers, thread_name_prefix="hls-decode")
+        pending: dict[int, Future[bytes]] = {}
+        next_submit = first_index
+        try:
+            for write_index in range(first_index, len(segments)):
+                # 只向前预取有限窗口：按已观测的平均分段大小折算在途字节，超过预算就先落盘。
+                while next_submit < len(segments) and (
+                    next_submit == write_index or len(pending) < self._pending_limit()
+                ):
+                    fetched = submit(segments[next_submit].absolute_uri)
+                    if decoder is not None:
+                        fetched = self._chain_decode(fetched, segments[next_submit], decoder)
+                    pending[next_submit] = fetched
+                    next_submit += 1
+                segment_bytes = self._wait_result(pending.pop(write_index))
+                self._write_segment(
+                    write_index,
+                    segments[write_index],
+                    segment_bytes,
+                    output,
+                    decoded=decoder is not None,
+                )
+                if on_segment_written is not None:
+                    on_segment_written(write_index + 1, self.bytes_written)
+        finally:
+            self._stop_event.set()
+            for future in pending.values():
+                future.cancel()
+            # 已在传输中的分段只能等单次请求自然结束；调用方随后才会关闭共享会话。
+            if executor is not None:
+                executor.shutdown(wait=True)
+            if decoder is not None:
+                decoder.shutdown(wait=True, cancel_futures=True)
+        return self.bytes_written
+
+    def _chain_decode(self, fetched: Any, segment: Any, decoder: ThreadPoolExecutor) -> Future[bytes]:
+        """抓取完成后立即把原始分段交给解密线程；返回的 Future 取消时一并取消抓取。"""
+        decoded: Future[bytes] = Future()
+
+        def on_fetched(source: Any) -> None:
+            if decoded.done() or source.cancelled() or source.exception() is not None:
+                self._copy_outcome(decoded, source)
+                return
+            try:
+                stage = decoder.submit(self._decode_segment, segment, source.result())
+            except RuntimeError:  # 解密线程池已随停止关闭
+                decoded.cancel()
+                return
+            stage.add_done_callback(partial(self._copy_outcome, decoded))
+
+        decoded.add_done_callback(lambda future: fetched.cancel() if future.cancelled() else None)
+        fetched.add_done_callback(on_fetched)
+        return decoded
+
+    @staticmethod
+    def _copy_outcome(target: Future[bytes], source: Any) -> None:
+        try:
+            if source.cancelled():
+                target.cancel()
+            elif source.exception() is not None:
+                target.set_exception(source.exception())
+            else:
+                target.set_result(source.result())
+        except InvalidStateError:
+            # 写入线程已先一步取消了该分段。
+            return
+
+    def _pending_limit(self) -> int:
+        if self._fetched_segments:
+            estimate = max(1, self._fetched_bytes // self._fetched_segments)
+        else:
+            estimate = INITIAL_SEGMENT_ESTIMATE_BYTES
+        by_budget = max(1, self.max_inflight_bytes // estimate)
+        # 允许少量超出线程数的前瞻，慢分段阻塞队头时其他线程仍能继续抓取后续分段。
+        return max(1, min(by_budget, self.max_workers * 2))
+
+    def _fetch_segment(self, url: str) -> bytes:
+        if self._stop_event.is_set() or self._check_stop_func():
+            raise DownloaderStoppedError("Download stopped by user")
+        return self._fetch_bytes(url)
+
+    def _wait_result(self, future: Future[bytes]) -> bytes:
+        while True:
+            self._raise_if_stopped()
+            try:
+                segment_bytes = future.result(timeout=RESULT_POLL_SECONDS)
+            except FutureTimeoutError:
+                continue
+            self._fetched_segments += 1
+            self._fetched_bytes += len(segment_bytes)
+            return segment_bytes
+
+    def _raise_if_stopped(self) -> None:
+        if self._check_stop_func():
+            self._stop_event.set()
+            raise DownloaderStoppedError("Download stopped by user")
+
+    def _write_segment(
+        self,
+        index: int,
+        segment: Any,
+        segment_bytes: bytes,
+        output: BinaryIO,
+        *,
+        decoded: bool = False,
+    ) -> None:
+        init_section = getattr(segment, "init_section", None)
+        init_uri = getattr(init_section, "absolute_uri", None) if init_section else None
+        written_map = None
+        if init_uri and init_uri not in self._written_maps:
+            # fMP4 HLS 的 MAP 初始化段只写一次，否则合并后的流会被播放器识别为损坏。
+            init_bytes = self._fetch_bytes(init_uri)
+            output.write(init_bytes)
+            self._rate_limiter.throttle(len(init_bytes), self._check_stop_func)
+            self.bytes_written += len(init_bytes)
+            self._written_maps.add(init_uri)
+            written_map = init_uri
+        decoded_segment = segment_bytes if decoded else self._decode_segment(segment, segment_bytes)
+        offset = self.bytes_written
+        output.write(decoded_segment)
+        if self._journal is not None:
+            # 先把分段字节交给操作系统再记日志，崩溃后日志只会落后于裸文件而不会超前。
+            output.flush()
+            self._journal.record(index, offset, decoded_segment, written_map)
+        # 分段已整段抓取完成，只能在写入之间施加背压；写入线程被限速阻塞时预取窗口随之停止扩张。
+        self._rate_limiter.throttle(len(decoded_segment), self._check_stop_func)
+        self.bytes_written += len(decoded_segment)
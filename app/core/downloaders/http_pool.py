@@ -0,0 +1,206 @@
+"""下载器共享的 HTTP 会话池：按主机和代理复用 ``requests.Session`` 及其连接池。"""
+
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict
+from http.cookiejar import DefaultCookiePolicy
+from typing import Any
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from app.config import cfg
+from shared.network_proxy import configure_requests_session
+
+# 单个分块任务的最大分片数；与 ChunkedDownloader.THREAD_COUNT 保持一致，避免循环导入。
+CONNECTIONS_PER_TASK = 8
+MAX_POOLED_SESSIONS = 64
+# 每个会话内按 (scheme, host, port) 缓存的 urllib3 连接池数量，覆盖 CDN 重定向到的少量边缘节点。
+ADAPTER_HOST_POOLS = 4
+
+SessionKey = tuple[str, str, str]
+
+
+def configured_pool_maxsize() -> int:
+    """每个主机保留的空闲连接数 = 全局并发任务数 × 单任务分片数。"""
+    try:
+        max_concurrent = int(cfg.get("download", "max_concurrent", 3))
+    except (TypeError, ValueError):
+        max_concurrent = 3
+    return max(10, max(1, max_concurrent) * CONNECTIONS_PER_TASK)
+
+
+def _proxy_key(proxies: Any) -> str:
+    if not proxies:
+        return ""
+    return str(proxies.get("https") or proxies.get("all") or proxies.get("http") or "")
+
+
+class _CountingHTTPAdapter(HTTPAdapter):
+    """urllib3 ``PoolManager`` 按 LRU 淘汰主机连接池时，把被淘汰池的计数累加到适配器上。"""
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        self._retired_lock = threading.Lock()
+        self.retired_requests = 0
+        self.retired_connections = 0
+        super().__init__(*args, **kwargs)
+
+    def init_poolmanager(self, *args: Any, **kwargs: Any) -> None:
+        super().init_poolmanager(*args, **kwargs)
+        self._count_disposed_pools(self.poolmanager)
+
+    def proxy_manager_for(self, proxy: Any, **proxy_kwargs: Any) -> Any:
+        manager = super().proxy_manager_for(proxy, **proxy_kwargs)
+        self._count_disposed_pools(manager)
+        return manager
+
+    def retired_counts(self) -> tuple[int, int]:
+        with self._retired_lock:
+            return self.retired_requests, self.retired_connections
+
+    def _count_disposed_pools(self, manager: Any) -> None:
+        pools = getattr(manager, "pools", None)
+        if pools is None or not hasattr(pools, "dispose_func"):
+            return
+        dispose = pools.dispose_func
+        if getattr(dispose, "counts_retired", False):
+            return
+
+        def dispose_and_count(pool: Any) -> None:
+            with self._retired_lock:
+                self.retired_requests += int(getattr(pool, "num_requests", 0))
+                self.retired_connections += int(getattr(pool, "num_connections", 0))
+            # urllib3 2.x 默认不设 dispose_func，被淘汰的池交给垃圾回收，这里保持原行为。
+            if dispose is not None:
+                dispose(pool)
+
+        dispose_and_count.counts_retired = True  # type: ignore[attr-defined]
+        pools.dispose_func = dispose_and_count
+
+
+class DownloadSessionPool:
+    """进程级会话池，所有下载器的 HTTP 请求共享 TCP/TLS 连接。
+
+    会话按 ``(scheme, host:port, 代理)`` 区分，不同代理绝不共用连接；会话禁用 Cookie
+    持久化并关闭环境代理发现，请求语义与逐次调用 ``requests.get`` 保持一致。
+    ``DomainPolicyEngine`` 的重定向校验仍以 ``hooks`` 参数逐请求传入。
+    """
+
+    def __init__(self, *, max_sessions: int = MAX_POOLED_SESSIONS) -> None:
+        self.max_sessions = max(1, int(max_sessions))
+        self._sessions: OrderedDict[SessionKey, requests.Session] = OrderedDict()
+        self._lock = threading.Lock()
+        self._sessions_created = 0
+        self._sessions_evicted = 0
+        # 被淘汰会话的连接计数累加到这里，stats() 才能反映进程生命周期内的总体复用率。
+        self._retired_requests = 0
+        self._retired_connections = 0
+
+    def session_for(self, url: str, proxies: Any = None) -> requests.Session:
+        parsed = urlsplit(str(url))
+        key = (parsed.scheme.lower(), parsed.netloc.lower(), _proxy_key(proxies))
+        evicted: list[requests.Session] = []
+        with self._lock:
+            session = self._sessions.get(key)
+            if session is not None:
+                self._sessions.move_to_end(key)
+                return session
+            session = self._build_session()
+            self._sessions[key] = session
+            self._sessions_created += 1
+            while len(self._sessions) > self.max_sessions:
+                _old_key, old_session = self._sessions.popitem(last=False)
+                evicted.append(old_session)
+                self._sessions_evicted += 1
+                requests_count, connections = self._connection_counts(old_session)
+                self._retired_requests += requests_count
+                self._retired_connections += connections
+        for old_session in evicted:
+            # 淘汰的会话可能仍有其他线程在读流，关闭只释放空闲连接，不会打断进行中的响应。
+            old_session.close()
+        return session
+
+    def request(self, method: str, url: str, **kwargs: Any) -> requests.Response:
+        return self.session_for(url, kwargs.get("proxies")).request(method, url, **kwargs)
+
+    def stats(self) -> dict[str, Any]:
+        """返回会话数和连接复用计数；``new_connections`` 即发生过的 TCP/TLS 握手次数。"""
+        with self._lock:
+            sessions = list(self._sessions.values())
+            total_requests = self._retired_requests
+            new_connections = self._retired_connections
+            created = self._sessions_created
+            evicted = self._sessions_evicted
+        for session in sessions:
+            requests_count, connections = self._connection_counts(session)
+            total_requests += requests_count
+            new_connections += connections
+        reused = max(0, total_requests - new_connections)
+        return {
+            "sessions": len(sessions),
+            "sessions_created": created,
+            "sessions_evicted": evicted,
+            "requests": total_requests,
+            "new_connections": new_connections,
+            "reused_connections": reused,
+            "reuse_rate": round(reused / total_requests, 4) if total_requests else 0.0,
+        }
+
+    def close(self) -> None:
+        with self._lock:
+            sessions = list(self._sessions.values())
+            self._sessions.clear()
+        for session in sessions:
+            session.close()
+
+    @staticmethod
+    def _build_session() -> requests.Session:
+        session = configure_requests_session(requests.Session())
+        # 不同任务可能访问同一 CDN，服务端下发的 Cookie 不能被带到别的任务；需要 Cookie 的调用方显式传 headers。
+        session.cookies.set_policy(DefaultCookiePolicy(allowed_domains=[]))
+        pool_maxsize = configured_pool_maxsize()
+        adapter = _CountingHTTPAdapter(pool_connections=ADAPTER_HOST_POOLS, pool_maxsize=pool_maxsize)
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        return session
+
+    @staticmethod
+    def _connection_counts(session: requests.Session) -> tuple[int, int]:
+        """汇总 urllib3 连接池的请求数和新建连接数（含代理连接池和已被淘汰的主机连接池）。"""
+        total_requests = 0
+        connections = 0
+        for adapter in set(session.adapters.values()):
+            if isinstance(adapter, _CountingHTTPAdapter):
+                retired_requests, retired_connections = adapter.retired_counts()
+                total_requests += retired_requests
+                connections += retired_connections
+            managers = [getattr(adapter, "poolmanager", None)]
+            managers.extend(getattr(adapter, "proxy_manager", {}).values())
+            for manager in managers:
+                pools = getattr(manager, "pools", None)
+                if pools is None:
+                    continue
+                with pools.lock:
+                    host_pools = list(pools._container.values())
+                for pool in host_pools:
+                    total_requests += int(getattr(pool, "num_requests", 0))
+                    connections += int(getattr(pool, "num_connections", 0))
+        return total_requests, connections
+
+
+download_session_pool = DownloadSessionPool()
+
+
+def pooled_get(url: str, **kwargs: Any) -> requests.Response:
+    """与 ``requests.get`` 参数一致，但复用共享会话池中的连接。"""
+    kwargs.setdefault("allow_redirects", True)
+    return download_session_pool.request("GET", url, **kwargs)
+
+
+def pooled_head(url: str, **kwargs: Any) -> requests.Response:
+    """与 ``requests.head`` 参数一致；默认同样不跟随重定向。"""
+    kwargs.setdefault("allow_redirects", False)
+    return download_session_pool.request("HEAD", url, **kwargs)
+
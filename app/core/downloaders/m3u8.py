@@ -3,6 +3,7 @@
 from __future__ import annotations
 
 import base64
+import contextlib
 import io
 import os
 import re
@@ -17,17 +18,23 @@ from typing import Any, Callable
 
 from app.config import DEFAULT_USER_AGENT, cfg
 from app.core.anti_detection import build_browser_anti_detection
+from app.core.anti_detection.browser_pool import browser_pool
 from app.debug_logger import debug_logger
 from shared import playwright_network_guard
 from app.exceptions import DownloaderStoppedError, ExternalToolError, ExternalToolNotFoundError
 from app.models import VideoItem
-from shared.network.pinned_transport import PinnedTransport, canonicalize_request_target
+from shared.network.pinned_transport import PooledPinnedTransport, canonicalize_request_target
 from shared.runtime_options import PUBLIC_DOMAIN_POLICY, DomainPolicyEngine
 from shared.subprocess_env import isolated_media_subprocess_env
 
+from .bandwidth import task_weight
 from .base import BaseDownloader, ProgressCallback, StopCheck, TransferRateLimiter
 from . import hls_proxy as hls_proxy_utils
 from .hls_proxy import _LocalHlsProxy
+from .async_engine import AsyncSegmentFetcher, asyncio_engine_enabled
+from .hls_crypto import aes_128_cbc_decrypt, configured_decrypt_workers
+from .hls_journal import HlsSegmentJournal, record_workspace_failure, sweep_orphaned_hls_workspaces
+from .hls_segments import HlsSegmentWriter, configured_inflight_limit_bytes, configured_segment_workers
 from .nm3u8_progress import _Nm3u8OutputProgress
 from .external import (
     ExternalToolRunner,
@@ -460,70 +467,8 @@ class N_m3u8DL_RE_Downloader(BaseDownloader):
 
     @classmethod
     def sweep_orphaned_workspaces(cls, download_dirs: list[str | os.PathLike[str]]) -> int:
-        """应用启动后、任务运行前清理一次遗留的 HLS 工作目录。"""
-        cleaned_count = 0
-        errors: list[dict[str, str]] = []
-
-        for raw_dir in download_dirs:
-            try:
-                base_dir = Path(raw_dir).expanduser()
-            except (OSError, RuntimeError, TypeError, ValueError) as exc:
-                errors.append({"path": str(raw_dir), "error": str(exc)})
-                debug_logger.log_exception(
-                    "N_m3u8DL_RE_Downloader",
-                    "orphan_workspace_sweep_path_error",
-                    exc,
-                    details={"path": str(raw_dir)},
-                )
-                continue
-
-            try:
-                if not base_dir.exists() or not base_dir.is_dir():
-                    continue
-                # 既扫统一根目录，也扫旧版回退路径（fallback）留在目标目录下的 *_hls 目录。
-                candidates = [base_dir / cls.NM3U8_TEMP_ROOT_NAME]
-                candidates.extend(
-                    child
-                    for child in base_dir.iterdir()
-                    if child.is_dir()
-                    and (child.name.endswith("_curl_cffi_hls") or child.name.endswith("_playwright_hls"))
-                )
-            except OSError as exc:
-                errors.append({"path": str(base_dir), "error": str(exc)})
-                debug_logger.log_exception(
-                    "N_m3u8DL_RE_Downloader",
-                    "orphan_workspace_sweep_scan_error",
-                    exc,
-                    details={"path": str(base_dir)},
-                )
-                continue
-
-            for path in candidates:
-                try:
-                    if not path.exists() or not path.is_dir():
-                        continue
-                    shutil.rmtree(path, ignore_errors=True)
-                    if path.exists():
-                        errors.append({"path": str(path), "error": "directory still exists after cleanup"})
-                        continue
-                    cleaned_count += 1
-                except OSError as exc:
-                    errors.append({"path": str(path), "error": str(exc)})
-                    debug_logger.log_exception(
-                        "N_m3u8DL_RE_Downloader",
-                        "orphan_workspace_sweep_remove_error",
-                        exc,
-                        details={"path": str(path)},
-                    )
-
-        debug_logger.log(
-            component="N_m3u8DL_RE_Downloader",
-            action="orphan_workspace_sweep",
-            message="Swept stale HLS workspaces at application startup",
-            status_code="M3U8_TMP_SWEEP",
-            details={"cleaned_count": cleaned_count, "errors": errors},
-        )
-        return cleaned_count
+        """应用启动后、任务运行前清理一次遗留的 HLS 工作目录；带有效分段日志的目录保留续传。"""
+        return sweep_orphaned_hls_workspaces(download_dirs, temp_root_name=cls.NM3U8_TEMP_ROOT_NAME)
 
     def _download_with_nm3u8_external(
         self,
@@ -868,6 +813,7 @@ class N_m3u8DL_RE_Downloader(BaseDownloader):
                     request_headers,
                     upstream_proxy,
                     domain_policy=domain_policy,
+                    stream=True,
                 )
             except Exception as exc:
                 first_error = exc
@@ -892,14 +838,18 @@ class N_m3u8DL_RE_Downloader(BaseDownloader):
         *,
         domain_policy: DomainPolicyEngine | None,
         max_redirects: int = 5,
+        stream: bool = False,
     ):
-        """读取单个 HLS 资源，并在跟随前逐跳校验每次重定向。"""
+        """读取单个 HLS 资源，并在跟随前逐跳校验每次重定向；stream=True 时按需流式读取主体。"""
         if domain_policy is not None and not upstream_proxy:
-            return PinnedTransport(
+            transport = PooledPinnedTransport(
                 policy=domain_policy,
+                pool=hls_proxy_utils.hls_pinned_session_pool,
                 timeout=60,
                 max_response_bytes=256 * 1024 * 1024,
-            ).request("GET", upstream_url, headers=headers, max_redirects=max_redirects)
+            )
+            send = transport.stream if stream else transport.request
+            return send("GET", upstream_url, headers=headers, max_redirects=max_redirects)
         current_url = canonicalize_request_target(str(upstream_url)).url
         redirect_chain = [current_url]
         request_headers = dict(headers)
@@ -909,13 +859,14 @@ class N_m3u8DL_RE_Downloader(BaseDownloader):
                 target = canonicalize_request_target(current_url)
                 request_url = target.url
                 domain_policy.require_public_url(request_url)
-            response = self._curl_cffi_get_response(
-                curl_requests,
-                request_url,
-                request_headers,
-                upstream_proxy,
-                allow_redirects=False,
-            )
+            with hls_proxy_utils.hls_upstream_sessions.lease(curl_requests, request_url, upstream_proxy) as client:
+                response = self._curl_cffi_get_response(
+                    client,
+                    request_url,
+                    request_headers,
+                    upstream_proxy,
+                    allow_redirects=False,
+                )
             status = int(getattr(response, "status_code", 0) or 0)
             response_headers = getattr(response, "headers", {}) or {}
             location = response_headers.get("Location") or response_headers.get("location")
@@ -1197,10 +1148,8 @@ class N_m3u8DL_RE_Downloader(BaseDownloader):
         target = Path(save_path)
         target.parent.mkdir(parents=True, exist_ok=True)
         temp_dir = target.parent / f"{target.stem}_curl_cffi_hls"
-        if temp_dir.exists():
-            shutil.rmtree(temp_dir, ignore_errors=True)
+        # 不再预先清空：目录内的分段日志与播放列表身份匹配时，本次只补抓缺失分段。
         temp_dir.mkdir(parents=True, exist_ok=True)
-        # Python 回退路径（fallback）先合并成裸 TS，再根据目标后缀决定是否 remux，失败时可整目录清理。
         raw_path = temp_dir / f"{target.stem}.ts"
         domain_policy = self._domain_policy_for_item(video_item)
         session = self._make_curl_cffi_session(
@@ -1209,6 +1158,14 @@ class N_m3u8DL_RE_Downloader(BaseDownloader):
             None if domain_policy is not None else proxy,
         )
         playlist_cache = self._playlist_cache_from_meta(video_item)
+        segment_fetcher = (
+            AsyncSegmentFetcher(headers, proxy, max_concurrency=configured_segment_workers())
+            if asyncio_engine_enabled(domain_policy, proxy)
+            else None
+        )
+        journal: HlsSegmentJournal | None = None
+        completed = False
+        stopped = False
         try:
             playlist_url = str(video_item.url)
             playlist_text = self._playlist_text_from_cache(playlist_cache, playlist_url)
@@ -1237,6 +1194,14 @@ class N_m3u8DL_RE_Downloader(BaseDownloader):
             if self._has_unsupported_hls_encryption(playlist):
                 raise ExternalToolError("curl_cffi HLS fallback found unsupported encrypted HLS segments")
 
+            journal = HlsSegmentJournal.open(
+                temp_dir,
+                raw_path,
+                playlist_url=playlist_url,
+                playlist=playlist,
+                resume_enabled=self._coerce_bool_setting(cfg.get("download", "resume_enabled", True)),
+                trace_id=video_item.meta.get("trace_id"),
+            )
             self._write_hls_segments(
                 playlist,
                 raw_path,
@@ -1248,17 +1213,35 @@ class N_m3u8DL_RE_Downloader(BaseDownloader):
                 ),
                 progress_callback,
                 check_stop_func,
+                journal=journal,
+                video_item=video_item,
+                submit_fetch=segment_fetcher.submit if segment_fetcher is not None else None,
             )
 
             if raw_path.stat().st_size <= 0:
                 raise ExternalToolError("curl_cffi HLS fallback produced an empty media file")
             self._finalize_curl_cffi_hls_output(raw_path, target, check_stop_func)
+            completed = True
+        except DownloaderStoppedError:
+            stopped = True
+            raise
         finally:
+            if segment_fetcher is not None:
+                segment_fetcher.close()
             try:
                 session.close()
             except (OSError, RuntimeError, AttributeError) as exc:
                 debug_logger.log_exception("M3U8Downloader", "close_curl_cffi_session", exc)
-            shutil.rmtree(temp_dir, ignore_errors=True)
+            if journal is not None:
+                journal.close()
+            # 停止时保留已有分段日志的工作目录，重试/重启后由日志续传；失败只保留到最后一次重试。
+            if completed or journal is None or not journal.resumable:
+                shutil.rmtree(temp_dir, ignore_errors=True)
+            elif not stopped and not record_workspace_failure(
+                temp_dir,
+                max_failures=self._coerce_retry_count(cfg.get("download", "max_retries", 3)),
+            ):
+                shutil.rmtree(temp_dir, ignore_errors=True)
 
     def _download_with_playwright_hls(
         self,
@@ -1296,7 +1279,7 @@ class N_m3u8DL_RE_Downloader(BaseDownloader):
 
         with sync_playwright() as playwright:
             launch_kwargs = self._playwright_launch_kwargs(video_item, proxy)
-            browser = playwright.chromium.launch(**launch_kwargs)
+            browser = browser_pool.launch(playwright, **launch_kwargs)
             try:
                 anti_context = build_browser_anti_detection(
                     "missav",
@@ -1361,6 +1344,9 @@ class N_m3u8DL_RE_Downloader(BaseDownloader):
                     ),
                     progress_callback,
                     check_stop_func,
+                    # 同步 Playwright 页面只能在创建线程调用，浏览器回退路径保持串行抓取。
+                    max_workers=1,
+                    video_item=video_item,
                 )
                 if raw_path.stat().st_size <= 0:
                     raise ExternalToolError("Playwright HLS fallback produced an empty media file")
@@ -1601,37 +1587,46 @@ class N_m3u8DL_RE_Downloader(BaseDownloader):
         fetch_bytes,
         progress_callback: ProgressCallback,
         check_stop_func: StopCheck,
+        *,
+        max_workers: int | None = None,
+        journal: HlsSegmentJournal | None = None,
+        video_item: VideoItem | None = None,
+        submit_fetch=None,
     ) -> None:
-        written_maps: set[str] = set()
         key_cache: dict[str, bytes] = {}
+        key_lock = threading.Lock()
         total = len(playlist.segments)
-        bytes_written = 0
-        rate_limiter = TransferRateLimiter(cfg.get("download", "speed_limit_kb", 0))
-        with raw_path.open("wb") as output:
-            for index, segment in enumerate(playlist.segments, start=1):
-                if check_stop_func():
-                    raise DownloaderStoppedError("Download stopped by user")
-                init_section = getattr(segment, "init_section", None)
-                init_uri = getattr(init_section, "absolute_uri", None) if init_section else None
-                if init_uri and init_uri not in written_maps:
-                    # fMP4 HLS 的 MAP 初始化段只写一次，否则合并后的流会被播放器识别为损坏。
-                    init_bytes = fetch_bytes(init_uri)
-                    output.write(init_bytes)
-                    rate_limiter.throttle(len(init_bytes), check_stop_func)
-                    bytes_written += len(init_bytes)
-                    written_maps.add(init_uri)
-                segment_bytes = fetch_bytes(segment.absolute_uri)
-                decoded_segment = self._decrypt_hls_segment(segment, segment_bytes, fetch_bytes, key_cache)
-                output.write(decoded_segment)
-                # Python/浏览器回退路径（fallback）已经拿到整段数据，只能在段之间施加背压；
-                # 外部工具与 yt-dlp 路径则使用各自的原生限速参数。
-                rate_limiter.throttle(len(decoded_segment), check_stop_func)
-                bytes_written += len(decoded_segment)
-                self._emit_progress(
+        encrypted = any(
+            str(getattr(getattr(segment, "key", None), "method", "") or "").upper() not in ("", "NONE")
+            for segment in playlist.segments
+        )
+        writer = HlsSegmentWriter(
+            fetch_bytes=fetch_bytes,
+            decode_segment=lambda segment, data: self._decrypt_hls_segment(
+                segment, data, fetch_bytes, key_cache, key_lock
+            ),
+            decode_workers=configured_decrypt_workers() if encrypted else 0,
+            rate_limiter=TransferRateLimiter(
+                cfg.get("download", "speed_limit_kb", 0),
+                label=str((video_item.meta.get("trace_id") if video_item else "") or raw_path.name),
+                weight=task_weight(video_item),
+            ),
+            check_stop_func=check_stop_func,
+            max_workers=configured_segment_workers() if max_workers is None else max_workers,
+            max_inflight_bytes=configured_inflight_limit_bytes(),
+            journal=journal,
+            submit_fetch=submit_fetch,
+        )
+        with journal.open_output() if journal is not None else raw_path.open("wb") as output:
+            writer.write(
+                playlist.segments,
+                output,
+                lambda index, bytes_written: self._emit_progress(
                     progress_callback,
                     min(95, 10 + int(index * 85 / total)),
                     bytes_downloaded=bytes_written,
-                )
+                ),
+            )
 
     def _decrypt_hls_segment(
         self,
@@ -1639,6 +1634,7 @@ class N_m3u8DL_RE_Downloader(BaseDownloader):
         data: bytes,
         fetch_bytes,
         key_cache: dict[str, bytes],
+        key_lock: threading.Lock | None = None,
     ) -> bytes:
         key = getattr(segment, "key", None)
         method = str(getattr(key, "method", "") or "").upper()
@@ -1649,11 +1645,13 @@ class N_m3u8DL_RE_Downloader(BaseDownloader):
         key_uri = getattr(key, "absolute_uri", None) or getattr(key, "uri", None)
         if not key_uri:
             raise ExternalToolError("AES-128 HLS key URI is missing")
-        if key_uri not in key_cache:
-            key_bytes = fetch_bytes(key_uri)
-            if len(key_bytes) != 16:
-                raise ExternalToolError(f"AES-128 HLS key must be 16 bytes, got {len(key_bytes)}")
-            key_cache[key_uri] = key_bytes
+        # 解密可能在多个解密线程并发执行；同一 key 只抓取一次。
+        with key_lock or contextlib.nullcontext():
+            if key_uri not in key_cache:
+                key_bytes = fetch_bytes(key_uri)
+                if len(key_bytes) != 16:
+                    raise ExternalToolError(f"AES-128 HLS key must be 16 bytes, got {len(key_bytes)}")
+                key_cache[key_uri] = key_bytes
         sequence = int(getattr(segment, "media_sequence", 0) or 0)
         iv = self._hls_aes_iv(getattr(key, "iv", None), sequence)
         return self._aes_128_cbc_decrypt(data, key_cache[key_uri], iv)
@@ -1673,33 +1671,7 @@ class N_m3u8DL_RE_Downloader(BaseDownloader):
 
     @staticmethod
     def _aes_128_cbc_decrypt(data: bytes, key: bytes, iv: bytes) -> bytes:
-        try:
-            # ``Crypto`` 实际由持续维护的 PyCryptodome 提供；B413 只识别到了兼容命名空间。
-            from Crypto.Cipher import AES  # nosec B413
-            from Crypto.Util.Padding import unpad  # nosec B413
-        except ImportError:
-            try:
-                from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
-                from cryptography.hazmat.backends import default_backend
-            except ImportError as cryptography_exc:
-                raise ExternalToolNotFoundError("pycryptodome or cryptography is required for AES-128 HLS") from cryptography_exc
-            decryptor = Cipher(algorithms.AES(key), modes.CBC(iv), backend=default_backend()).decryptor()
-            decrypted = decryptor.update(data) + decryptor.finalize()
-            return N_m3u8DL_RE_Downloader._pkcs7_unpad(decrypted)
-        try:
-            return unpad(AES.new(key, AES.MODE_CBC, iv).decrypt(data), 16)
-        except ValueError:
-            # 部分 HLS 生产端已按 MPEG-TS 包边界对齐，数据本身不含 PKCS7 填充。
-            return AES.new(key, AES.MODE_CBC, iv).decrypt(data)
-
-    @staticmethod
-    def _pkcs7_unpad(data: bytes) -> bytes:
-        if not data:
-            return data
-        pad = data[-1]
-        if pad < 1 or pad > 16 or data[-pad:] != bytes([pad]) * pad:
-            return data
-        return data[:-pad]
+        return aes_128_cbc_decrypt(data, key, iv)
 
     @staticmethod
     def _make_curl_cffi_session(curl_requests, headers: dict[str, str], proxy: str | None):
@@ -1764,7 +1736,7 @@ class N_m3u8DL_RE_Downloader(BaseDownloader):
     ):
         """使用 curl_cffi 发起请求，但仍由本项目掌控并逐跳校验重定向。"""
         if domain_policy is not None:
-            return PinnedTransport(
+            return PooledPinnedTransport(
                 policy=domain_policy,
                 timeout=timeout,
                 max_response_bytes=max_response_bytes,
@@ -0,0 +1,309 @@
+"""DASH 单流的多镜像分段下载：按镜像实测吞吐派发连接，慢镜像上的区间中途让给快镜像。"""
+
+from __future__ import annotations
+
+import threading
+import time
+from contextlib import AbstractContextManager
+from dataclasses import dataclass
+from typing import Any, Callable, Iterable
+
+import requests
+
+from app.exceptions import DownloaderStoppedError, StreamDownloadError
+
+from .base import BaseDownloader
+from .range_scheduler import MIN_SPLIT_BYTES, RangeScheduler, RangeTask, plan_ranges
+from .range_store import PreallocatedFileStore
+from .stream_io import iter_response_buffers
+
+# 小于该值的流单连接就能很快下完，多一次探测请求反而更慢。
+MIN_RANGED_BYTES = 4 * 1024 * 1024
+# 每传输这么多字节记一次吞吐样本，并检查当前镜像是否明显落后。
+SAMPLE_BYTES = 512 * 1024
+# 镜像吞吐低于最快镜像的该比例即视为慢镜像，连接在下一个样本点换镜像。
+SLOW_RATIO = 0.4
+EWMA_ALPHA = 0.3
+# 单个镜像连续失败这么多次后不再派发，直到刷新出新地址。
+MAX_MIRROR_FAILURES = 2
+
+OpenRange = Callable[[str, int, int], AbstractContextManager[Any]]
+
+
+class MirrorRangeUnavailable(RuntimeError):
+    """镜像不支持 Range 或无法确定长度，调用方应回退为单连接下载。"""
+
+
+@dataclass(slots=True)
+class MirrorStats:
+    url: str
+    rate: float | None = None
+    active: int = 0
+    failures: int = 0
+    downloaded: int = 0
+
+
+class MirrorPool:
+    """同一路流的 ``baseUrl`` 与 ``backupUrl`` 镜像集合，线程安全。
+
+    ``acquire`` 优先给出尚未测速的镜像，之后按 ``吞吐 / (在途连接 + 1)`` 选最优，
+    连接数会自然向快镜像倾斜；``replace`` 在签名过期刷新地址后重置全部统计。
+    """
+
+    def __init__(self, urls: Iterable[str]) -> None:
+        self._lock = threading.Lock()
+        self._mirrors: list[MirrorStats] = []
+        self.generation = 0
+        self.replace(urls)
+
+    def replace(self, urls: Iterable[str]) -> None:
+        unique = [url for url in dict.fromkeys(str(url or "") for url in urls) if url]
+        with self._lock:
+            self._mirrors = [MirrorStats(url) for url in unique]
+            self.generation += 1
+
+    def urls(self) -> list[str]:
+        with self._lock:
+            return [mirror.url for mirror in self._mirrors]
+
+    def acquire(self, *, exclude: Iterable[str] = ()) -> str | None:
+        excluded = set(exclude)
+        with self._lock:
+            healthy = [mirror for mirror in self._mirrors if mirror.failures < MAX_MIRROR_FAILURES]
+            # 只剩被排除的镜像时仍然返回它，慢总比停下来好。
+            candidates = [mirror for mirror in healthy if mirror.url not in excluded] or healthy
+            if not candidates:
+                return None
+            best = max(candidates, key=self._score)
+            best.active += 1
+            return best.url
+
+    def release(self, url: str) -> None:
+        with self._lock:
+            mirror = self._find(url)
+            if mirror is not None:
+                mirror.active = max(0, mirror.active - 1)
+
+    def record(self, url: str, byte_count: int, seconds: float) -> None:
+        if byte_count <= 0:
+            return
+        rate = byte_count / max(seconds, 1e-3)
+        with self._lock:
+            mirror = self._find(url)
+            if mirror is None:
+                return
+            mirror.downloaded += byte_count
+            mirror.failures = 0
+            mirror.rate = rate if mirror.rate is None else mirror.rate + EWMA_ALPHA * (rate - mirror.rate)
+
+    def fail(self, url: str, *, permanent: bool = False) -> None:
+        with self._lock:
+            mirror = self._find(url)
+            if mirror is not None:
+                mirror.failures = MAX_MIRROR_FAILURES if permanent else mirror.failures + 1
+
+    def exhausted(self) -> bool:
+        with self._lock:
+            return all(mirror.failures >= MAX_MIRROR_FAILURES for mirror in self._mirrors)
+
+    def is_slow(self, url: str) -> bool:
+        """当前镜像已测速且明显慢于其他健康镜像中最快的一个。"""
+        with self._lock:
+            mirror = self._find(url)
+            if mirror is None or mirror.rate is None:
+                return False
+            others = [
+                other.rate
+                for other in self._mirrors
+                if other.url != url and other.rate is not None and other.failures < MAX_MIRROR_FAILURES
+            ]
+            return bool(others) and mirror.rate < max(others) * SLOW_RATIO
+
+    def snapshot(self) -> list[dict[str, Any]]:
+        with self._lock:
+            return [
+                {
+                    "url": mirror.url,
+                    "rate": round(mirror.rate or 0.0, 1),
+                    "downloaded": mirror.downloaded,
+                    "failures": mirror.failures,
+                }
+                for mirror in self._mirrors
+            ]
+
+    @staticmethod
+    def _score(mirror: MirrorStats) -> tuple[float, int]:
+        if mirror.rate is None:
+            return float("inf"), -mirror.active
+        return mirror.rate / (mirror.active + 1), -mirror.active
+
+    def _find(self, url: str) -> MirrorStats | None:
+        for mirror in self._mirrors:
+            if mirror.url == url:
+                return mirror
+        return None
+
+
+def probe_total_size(open_range: OpenRange, url: str) -> int:
+    """用 ``bytes=0-0`` 探测镜像是否支持 Range，并返回流的总长度。"""
+    with open_range(url, 0, 0) as response:
+        response.raise_for_status()
+        if response.status_code != 206:
+            raise MirrorRangeUnavailable(f"镜像未返回 206: {response.status_code}")
+        content_range = response.headers.get("content-range") or response.headers.get("Content-Range")
+        parsed = BaseDownloader._parse_content_range_header(content_range)
+        if parsed is None or parsed[0] != 0 or not parsed[2]:
+            raise MirrorRangeUnavailable(f"无法从 Content-Range 确定流长度: {content_range!r}")
+        return int(parsed[2])
+
+
+class MirrorRangeFetcher:
+    """多个连接共享一个 ``RangeScheduler``，把一路流直接写进预分配的临时文件。
+
+    每个连接从 ``MirrorPool`` 领取镜像；样本点上发现所在镜像明显慢于最快镜像时，
+    连接放下镜像但保留区间，换到更快的镜像继续拉剩余字节。所有镜像都失败（常见于
+    签名过期的 403）时调用 ``refresh`` 换一批地址，刷新次数受 ``max_retries`` 限制。
+    """
+
+    def __init__(
+        self,
+        pool: MirrorPool,
+        store: PreallocatedFileStore,
+        *,
+        open_range: OpenRange,
+        connections: int,
+        max_retries: int,
+        should_stop: Callable[[], bool],
+        on_bytes: Callable[[int], None],
+        refresh: Callable[[], list[str] | None] | None = None,
+        clock: Callable[[], float] = time.monotonic,
+        min_split_bytes: int = MIN_SPLIT_BYTES,
+    ) -> None:
+        self.pool = pool
+        self.store = store
+        self._open_range = open_range
+        self._connections = max(1, int(connections))
+        self._max_retries = max(0, int(max_retries))
+        self._should_stop = should_stop
+        self._on_bytes = on_bytes
+        self._refresh = refresh
+        self._clock = clock
+        total_size = store.total_size
+        self.scheduler = RangeScheduler(
+            plan_ranges(total_size, min(self._connections, max(1, total_size // max(1, min_split_bytes)))),
+            min_split_bytes=min_split_bytes,
+        )
+        self._abort = threading.Event()
+        self._errors: list[BaseException] = []
+        self._refresh_lock = threading.Lock()
+        self._refreshes = 0
+        self._switch_lock = threading.Lock()
+        self.mirror_switches = 0
+
+    def run(self) -> None:
+        threads = [
+            threading.Thread(target=self._worker, daemon=True, name=f"MirrorRange-{index}")
+            for index in range(min(self._connections, len(self.scheduler.tasks)) or 1)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        if self._errors:
+            raise self._errors[0]
+        if not self.scheduler.all_complete():
+            raise StreamDownloadError("多镜像分段下载未完成")
+
+    def _worker(self) -> None:
+        failures = 0
+        try:
+            while not self._abort.is_set():
+                task = self.scheduler.acquire()
+                if task is None:
+                    return
+                exclude: tuple[str, ...] = ()
+                while not task.complete and not self._abort.is_set():
+                    generation = self.pool.generation
+                    url = self.pool.acquire(exclude=exclude)
+                    if url is None:
+                        self._refresh_mirrors(generation)
+                        continue
+                    try:
+                        moved = self._fetch(task, url)
+                    except MirrorRangeUnavailable:
+                        self.pool.fail(url, permanent=True)
+                        exclude = ()
+                        continue
+                    except (requests.RequestException, OSError, StreamDownloadError) as exc:
+                        failures += 1
+                        self.pool.fail(url)
+                        # 每个镜像各有 max_retries 次机会，镜像全部失败后还会先刷新地址。
+                        if failures > self._max_retries * max(1, len(self.pool.urls())):
+                            raise StreamDownloadError(f"多镜像分段下载失败: {exc}") from exc
+                        exclude = (url,)
+                        continue
+                    finally:
+                        self.pool.release(url)
+                    if moved:
+                        with self._switch_lock:
+                            self.mirror_switches += 1
+                    exclude = (url,) if moved else ()
+        except BaseException as exc:
+            self._errors.append(exc)
+            self._abort.set()
+
+    def _fetch(self, task: RangeTask, url: str) -> bool:
+        """拉取区间剩余字节；返回 True 表示因镜像过慢中途换镜像。"""
+        start, end = self.scheduler.bounds(task)
+        if start > end:
+            return False
+        with self._open_range(url, start, end) as response:
+            response.raise_for_status()
+            if response.status_code != 206:
+                raise MirrorRangeUnavailable(f"镜像未返回 206: {response.status_code}")
+            content_range = response.headers.get("content-range") or response.headers.get("Content-Range")
+            parsed = BaseDownloader._parse_content_range_header(content_range)
+            if parsed is None or parsed[0] != start or (parsed[2] and parsed[2] != self.store.total_size):
+                raise StreamDownloadError(f"镜像响应范围不匹配: expected {start}-{end}, got {content_range!r}")
+            window_started = self._clock()
+            window_bytes = 0
+            for chunk in iter_response_buffers(response, fallback_chunk_size=SAMPLE_BYTES // 4):
+                if self._abort.is_set():
+                    return False
+                if self._should_stop():
+                    raise DownloaderStoppedError("用户停止下载")
+                if not chunk:
+                    continue
+                # 与分块下载器相同：先声明再写盘，区间后半段被拆走时只写到新终点。
+                offset = task.next_offset
+                allowed = self.scheduler.claim(task, len(chunk))
+                if allowed:
+                    self.store.write_at(offset, chunk[:allowed])
+                    self.scheduler.commit(task, allowed)
+                    self._on_bytes(allowed)
+                    window_bytes += allowed
+                if allowed < len(chunk) or task.complete:
+                    break
+                if window_bytes >= SAMPLE_BYTES:
+                    now = self._clock()
+                    self.pool.record(url, window_bytes, now - window_started)
+                    window_started, window_bytes = now, 0
+                    if task.remaining > SAMPLE_BYTES and self.pool.is_slow(url):
+                        return True
+            if window_bytes:
+                self.pool.record(url, window_bytes, self._clock() - window_started)
+        if not task.complete:
+            raise StreamDownloadError(f"镜像连接提前结束: 区间还剩 {task.remaining} 字节")
+        return False
+
+    def _refresh_mirrors(self, generation: int) -> None:
+        with self._refresh_lock:
+            if self.pool.generation != generation:
+                return
+            if self._refresh is None or self._refreshes >= self._max_retries:
+                raise StreamDownloadError("所有镜像均不可用")
+            self._refreshes += 1
+            urls = self._refresh()
+            if not urls:
+                raise StreamDownloadError("刷新镜像地址失败")
+            self.pool.replace(urls)
@@ -0,0 +1,251 @@
+"""分块下载的 Range 调度：共享队列派发小区间，空闲线程拆分最大的在途区间。"""
+
+from __future__ import annotations
+
+import threading
+from dataclasses import dataclass
+
+# 剩余字节少于两倍该值的区间不再拆分，避免尾部出现大量只有几十 KB 的请求。
+MIN_SPLIT_BYTES = 1024 * 1024
+# 拆分点按该粒度对齐，分片文件边界与常见文件系统块对齐。
+SPLIT_ALIGNMENT = 64 * 1024
+
+
+@dataclass(slots=True)
+class RangeTask:
+    """一个分片对应的闭区间 ``[start, end]``；``end`` 在被拆分时只会缩小。
+
+    ``done`` 是已声明（即将或已经写入）的字节，``written`` 是确认写完的字节；
+    单文件模式只能依据后者记录续传区间。
+    """
+
+    part_id: int
+    start: int
+    end: int
+    done: int = 0
+    assigned: bool = False
+    written: int = 0
+
+    @property
+    def length(self) -> int:
+        return self.end - self.start + 1
+
+    @property
+    def next_offset(self) -> int:
+        return self.start + self.done
+
+    @property
+    def remaining(self) -> int:
+        return self.length - self.done
+
+    @property
+    def complete(self) -> bool:
+        return self.done >= self.length
+
+
+def plan_ranges(total_size: int, range_count: int) -> list[RangeTask]:
+    """把文件均分为 ``range_count`` 个区间，最后一个区间吸收除不尽的尾部字节。"""
+    count = max(1, min(int(range_count), int(total_size)))
+    size = total_size // count
+    tasks: list[RangeTask] = []
+    for index in range(count):
+        start = index * size
+        end = total_size - 1 if index == count - 1 else start + size - 1
+        tasks.append(RangeTask(index, start, end))
+    return tasks
+
+
+class RangeScheduler:
+    """线程安全的区间派发器。
+
+    ``acquire`` 先派发尚未分配的区间；队列为空时从剩余字节最多的在途区间切走后半段，
+    作为新的分片交给空闲线程。写入线程必须先 ``claim`` 再写盘：``claim`` 在锁内推进
+    进度并截断到区间当前终点，因此拆分点永远落在已声明字节之后，两个分片不会重叠。
+    """
+
+    def __init__(self, tasks: list[RangeTask], *, min_split_bytes: int = MIN_SPLIT_BYTES) -> None:
+        self._tasks = sorted(tasks, key=lambda task: task.start)
+        self._next_part_id = max((task.part_id for task in self._tasks), default=-1) + 1
+        self.min_split_bytes = max(1, int(min_split_bytes))
+        self._lock = threading.Lock()
+        self.version = 0
+        self.split_count = 0
+        self._active_workers = 0
+        self._retire_pending = 0
+
+    @property
+    def tasks(self) -> list[RangeTask]:
+        with self._lock:
+            return list(self._tasks)
+
+    def layout(self) -> list[list[int]]:
+        """按偏移排序的 ``[part_id, start, end]``，用于写入续传清单。"""
+        with self._lock:
+            return [[task.part_id, task.start, task.end] for task in self._tasks]
+
+    def downloaded_bytes(self) -> int:
+        with self._lock:
+            return sum(task.done for task in self._tasks)
+
+    def all_complete(self) -> bool:
+        with self._lock:
+            return all(task.complete for task in self._tasks)
+
+    def has_work(self) -> bool:
+        with self._lock:
+            return any(not task.assigned and not task.complete for task in self._tasks) or any(
+                task.assigned and task.remaining >= self.min_split_bytes * 2 for task in self._tasks
+            )
+
+    def acquire(self) -> RangeTask | None:
+        with self._lock:
+            for task in self._tasks:
+                if not task.assigned and not task.complete:
+                    task.assigned = True
+                    return task
+            victim = max(
+                (task for task in self._tasks if task.assigned and not task.complete),
+                key=lambda task: task.remaining,
+                default=None,
+            )
+            if victim is None or victim.remaining < self.min_split_bytes * 2:
+                return None
+            split_at = victim.next_offset + victim.remaining // 2
+            split_at -= (split_at - victim.start) % SPLIT_ALIGNMENT
+            if split_at <= victim.next_offset:
+                split_at = victim.next_offset + victim.remaining // 2
+            stolen = RangeTask(self._next_part_id, split_at, victim.end, assigned=True)
+            self._next_part_id += 1
+            victim.end = split_at - 1
+            self._tasks.append(stolen)
+            self._tasks.sort(key=lambda task: task.start)
+            self.version += 1
+            self.split_count += 1
+            return stolen
+
+    def bounds(self, task: RangeTask) -> tuple[int, int]:
+        """返回下一次请求的 ``(起点, 终点)`` 快照。"""
+        with self._lock:
+            return task.next_offset, task.end
+
+    def claim(self, task: RangeTask, byte_count: int) -> int:
+        """声明即将写入的字节数，返回不超过区间当前终点的可写字节。"""
+        with self._lock:
+            allowed = max(0, min(int(byte_count), task.remaining))
+            task.done += allowed
+            return allowed
+
+    def commit(self, task: RangeTask, byte_count: int) -> None:
+        """记录已经写完的字节；必须在对应的 ``claim`` 之后调用。"""
+        with self._lock:
+            task.written = min(task.done, task.written + max(0, int(byte_count)))
+
+    def rewind(self, task: RangeTask, done: int) -> None:
+        """重试前按实际落盘长度校正进度；只会由持有该区间的线程调用。"""
+        with self._lock:
+            task.done = max(0, min(int(done), task.length))
+            task.written = task.done
+
+    def written_bytes(self) -> int:
+        with self._lock:
+            return sum(task.written for task in self._tasks)
+
+    def written_intervals(self) -> list[list[int]]:
+        """已确认落盘的闭区间，相邻区间合并，供单文件模式写入续传清单。"""
+        intervals: list[list[int]] = []
+        with self._lock:
+            for task in self._tasks:
+                if task.written <= 0:
+                    continue
+                start, end = task.start, task.start + task.written - 1
+                if intervals and intervals[-1][1] + 1 == start:
+                    intervals[-1][1] = end
+                else:
+                    intervals.append([start, end])
+        return intervals
+
+    def release(self, task: RangeTask) -> None:
+        with self._lock:
+            task.assigned = False
+
+    def register_worker(self) -> None:
+        with self._lock:
+            self._active_workers += 1
+
+    def unregister_worker(self) -> None:
+        with self._lock:
+            self._active_workers = max(0, self._active_workers - 1)
+
+    def set_retire_target(self, count: int) -> None:
+        with self._lock:
+            self._retire_pending = max(0, int(count))
+
+    def should_retire(self) -> bool:
+        """在区间边界检查是否需要降低并发；最后一个线程永远不退出。"""
+        with self._lock:
+            if self._retire_pending <= 0 or self._active_workers <= 1:
+                return False
+            self._retire_pending -= 1
+            self._active_workers -= 1
+            return True
+
+
+class ThroughputTuner:
+    """按固定窗口测量吞吐，对单任务并发做一次一步的爬山调整。
+
+    增加一个连接后吞吐提升不足 ``gain_threshold`` 就回退一步，并在若干窗口内保持不动，
+    避免在 CDN 单连接限速与整体带宽瓶颈之间来回震荡。
+    """
+
+    def __init__(
+        self,
+        *,
+        initial: int,
+        minimum: int = 1,
+        maximum: int,
+        window_seconds: float = 2.0,
+        gain_threshold: float = 0.1,
+        hold_windows: int = 3,
+    ) -> None:
+        self.minimum = max(1, int(minimum))
+        self.maximum = max(self.minimum, int(maximum))
+        self.target = max(self.minimum, min(int(initial), self.maximum))
+        self.window_seconds = max(0.1, float(window_seconds))
+        self.gain_threshold = max(0.0, float(gain_threshold))
+        self.hold_windows = max(0, int(hold_windows))
+        self._window_started: float | None = None
+        self._window_bytes = 0
+        self._last_rate: float | None = None
+        self._last_change = 0
+        self._hold = 0
+
+    def observe(self, total_bytes: int, now: float) -> int:
+        if self._window_started is None:
+            self._window_started = now
+            self._window_bytes = total_bytes
+            return self.target
+        elapsed = now - self._window_started
+        if elapsed < self.window_seconds:
+            return self.target
+        rate = max(0, total_bytes - self._window_bytes) / elapsed
+        self._window_started = now
+        self._window_bytes = total_bytes
+        previous_rate = self._last_rate
+        self._last_rate = rate
+        if (
+            self._last_change > 0
+            and previous_rate is not None
+            and rate < previous_rate * (1 + self.gain_threshold)
+        ):
+            self.target = max(self.minimum, self.target - 1)
+            self._last_change = -1
+            self._hold = self.hold_windows
+        elif self._hold > 0:
+            self._hold -= 1
+            self._last_change = 0
+        elif self.target < self.maximum:
+            self.target += 1
+            self._last_change = 1
+        else:
+            self._last_change = 0
+        return self.target
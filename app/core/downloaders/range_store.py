@@ -0,0 +1,140 @@
+"""分块下载的落盘方式：独立分片文件合并，或预分配单文件按偏移直写。"""
+
+from __future__ import annotations
+
+import errno
+import os
+import threading
+from contextlib import contextmanager
+from typing import Callable, Iterator
+
+from .range_scheduler import RangeTask
+
+RangeWrite = Callable[[int, "bytes | memoryview"], None]
+
+_UNSUPPORTED_ALLOCATE_ERRNOS = {errno.EINVAL, errno.ENOSYS, getattr(errno, "EOPNOTSUPP", errno.EINVAL)}
+
+
+class PartFileStore:
+    """每个区间写入隐藏的 ``.<name>.partN``，全部完成后交给 ``_merge_temp_files_atomically``。"""
+
+    single_file = False
+
+    def __init__(self, temp_dir: str, base_name: str) -> None:
+        self.temp_dir = temp_dir
+        self.base_name = base_name
+
+    def part_path(self, part_id: int) -> str:
+        return os.path.join(self.temp_dir, f".{self.base_name}.part{part_id}")
+
+    def owned_paths(self) -> list[str]:
+        return []
+
+    def prepare_attempt(self, task: RangeTask, *, resume_enabled: bool) -> int:
+        """以分片文件长度作为续传起点；超长的旧分片说明来自其他布局，清空重下。"""
+        path = self.part_path(task.part_id)
+        if not resume_enabled or not os.path.exists(path):
+            return 0
+        existing_size = os.path.getsize(path)
+        if existing_size > task.length:
+            with open(path, "wb"):
+                pass
+            return 0
+        return existing_size
+
+    @contextmanager
+    def open_range(self, task: RangeTask, existing_size: int) -> Iterator[RangeWrite]:
+        with open(self.part_path(task.part_id), "ab" if existing_size > 0 else "wb") as fp:
+            yield lambda _offset, data: fp.write(data)
+
+    def written_length(self, task: RangeTask) -> int:
+        return os.path.getsize(self.part_path(task.part_id))
+
+    def sync(self) -> None:
+        return None
+
+    def close(self) -> None:
+        return None
+
+
+class PreallocatedFileStore:
+    """预分配到完整大小的单个临时文件，各区间线程直接写到自己的偏移。
+
+    有 ``os.pwrite`` 的平台上所有线程共享一个描述符并发写；Windows 没有 ``pwrite``，
+    退化为加锁的 ``lseek + write``。完成后只需一次 ``os.replace``，不需要第二遍复制。
+    """
+
+    single_file = True
+
+    def __init__(self, path: str, total_size: int) -> None:
+        self.path = path
+        self.total_size = int(total_size)
+        self._fd: int | None = None
+        self._seek_lock = threading.Lock()
+
+    def owned_paths(self) -> list[str]:
+        return [self.path]
+
+    def open(self, *, reuse: bool) -> None:
+        """打开临时文件；``reuse`` 为真且长度一致时保留已写内容，否则重新分配。"""
+        flags = os.O_RDWR | os.O_CREAT | getattr(os, "O_BINARY", 0)
+        self._fd = os.open(self.path, flags, 0o644)
+        try:
+            if reuse and os.fstat(self._fd).st_size == self.total_size:
+                return
+            os.ftruncate(self._fd, 0)
+            self._allocate()
+        except OSError:
+            self.close()
+            raise
+
+    def _allocate(self) -> None:
+        assert self._fd is not None
+        allocate = getattr(os, "posix_fallocate", None)
+        if allocate is not None and self.total_size > 0:
+            try:
+                # 真正占用磁盘块：空间不足会在开始下载前就失败，而不是写到一半。
+                allocate(self._fd, 0, self.total_size)
+                return
+            except OSError as exc:
+                if exc.errno not in _UNSUPPORTED_ALLOCATE_ERRNOS:
+                    raise
+        os.ftruncate(self._fd, self.total_size)
+
+    def prepare_attempt(self, task: RangeTask, *, resume_enabled: bool) -> int:
+        """单文件没有可测量的分片长度，以调度器记录的已落盘字节作为续传起点。"""
+        return task.written if resume_enabled else 0
+
+    @contextmanager
+    def open_range(self, task: RangeTask, existing_size: int) -> Iterator[RangeWrite]:
+        del task, existing_size
+        yield self.write_at
+
+    def write_at(self, offset: int, data: bytes | memoryview) -> None:
+        if self._fd is None:
+            raise OSError(errno.EBADF, "range file is closed")
+        view = memoryview(data)
+        pwrite = getattr(os, "pwrite", None)
+        while view:
+            if pwrite is not None:
+                written = pwrite(self._fd, view, offset)
+            else:
+                with self._seek_lock:
+                    os.lseek(self._fd, offset, os.SEEK_SET)
+                    written = os.write(self._fd, view)
+            view = view[written:]
+            offset += written
+
+    def written_length(self, task: RangeTask) -> int:
+        return task.written
+
+    def sync(self) -> None:
+        if self._fd is not None:
+            os.fsync(self._fd)
+
+    def close(self) -> None:
+        if self._fd is not None:
+            try:
+                os.close(self._fd)
+            finally:
+                self._fd = None
@@ -12,6 +12,8 @@ from app.exceptions import DownloaderStoppedError, StreamDownloadError
 from app.models import VideoItem
 from app.models.download_context import DownloadContext
 
+from .bandwidth import task_weight
+
 @dataclass(slots=True)
 class DownloadRequest:
     """下载策略链共享的请求上下文，避免每个策略重复解析 VideoItem/meta。"""
@@ -60,6 +62,7 @@ class StrategyCapableDownloader(Protocol):
         proxy: str | None = None,
         trace_id: str | None = None,
         domain_policy=None,
+        bandwidth_weight: float = 1.0,
     ) -> None:
         ...
 
@@ -163,6 +166,7 @@ class HttpDownloadStrategy:
             proxy=request.context.proxy,
             trace_id=request.context.trace_id,
             domain_policy=downloader._domain_policy_for_item(request.video_item),
+            bandwidth_weight=task_weight(request.video_item),
         )
         return True
 
@@ -0,0 +1,113 @@
+"""HTTP 响应体的大缓冲读取：按吞吐自适应读块大小，并复用同一块缓冲区。"""
+
+from __future__ import annotations
+
+import time
+from typing import Any, Callable, Iterator
+
+import requests
+from urllib3.exceptions import DecodeError, ProtocolError, ReadTimeoutError, SSLError
+from urllib3.response import BaseHTTPResponse
+
+# 读取会阻塞到整块收满：下限取小，慢速连接上两次停止检查和限速等待之间不会隔太久。
+MIN_READ_SIZE = 16 * 1024
+MAX_READ_SIZE = 4 * 1024 * 1024
+# 每次读取大约覆盖这么长的传输时间：慢速连接保持小块以便及时响应停止，快速连接放大块降低循环次数。
+TARGET_READ_SECONDS = 0.05
+PROGRESS_INTERVAL_SECONDS = 0.25
+
+
+class AdaptiveReadSizer:
+    """根据最近吞吐的指数滑动平均，在 ``[min_size, max_size]`` 内按 2 的幂调整读块大小。"""
+
+    def __init__(
+        self,
+        *,
+        min_size: int = MIN_READ_SIZE,
+        max_size: int = MAX_READ_SIZE,
+        target_seconds: float = TARGET_READ_SECONDS,
+    ) -> None:
+        self.min_size = max(1, int(min_size))
+        self.max_size = max(self.min_size, int(max_size))
+        self.target_seconds = max(0.001, float(target_seconds))
+        self.size = self.min_size
+        self._throughput = 0.0
+
+    def observe(self, byte_count: int, elapsed: float) -> int:
+        if byte_count <= 0:
+            return self.size
+        sample = byte_count / max(elapsed, 1e-6)
+        self._throughput = sample if self._throughput <= 0 else self._throughput * 0.7 + sample * 0.3
+        desired = self._throughput * self.target_seconds
+        size = self.min_size
+        while size < self.max_size and size * 2 <= desired:
+            size *= 2
+        self.size = size
+        return size
+
+    def capped(self, bytes_per_second: int) -> int:
+        """按限速封顶：读取的数据从套接字缓冲区来得再快，也只按限速能在目标时长内放行的量读。"""
+        if bytes_per_second <= 0:
+            return self.size
+        size = self.min_size
+        while size < self.size and size * 2 <= bytes_per_second * self.target_seconds:
+            size *= 2
+        return size
+
+
+class ProgressThrottle:
+    """按时间而不是按块节流进度回调；完成时由调用方强制放行最后一次。"""
+
+    def __init__(self, interval: float = PROGRESS_INTERVAL_SECONDS, clock: Callable[[], float] = time.monotonic) -> None:
+        self.interval = max(0.0, float(interval))
+        self._clock = clock
+        self._last_emit: float | None = None
+
+    def ready(self, *, force: bool = False) -> bool:
+        now = self._clock()
+        if force or self._last_emit is None or now - self._last_emit >= self.interval:
+            self._last_emit = now
+            return True
+        return False
+
+
+def iter_response_buffers(
+    response: Any,
+    *,
+    fallback_chunk_size: int,
+    sizer: AdaptiveReadSizer | None = None,
+    rate_limiter: Any = None,
+) -> Iterator[memoryview | bytes]:
+    """逐块产出响应体；真实 urllib3 流用可复用 ``bytearray`` 读入，其余对象回退 ``iter_content``。
+
+    传入 ``rate_limiter`` 时读块大小再按其 ``bytes_per_second`` 封顶（每次读取时重新取值）。
+
+    产出的 ``memoryview`` 指向同一块缓冲区，调用方必须在请求下一块之前写完或复制它。
+    底层异常按 ``requests`` 的 ``iter_content`` 规则转换，调用方的重试分支保持不变。
+    """
+    raw = getattr(response, "raw", None)
+    if not isinstance(raw, BaseHTTPResponse):
+        yield from response.iter_content(chunk_size=fallback_chunk_size)
+        return
+    sizer = sizer or AdaptiveReadSizer()
+    # 与 iter_content 一致地解开 gzip/deflate 等传输编码。
+    raw.decode_content = True
+    buffer = bytearray(sizer.max_size)
+    view = memoryview(buffer)
+    while True:
+        started = time.perf_counter()
+        try:
+            size = sizer.size if rate_limiter is None else sizer.capped(rate_limiter.bytes_per_second)
+            read_count = raw.readinto(view[:size])
+        except ProtocolError as exc:
+            raise requests.exceptions.ChunkedEncodingError(exc) from exc
+        except DecodeError as exc:
+            raise requests.exceptions.ContentDecodingError(exc) from exc
+        except ReadTimeoutError as exc:
+            raise requests.exceptions.ConnectionError(exc) from exc
+        except SSLError as exc:
+            raise requests.exceptions.SSLError(exc) from exc
+        if not read_count:
+            return
+        sizer.observe(read_count, time.perf_counter() - started)
+        yield view[:read_count]
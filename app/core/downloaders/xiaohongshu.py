@@ -11,6 +11,7 @@ from app.exceptions import DownloaderStoppedError
 from app.models import VideoItem
 from app.utils.filenames import sanitize_filename
 
+from .bandwidth import task_weight
 from .base import BaseDownloader, ProgressCallback, StopCheck
 
 class XiaohongshuDownloader(BaseDownloader):
@@ -176,6 +177,7 @@ class XiaohongshuDownloader(BaseDownloader):
                 error_message=f"小红书图片下载失败: {base_name}_{idx}",
                 proxy=video_item.meta.get("proxy"),
                 domain_policy=self._domain_policy_for_item(video_item),
+                bandwidth_weight=task_weight(video_item),
             )
             return idx, target_path
 
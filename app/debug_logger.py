@@ -1,14 +1,26 @@
 """提供线程安全的调试日志、敏感信息脱敏与 trace_id 生成。"""
 
+import atexit
 import json
+import os
 import re
 import threading
 import multiprocessing
 import time
 import uuid
+from collections import deque
 from datetime import datetime
-from typing import Any
-
+from pathlib import Path
+from typing import IO, Any
+
+from app.utils.log_sidecar import (
+    INDEX_SUFFIX,
+    SIDECAR_SUFFIX,
+    EncodedRecord,
+    append_records,
+    encode_record,
+    sidecar_paths,
+)
 from app.utils.runtime_paths import user_logs_root
 
 _TRACE_PREFIX_ALIASES = {
@@ -25,6 +37,13 @@ _TRACE_PREFIX_ALIASES = {
 }
 _VALID_RETENTION_DAYS = {1, 3, 5, 7}
 _DEFAULT_RETENTION_DAYS = 1
+_LOG_QUEUE_CAPACITY = 8192
+_LOG_FLUSH_INTERVAL_SECONDS = 0.2
+_LOG_FLUSH_BATCH_BYTES = 256 * 1024
+_LOG_FLUSH_TIMEOUT_SECONDS = 5.0
+_LOG_BLOCK_POLL_SECONDS = 0.1
+_OVERFLOW_POLICIES = ("drop_oldest", "block")
+_DEFAULT_OVERFLOW = "drop_oldest"
 
 def normalize_trace_prefix(prefix: str = "trace") -> str:
     """把前端追踪前缀规整为稳定的 platform_name 片段。"""
@@ -42,6 +61,296 @@ def normalize_trace_prefix(prefix: str = "trace") -> str:
         tail.append(str(normalized))
     return "_".join([base, *tail])
 
+# 结构化记录以 (记录字典, 毫秒时间戳) 入队，JSON 编码留给写线程，调用方线程只做格式化。
+_PendingStructured = tuple[dict[str, Any], int]
+_QueuedRecord = tuple[tuple[Path, ...], str | None, _PendingStructured | None]
+
+
+class _BatchedLogWriter:
+    """单线程日志写入器：调用方只把预格式化文本放入有界队列，写线程常驻持有文件句柄并按批刷盘。
+
+    队列满时按 ``overflow`` 处理：``drop_oldest`` 丢弃最旧记录并计数，``block`` 让调用方等待写线程腾出空间。
+    带结构化记录的条目同时追加到目标文件的 JSONL 旁路和偏移索引；截断请求与写入按入队顺序执行。
+    """
+
+    def __init__(
+        self,
+        *,
+        capacity: int = _LOG_QUEUE_CAPACITY,
+        flush_interval_seconds: float = _LOG_FLUSH_INTERVAL_SECONDS,
+        batch_bytes: int = _LOG_FLUSH_BATCH_BYTES,
+        overflow: str = _DEFAULT_OVERFLOW,
+    ) -> None:
+        self._capacity = max(1, int(capacity))
+        self._flush_interval_seconds = max(0.0, float(flush_interval_seconds))
+        self._batch_bytes = max(1, int(batch_bytes))
+        self._overflow = overflow if overflow in _OVERFLOW_POLICIES else _DEFAULT_OVERFLOW
+        self._reset_state()
+
+    def _reset_state(self) -> None:
+        self._condition = threading.Condition()
+        # 条目为 (目标文本日志, 文本, 结构化记录)；文本为 None 表示按序截断目标文件。
+        self._records: deque[_QueuedRecord] = deque()
+        self._pending_bytes = 0
+        self._enqueued = 0
+        self._completed = 0
+        self._flush_requested = False
+        self._closing = False
+        self._thread: threading.Thread | None = None
+        # 句柄只由写线程访问；close() 在写线程退出后才接管。
+        self._handles: dict[Path, IO[Any]] = {}
+        self._counters = {
+            "written": 0,
+            "dropped": 0,
+            "batches": 0,
+            "write_errors": 0,
+            "sidecar_errors": 0,
+            "blocked": 0,
+        }
+
+    @property
+    def overflow(self) -> str:
+        return self._overflow
+
+    def set_overflow(self, overflow: str) -> None:
+        normalized = str(overflow or "").strip().lower()
+        with self._condition:
+            self._overflow = normalized if normalized in _OVERFLOW_POLICIES else _DEFAULT_OVERFLOW
+            self._condition.notify_all()
+
+    def submit(self, targets: tuple[Path, ...], content: str, record: _PendingStructured | None = None) -> None:
+        with self._condition:
+            self._ensure_thread()
+            if len(self._records) >= self._capacity:
+                if self._overflow == "block" and threading.current_thread() is not self._thread:
+                    self._counters["blocked"] += 1
+                    while len(self._records) >= self._capacity and self._overflow == "block":
+                        self._flush_requested = True
+                        self._condition.notify_all()
+                        self._condition.wait(_LOG_BLOCK_POLL_SECONDS)
+                        self._ensure_thread()
+                while len(self._records) >= self._capacity:
+                    self._drop_oldest_locked()
+            self._records.append((targets, content, record))
+            self._pending_bytes += self._queued_size(content, record)
+            self._enqueued += 1
+            if self._pending_bytes >= self._batch_bytes:
+                self._condition.notify_all()
+
+    def truncate(self, targets: tuple[Path, ...]) -> None:
+        """排在已入队记录之后清空目标文本日志及其旁路；截断请求不占容量也不会被丢弃。"""
+        with self._condition:
+            self._ensure_thread()
+            self._records.append((targets, None, None))
+            self._enqueued += 1
+            self._condition.notify_all()
+
+    def flush(self, timeout: float = _LOG_FLUSH_TIMEOUT_SECONDS) -> bool:
+        """等待调用前入队的记录全部落盘；超时返回 False，不抛异常。"""
+        with self._condition:
+            target = self._enqueued
+            if self._completed >= target:
+                return True
+            if threading.current_thread() is self._thread:
+                return False
+            self._ensure_thread()
+            self._flush_requested = True
+            self._condition.notify_all()
+            return self._condition.wait_for(lambda: self._completed >= target, timeout)
+
+    def close(self, timeout: float = _LOG_FLUSH_TIMEOUT_SECONDS) -> None:
+        """刷盘后停止写线程并关闭文件句柄；之后再写入会重新启动写线程。"""
+        with self._condition:
+            thread = self._thread
+            self._closing = True
+            self._condition.notify_all()
+        if thread is not None and thread is not threading.current_thread():
+            thread.join(timeout)
+        with self._condition:
+            if self._thread is thread:
+                self._thread = None
+            self._closing = False
+            handles, self._handles = self._handles, {}
+        for handle in handles.values():
+            try:
+                handle.close()
+            except OSError:
+                pass
+
+    def stats(self) -> dict[str, Any]:
+        with self._condition:
+            return {
+                **self._counters,
+                "queued": len(self._records),
+                "queued_bytes": self._pending_bytes,
+                "capacity": self._capacity,
+                "overflow": self._overflow,
+            }
+
+    def _drop_oldest_locked(self) -> None:
+        for position, (_targets, content, record) in enumerate(self._records):
+            if content is None:
+                continue
+            del self._records[position]
+            self._pending_bytes -= self._queued_size(content, record)
+            self._counters["dropped"] += 1
+            return
+
+    @staticmethod
+    def _queued_size(content: str, record: _PendingStructured | None) -> int:
+        # 结构化记录尚未编码，其正文即文本详情，按文本长度估算旁路字节数。
+        return len(content) * (2 if record is not None else 1)
+
+    def _ensure_thread(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._thread = threading.Thread(target=self._run, name="ucrawl-debug-log", daemon=True)
+        self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            with self._condition:
+                while not self._records and not self._closing:
+                    self._condition.wait()
+                # 合并窗口：攒够字节数、收到 flush 请求或到时即写，单条日志最多延迟一个窗口。
+                deadline = time.monotonic() + self._flush_interval_seconds
+                while (
+                    self._records
+                    and not self._closing
+                    and not self._flush_requested
+                    and self._pending_bytes < self._batch_bytes
+                ):
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._condition.wait(remaining)
+                batch = list(self._records)
+                self._records.clear()
+                self._pending_bytes = 0
+                self._flush_requested = False
+                target = self._enqueued
+                closing = self._closing
+                # 唤醒 block 策略下等待空间的调用方。
+                self._condition.notify_all()
+            self._write_batch(batch)
+            with self._condition:
+                self._completed = max(self._completed, target)
+                self._condition.notify_all()
+            if closing and not batch:
+                return
+
+    def _write_batch(self, batch: list[_QueuedRecord]) -> None:
+        if not batch:
+            return
+        active: set[Path] = set()
+        for targets, _content, _record in batch:
+            for path in targets:
+                active.add(path)
+                active.update(sidecar_paths(path))
+        # 目标文件切换（如测试或会话重建）后释放旧句柄，避免长期占用已废弃的日志文件。
+        for stale in [path for path in self._handles if path not in active]:
+            self._close_handle(stale)
+        segment: list[_QueuedRecord] = []
+        written = 0
+        for queued in batch:
+            if queued[1] is None:
+                written += self._write_segment(segment)
+                segment = []
+                self._truncate_files(queued[0])
+            else:
+                segment.append(queued)
+        written += self._write_segment(segment)
+        with self._condition:
+            self._counters["batches"] += 1
+            self._counters["written"] += written
+
+    def _write_segment(self, segment: list[_QueuedRecord]) -> int:
+        if not segment:
+            return 0
+        grouped: dict[Path, list[str]] = {}
+        structured: dict[Path, list[EncodedRecord]] = {}
+        sidecar_failed = 0
+        for targets, content, pending in segment:
+            # 同一条记录写往多个目标时只编码一次；无法序列化的记录只丢旁路，文本照常写出。
+            record = None
+            if pending is not None:
+                try:
+                    record = encode_record(pending[0], timestamp_ms=pending[1])
+                except (TypeError, ValueError):
+                    sidecar_failed += len(targets)
+            for path in targets:
+                grouped.setdefault(path, []).append(content or "")
+                if record is not None:
+                    structured.setdefault(path, []).append(record)
+        # 旁路先于文本落盘：读端以文本文件指纹判断是否刷新时，旁路里一定已有对应记录。
+        for path, records in structured.items():
+            if not self._write_sidecar(path, records):
+                sidecar_failed += len(records)
+        failed = 0
+        for path, parts in grouped.items():
+            if not self._write_file(path, "".join(parts)):
+                failed += len(parts)
+        with self._condition:
+            self._counters["write_errors"] += failed
+            self._counters["sidecar_errors"] += sidecar_failed
+        return len(segment)
+
+    def _write_sidecar(self, path: Path, records: list[EncodedRecord]) -> bool:
+        sidecar_path, index_path = sidecar_paths(path)
+        try:
+            sidecar = self._open_handle(sidecar_path, "ab")
+            index = self._open_handle(index_path, "ab")
+            append_records(sidecar, index, records)
+            return True
+        except (OSError, ValueError):
+            # 旁路写失败不重试：半条正文不会被索引引用，下一批按实际文件长度继续追加。
+            self._close_handle(sidecar_path)
+            self._close_handle(index_path)
+            return False
+
+    def _truncate_files(self, targets: tuple[Path, ...]) -> None:
+        for path in targets:
+            for target in (path, *sidecar_paths(path)):
+                self._close_handle(target)
+                try:
+                    with open(target, "wb"):
+                        pass
+                except OSError:
+                    continue
+
+    def _open_handle(self, path: Path, mode: str) -> IO[Any]:
+        handle = self._handles.get(path)
+        if handle is None:
+            handle = open(path, mode, encoding=None if "b" in mode else "utf-8")
+            self._handles[path] = handle
+        return handle
+
+    def _write_file(self, path: Path, content: str) -> bool:
+        # 杀毒扫描或日志查看器仍可能短时锁住日志文件；重试只发生在写线程，不阻塞业务调用方。
+        for attempt in range(3):
+            try:
+                handle = self._open_handle(path, "a")
+                handle.write(content)
+                handle.flush()
+                return True
+            except (OSError, PermissionError, ValueError):
+                self._close_handle(path)
+                if attempt == 2:
+                    # 文件不可写时只丢弃本批日志，不向业务调用方抛异常。
+                    return False
+                time.sleep(0.05 * (attempt + 1))
+        return False
+
+    def _close_handle(self, path: Path) -> None:
+        handle = self._handles.pop(path, None)
+        if handle is None:
+            return
+        try:
+            handle.close()
+        except (OSError, ValueError):
+            pass
+
+
 class DebugLogger:
     """以便于排障的文本格式记录日志，并在写入前统一脱敏。"""
 
@@ -73,13 +382,17 @@ class DebugLogger:
         self.latest_file = self.logs_dir / "latest_debug.log"
         self.latest_error_summary_file = self.logs_dir / "latest_error_summary.md"
         self._lock = threading.Lock()
+        self._writer = _BatchedLogWriter()
         self._min_level = self.LEVEL_ORDER["INFO"]
         self._retention_days = _DEFAULT_RETENTION_DAYS
         self._last_cleanup_policy: tuple[int, str] | None = None
+        self._latest_clear_generation = 0
 
         # Windows 可能短暂持有日志文件锁，因此初始化也走有限重试的安全写入路径。
         if self._is_main_process:
             self._safe_write_text(self.latest_file, "")
+            for sidecar in sidecar_paths(self.latest_file):
+                self._safe_write_text(sidecar, "")
             self._safe_write_text(
                 self.latest_error_summary_file,
                 "# 最近错误摘要\n\n当前会话暂无错误。\n",
@@ -92,8 +405,11 @@ class DebugLogger:
         level: str | None = None,
         retention_days: int | None = None,
         cleanup_old_logs: bool | None = None,
+        overflow: str | None = None,
     ) -> None:
         """应用 GUI 与 Web 共用的运行时日志设置。"""
+        if overflow is not None:
+            self._writer.set_overflow(overflow)
         if level is not None:
             normalized_level = str(level or "info").strip().upper()
             self._min_level = self.LEVEL_ORDER.get(normalized_level, self.LEVEL_ORDER["INFO"])
@@ -117,9 +433,21 @@ class DebugLogger:
         except (TypeError, ValueError):
             days = _DEFAULT_RETENTION_DAYS
         cutoff = time.time() - days * 24 * 60 * 60
-        keep_paths = {self.session_file.resolve(), self.latest_file.resolve(), self.latest_error_summary_file.resolve()}
+        keep_paths = {
+            path.resolve()
+            for path in (
+                self.session_file,
+                *sidecar_paths(self.session_file),
+                self.latest_file,
+                *sidecar_paths(self.latest_file),
+                self.latest_error_summary_file,
+            )
+        }
         removed = 0
-        for path in self.logs_dir.glob("debug_*.log"):
+        # 结构化旁路与索引随会话文本日志一起过期。
+        for path in self.logs_dir.glob("debug_*"):
+            if path.suffix not in {".log", SIDECAR_SUFFIX, INDEX_SUFFIX}:
+                continue
             try:
                 resolved = path.resolve()
                 if resolved in keep_paths or path.stat().st_mtime >= cutoff:
@@ -243,32 +571,63 @@ class DebugLogger:
             return "[已脱敏]"
         return "***"
 
-    def _append_lines(self, lines: list[str]):
-        content = "\n".join(lines) + "\n"
-        import time as _time
+    def flush(self, timeout: float = _LOG_FLUSH_TIMEOUT_SECONDS) -> bool:
+        """等待已入队日志写入会话文件和 latest_debug.log；超时返回 False。"""
+        return self._writer.flush(timeout)
+
+    def close(self) -> None:
+        """刷盘并释放常驻文件句柄；之后仍可继续记录，写线程会按需重启。"""
+        self._writer.close()
+
+    def stats(self) -> dict[str, Any]:
+        """写入队列深度、丢弃条数与批次计数，供诊断面板和基准测试读取。"""
+        return self._writer.stats()
+
+    def clear_latest(self) -> None:
+        """清空 latest_debug.log 及其结构化旁路；由写线程排在已入队日志之后执行。
+
+        清空后递增 ``latest_clear_generation``，尾读方据此丢弃按记录序号记下的旧状态。
+        """
+        self._writer.truncate((self.latest_file,))
+        self._writer.flush()
         with self._lock:
-            # 杀毒扫描或日志查看器仍可能短时锁住独立会话文件，有限重试后再降级。
-            for attempt in range(3):
-                try:
-                    with open(self.session_file, "a", encoding="utf-8") as fp:
-                        fp.write(content)
-                    break
-                except (OSError, PermissionError):
-                    if attempt == 2:
-                        # 会话文件不可写时只丢弃本批日志，不向业务调用方抛异常。
-                        return
-                    _time.sleep(0.05 * (attempt + 1))
-            # latest_debug.log 只反映主进程，避免 Web 子进程覆盖 GUI 的诊断上下文。
-            if self._is_main_process:
-                for attempt in range(3):
-                    try:
-                        with open(self.latest_file, "a", encoding="utf-8") as fp:
-                            fp.write(content)
-                        break
-                    except (OSError, PermissionError):
-                        if attempt == 2:
-                            return
-                        _time.sleep(0.05 * (attempt + 1))
+            self._latest_clear_generation += 1
+
+    @property
+    def latest_clear_generation(self) -> int:
+        return self._latest_clear_generation
+
+    def _append_lines(self, lines: list[str], record: dict[str, Any] | None = None):
+        # latest_debug.log 只反映主进程，避免 Web 子进程覆盖 GUI 的诊断上下文。
+        targets = (self.session_file, self.latest_file) if self._is_main_process else (self.session_file,)
+        pending = None
+        if record is not None:
+            # 结构化记录与文本同批入队，详情沿用文本正文，读端无需再解析多行格式；JSON 编码在写线程完成。
+            record["detail"] = "\n".join(lines[2:]).strip()
+            pending = (record, int(time.time() * 1000))
+        self._writer.submit(targets, "\n".join(lines) + "\n", pending)
+
+    @staticmethod
+    def _structured_record(
+        stamp: str,
+        level: str,
+        component: str,
+        action: str,
+        message: str,
+        status_code: int | str | None,
+        trace_id: str | None,
+    ) -> dict[str, Any]:
+        record: dict[str, Any] = {
+            "time": stamp,
+            "level": level,
+            "source": str(component),
+            "action": str(action),
+            "message": message,
+            "trace_id": str(trace_id or ""),
+        }
+        if status_code is not None:
+            record["status_code"] = str(status_code)
+        return record
 
     def _clean_mapping(self, data: dict[str, Any] | None) -> dict[str, Any]:
         if not data:
@@ -390,6 +749,8 @@ class DebugLogger:
         for item in suggestions:
             lines.append(f"- {item}")
         lines.append("")
+        # 先让本条错误及其之前的上下文落盘，摘要指向的会话日志才完整。
+        self.flush()
         with self._lock:
             # 摘要与普通日志共享 Windows 文件锁降级策略。
             self._safe_write_text(self.latest_error_summary_file, "\n".join(lines))
@@ -482,9 +843,10 @@ class DebugLogger:
         message = self._mask_inline_secret(str(message))
         context = self._clean_mapping(context)
         details = self._clean_mapping(details)
+        stamp = self._now()
         lines = [
             "-" * 88,
-            f"[{self._now()}] [{level.upper()}] {component} / {action}",
+            f"[{stamp}] [{level.upper()}] {component} / {action}",
         ]
         if message:
             lines.append(f"说明: {message}")
@@ -495,7 +857,10 @@ class DebugLogger:
         lines.extend(self._format_mapping("上下文", context))
         lines.extend(self._format_mapping("详情", details))
         lines.append("")
-        self._append_lines(lines)
+        self._append_lines(
+            lines,
+            self._structured_record(stamp, level.upper(), component, action, message, status_code, trace_id),
+        )
         if level.upper() == "ERROR":
             self._write_error_summary(component, action, message, status_code, trace_id, context, details)
 
@@ -515,9 +880,10 @@ class DebugLogger:
         message = self._mask_inline_secret(str(message))
         request = self._clean_mapping(request)
         response_summary = self._clean_mapping(response_summary)
+        stamp = self._now()
         lines = [
             "-" * 88,
-            f"[{self._now()}] [{level.upper()}] {component} / API::{api_name}",
+            f"[{stamp}] [{level.upper()}] {component} / API::{api_name}",
         ]
         if message:
             lines.append(f"说明: {message}")
@@ -528,7 +894,12 @@ class DebugLogger:
         lines.extend(self._format_mapping("请求", request))
         lines.extend(self._format_mapping("响应摘要", response_summary))
         lines.append("")
-        self._append_lines(lines)
+        self._append_lines(
+            lines,
+            self._structured_record(
+                stamp, level.upper(), component, f"API::{api_name}", message, status_code, trace_id
+            ),
+        )
         if level.upper() == "ERROR":
             self._write_error_summary(component, f"API::{api_name}", message, status_code, trace_id, request, response_summary)
 
@@ -547,9 +918,10 @@ class DebugLogger:
             details["args"] = self._redact_command_args(command_args)
         message = self._mask_inline_secret(str(message))
         context = self._clean_mapping(context)
+        stamp = self._now()
         lines = [
             "-" * 88,
-            f"[{self._now()}] [COMMAND] {component} / {tool_name}",
+            f"[{stamp}] [COMMAND] {component} / {tool_name}",
         ]
         if message:
             lines.append(f"说明: {message}")
@@ -558,7 +930,10 @@ class DebugLogger:
         lines.extend(self._format_mapping("上下文", context))
         lines.extend(self._format_mapping("参数", details))
         lines.append("")
-        self._append_lines(lines)
+        self._append_lines(
+            lines,
+            self._structured_record(stamp, "COMMAND", component, tool_name, message, None, trace_id),
+        )
 
     def log_exception(
         self,
@@ -587,8 +962,18 @@ def get_debug_logger() -> DebugLogger:
     global _debug_logger_singleton
     if _debug_logger_singleton is None:
         _debug_logger_singleton = DebugLogger()
+        # 写线程是守护线程，解释器退出前显式刷盘，避免丢失最后一批日志。
+        atexit.register(_debug_logger_singleton.close)
     return _debug_logger_singleton
 
+def _reset_writer_after_fork() -> None:
+    # fork 出的子进程只继承父进程的写线程对象而没有线程本身；父进程队列由父进程负责落盘。
+    if _debug_logger_singleton is not None:
+        _debug_logger_singleton._writer._reset_state()
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_writer_after_fork)
+
 class DebugLoggerProxy:
     """惰性代理，避免模块导入时立刻创建日志目录和文件。"""
 
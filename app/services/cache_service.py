@@ -2,14 +2,16 @@
 
 from __future__ import annotations
 
+import atexit
 import base64
 import json
 import math
 import sqlite3
 import threading
 import time
-from contextlib import closing
+import weakref
 from copy import deepcopy
+from dataclasses import dataclass
 from importlib import import_module
 from pathlib import Path
 from typing import Any
@@ -22,6 +24,13 @@ _PERSISTENT_FORMAT_PREFIX = b"UCACHE2\n"
 _PERSISTENT_TYPE_KEY = "__ucache_type__"
 _MAX_PERSISTENT_PAYLOAD_BYTES = 64 * 1024 * 1024
 _MAX_PERSISTENT_DEPTH = 64
+_DEFAULT_WRITE_BEHIND_SECONDS = 0.5
+_DEFAULT_SWEEP_INTERVAL_SECONDS = 300.0
+_DEFAULT_MAX_PERSISTENT_BYTES = 128 * 1024 * 1024
+_DEFAULT_MAX_PERSISTENT_ROWS = 10_000
+_SQLITE_BUSY_TIMEOUT_SECONDS = 5.0
+# 这些类型的实例不可变，读写时可以直接共享而无需深拷贝。
+_IMMUTABLE_SCALAR_TYPES = frozenset({type(None), bool, int, float, complex, str, bytes})
 
 
 def _pack_persistent_value(value: Any, *, depth: int = 0) -> Any:
@@ -193,11 +202,49 @@ class _FallbackTTLCache(dict):
                 self.pop(key, None)
                 self._expires.pop(key, None)
 
+
+@dataclass(frozen=True, slots=True)
+class _PendingWrite:
+    """写回队列里尚未提交的持久化项；``value`` 是与内存层共享的隔离副本。"""
+
+    payload: bytes
+    expires_at: float | None
+    value: Any
+
+
+def _close_connection_quietly(conn: sqlite3.Connection) -> None:
+    try:
+        conn.close()
+    except sqlite3.Error:
+        pass
+
+
+class _ThreadConnection:
+    """线程私有的 SQLite 连接；线程退出时 ``threading.local`` 释放本对象，终结器随之关闭连接。"""
+
+    __slots__ = ("conn", "__weakref__")
+
+    def __init__(self, conn: sqlite3.Connection) -> None:
+        self.conn: sqlite3.Connection | None = conn
+        weakref.finalize(self, _close_connection_quietly, conn)
+
+
+def _is_immutable_value(value: Any, *, depth: int = 0) -> bool:
+    """精确类型判断，子类（如带可变属性的 str 子类）仍走深拷贝。"""
+    if type(value) in _IMMUTABLE_SCALAR_TYPES:
+        return True
+    if depth >= _MAX_PERSISTENT_DEPTH or type(value) not in (tuple, frozenset):
+        return False
+    return all(_is_immutable_value(item, depth=depth + 1) for item in value)
+
+
 class CacheService:
     """混合缓存：热路径读内存，需要跨启动保留时再落盘。
 
     内存读写一致性只由单个 ``CacheService`` 实例内的锁保证，不提供跨实例或跨进程
-    一致性。持久化 TTL 按键惰性检查，不是 SQLite 全局保留量上限，也没有全表过期清理。
+    一致性。持久化写入先进入写回队列，由后台线程合并成一个事务提交；每个线程复用
+    一条 WAL 模式的 SQLite 连接。后台清理按过期时间和最近访问时间（LRU）把库收敛到
+    ``max_persistent_bytes`` / ``max_persistent_rows`` 以内，上限 ``<= 0`` 表示不限制。
     """
 
     def __init__(
@@ -207,52 +254,123 @@ class CacheService:
         memory_ttl_seconds: float = 5.0,
         memory_maxsize: int = 256,
         cache_dir: str | None = None,
+        write_behind_seconds: float = _DEFAULT_WRITE_BEHIND_SECONDS,
+        sweep_interval_seconds: float = _DEFAULT_SWEEP_INTERVAL_SECONDS,
+        max_persistent_bytes: int = _DEFAULT_MAX_PERSISTENT_BYTES,
+        max_persistent_rows: int = _DEFAULT_MAX_PERSISTENT_ROWS,
     ) -> None:
         cache_root = Path(cache_dir or (Path(user_data_root()) / "cache"))
         cache_root.mkdir(parents=True, exist_ok=True)
+        self._namespace = namespace
         self._db_path = cache_root / f"{namespace}.sqlite3"
         self._operation_lock = threading.RLock()
         self._memory_lock = threading.RLock()
         cache_cls = CachetoolsTTLCache or _FallbackTTLCache
         self._memory_cache = cache_cls(maxsize=memory_maxsize, ttl=memory_ttl_seconds)
         self._db_lock = threading.RLock()
+        self._write_behind_seconds = max(0.0, float(write_behind_seconds))
+        self._sweep_interval_seconds = max(1.0, float(sweep_interval_seconds))
+        self._max_persistent_bytes = int(max_persistent_bytes)
+        self._max_persistent_rows = int(max_persistent_rows)
+        # 连接挂在 threading.local 上随线程释放；弱引用集合只用于 close() 关闭仍存活线程的连接。
+        self._local = threading.local()
+        self._connections: weakref.WeakSet[_ThreadConnection] = weakref.WeakSet()
+        self._connections_lock = threading.Lock()
+        self._pending: dict[str, _PendingWrite] = {}
+        self._touched: dict[str, float] = {}
+        self._pending_lock = threading.Lock()
+        self._writer: threading.Thread | None = None
+        self._writer_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._closing = threading.Event()
+        # 写回线程启动后先做一次清理，收敛上次运行遗留的过期项和超额数据。
+        self._next_sweep_at = 0.0
+        self._counters = dict.fromkeys(
+            (
+                "memory_hits",
+                "persistent_hits",
+                "misses",
+                "writes",
+                "flushes",
+                "flush_errors",
+                "expired",
+                "evicted",
+                "sweeps",
+            ),
+            0,
+        )
+        self._stats_lock = threading.Lock()
         self._init_db()
+        _OPEN_SERVICES.add(self)
 
     def _init_db(self) -> None:
         with self._db_lock:
-            with closing(sqlite3.connect(self._db_path)) as conn:
-                conn.execute(
-                    """
-                    CREATE TABLE IF NOT EXISTS cache_entries (
-                        key TEXT PRIMARY KEY,
-                        value BLOB NOT NULL,
-                        expires_at REAL
-                    )
-                    """
+            conn = self._connection()
+            # WAL 是库文件级持久设置：读不阻塞写，提交只追加日志而不是重写主库页。
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS cache_entries (
+                    key TEXT PRIMARY KEY,
+                    value BLOB NOT NULL,
+                    expires_at REAL,
+                    accessed_at REAL NOT NULL DEFAULT 0
                 )
-                conn.commit()
+                """
+            )
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(cache_entries)")}
+            if "accessed_at" not in columns:
+                # 旧库迁移：历史行访问时间为 0，超额时最先被淘汰。
+                conn.execute("ALTER TABLE cache_entries ADD COLUMN accessed_at REAL NOT NULL DEFAULT 0")
+            conn.execute("CREATE INDEX IF NOT EXISTS cache_entries_accessed_at ON cache_entries(accessed_at)")
+            conn.commit()
+
+    def _connection(self) -> sqlite3.Connection:
+        """返回当前线程的长连接；线程退出时自动关闭，跨线程关闭只发生在 ``close()``。"""
+        holder = getattr(self._local, "connection", None)
+        if holder is not None and holder.conn is not None:
+            return holder.conn
+        conn = sqlite3.connect(
+            self._db_path,
+            timeout=_SQLITE_BUSY_TIMEOUT_SECONDS,
+            check_same_thread=False,
+        )
+        # WAL 下 NORMAL 只在检查点时 fsync，进程崩溃不丢已提交事务。
+        conn.execute("PRAGMA synchronous=NORMAL")
+        holder = _ThreadConnection(conn)
+        self._local.connection = holder
+        with self._connections_lock:
+            self._connections.add(holder)
+        return conn
 
     def get(self, key: str, default: Any = None) -> Any:
-        """优先读内存，未命中再读持久化；返回深拷贝避免外部修改缓存体。"""
+        """优先读内存，其次读写回队列和持久化；可变值返回深拷贝避免外部修改缓存体。"""
         with self._operation_lock:
             with self._memory_lock:
                 try:
-                    return self._clone_value(self._memory_cache[key])
+                    value = self._memory_cache[key]
                 except KeyError:
                     pass
-            record = self._read_local_persistent(key)
+                else:
+                    self._count("memory_hits")
+                    return self._clone_value(value)
+            record = self._read_pending(key) or self._read_local_persistent(key)
             if record is None:
+                self._count("misses")
                 return default
             value, expires_at = record
             if expires_at is not None and expires_at < time.time():
+                self._count("expired")
+                self._count("misses")
                 self.delete(key)
                 return default
+            self._count("persistent_hits")
             with self._memory_lock:
-                self._memory_cache[key] = self._clone_value(value)
+                self._memory_cache[key] = value
             return self._clone_value(value)
 
     def set(self, key: str, value: Any, *, ttl_seconds: float | None = None, persist: bool = False) -> None:
-        """persist=False 只更新内存；持久化写入先提交 SQLite，再发布内存副本。"""
+        """persist=False 只更新内存；持久化写入先同步编码入写回队列，再发布内存副本。"""
         value_snapshot = self._clone_value(value)
         if not persist:
             with self._operation_lock:
@@ -266,7 +384,7 @@ class CacheService:
                 self._memory_cache[key] = value_snapshot
 
     def delete(self, key: str) -> None:
-        """删除本实例内存项，并尽力删除 SQLite 项。
+        """删除本实例内存项、写回队列项，并尽力删除 SQLite 项。
 
         SQLite 删除失败只记录日志，不向调用方抛出；此时持久化旧项可能仍然存在。
         """
@@ -274,11 +392,15 @@ class CacheService:
             # 同一把操作锁覆盖热缓存失效和 SQLite 删除，避免并发 get 把旧值回填进内存。
             with self._memory_lock:
                 self._memory_cache.pop(key, None)
+            # 持有库锁再撤销排队写入，保证正在提交的批次不会在删除之后把旧值写回。
             with self._db_lock:
+                with self._pending_lock:
+                    self._pending.pop(key, None)
+                    self._touched.pop(key, None)
                 try:
-                    with closing(sqlite3.connect(self._db_path)) as conn:
+                    conn = self._connection()
+                    with conn:
                         conn.execute("DELETE FROM cache_entries WHERE key = ?", (key,))
-                        conn.commit()
                 except Exception as exc:
                     debug_logger.log_exception(
                         "CacheService",
@@ -287,11 +409,146 @@ class CacheService:
                         details={"key": key, "db_path": str(self._db_path)},
                     )
 
+    def flush(self) -> None:
+        """立即提交写回队列中的持久化写入和访问时间；失败只记录日志并丢弃该批。"""
+        with self._db_lock:
+            with self._pending_lock:
+                pending = dict(self._pending)
+                touched, self._touched = self._touched, {}
+            if not pending and not touched:
+                return
+            try:
+                self._write_sqlite_persistent(pending, touched)
+            except Exception as exc:
+                self._count("flush_errors")
+                debug_logger.log_exception(
+                    "CacheService",
+                    "flush_write_behind",
+                    exc,
+                    details={"rows": len(pending), "db_path": str(self._db_path)},
+                )
+            else:
+                self._count("flushes")
+            finally:
+                # 只移除本批提交的对象；提交期间被新 set 覆盖的项留给下一批。
+                with self._pending_lock:
+                    for key, entry in pending.items():
+                        if self._pending.get(key) is entry:
+                            del self._pending[key]
+
+    def sweep(self) -> None:
+        """删除已过期项，并按最近访问时间淘汰到字节数和行数上限以内。"""
+        self._next_sweep_at = time.monotonic() + self._sweep_interval_seconds
+        self.flush()
+        try:
+            with self._db_lock:
+                conn = self._connection()
+                with conn:
+                    expired = conn.execute(
+                        "DELETE FROM cache_entries WHERE expires_at IS NOT NULL AND expires_at < ?",
+                        (time.time(),),
+                    ).rowcount
+                    evicted = self._evict_least_recently_used(conn)
+        except sqlite3.Error as exc:
+            debug_logger.log_exception(
+                "CacheService",
+                "sweep",
+                exc,
+                details={"db_path": str(self._db_path)},
+            )
+            return
+        with self._stats_lock:
+            self._counters["sweeps"] += 1
+            self._counters["expired"] += max(0, expired)
+            self._counters["evicted"] += evicted
+
+    def stats(self) -> dict[str, Any]:
+        """命中/未命中计数、写回队列深度与持久化库当前行数和字节数。"""
+        with self._stats_lock:
+            snapshot: dict[str, Any] = dict(self._counters)
+        with self._pending_lock:
+            snapshot["pending_writes"] = len(self._pending)
+        hits = snapshot["memory_hits"] + snapshot["persistent_hits"]
+        lookups = hits + snapshot["misses"]
+        snapshot["hits"] = hits
+        snapshot["hit_rate"] = round(hits / lookups, 4) if lookups else 0.0
+        try:
+            rows, size = self._persistent_totals(self._connection())
+        except sqlite3.Error:
+            rows, size = -1, -1
+        snapshot.update(
+            rows=rows,
+            bytes=size,
+            max_rows=self._max_persistent_rows,
+            max_bytes=self._max_persistent_bytes,
+        )
+        return snapshot
+
     def close(self) -> None:
-        """保留统一生命周期接口；SQLite 连接均按操作即时关闭。"""
+        """停止写回线程、提交剩余写入并关闭各线程连接；可重复调用，之后再写入会重新启动。"""
+        with self._writer_lock:
+            writer, self._writer = self._writer, None
+            self._closing.set()
+            self._wake.set()
+        if writer is not None and writer is not threading.current_thread():
+            writer.join(timeout=_SQLITE_BUSY_TIMEOUT_SECONDS)
+        self.flush()
+        with self._db_lock:
+            with self._connections_lock:
+                holders = list(self._connections)
+                self._connections.clear()
+            for holder in holders:
+                conn, holder.conn = holder.conn, None
+                if conn is not None:
+                    _close_connection_quietly(conn)
+
+    def _count(self, name: str) -> None:
+        with self._stats_lock:
+            self._counters[name] += 1
+
+    def _ensure_writer(self) -> None:
+        with self._writer_lock:
+            if self._writer is not None and self._writer.is_alive():
+                return
+            self._closing.clear()
+            self._writer = threading.Thread(
+                target=self._writer_loop,
+                name=f"ucache-{self._namespace}",
+                daemon=True,
+            )
+            self._writer.start()
+
+    def _writer_loop(self) -> None:
+        while not self._closing.is_set():
+            self._wake.wait(max(0.0, self._next_sweep_at - time.monotonic()))
+            self._wake.clear()
+            if self._closing.is_set():
+                return
+            if self._write_behind_seconds:
+                # 合并窗口：窗口内的连续 set 共用一次提交和一次 WAL 追加。
+                self._closing.wait(self._write_behind_seconds)
+            try:
+                self.flush()
+                if time.monotonic() >= self._next_sweep_at:
+                    self.sweep()
+            except Exception as exc:
+                debug_logger.log_exception(
+                    "CacheService",
+                    "writer_loop",
+                    exc,
+                    details={"db_path": str(self._db_path)},
+                )
+
+    def _read_pending(self, key: str) -> tuple[Any, float | None] | None:
+        with self._pending_lock:
+            entry = self._pending.get(key)
+        if entry is None:
+            return None
+        return entry.value, entry.expires_at
 
     def _read_local_persistent(self, key: str) -> tuple[Any, float | None] | None:
         """持久化只走受控 SQLite BLOB，不委托第三方对象反序列化器。"""
+        self._ensure_writer()
         return self._read_persistent(key)
 
     def _write_persistent(
@@ -302,32 +559,49 @@ class CacheService:
         ttl_seconds: float | None,
         expires_at: float | None,
     ) -> None:
-        """先编码为安全类型树，再原子提交到 SQLite。"""
+        """同步编码为安全类型树（不支持的值直接抛出），提交交给写回线程。"""
         payload = _encode_persistent_value(value)
-        self._write_sqlite_persistent(key, payload, expires_at=expires_at)
-
-    def _write_sqlite_persistent(self, key: str, payload: bytes, *, expires_at: float | None) -> None:
-        with self._db_lock:
-            with closing(sqlite3.connect(self._db_path)) as conn:
-                conn.execute(
+        with self._pending_lock:
+            was_idle = not self._pending
+            self._pending[key] = _PendingWrite(payload, expires_at, value)
+            self._touched.pop(key, None)
+        self._count("writes")
+        self._ensure_writer()
+        if was_idle:
+            self._wake.set()
+
+    def _write_sqlite_persistent(self, pending: dict[str, _PendingWrite], touched: dict[str, float]) -> None:
+        now = time.time()
+        conn = self._connection()
+        with conn:
+            if pending:
+                conn.executemany(
                     """
-                    INSERT INTO cache_entries(key, value, expires_at)
-                    VALUES(?, ?, ?)
-                    ON CONFLICT(key) DO UPDATE SET value=excluded.value, expires_at=excluded.expires_at
+                    INSERT INTO cache_entries(key, value, expires_at, accessed_at)
+                    VALUES(?, ?, ?, ?)
+                    ON CONFLICT(key) DO UPDATE SET
+                        value=excluded.value,
+                        expires_at=excluded.expires_at,
+                        accessed_at=excluded.accessed_at
                     """,
-                    (key, payload, expires_at),
+                    [(key, entry.payload, entry.expires_at, now) for key, entry in pending.items()],
+                )
+            if touched:
+                conn.executemany(
+                    "UPDATE cache_entries SET accessed_at = ? WHERE key = ?",
+                    [(accessed_at, key) for key, accessed_at in touched.items()],
                 )
-                conn.commit()
 
     def _read_persistent(self, key: str) -> tuple[Any, float | None] | None:
         """读取 SQLite 兜底缓存；旧格式或损坏条目直接删除，不做对象反序列化。"""
-        with self._db_lock:
-            with closing(sqlite3.connect(self._db_path)) as conn:
-                row = conn.execute("SELECT value, expires_at FROM cache_entries WHERE key = ?", (key,)).fetchone()
+        row = self._connection().execute(
+            "SELECT value, expires_at FROM cache_entries WHERE key = ?",
+            (key,),
+        ).fetchone()
         if row is None:
             return None
         try:
-            return _decode_persistent_value(row[0]), row[1]
+            record = _decode_persistent_value(row[0]), row[1]
         except (UnicodeError, TypeError, ValueError, json.JSONDecodeError) as exc:
             debug_logger.log_exception(
                 "CacheService",
@@ -337,13 +611,17 @@ class CacheService:
             )
             self._delete_persistent_corrupt_entry(key)
             return None
+        # 访问时间只在内存里累积，随下一批写回一起提交，读路径不产生写事务。
+        with self._pending_lock:
+            self._touched[key] = time.time()
+        return record
 
     def _delete_persistent_corrupt_entry(self, key: str) -> None:
         try:
             with self._db_lock:
-                with closing(sqlite3.connect(self._db_path)) as conn:
+                conn = self._connection()
+                with conn:
                     conn.execute("DELETE FROM cache_entries WHERE key = ?", (key,))
-                    conn.commit()
         except sqlite3.Error as exc:
             debug_logger.log_exception(
                 "CacheService",
@@ -352,9 +630,48 @@ class CacheService:
                 details={"key": key, "db_path": str(self._db_path)},
             )
 
+    def _evict_least_recently_used(self, conn: sqlite3.Connection) -> int:
+        rows, size = self._persistent_totals(conn)
+        excess_rows = rows - self._max_persistent_rows if self._max_persistent_rows > 0 else 0
+        excess_bytes = size - self._max_persistent_bytes if self._max_persistent_bytes > 0 else 0
+        if excess_rows <= 0 and excess_bytes <= 0:
+            return 0
+        victims: list[tuple[str]] = []
+        cursor = conn.execute("SELECT key, length(value) FROM cache_entries ORDER BY accessed_at ASC")
+        try:
+            for key, entry_size in cursor:
+                if excess_rows <= 0 and excess_bytes <= 0:
+                    break
+                victims.append((key,))
+                excess_rows -= 1
+                excess_bytes -= entry_size or 0
+        finally:
+            cursor.close()
+        conn.executemany("DELETE FROM cache_entries WHERE key = ?", victims)
+        return len(victims)
+
+    @staticmethod
+    def _persistent_totals(conn: sqlite3.Connection) -> tuple[int, int]:
+        rows, size = conn.execute("SELECT COUNT(*), COALESCE(SUM(length(value)), 0) FROM cache_entries").fetchone()
+        return int(rows), int(size)
+
     @staticmethod
     def _clone_value(value: Any) -> Any:
+        if _is_immutable_value(value):
+            return value
         try:
             return deepcopy(value)
         except Exception as exc:
             raise TypeError("cache values must support isolated deep copies") from exc
+
+
+_OPEN_SERVICES: weakref.WeakSet[CacheService] = weakref.WeakSet()
+
+
+def _flush_open_services() -> None:
+    """解释器退出前提交所有实例的写回队列；守护写回线程不会等到这一步。"""
+    for service in list(_OPEN_SERVICES):
+        service.flush()
+
+
+atexit.register(_flush_open_services)
@@ -2,7 +2,7 @@ from __future__ import annotations
 
 import os
 from pathlib import Path
-from typing import Any, Mapping
+from typing import Any, Iterable, Mapping
 
 from app.services import frontend_video_adapter as video_adapter
 from app.services.media_metadata_service import MediaMetadataService
@@ -46,6 +46,28 @@ def has_media_metadata(meta: Mapping[str, Any], path: Path | None = None) -> boo
     return has_display_duration(meta.get("duration")) and video_adapter.is_real_resolution(resolution)
 
 
+def prefetch_completed_metadata(
+    service: Any,
+    items: Iterable[Any],
+    *,
+    queued_ids: set[str],
+    active_ids: set[str],
+) -> None:
+    """整批构建已完成列表前，把缺元数据的本地文件一次性交给持久化索引预热。"""
+    prefetch = getattr(service, "prefetch", None)
+    if not callable(prefetch):
+        return
+    paths = []
+    for item in items:
+        local_path = str(getattr(item, "local_path", "") or "")
+        if not local_path or video_adapter.bucket_for_item(item, queued_ids=queued_ids, active_ids=active_ids) != "completed":
+            continue
+        if not has_media_metadata(item.meta or {}, Path(local_path)):
+            paths.append(local_path)
+    if paths:
+        prefetch(paths)
+
+
 def normalize_completed_metadata_payload(metadata: Mapping[str, Any]) -> dict[str, str]:
     duration = video_adapter.display_duration(metadata.get("duration"))
     if not duration:
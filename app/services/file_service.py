@@ -4,22 +4,30 @@ import heapq
 import os
 import re
 import shutil
+import sqlite3
 import time
 from collections.abc import Iterable
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Callable, TypeVar
+from typing import TYPE_CHECKING, Callable, TypeVar
 
 from app.debug_logger import debug_logger
 from app.exceptions import FileOperationError, MediaScanError
 from app.models import VideoItem
 from app.utils import sanitize_filename
 
+if TYPE_CHECKING:
+    from app.services.media_library_index import MediaLibraryEntry, MediaLibraryIndex, MediaLibraryPage
+
 T = TypeVar("T")
 
 @dataclass
 class ScanResult:
-    """媒体库扫描结果；truncated/original_count 用于前端提示大目录被截断。"""
+    """媒体库扫描结果；truncated/original_count 用于前端提示大目录被截断。
+
+    indexed 表示结果来自持久化媒体库索引：items 只是最新的一段窗口，其余文件仍可
+    通过 ``MediaLibraryService.query_library`` 分页取得。
+    """
 
     items: list[VideoItem]
     total_count: int
@@ -27,6 +35,7 @@ class ScanResult:
     image_count: int
     truncated: bool = False
     original_count: int = 0
+    indexed: bool = False
 
 
 @dataclass(frozen=True)
@@ -91,10 +100,17 @@ class MediaLibraryService:
         *BILIBILI_TEMP_SUFFIXES,
     )
 
-    def __init__(self, video_extensions: tuple[str, ...], image_extensions: tuple[str, ...]):
+    def __init__(
+        self,
+        video_extensions: tuple[str, ...],
+        image_extensions: tuple[str, ...],
+        *,
+        library_index: "MediaLibraryIndex | None" = None,
+    ):
         self.video_extensions = tuple(ext.lower() for ext in video_extensions)
         self.image_extensions = tuple(ext.lower() for ext in image_extensions)
         self.all_media_extensions = self.video_extensions + self.image_extensions
+        self.library_index = library_index
 
     @staticmethod
     def _run_file_mutation_with_retry(
@@ -219,6 +235,8 @@ class MediaLibraryService:
             stem = os.path.splitext(name)[0]
             # 兼容不同下载器命名：有的拼在完整文件名后，有的拼在 stem 后。
             add_candidate(file_path + ".downloading")
+            # 分块下载预分配模式的隐藏单文件。
+            add_candidate(os.path.join(final_dir, f".{name}.ranges.downloading"))
             for suffix in (".tmp", ".part", ".aria2", ".download"):
                 add_candidate(os.path.join(final_dir, f"{name}{suffix}"))
                 if stem:
@@ -328,6 +346,8 @@ class MediaLibraryService:
                 # 启动时如果目录还不存在，直接创建一个空目录，避免首轮扫描报错。
                 os.makedirs(directory, exist_ok=True)
                 return ScanResult(items=[], total_count=0, video_count=0, image_count=0)
+            if self.library_index is not None:
+                return self._scan_indexed_directory(directory, max_scan_count)
 
             media_entries: list[tuple[float, str]] = []
             with os.scandir(directory) as entries:
@@ -355,17 +375,10 @@ class MediaLibraryService:
             image_count = 0
 
             for _mtime, filename in selected_entries:
-                title, ext = os.path.splitext(filename)
-                ext = ext.lower()
-                item = VideoItem(url="", title=title, source="local")
-                item.status = "✅ 本地"
-                item.progress = 100
-                item.local_path = os.path.join(directory, filename)
-                if ext in self.video_extensions:
-                    item.meta["content_type"] = "video"
+                item = self._local_item(os.path.join(directory, filename))
+                if item.meta["content_type"] == "video":
                     video_count += 1
-                elif ext in self.image_extensions:
-                    item.meta["content_type"] = "image"
+                else:
                     image_count += 1
                 items.append(item)
 
@@ -380,6 +393,141 @@ class MediaLibraryService:
         except OSError as exc:
             raise MediaScanError(str(exc)) from exc
 
+    def _scan_indexed_directory(self, directory: str, max_scan_count: int) -> ScanResult:
+        """增量同步索引后只实例化最新的一段窗口，条目沿用索引分配的稳定 ID。"""
+        try:
+            summary = self.library_index.sync_directory(
+                directory,
+                video_extensions=self.video_extensions,
+                image_extensions=self.image_extensions,
+            )
+            window = self.library_index.query(directory, page_size=max(1, max_scan_count))
+        except sqlite3.Error as exc:
+            raise MediaScanError(f"媒体库索引不可用: {exc}") from exc
+        items = [self.library_item(entry) for entry in window.entries] if max_scan_count > 0 else []
+        video_count = sum(1 for item in items if item.meta.get("content_type") == "video")
+        return ScanResult(
+            items=items,
+            total_count=len(items),
+            video_count=video_count,
+            image_count=len(items) - video_count,
+            truncated=summary.total_count > len(items),
+            original_count=summary.total_count,
+            indexed=True,
+        )
+
+    def query_library(
+        self,
+        directory: str,
+        *,
+        page: int = 1,
+        page_size: int = 20,
+        sort: str = "mtime",
+        descending: bool = True,
+        content_type: str = "",
+        keyword: str = "",
+    ) -> "MediaLibraryPage":
+        """在媒体库索引上排序、筛选并分页；目录从未同步过时先同步一轮。"""
+        if self.library_index is None:
+            raise MediaScanError("媒体库索引未启用")
+        try:
+            if not self.library_index.is_synced(directory):
+                self.library_index.sync_directory(
+                    directory,
+                    video_extensions=self.video_extensions,
+                    image_extensions=self.image_extensions,
+                )
+            return self.library_index.query(
+                directory,
+                page=page,
+                page_size=page_size,
+                sort=sort,
+                descending=descending,
+                content_type=content_type,
+                keyword=keyword,
+            )
+        except (OSError, sqlite3.Error) as exc:
+            raise MediaScanError(str(exc)) from exc
+
+    def apply_entry_changes(
+        self,
+        directory: str,
+        *,
+        added: Iterable[str] = (),
+        removed: Iterable[str] = (),
+        modified: Iterable[str] = (),
+    ) -> list[VideoItem]:
+        """按目录监控给出的逐文件差异更新索引，只 stat 变化的文件，返回新增媒体条目。
+
+        监控事件可能早于或晚于文件系统的最终状态，所以删除以文件确实不存在为准，
+        新增/修改以能 stat 到普通文件为准，两者都不满足的路径直接忽略。
+        """
+        upserts: list[tuple[str, int, int]] = []
+        gone: list[str] = []
+        added_paths: set[str] = set()
+        for paths, is_added in ((added, True), (modified, False)):
+            for path in paths:
+                if not path.lower().endswith(self.all_media_extensions):
+                    continue
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    gone.append(path)
+                    continue
+                except OSError:
+                    continue
+                if not os.path.isfile(path):
+                    continue
+                upserts.append((path, int(stat.st_size), int(stat.st_mtime_ns)))
+                if is_added:
+                    added_paths.add(path)
+        gone.extend(
+            path
+            for path in removed
+            if path.lower().endswith(self.all_media_extensions) and not os.path.lexists(path)
+        )
+        if self.library_index is None:
+            return [self._local_item(path) for path in sorted(added_paths)]
+        try:
+            entries = self.library_index.apply_changes(
+                directory,
+                upserts=upserts,
+                removed=gone,
+                video_extensions=self.video_extensions,
+                image_extensions=self.image_extensions,
+            )
+        except sqlite3.Error as exc:
+            raise MediaScanError(f"媒体库索引不可用: {exc}") from exc
+        return [self.library_item(entry) for entry in entries.values() if entry.local_path in added_paths]
+
+    def _local_item(self, local_path: str) -> VideoItem:
+        title, ext = os.path.splitext(os.path.basename(local_path))
+        item = VideoItem(url="", title=title, source="local")
+        item.status = "✅ 本地"
+        item.progress = 100
+        item.local_path = local_path
+        item.meta["content_type"] = "video" if ext.lower() in self.video_extensions else "image"
+        return item
+
+    @staticmethod
+    def library_item(entry: "MediaLibraryEntry") -> VideoItem:
+        item = VideoItem(url="", title=entry.title, source="local")
+        item.id = entry.id
+        item.status = "✅ 本地"
+        item.progress = 100
+        item.local_path = entry.local_path
+        item.meta["content_type"] = entry.content_type
+        return item
+
+    @staticmethod
+    def _is_resumable_hls_workspace(entry: os.DirEntry[str]) -> bool:
+        """curl_cffi 回退路径留下的工作目录若仍有有效分段日志，则留给下次任务续传。"""
+        if not entry.name.lower().endswith("_curl_cffi_hls"):
+            return False
+        from app.core.downloaders.hls_journal import is_resumable_workspace
+
+        return is_resumable_workspace(entry.path)
+
     @classmethod
     def sweep_orphan_download_temp_directory(
         cls,
@@ -422,6 +570,8 @@ class MediaLibraryService:
                         if not entry.is_dir(follow_symlinks=False):
                             continue
                         if cls._is_safe_orphan_temp_dir_name(entry.name):
+                            if cls._is_resumable_hls_workspace(entry):
+                                continue
                             if cls._remove_temp_path(entry.path):
                                 removed += 1
                             continue
@@ -531,8 +681,18 @@ class MediaLibraryService:
         )
         if result is None:
             raise FileOperationError("重命名文件失败")
+        self._update_library_index(lambda index: index.rename_path(*result))
         return result
 
+    def _update_library_index(self, update: Callable[["MediaLibraryIndex"], object]) -> None:
+        """文件已改动后同步索引；索引写入失败只记日志，下一轮扫描会重新对齐。"""
+        if self.library_index is None:
+            return
+        try:
+            update(self.library_index)
+        except sqlite3.Error as exc:
+            debug_logger.log_exception("MediaLibraryService", "update_library_index", exc)
+
     @classmethod
     def _owned_empty_subdirectory_candidates(
         cls,
@@ -638,4 +798,5 @@ class MediaLibraryService:
         for temp_path in plan.temp_paths:
             deleted = self._delete_file(temp_path, required=False) or deleted
         deleted = self._remove_owned_empty_subdirectories(plan.owned_directories) or deleted
+        self._update_library_index(lambda index: index.remove_paths([plan.file_path]))
         return deleted
@@ -9,6 +9,8 @@ from dataclasses import dataclass, field
 from enum import IntEnum
 from typing import Any
 
+from shared.frontend_row_delta import ROW_SECTIONS
+
 class FrontendEventPriority(IntEnum):
     """数值越高，队列背压时越应优先保留。"""
 
@@ -142,6 +144,25 @@ def sections_for_topic(topic: str) -> frozenset[str] | None:
         return TOOLBOX_SECTIONS
     return None
 
+ROW_ID_KEYS = ("video_id", "id", "entity_id")
+ROW_ID_LIST_KEYS = ("video_ids", "added_ids", "removed_ids")
+ROW_REMOVAL_TOPICS = frozenset({"videos.remove", "videos.remove_many", "video_removed"})
+
+def row_ids_for_payload(payload: Any) -> tuple[str, ...]:
+    """提取事件涉及的视频 ID；没有 ID 的列表事件无法按行描述。"""
+    if not isinstance(payload, dict):
+        return ()
+    ids: dict[str, None] = {}
+    for key in ROW_ID_KEYS:
+        value = payload.get(key)
+        if value:
+            ids[str(value)] = None
+    for key in ROW_ID_LIST_KEYS:
+        values = payload.get(key)
+        if isinstance(values, (list, tuple, set)):
+            ids.update((str(value), None) for value in values if value)
+    return tuple(ids)
+
 def event_coalesce_key(topic: str, payload: Any = None) -> tuple[str, str]:
     """返回末值优先键（latest-state-wins key）；同视频的高频事件只保留最后一次。"""
 
@@ -180,6 +201,11 @@ class FrontendEventAggregator:
         self._max_pending_events = max(1, int(max_pending_events))
         self._section_history: deque[tuple[int, frozenset[str]]] = deque(maxlen=max(256, self._max_pending_events))
         self._deleted_history: deque[tuple[int, str]] = deque(maxlen=max(256, self._max_pending_events))
+        # 行级变更日志：(版本, 视频 ID, upsert/remove)。早于 floor 的版本已被截断，
+        # 早于 barrier 的版本中有无法按行描述的列表变更，两种情况都只能整段重同步。
+        self._row_history: deque[tuple[int, str, str]] = deque(maxlen=max(4096, self._max_pending_events * 2))
+        self._row_history_floor = 0
+        self._row_barrier_version = 0
         self._coalesced_count = 0
         self._dropped_count = 0
         self._recorded_count = 0
@@ -208,6 +234,7 @@ class FrontendEventAggregator:
             self._priority = max(self._priority, priority)
             self._remember_event(topic, payload, priority)
             self._remember_deleted_id(topic, payload, self._version)
+            self._remember_row_changes(topic, payload, event_sections, self._version)
             return self.peek()
 
     def reset(self) -> None:
@@ -219,6 +246,8 @@ class FrontendEventAggregator:
             self._deleted_ids.clear()
             self._section_history.clear()
             self._deleted_history.clear()
+            self._row_history.clear()
+            self._row_barrier_version = self._version
             self._section_history.append((self._version, ALL_FRONTEND_SECTIONS))
 
     def peek(self) -> FrontendDirtyState:
@@ -255,6 +284,8 @@ class FrontendEventAggregator:
                 "dropped_count": self._dropped_count,
                 "last_recorded_at": self._last_recorded_at,
                 "history_depth": len(self._section_history),
+                "row_history_depth": len(self._row_history),
+                "row_barrier_version": self._row_barrier_version,
             }
 
     def sections_since(self, base_version: int) -> frozenset[str]:
@@ -280,15 +311,33 @@ class FrontendEventAggregator:
     def delta_since(
         self,
         base_version: int,
-    ) -> tuple[FrontendDirtyState, frozenset[str], tuple[str, ...]]:
-        """在同一把锁内返回脏 section 与删除记录，保证两者对应同一版本。"""
+    ) -> tuple[FrontendDirtyState, frozenset[str], tuple[str, ...], dict[str, str] | None]:
+        """在同一把锁内返回脏 section、删除记录与行级变更，保证三者对应同一版本。"""
         with self._lock:
             return (
                 self.peek(),
                 self.sections_since(base_version),
                 self.deleted_ids_since(base_version),
+                self.row_changes_since(base_version),
             )
 
+    def row_changes_since(self, base_version: int) -> dict[str, str] | None:
+        """返回 ``{视频 ID: 最后一次操作}``；历史被截断或跨过 barrier 时返回 ``None``。"""
+        with self._lock:
+            try:
+                base = int(base_version or 0)
+            except (TypeError, ValueError):
+                return None
+            if base >= self._version:
+                return {}
+            if base < 0 or base < self._row_barrier_version or base < self._row_history_floor:
+                return None
+            changes: dict[str, str] = {}
+            for version, row_id, operation in self._row_history:
+                if version > base:
+                    changes[row_id] = operation
+            return changes
+
     def deleted_ids_since(self, base_version: int) -> tuple[str, ...]:
         with self._lock:
             try:
@@ -363,6 +412,22 @@ class FrontendEventAggregator:
         if video_id:
             self._remember_deleted_value(str(video_id), version)
 
+    def _remember_row_changes(self, topic: str, payload: Any, sections: frozenset[str], version: int) -> None:
+        if not sections & frozenset(ROW_SECTIONS):
+            return
+        row_ids = row_ids_for_payload(payload)
+        if not row_ids:
+            self._row_barrier_version = version
+            return
+        removed = set()
+        if isinstance(payload, dict):
+            removed = {str(value) for value in payload.get("removed_ids") or () if value}
+        for row_id in row_ids:
+            operation = "remove" if topic in ROW_REMOVAL_TOPICS or row_id in removed else "upsert"
+            if len(self._row_history) == self._row_history.maxlen:
+                self._row_history_floor = self._row_history[0][0]
+            self._row_history.append((version, row_id, operation))
+
     def _remember_deleted_value(self, video_id: str, version: int) -> None:
         self._deleted_ids.add(str(video_id))
         self._deleted_history.append((version, str(video_id)))
@@ -14,8 +14,12 @@ from app.utils.runtime_paths import user_data_root
 
 
 def truncate_latest_debug_log(*, latest_file: str | Path | None = None) -> None:
+    if latest_file is None:
+        # 由日志写线程按队列顺序清空文本和结构化旁路，避免清空后又追加清空前产生的旧日志。
+        debug_logger.clear_latest()
+        return
     try:
-        Path(latest_file or debug_logger.latest_file).write_text("", encoding="utf-8")
+        Path(latest_file).write_text("", encoding="utf-8")
     except OSError:
         pass
 
@@ -26,6 +30,7 @@ def export_latest_debug_log(
     export_root: str | Path | None = None,
     now: Callable[[], datetime] | None = None,
 ) -> Path:
+    debug_logger.flush()
     source = Path(latest_file or debug_logger.latest_file)
     export_dir = Path(export_root) if export_root is not None else user_data_root() / "Exports"
     export_dir.mkdir(parents=True, exist_ok=True)
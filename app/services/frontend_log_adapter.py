@@ -239,6 +239,29 @@ def parse_debug_log_text(
     return items[-int(limit):]
 
 
+def log_item_from_record(record: Mapping[str, Any], *, item_id: str) -> dict[str, Any]:
+    """把结构化旁路记录转换成与 ``parse_debug_log_text`` 相同形状的日志项。"""
+    action = str(record.get("action") or "").strip()
+    message = str(record.get("message") or "").strip()
+    item: dict[str, Any] = {
+        "time": str(record.get("time") or ""),
+        "level": normalize_log_level(str(record.get("level") or "")),
+        "source": str(record.get("source") or "").strip(),
+        "action": action,
+        "thread": "",
+        "trace_id": str(record.get("trace_id") or ""),
+        "message_summary": message[:120] if message else action,
+        "message": message,
+        "detail": str(record.get("detail") or ""),
+        "stack": "",
+        "id": item_id,
+    }
+    status_code = record.get("status_code")
+    if status_code not in (None, ""):
+        item["status_code"] = str(status_code)
+    return item
+
+
 def parse_debug_log_file(path: Path, *, limit: int) -> list[dict[str, Any]]:
     if not path.exists():
         return []
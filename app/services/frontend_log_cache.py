@@ -13,6 +13,7 @@ from typing import Any
 
 from app.debug_logger import debug_logger
 from app.services import frontend_log_adapter as log_adapter
+from app.utils.log_sidecar import LogSidecarReader
 
 
 @dataclass(frozen=True)
@@ -23,7 +24,10 @@ class _TailCacheState:
 
 
 class _TailLogFileReader:
-    """增量读取当前调试日志，避免每次状态快照都全文件扫描。"""
+    """增量读取当前调试日志，避免每次状态快照都全文件扫描。
+
+    日志旁边存在结构化旁路时按记录序号尾读和增量追加，不再解析文本；否则回退到文本尾窗解析。
+    """
 
     INITIAL_WINDOW_BYTES = 1024 * 1024
     MAX_WINDOW_BYTES = 8 * 1024 * 1024
@@ -34,12 +38,17 @@ class _TailLogFileReader:
         self._offset = 0
         self._items: list[dict[str, Any]] = []
         self._initialized = False
+        self._record_count: int | None = None
+        self._generation = ""
+        self._clear_generation: int | None = None
 
     def reset(self) -> None:
         self._path_key = ""
         self._offset = 0
         self._items = []
         self._initialized = False
+        self._record_count = None
+        self._generation = ""
 
     def cache_state(self, *, limit: int) -> _TailCacheState | None:
         """用路径、大小和 mtime 生成缓存指纹；文件轮转后会自动失效。"""
@@ -72,10 +81,16 @@ class _TailLogFileReader:
         self._offset = state.offset
         self._items = deepcopy(items[-limit:])
         self._ensure_ids(self._items, prefix=self._row_id_prefix(state.path_key, 0))
+        self._record_count, self._generation = self._sidecar_position_from_items(self._items)
         self._initialized = True
 
     def read(self, *, limit: int) -> list[dict[str, Any]]:
-        """读取新增字节；文件变小或路径变化时按尾窗重新初始化。"""
+        """读取新增字节；文件变小、路径变化或 latest 日志被清空时按尾窗重新初始化。"""
+        clear_generation = debug_logger.latest_clear_generation
+        if clear_generation != self._clear_generation:
+            if self._clear_generation is not None:
+                self.reset()
+            self._clear_generation = clear_generation
         path = Path(self._path_provider())
         try:
             stat = path.stat()
@@ -84,6 +99,12 @@ class _TailLogFileReader:
             return []
         size = max(0, int(stat.st_size))
         path_key = str(path.resolve())
+        sidecar = LogSidecarReader(path)
+        if sidecar.available():
+            return self._read_sidecar(sidecar, path_key, size, limit=limit)
+        if self._record_count is not None:
+            # 旁路消失（如外部清理）后文本尾读必须从头初始化，不能沿用按记录序号记下的状态。
+            self.reset()
         if not self._initialized or path_key != self._path_key or size < self._offset:
             return self._read_tail_window(path, path_key, size, limit=limit)
         if size == self._offset:
@@ -100,6 +121,62 @@ class _TailLogFileReader:
             self._items = [*self._items, *parsed][-limit:]
         return deepcopy(self._items[-limit:])
 
+    def _read_sidecar(
+        self,
+        sidecar: LogSidecarReader,
+        path_key: str,
+        size: int,
+        *,
+        limit: int,
+    ) -> list[dict[str, Any]]:
+        """按偏移索引读取：首次或文件被截断时取最后 ``limit`` 条，之后只读新增记录。
+
+        截断以首条索引的摘要（generation）判断，清空后即使新记录数超过旧记录数也会重新尾读。
+        """
+        count = sidecar.count()
+        generation = sidecar.generation()
+        previous = self._record_count
+        if (
+            not self._initialized
+            or path_key != self._path_key
+            or previous is None
+            or count < previous
+            or generation != self._generation
+        ):
+            self._items = self._items_from_records(path_key, generation, sidecar.tail(limit))
+        elif count > previous:
+            appended = self._items_from_records(path_key, generation, sidecar.read(previous, count))
+            self._items = [*self._items, *appended][-limit:]
+        self._path_key = path_key
+        self._offset = size
+        self._record_count = count
+        self._generation = generation
+        self._initialized = True
+        return deepcopy(self._items[-limit:])
+
+    def _items_from_records(
+        self,
+        path_key: str,
+        generation: str,
+        records: list[tuple[int, dict[str, Any]]],
+    ) -> list[dict[str, Any]]:
+        prefix = self._row_id_prefix(path_key, 0).rsplit(":", 1)[0]
+        return [
+            log_adapter.log_item_from_record(record, item_id=f"{prefix}:g{generation}:r{record_id}")
+            for record_id, record in records
+        ]
+
+    @staticmethod
+    def _sidecar_position_from_items(items: list[dict[str, Any]]) -> tuple[int | None, str]:
+        """旁路日志项的 ID 以 ``:g<摘要>:r<序号>`` 结尾；据此恢复持久缓存对应的已读记录数和截断代。"""
+        if not items:
+            return None, ""
+        head, _separator, tail = str(items[-1].get("id") or "").rpartition(":r")
+        if not tail.isdigit():
+            return None, ""
+        _prefix, separator, generation = head.rpartition(":g")
+        return int(tail) + 1, generation if separator else ""
+
     def _read_tail_window(self, path: Path, path_key: str, size: int, *, limit: int) -> list[dict[str, Any]]:
         """从文件尾部逐步扩大窗口，尽量读够 UI 需要的最近日志。"""
         window = min(size, self.INITIAL_WINDOW_BYTES)
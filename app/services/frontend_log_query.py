@@ -0,0 +1,117 @@
+"""Web 日志中心的服务端查询：与 GUI 查询 worker 共用增量日志索引，只回传当前页行 ID。"""
+
+from __future__ import annotations
+
+import threading
+from collections.abc import Callable, Mapping, Sequence
+from typing import Any
+
+from app.debug_logger import debug_logger
+from app.services.frontend_log_adapter import enrich_log_item
+from app.services.log_history import LogHistoryIndex, get_log_history_index
+from shared.log_platforms import builtin_platform_metas
+from shared.log_query_index import LogQueryIndex
+
+LOG_QUERY_CATEGORIES = ("all", "crawl", "download", "system", "performance", "error")
+_LEVEL_ALIASES = {"WARNING": "WARN", "COMMAND": "CMD", "OK": "SUCCESS"}
+
+
+def log_items_key(items: Sequence[Any]) -> dict[str, Any]:
+    """日志窗口指纹；Web 端据此确认服务端索引与自己手里的快照是同一批日志。"""
+    first = items[0] if items and isinstance(items[0], Mapping) else {}
+    last = items[-1] if items and isinstance(items[-1], Mapping) else {}
+    return {"count": len(items), "first": str(first.get("id") or ""), "last": str(last.get("id") or "")}
+
+
+class FrontendLogQueryService:
+    """按 Web 日志中心的筛选参数查询常驻索引；索引只在锁内同步和读取。"""
+
+    def __init__(self, source: Callable[[], Sequence[Mapping[str, Any]]]) -> None:
+        self._source = source
+        self._lock = threading.Lock()
+        self._index = LogQueryIndex(prepare=enrich_log_item)
+
+    def query(self, payload: Mapping[str, Any]) -> dict[str, Any]:
+        filters = payload.get("filters")
+        if not isinstance(filters, Mapping):
+            filters = {}
+        selected_id = str(payload.get("selectedId") or "")
+        level = str(filters.get("level") or "").strip().upper()
+        try:
+            items = self._source()
+            metas = builtin_platform_metas()
+            with self._lock:
+                self._index.sync(items, platform_options=tuple(metas.values()), platform_meta_by_id=metas)
+                page = self._index.query(
+                    categories=LOG_QUERY_CATEGORIES,
+                    category=str(filters.get("category") or "all"),
+                    level=_LEVEL_ALIASES.get(level, level),
+                    time_range=str(filters.get("time") or ""),
+                    platform_id=str(filters.get("platform") or ""),
+                    trace_query=str(filters.get("trace") or ""),
+                    keyword=str(filters.get("keyword") or ""),
+                    page=_int_value(payload.get("page"), 1),
+                    page_size=_int_value(payload.get("pageSize"), 20),
+                    selected_id=selected_id,
+                    selected_id_moves_page=False,
+                    limit=_int_value(payload.get("rowBudget"), 0),
+                )
+        except Exception as exc:
+            with self._lock:
+                # 同步中途失败的索引可能只登记了一半，丢弃后下次请求整体重建。
+                self._index = LogQueryIndex(prepare=enrich_log_item)
+            debug_logger.log_exception("FrontendLogQueryService", "query", exc)
+            return {"status": "error", "message": "log query failed"}
+        page_ids = [str(row.get("id") or "") for row in page.rows]
+        return {
+            "status": "ok",
+            "sequence": _int_value(payload.get("sequence"), 0),
+            "pageIds": page_ids,
+            "tabCounts": page.category_counts,
+            "totalCount": page.total_count,
+            "matchedCount": page.matched_count,
+            "visibleCount": len(page_ids),
+            "currentPage": page.current_page,
+            "totalPages": page.total_pages,
+            "selectedId": selected_id if selected_id in page_ids else (page_ids[0] if page_ids else ""),
+            "itemsKey": log_items_key(items),
+        }
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return self._index.stats()
+
+
+def search_log_history(payload: Mapping[str, Any], index: LogHistoryIndex | None = None) -> dict[str, Any]:
+    """日志中心的跨会话检索；首页请求顺带唤醒后台索引，翻页只按游标读取已有索引。
+
+    ``level`` 与实时视图的级别下拉框同义，按展示级别精确匹配（含 SUCCESS）。
+    """
+    history = index or get_log_history_index()
+    if not payload.get("cursor"):
+        history.request_sync()
+    try:
+        result = history.search(
+            trace_id=str(payload.get("trace_id") or ""),
+            platform=str(payload.get("platform") or ""),
+            display_level=str(payload.get("level") or ""),
+            text=str(payload.get("text") or ""),
+            since=payload.get("since") or None,
+            until=payload.get("until") or None,
+            cursor=str(payload.get("cursor") or ""),
+            limit=_int_value(payload.get("limit"), 0),
+        )
+    except ValueError as exc:
+        return {"status": "error", "message": str(exc)}
+    except Exception as exc:
+        debug_logger.log_exception("FrontendLogQueryService", "search_log_history", exc)
+        return {"status": "error", "message": "log history search failed"}
+    result["items"] = [enrich_log_item(item) for item in result["items"]]
+    return result
+
+
+def _int_value(value: Any, default: int) -> int:
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return default
@@ -0,0 +1,66 @@
+"""把行级变更日志投影成排队/下载中/已完成列表的逐行增量。"""
+
+from __future__ import annotations
+
+from collections.abc import Mapping
+from typing import Any
+
+from shared.frontend_row_delta import ROW_SECTIONS
+
+_BUCKET_SECTIONS = {
+    "active": "active_downloads",
+    "completed": "completed_items",
+    "failed": "",
+}
+
+
+class FrontendRowDeltaMixin:
+    """大列表只序列化变化的行；计数与位置按当前分桶顺序计算，客户端据此校验合并结果。"""
+
+    @staticmethod
+    def _row_delta_sections(
+        requested_sections: frozenset[str],
+        row_changes: Mapping[str, str] | None,
+        explicit_sections: frozenset[str] | set[str] | None,
+    ) -> frozenset[str]:
+        """可以改走行级增量的 section；调用方显式点名的 section 仍返回整段。"""
+        explicit = frozenset(explicit_sections or ())
+        if row_changes is None or not (requested_sections & frozenset(ROW_SECTIONS)) - explicit:
+            return frozenset()
+        # 任一行级列表变脏就覆盖全部三个列表，条目跨列表迁移时删除与插入在同一次增量里完成。
+        return frozenset(ROW_SECTIONS) - explicit
+
+    def _build_row_delta(self, row_changes: Mapping[str, str], sections: frozenset[str]) -> dict[str, Any]:
+        videos = self._videos(shallow=True)
+        queued_ids = self._queued_video_ids()
+        active_ids = self._active_video_ids()
+        counts = {section: 0 for section in sections}
+        upserts: dict[str, list[dict[str, Any]]] = {section: [] for section in sections}
+        previous_probe_budget = self._metadata_probe_budget_remaining
+        self._metadata_probe_budget_remaining = self.METADATA_PROBES_PER_SNAPSHOT
+        try:
+            for item in videos.values():
+                bucket = self._bucket_for_item(item, queued_ids=queued_ids, active_ids=active_ids)
+                section = _BUCKET_SECTIONS.get(bucket, "queue_items")
+                if section not in counts:
+                    continue
+                index = counts[section]
+                counts[section] += 1
+                if str(item.id) not in row_changes:
+                    continue
+                item = self._ensure_stage_title_snapshot(item, bucket)
+                if section == "active_downloads":
+                    row = self._active_item(item)
+                elif section == "completed_items":
+                    row = self._completed_item(item)
+                else:
+                    row = self._queue_item(item, queued_ids=queued_ids)
+                upserts[section].append({"index": index, "row": row})
+        finally:
+            self._metadata_probe_budget_remaining = previous_probe_budget
+        return {
+            "sections": sorted(sections),
+            "ids": sorted(row_changes),
+            "upserts": {section: rows for section, rows in upserts.items() if rows},
+            "counts": counts,
+        }
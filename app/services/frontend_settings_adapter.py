@@ -10,6 +10,7 @@ from app.config.settings import (
     accent_label,
     accent_options,
     download_concurrency_options,
+    download_engine_options,
     failed_record_retention_options,
     filename_template_label,
     filename_template_options,
@@ -383,11 +384,13 @@ def build_settings_snapshot(
             "speed_limit_kb": int(download.get("speed_limit_kb", 0) or 0),
             "video_only": bool(download.get("video_only", False)),
             "image_respects_concurrency": download_options["image_respects_concurrency"],
+            "engine": str(download.get("engine") or "thread"),
             "_options": {
                 "max_concurrent": download_concurrency_options(),
                 "request_timeout": request_timeout_options(),
                 "max_retries": retry_options(),
                 "speed_limit_kb": speed_limit_options(),
+                "engine": download_engine_options(),
             },
         },
         "平台设置": platform_settings_rows(data, plugins=plugins, auth_status_provider=auth_status_provider),
@@ -50,6 +50,7 @@ from app.services.metadata_retry_tracker import MetadataRetryTracker
 from app.services.tool_runner_service import ToolRunnerService
 from app.services.frontend_action_result import FrontendActionResult
 from app.services.frontend_toolbox_state import FrontendToolboxStateMixin
+from app.services.frontend_row_delta_state import FrontendRowDeltaMixin
 from app.utils.filenames import sanitize_filename
 from app.utils.safe_slot import safe_slot
 from shared.settings_metadata import GROUP_DESCRIPTIONS, GROUP_HINTS, GROUP_ICONS
@@ -79,7 +80,7 @@ class _HeadlessGuiRuntimeAdapter:
 
 
 
-class FrontendStateService(FrontendToolboxStateMixin):
+class FrontendStateService(FrontendToolboxStateMixin, FrontendRowDeltaMixin):
     """构建 GUI/WebUI 共用的七页快照，并负责把状态变更压缩成增量事件。"""
 
     METADATA_PROBES_PER_SNAPSHOT = 64
@@ -577,6 +578,9 @@ class FrontendStateService(FrontendToolboxStateMixin):
         previous_probe_budget = self._metadata_probe_budget_remaining
         if want_completed:
             self._metadata_probe_budget_remaining = self.METADATA_PROBES_PER_SNAPSHOT
+            metadata_rules.prefetch_completed_metadata(
+                self.media_metadata_service, videos.values(), queued_ids=queued_ids, active_ids=active_ids
+            )
         try:
             for item in videos.values():
                 bucket = self._bucket_for_item(item, queued_ids=queued_ids, active_ids=active_ids)
@@ -696,7 +700,7 @@ class FrontendStateService(FrontendToolboxStateMixin):
         *,
         sections: frozenset[str] | set[str] | None = None,
     ) -> dict[str, Any]:
-        """返回版本化增量；历史不足或版本异常时强制客户端做完整重同步。"""
+        """返回版本化增量；列表只下发变化的行，历史不足或版本异常时强制客户端做完整重同步。"""
 
         self.flush_pending_app_state_events()
         with self._delta_lock:
@@ -704,7 +708,7 @@ class FrontendStateService(FrontendToolboxStateMixin):
                 base_version = int(since_version or 0)
             except (TypeError, ValueError):
                 base_version = 0
-            dirty, history_sections, deleted_ids = self._event_aggregator.delta_since(base_version)
+            dirty, history_sections, deleted_ids, row_changes = self._event_aggregator.delta_since(base_version)
             current_version = dirty.version
             requested_sections = history_sections
             if sections is not None:
@@ -715,13 +719,15 @@ class FrontendStateService(FrontendToolboxStateMixin):
             elif base_version >= current_version:
                 requested_sections = frozenset()
 
+            row_sections = frozenset() if full else self._row_delta_sections(requested_sections, row_changes, sections)
+            snapshot_request = requested_sections - row_sections
             snapshot_sections: dict[str, Any] = {}
-            if requested_sections:
-                partial = self.get_snapshot(sections=frozenset(requested_sections))
+            if snapshot_request:
+                partial = self.get_snapshot(sections=frozenset(snapshot_request))
                 snapshot_sections = {
                     key: value
                     for key, value in partial.items()
-                    if key in requested_sections
+                    if key in snapshot_request
                 }
 
             return {
@@ -731,6 +737,7 @@ class FrontendStateService(FrontendToolboxStateMixin):
                 "changed_sections": sorted(requested_sections),
                 "sections": snapshot_sections,
                 "deleted_ids": [] if full else list(deleted_ids),
+                "rows": self._build_row_delta(row_changes or {}, row_sections) if row_sections else None,
                 "events": list(dirty.pending_events)[-self.FRONTEND_DELTA_EVENTS_LIMIT:],
                 "priority": dirty.priority.name.lower(),
                 "metrics": self.frontend_metrics(),
@@ -854,6 +861,9 @@ class FrontendStateService(FrontendToolboxStateMixin):
                 "video_only": False,
                 "image_respects_concurrency": False,
                 "image_fast_lane_limit": 10,
+                "platform_concurrency": 0,
+                "platform_concurrency_limits": {},
+                "host_concurrency": 0,
             },
         )
         set_runtime_options = getattr(manager, "set_runtime_options", None)
@@ -867,6 +877,9 @@ class FrontendStateService(FrontendToolboxStateMixin):
                 video_only=download_cfg.get("video_only", False),
                 image_respects_concurrency=download_cfg.get("image_respects_concurrency", False),
                 image_fast_lane_limit=download_cfg.get("image_fast_lane_limit", 10),
+                platform_concurrency=download_cfg.get("platform_concurrency", 0),
+                platform_concurrency_limits=download_cfg.get("platform_concurrency_limits", {}),
+                host_concurrency=download_cfg.get("host_concurrency", 0),
             )
             return
 
@@ -880,6 +893,7 @@ class FrontendStateService(FrontendToolboxStateMixin):
                 "cleanup_old_logs_on_start": False,
                 "ui_log_max_display_count": 300,
                 "auto_copy_trace_on_error": True,
+                "writer_overflow": "drop_oldest",
             },
         )
         configure = getattr(debug_logger, "configure", None)
@@ -888,6 +902,7 @@ class FrontendStateService(FrontendToolboxStateMixin):
                 level=logging_cfg.get("level", "info"),
                 retention_days=logging_cfg.get("retention_days", 1),
                 cleanup_old_logs=cleanup_old_logs,
+                overflow=logging_cfg.get("writer_overflow", "drop_oldest"),
             )
         configure_buffer = getattr(self.app_state, "configure_log_buffer", None)
         if callable(configure_buffer):
@@ -1244,6 +1259,10 @@ class FrontendStateService(FrontendToolboxStateMixin):
             active_events=self._active_events,
         )
 
+    def completed_row(self, item: VideoItem) -> dict[str, Any]:
+        """单独构建一行已完成项，供媒体库分页与快照共用同一套字段。"""
+        return self._completed_item(item)
+
     def _completed_item(self, item: VideoItem) -> dict[str, Any]:
         path = Path(item.local_path) if item.local_path else None
         meta = item.meta or {}
@@ -1729,9 +1748,11 @@ class FrontendStateService(FrontendToolboxStateMixin):
 
     def log_items(self) -> list[dict[str, Any]]:
         """合并 UI 环形日志和文件日志尾部，并补齐前端展示字段。"""
-        buffer = self.app_state.get_log_buffer()
-        merged = self._file_log_cache_store.merged_items(buffer)
-        return [self._enrich_log_item(item) for item in merged]
+        return [self._enrich_log_item(item) for item in self.raw_log_items()]
+
+    def raw_log_items(self) -> list[dict[str, Any]]:
+        """未补齐展示字段的合并日志；日志查询索引只对新进入窗口的行做补齐。"""
+        return self._file_log_cache_store.merged_items(self.app_state.get_log_buffer())
 
     def _ui_log_display_limit(self) -> int:
         config = getattr(self, "config", None)
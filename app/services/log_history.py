@@ -0,0 +1,557 @@
+"""跨会话历史日志检索：后台把已落盘的 ``debug_*.log`` 会话导入 SQLite 全文索引，按游标分页查询。
+
+有结构化旁路的会话按记录序号增量导入；只有文本日志的旧会话整文件解析一次。索引库放在日志目录下，
+会话文件被 ``cleanup_old_logs`` 按保留期删除后，下一轮同步会删除对应索引行，索引不会比日志活得更久。
+"""
+
+from __future__ import annotations
+
+import base64
+import re
+import sqlite3
+import sys
+import threading
+import time
+from collections.abc import Callable, Iterable, Iterator, Mapping
+from datetime import datetime
+from pathlib import Path
+from typing import Any
+
+from app.debug_logger import debug_logger
+from app.services.frontend_log_adapter import (
+    LOG_ENTRY_RE,
+    enrich_log_item,
+    log_item_from_record,
+    log_timestamp_ms,
+    normalize_log_level,
+    parse_debug_log_text,
+)
+from app.utils.log_sidecar import LEVEL_CODES, LogSidecarReader, level_code
+from app.utils.runtime_paths import user_logs_root
+from shared.log_classification import derive_result_type, normalized_raw_level, result_display_text
+from shared.log_display import resolve_item_platform_id
+from shared.log_platforms import builtin_platform_metas
+
+HISTORY_DB_NAME = "log_history.db"
+DEFAULT_PAGE_LIMIT = 50
+MAX_PAGE_LIMIT = 500
+_INGEST_BATCH = 1000
+# 纯文本会话按约 4 MiB 的整条记录分块解析，大文件不会整份读进内存。
+_TEXT_BLOCK_BYTES = 4 * 1024 * 1024
+_DEFAULT_SYNC_INTERVAL_SECONDS = 300.0
+_SQLITE_BUSY_TIMEOUT_SECONDS = 5.0
+# 三元组分词要求检索词至少 3 个字符，更短的词改走 LIKE 子串匹配。
+_TRIGRAM_MIN_CHARS = 3
+_RELATIVE_TIME_RE = re.compile(r"^(\d+)\s*([mhd])$", re.IGNORECASE)
+_RELATIVE_UNIT_SECONDS = {"m": 60, "h": 60 * 60, "d": 24 * 60 * 60}
+_TEXT_COLUMNS = ("source", "action", "message", "detail")
+# 日志中心下拉框的展示级别；与实时视图同一套派生规则，SUCCESS 等不存在于原始 level 中。
+DISPLAY_LEVELS = ("INFO", "SUCCESS", "WARN", "ERROR", "CMD")
+# 表结构变化时递增；索引是日志文件的派生数据，版本不符直接清空重建。
+_SCHEMA_VERSION = 2
+
+_SCHEMA = (
+    """
+    CREATE TABLE IF NOT EXISTS log_files (
+        name TEXT PRIMARY KEY,
+        kind TEXT NOT NULL,
+        size INTEGER NOT NULL,
+        mtime_ns INTEGER NOT NULL,
+        records INTEGER NOT NULL
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS log_records (
+        id INTEGER PRIMARY KEY,
+        file TEXT NOT NULL,
+        record_no INTEGER NOT NULL,
+        ts_ms INTEGER NOT NULL,
+        level_code INTEGER NOT NULL,
+        level TEXT NOT NULL,
+        display_level TEXT NOT NULL,
+        trace_id TEXT NOT NULL,
+        platform TEXT NOT NULL,
+        time TEXT NOT NULL,
+        source TEXT NOT NULL,
+        action TEXT NOT NULL,
+        message TEXT NOT NULL,
+        status_code TEXT NOT NULL,
+        detail TEXT NOT NULL,
+        UNIQUE (file, record_no)
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS log_records_time ON log_records(ts_ms, id)",
+    "CREATE INDEX IF NOT EXISTS log_records_trace ON log_records(trace_id, ts_ms) WHERE trace_id != ''",
+    "CREATE INDEX IF NOT EXISTS log_records_platform ON log_records(platform, ts_ms)",
+    "CREATE INDEX IF NOT EXISTS log_records_display_level ON log_records(display_level, ts_ms)",
+)
+# 外部内容表只存倒排索引，正文仍只在 log_records 里保存一份。
+_FTS_SCHEMA = (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS log_records_fts USING fts5("
+    "source, action, message, detail, content='log_records', content_rowid='id', tokenize='trigram')"
+)
+
+
+def parse_time_bound(value: Any, *, now: float | None = None) -> int | None:
+    """把 ``since``/``until`` 解析为毫秒时间戳；支持 ``30m``/``24h``/``7d``、ISO 日期时间和秒级时间戳。"""
+    if value is None or value == "":
+        return None
+    if isinstance(value, datetime):
+        return int(value.timestamp() * 1000)
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return int(float(value) * 1000)
+    text = str(value).strip()
+    relative = _RELATIVE_TIME_RE.match(text)
+    if relative:
+        seconds = int(relative.group(1)) * _RELATIVE_UNIT_SECONDS[relative.group(2).lower()]
+        return int(((time.time() if now is None else now) - seconds) * 1000)
+    try:
+        return int(datetime.fromisoformat(text).timestamp() * 1000)
+    except ValueError:
+        pass
+    try:
+        return int(float(text) * 1000)
+    except ValueError as exc:
+        raise ValueError(f"invalid time bound: {text}") from exc
+
+
+def resolve_platform_filter(value: str) -> str:
+    """把平台 ID、中文名或别名统一成索引里保存的平台 ID。"""
+    text = str(value or "").strip().lower()
+    for meta in builtin_platform_metas().values():
+        if text == meta.id or text == meta.label.lower() or any(text == alias.lower() for alias in meta.aliases):
+            return meta.id
+    return text
+
+
+def encode_cursor(ts_ms: int, row_id: int) -> str:
+    raw = f"{int(ts_ms)}:{int(row_id)}".encode("ascii")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[int, int]:
+    text = str(cursor or "").strip()
+    try:
+        raw = base64.urlsafe_b64decode(text + "=" * (-len(text) % 4)).decode("ascii")
+        ts_ms, row_id = raw.split(":", 1)
+        return int(ts_ms), int(row_id)
+    except (ValueError, UnicodeDecodeError) as exc:
+        raise ValueError("invalid history cursor") from exc
+
+
+def _like_pattern(term: str) -> str:
+    escaped = term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return f"%{escaped}%"
+
+
+def _fts_phrase(term: str) -> str:
+    return '"' + term.replace('"', '""') + '"'
+
+
+class LogHistoryIndex:
+    """会话日志的持久化检索索引；同步串行执行，连接由内部锁保护，查询可在任意线程调用。"""
+
+    def __init__(
+        self,
+        *,
+        logs_dir: str | Path | None = None,
+        db_path: str | Path | None = None,
+        exclude: Callable[[], Iterable[Path]] | None = None,
+        sync_interval_seconds: float = _DEFAULT_SYNC_INTERVAL_SECONDS,
+    ) -> None:
+        self.logs_dir = Path(logs_dir) if logs_dir is not None else user_logs_root()
+        self.db_path = Path(db_path) if db_path is not None else self.logs_dir / HISTORY_DB_NAME
+        self._exclude = exclude or (lambda: ())
+        self._sync_interval_seconds = max(1.0, float(sync_interval_seconds))
+        self._lock = threading.Lock()
+        self._sync_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._conn: sqlite3.Connection | None = None
+        self._fts = False
+        self._thread: threading.Thread | None = None
+        self._closed = False
+        self._syncing = False
+        self._platform_metas = builtin_platform_metas()
+        self._platform_options = tuple(self._platform_metas.values())
+        self._stats = {"syncs": 0, "ingested": 0, "pruned_files": 0, "errors": 0}
+
+    def start(self) -> None:
+        """启动后台索引线程；重复调用只保留一个线程。"""
+        with self._lock:
+            if self._closed or (self._thread is not None and self._thread.is_alive()):
+                return
+            self._thread = threading.Thread(target=self._run, name="LogHistoryIndexer", daemon=True)
+            self._thread.start()
+
+    def request_sync(self) -> None:
+        """唤醒后台线程立即同步一轮，线程未启动时顺带启动。"""
+        self.start()
+        self._wake.set()
+
+    def close(self, timeout: float = 2.0) -> None:
+        with self._lock:
+            self._closed = True
+            thread = self._thread
+        self._wake.set()
+        if thread is not None and thread is not threading.current_thread():
+            thread.join(timeout)
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            conn = self._connection()
+            files, records = conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(records), 0) FROM log_files"
+            ).fetchone()
+            return {**self._stats, "files": files, "records": records, "fts": self._fts, "syncing": self._syncing}
+
+    def sync(self) -> dict[str, int]:
+        """导入新增或变化的会话文件，并删除已被保留期清理掉的会话索引。"""
+        with self._sync_lock:
+            self._syncing = True
+            try:
+                return self._sync_unlocked()
+            finally:
+                self._syncing = False
+
+    def search(
+        self,
+        *,
+        trace_id: str | None = None,
+        platform: str | None = None,
+        level: str | None = None,
+        display_level: str | None = None,
+        text: str | None = None,
+        since: Any = None,
+        until: Any = None,
+        cursor: str | None = None,
+        limit: int = DEFAULT_PAGE_LIMIT,
+    ) -> dict[str, Any]:
+        """按条件从新到旧返回一页；``text`` 按空白拆词且每个词都须出现。
+
+        ``level`` 按原始级别取下限（CLI ``--level``）；``display_level`` 按日志中心展示级别精确匹配，
+        与实时视图的级别下拉框一致，可取 ``DISPLAY_LEVELS`` 中的值。
+        """
+        clauses: list[str] = []
+        params: list[Any] = []
+        if trace_id:
+            clauses.append("trace_id = ?")
+            params.append(str(trace_id).strip())
+        if platform and str(platform).strip().lower() != "all":
+            clauses.append("platform = ?")
+            params.append(resolve_platform_filter(platform))
+        if level and str(level).strip().lower() != "all":
+            minimum = level_code(level)
+            if not minimum:
+                raise ValueError(f"invalid level: {level}")
+            clauses.append("level_code >= ?")
+            params.append(minimum)
+        if display_level and str(display_level).strip().lower() != "all":
+            exact = normalize_log_level(str(display_level).strip())
+            if exact not in DISPLAY_LEVELS:
+                raise ValueError(f"invalid level: {display_level}")
+            clauses.append("display_level = ?")
+            params.append(exact)
+        since_ms = parse_time_bound(since)
+        if since_ms is not None:
+            clauses.append("ts_ms >= ?")
+            params.append(since_ms)
+        until_ms = parse_time_bound(until)
+        if until_ms is not None:
+            clauses.append("ts_ms < ?")
+            params.append(until_ms)
+        if cursor:
+            cursor_ts, cursor_id = decode_cursor(cursor)
+            clauses.append("(ts_ms < ? OR (ts_ms = ? AND id < ?))")
+            params.extend((cursor_ts, cursor_ts, cursor_id))
+        page_limit = max(1, min(int(limit or DEFAULT_PAGE_LIMIT), MAX_PAGE_LIMIT))
+
+        with self._lock:
+            conn = self._connection()
+            terms = [term.lower() for term in str(text or "").split()]
+            fts_terms = [term for term in terms if self._fts and len(term) >= _TRIGRAM_MIN_CHARS]
+            if fts_terms:
+                clauses.append("id IN (SELECT rowid FROM log_records_fts WHERE log_records_fts MATCH ?)")
+                params.append(" AND ".join(_fts_phrase(term) for term in fts_terms))
+            for term in terms:
+                if term in fts_terms:
+                    continue
+                clauses.append("(" + " OR ".join(f"{column} LIKE ? ESCAPE '\\'" for column in _TEXT_COLUMNS) + ")")
+                params.extend([_like_pattern(term)] * len(_TEXT_COLUMNS))
+            where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+            rows = conn.execute(
+                "SELECT id, file, record_no, ts_ms, level, trace_id, platform, time, source, action, message, "
+                f"status_code, detail FROM log_records {where} ORDER BY ts_ms DESC, id DESC LIMIT ?",
+                (*params, page_limit + 1),
+            ).fetchall()
+        next_cursor = encode_cursor(rows[page_limit - 1][3], rows[page_limit - 1][0]) if len(rows) > page_limit else ""
+        return {
+            "status": "ok",
+            "items": [_history_item(row) for row in rows[:page_limit]],
+            "next_cursor": next_cursor,
+            "indexing": self._syncing,
+        }
+
+    def _run(self) -> None:
+        while not self._closed:
+            try:
+                self.sync()
+            except Exception as exc:
+                self._stats["errors"] += 1
+                debug_logger.log_exception("LogHistoryIndex", "sync", exc)
+            self._wake.wait(self._sync_interval_seconds)
+            self._wake.clear()
+
+    def _connection(self) -> sqlite3.Connection:
+        """调用方持有 ``_lock``；首次使用时建库并探测三元组全文索引是否可用。"""
+        if self._conn is not None:
+            return self._conn
+        conn = sqlite3.connect(
+            self.db_path,
+            timeout=_SQLITE_BUSY_TIMEOUT_SECONDS,
+            check_same_thread=False,
+            isolation_level=None,
+        )
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        if conn.execute("PRAGMA user_version").fetchone()[0] != _SCHEMA_VERSION:
+            for table in ("log_records_fts", "log_records", "log_files"):
+                conn.execute(f"DROP TABLE IF EXISTS {table}")
+            conn.execute(f"PRAGMA user_version = {_SCHEMA_VERSION}")
+        for statement in _SCHEMA:
+            conn.execute(statement)
+        try:
+            conn.execute(_FTS_SCHEMA)
+            self._fts = True
+        except sqlite3.OperationalError:
+            # 老版本 SQLite 没有 FTS5 或三元组分词；所有检索词改走 LIKE，结果不变只是更慢。
+            self._fts = False
+        self._conn = conn
+        return conn
+
+    def _sync_unlocked(self) -> dict[str, int]:
+        excluded = set()
+        for path in self._exclude():
+            try:
+                excluded.add(Path(path).resolve())
+            except OSError:
+                continue
+        on_disk = {path.name: path for path in self.logs_dir.glob("debug_*.log")}
+        with self._lock:
+            known = {
+                name: (kind, size, mtime_ns, records)
+                for name, kind, size, mtime_ns, records in self._connection().execute(
+                    "SELECT name, kind, size, mtime_ns, records FROM log_files"
+                )
+            }
+        pruned = 0
+        for name in sorted(known.keys() - on_disk.keys()):
+            self._drop_file(name)
+            pruned += 1
+        ingested = 0
+        for name, path in sorted(on_disk.items()):
+            if self._closed:
+                break
+            if path.resolve() in excluded:
+                continue
+            ingested += self._sync_file(name, path, known.get(name))
+        self._stats["syncs"] += 1
+        self._stats["ingested"] += ingested
+        self._stats["pruned_files"] += pruned
+        return {"files": len(on_disk), "ingested": ingested, "pruned": pruned}
+
+    def _sync_file(self, name: str, path: Path, state: tuple[str, int, int, int] | None) -> int:
+        try:
+            stat = path.stat()
+        except OSError:
+            return 0
+        reader = LogSidecarReader(path)
+        if reader.available():
+            total = reader.count()
+            start = state[3] if state is not None and state[0] == "sidecar" else 0
+            if state is not None and (state[0] != "sidecar" or start > total):
+                # 旁路被截断或之前按文本导入过，旧索引行与记录序号对不上，整文件重导。
+                self._drop_file(name)
+                start = 0
+            ingested = 0
+            while start < total and not self._closed:
+                stop = min(total, start + _INGEST_BATCH)
+                entries = {entry.record_id: entry for entry in reader.entries(start, stop)}
+                rows = [
+                    self._record_row(
+                        name,
+                        record_id,
+                        entries[record_id].timestamp_ms,
+                        log_item_from_record(record, item_id=""),
+                    )
+                    for record_id, record in reader.read_entries(list(entries.values()))
+                ]
+                ingested += self._write_batch(name, "sidecar", stat, start, stop, rows)
+                start = stop
+            if state is None and total == 0:
+                self._write_batch(name, "sidecar", stat, 0, 0, [])
+            return ingested
+
+        if state is not None and state[0] == "text" and (state[1], state[2]) == (stat.st_size, stat.st_mtime_ns):
+            return 0
+        if state is not None:
+            self._drop_file(name)
+        ingested = 0
+        number = 0
+        try:
+            for items in _iter_text_log_blocks(path, name):
+                for offset in range(0, len(items), _INGEST_BATCH):
+                    if self._closed:
+                        # 文本会话按大小和 mtime 判断是否已导入，半途退出必须丢弃已写部分，下一轮从头导入。
+                        self._drop_file(name)
+                        return ingested
+                    batch = items[offset:offset + _INGEST_BATCH]
+                    rows = [
+                        self._record_row(name, record_no, log_timestamp_ms(str(item.get("time") or "")), item)
+                        for record_no, item in enumerate(batch, number)
+                    ]
+                    ingested += self._write_batch(name, "text", stat, number, number + len(rows), rows)
+                    number += len(rows)
+        except OSError:
+            self._drop_file(name)
+            return ingested
+        if number == 0:
+            # 空文件也登记下来，文件不变时不再重复读取。
+            self._write_batch(name, "text", stat, 0, 0, [])
+        return ingested
+
+    def _record_row(self, name: str, number: int, timestamp_ms: int, item: Mapping[str, Any]) -> tuple[Any, ...]:
+        level = str(item.get("level") or "INFO")
+        enriched = enrich_log_item(item)
+        return (
+            name,
+            number,
+            int(timestamp_ms),
+            level_code(level) or LEVEL_CODES["INFO"],
+            level,
+            result_display_text(derive_result_type(enriched), normalized_raw_level(enriched)),
+            str(item.get("trace_id") or ""),
+            resolve_item_platform_id(item, self._platform_options, self._platform_metas),
+            str(item.get("time") or ""),
+            str(item.get("source") or ""),
+            str(item.get("action") or ""),
+            str(item.get("message") or ""),
+            str(item.get("status_code") or ""),
+            str(item.get("detail") or ""),
+        )
+
+    def _write_batch(
+        self,
+        name: str,
+        kind: str,
+        stat: Any,
+        start: int,
+        stop: int,
+        rows: list[tuple[Any, ...]],
+    ) -> int:
+        """单个事务内写入 ``[start, stop)`` 区间；其他进程已抢先导入同一区间时放弃本批。"""
+        with self._lock:
+            conn = self._connection()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                current = conn.execute("SELECT records FROM log_files WHERE name = ?", (name,)).fetchone()
+                if (current[0] if current else 0) != start:
+                    conn.execute("ROLLBACK")
+                    return 0
+                conn.executemany(
+                    "INSERT INTO log_records (file, record_no, ts_ms, level_code, level, display_level, trace_id, "
+                    "platform, time, source, action, message, status_code, detail) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    rows,
+                )
+                if self._fts and rows:
+                    conn.execute(
+                        "INSERT INTO log_records_fts (rowid, source, action, message, detail) "
+                        "SELECT id, source, action, message, detail FROM log_records "
+                        "WHERE file = ? AND record_no >= ? AND record_no < ?",
+                        (name, start, stop),
+                    )
+                conn.execute(
+                    "INSERT INTO log_files (name, kind, size, mtime_ns, records) VALUES (?, ?, ?, ?, ?) "
+                    "ON CONFLICT(name) DO UPDATE SET kind = excluded.kind, size = excluded.size, "
+                    "mtime_ns = excluded.mtime_ns, records = excluded.records",
+                    (name, kind, stat.st_size, stat.st_mtime_ns, stop),
+                )
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+        return len(rows)
+
+    def _drop_file(self, name: str) -> None:
+        with self._lock:
+            conn = self._connection()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                if self._fts:
+                    # 外部内容表必须带原值删除，否则倒排索引里会残留指向已删行的词条。
+                    conn.execute(
+                        "INSERT INTO log_records_fts (log_records_fts, rowid, source, action, message, detail) "
+                        "SELECT 'delete', id, source, action, message, detail FROM log_records WHERE file = ?",
+                        (name,),
+                    )
+                conn.execute("DELETE FROM log_records WHERE file = ?", (name,))
+                conn.execute("DELETE FROM log_files WHERE name = ?", (name,))
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+
+
+def _iter_text_log_blocks(path: Path, name: str) -> Iterator[list[dict[str, Any]]]:
+    """按记录边界把纯文本会话切成约 ``_TEXT_BLOCK_BYTES`` 的块逐块解析；记录的续行不会被拆到两块。"""
+    lines: list[str] = []
+    size = 0
+    with path.open("r", encoding="utf-8", errors="replace") as handle:
+        for line in handle:
+            if size >= _TEXT_BLOCK_BYTES and LOG_ENTRY_RE.match(line.strip()):
+                yield parse_debug_log_text("".join(lines), limit=sys.maxsize, id_prefix=name)
+                lines, size = [], 0
+            lines.append(line)
+            size += len(line)
+    if lines:
+        yield parse_debug_log_text("".join(lines), limit=sys.maxsize, id_prefix=name)
+
+
+def _history_item(row: tuple[Any, ...]) -> dict[str, Any]:
+    row_id, name, number, ts_ms, level, trace_id, platform, stamp, source, action, message, status_code, detail = row
+    item: dict[str, Any] = {
+        "id": f"history:{name}:{number}",
+        "session": name,
+        "time": stamp,
+        "timestamp_ms": ts_ms,
+        "level": level,
+        "source": source,
+        "action": action,
+        "thread": "",
+        "trace_id": trace_id,
+        "platform_id": platform,
+        "message_summary": message[:120] if message else action,
+        "message": message,
+        "detail": detail,
+        "stack": "",
+    }
+    if status_code:
+        item["status_code"] = status_code
+    return item
+
+
+_history_index: LogHistoryIndex | None = None
+_history_index_lock = threading.Lock()
+
+
+def get_log_history_index() -> LogHistoryIndex:
+    """进程内共享的历史索引；当前进程仍在写的会话文件不导入，日志中心实时视图已覆盖它。"""
+    global _history_index
+    with _history_index_lock:
+        if _history_index is None:
+            _history_index = LogHistoryIndex(exclude=lambda: (debug_logger.session_file,))
+        return _history_index
@@ -4,15 +4,40 @@ from __future__ import annotations
 
 import os
 import threading
+import time
 import uuid
 from dataclasses import dataclass, field
 from typing import Callable, Iterable
 
+try:
+    from watchdog.events import FileSystemEventHandler
+    from watchdog.observers import Observer
+except ImportError:  # pragma: no cover - optional native backend
+    FileSystemEventHandler = object  # type: ignore[assignment,misc]
+    Observer = None  # type: ignore[assignment]
+
 
 DirectoryChangedCallback = Callable[[str], None]
 DirectorySignature = tuple[int, int, int, int] | None
+EntrySnapshot = dict[str, tuple[int, int]]
 _UNSET = object()
 
+ENTRY_ADDED = "added"
+ENTRY_REMOVED = "removed"
+ENTRY_MODIFIED = "modified"
+# Net effect of two consecutive changes to the same entry; ``None`` cancels out.
+_MERGED_KIND: dict[tuple[str, str], str | None] = {
+    (ENTRY_ADDED, ENTRY_ADDED): ENTRY_ADDED,
+    (ENTRY_ADDED, ENTRY_MODIFIED): ENTRY_ADDED,
+    (ENTRY_ADDED, ENTRY_REMOVED): None,
+    (ENTRY_REMOVED, ENTRY_ADDED): ENTRY_MODIFIED,
+    (ENTRY_REMOVED, ENTRY_MODIFIED): ENTRY_MODIFIED,
+    (ENTRY_REMOVED, ENTRY_REMOVED): ENTRY_REMOVED,
+    (ENTRY_MODIFIED, ENTRY_ADDED): ENTRY_MODIFIED,
+    (ENTRY_MODIFIED, ENTRY_MODIFIED): ENTRY_MODIFIED,
+    (ENTRY_MODIFIED, ENTRY_REMOVED): ENTRY_REMOVED,
+}
+
 
 def _normalize_directory(path: str) -> str:
     raw = str(path or "").strip()
@@ -42,13 +67,121 @@ def _directory_signature(path: str) -> DirectorySignature:
     )
 
 
+def _entry_snapshot(path: str) -> EntrySnapshot | None:
+    """List direct child files with (size, mtime); ``None`` when unreadable."""
+
+    snapshot: EntrySnapshot = {}
+    try:
+        with os.scandir(path) as entries:
+            for entry in entries:
+                try:
+                    if not entry.is_file():
+                        continue
+                    stat_result = entry.stat()
+                except OSError:
+                    continue
+                snapshot[entry.name] = (int(stat_result.st_size), int(stat_result.st_mtime_ns))
+    except OSError:
+        return None
+    return snapshot
+
+
+@dataclass(frozen=True)
+class MediaEntryChanges:
+    """Net per-file changes of one watched directory, as absolute file paths.
+
+    ``overflow`` means the batch was too large or incomplete to describe entry
+    by entry; consumers should fall back to a full directory scan.
+    """
+
+    directory: str
+    added: tuple[str, ...] = ()
+    removed: tuple[str, ...] = ()
+    modified: tuple[str, ...] = ()
+    overflow: bool = False
+
+    def __len__(self) -> int:
+        return len(self.added) + len(self.removed) + len(self.modified)
+
+    def merge(self, later: "MediaEntryChanges") -> "MediaEntryChanges":
+        """Fold a later batch of the same directory into this one."""
+
+        if self.overflow or later.overflow:
+            return MediaEntryChanges(directory=self.directory, overflow=True)
+        kinds = _kinds_by_path(self)
+        for path, kind in _kinds_by_path(later).items():
+            _fold_kind(kinds, path, kind)
+        return _changes_from_kinds(self.directory, kinds)
+
+
+def _kinds_by_path(changes: MediaEntryChanges) -> dict[str, str]:
+    kinds = {path: ENTRY_ADDED for path in changes.added}
+    kinds.update((path, ENTRY_REMOVED) for path in changes.removed)
+    kinds.update((path, ENTRY_MODIFIED) for path in changes.modified)
+    return kinds
+
+
+def _fold_kind(kinds: dict[str, str], path: str, kind: str) -> None:
+    previous = kinds.get(path)
+    merged = kind if previous is None else _MERGED_KIND[(previous, kind)]
+    if merged is None:
+        kinds.pop(path, None)
+    else:
+        kinds[path] = merged
+
+
+def _changes_from_kinds(directory: str, kinds: dict[str, str], *, overflow: bool = False) -> MediaEntryChanges:
+    if overflow:
+        return MediaEntryChanges(directory=directory, overflow=True)
+    grouped: dict[str, list[str]] = {ENTRY_ADDED: [], ENTRY_REMOVED: [], ENTRY_MODIFIED: []}
+    for path, kind in kinds.items():
+        grouped[kind].append(path)
+    return MediaEntryChanges(
+        directory=directory,
+        added=tuple(sorted(grouped[ENTRY_ADDED])),
+        removed=tuple(sorted(grouped[ENTRY_REMOVED])),
+        modified=tuple(sorted(grouped[ENTRY_MODIFIED])),
+    )
+
+
+def diff_entry_snapshots(directory: str, previous: EntrySnapshot, current: EntrySnapshot) -> MediaEntryChanges:
+    """Compare two directory listings taken by the polling fallback."""
+
+    return MediaEntryChanges(
+        directory=directory,
+        added=tuple(sorted(os.path.join(directory, name) for name in current.keys() - previous.keys())),
+        removed=tuple(sorted(os.path.join(directory, name) for name in previous.keys() - current.keys())),
+        modified=tuple(
+            sorted(
+                os.path.join(directory, name)
+                for name in current.keys() & previous.keys()
+                if current[name] != previous[name]
+            )
+        ),
+    )
+
+
+EntryChangesCallback = Callable[[MediaEntryChanges], None]
+
+
 @dataclass
 class _WatchRegistration:
     callback: DirectoryChangedCallback
+    on_entries: EntryChangesCallback | None = None
     paths: tuple[str, ...] = ()
     signatures: dict[str, DirectorySignature | object] = field(default_factory=dict)
 
 
+@dataclass
+class _PendingEntries:
+    """Coalescing window for one directory: closes after a quiet period or a hard cap."""
+
+    first_at: float
+    last_at: float
+    kinds: dict[str, str] = field(default_factory=dict)
+    overflow: bool = False
+
+
 class MediaDirectoryWatchHandle:
     """Mutable subscription owned by one GUI or Web controller."""
 
@@ -68,54 +201,163 @@ class MediaDirectoryWatchHandle:
         self._monitor._remove(self._registration_id)
 
 
+class _NativeEventHandler(FileSystemEventHandler):
+    """Translate watchdog file events into monitor entry events."""
+
+    def __init__(self, monitor: "MediaDirectoryMonitor") -> None:
+        super().__init__()
+        self._monitor = monitor
+
+    def on_created(self, event) -> None:
+        if not event.is_directory:
+            self._monitor.record_entry_event(ENTRY_ADDED, os.fsdecode(event.src_path))
+
+    def on_deleted(self, event) -> None:
+        if event.is_directory:
+            self._monitor.native_watch_lost(os.fsdecode(event.src_path))
+        else:
+            self._monitor.record_entry_event(ENTRY_REMOVED, os.fsdecode(event.src_path))
+
+    def on_modified(self, event) -> None:
+        if not event.is_directory:
+            self._monitor.record_entry_event(ENTRY_MODIFIED, os.fsdecode(event.src_path))
+
+    def on_closed(self, event) -> None:
+        if not event.is_directory:
+            self._monitor.record_entry_event(ENTRY_MODIFIED, os.fsdecode(event.src_path))
+
+    def on_moved(self, event) -> None:
+        if event.is_directory:
+            self._monitor.native_watch_lost(os.fsdecode(event.src_path))
+            return
+        self._monitor.record_entry_event(ENTRY_REMOVED, os.fsdecode(event.src_path))
+        self._monitor.record_entry_event(ENTRY_ADDED, os.fsdecode(event.dest_path))
+
+
 class MediaDirectoryMonitor:
-    """Poll directory metadata in one shared thread and notify on entry changes.
+    """Watch media directories in one shared thread and report entry changes.
 
-    A process can own many Web sessions. Keeping one polling thread here avoids a
+    A process can own many Web sessions. Keeping one monitor here avoids a
     thread per session, while each controller still owns and closes its handle.
+
+    When watchdog is installed, directories are watched natively (inotify on
+    Linux) and file events are folded into per-directory coalescing windows.
+    Otherwise, and for directories the native observer cannot watch, the
+    monitor polls directory ``stat`` signatures and diffs a directory listing
+    only after its signature changes. Registrations that pass ``on_entries``
+    receive net add/remove/modify batches once a window closes; plain
+    callbacks keep receiving the changed directory path.
     """
 
+    COALESCE_QUIET_SECONDS = 0.3
+    COALESCE_MAX_SECONDS = 2.0
+    MAX_BATCH_ENTRIES = 5000
+
     def __init__(
         self,
         *,
         interval_seconds: float = 0.8,
         signature_provider: Callable[[str], DirectorySignature] = _directory_signature,
+        entry_snapshot_provider: Callable[[str], EntrySnapshot | None] = _entry_snapshot,
+        native: bool | None = None,
+        clock: Callable[[], float] = time.monotonic,
         auto_start: bool = True,
     ) -> None:
         self._interval_seconds = max(0.1, float(interval_seconds))
         self._signature_provider = signature_provider
+        self._entry_snapshot_provider = entry_snapshot_provider
+        self._native_enabled = Observer is not None if native is None else bool(native and Observer is not None)
+        self._clock = clock
         self._auto_start = bool(auto_start)
         self._lock = threading.RLock()
         self._wake_event = threading.Event()
         self._registrations: dict[str, _WatchRegistration] = {}
+        self._entry_snapshots: dict[str, EntrySnapshot | None] = {}
+        self._pending_entries: dict[str, _PendingEntries] = {}
         self._thread: threading.Thread | None = None
+        # Observer.schedule() blocks on the observer lock, which watchdog holds
+        # while dispatching into record_entry_event(); never call it under _lock.
+        self._native_lock = threading.Lock()
+        self._observer = None
+        self._native_watches: dict[str, object] = {}
+        self._native_paths: frozenset[str] = frozenset()
+        # Directories whose native watch died (deleted, moved away, emitter
+        # error); they stay on polling while any registration still wants them.
+        self._lost_native_paths: set[str] = set()
 
     def watch(
         self,
         paths: Iterable[str],
         callback: DirectoryChangedCallback,
+        *,
+        on_entries: EntryChangesCallback | None = None,
     ) -> MediaDirectoryWatchHandle:
         registration_id = uuid.uuid4().hex
-        registration = _WatchRegistration(callback=callback)
+        registration = _WatchRegistration(callback=callback, on_entries=on_entries)
         with self._lock:
             self._registrations[registration_id] = registration
             self._replace_paths_locked(registration, paths)
             if self._auto_start:
                 self._ensure_thread_locked()
+        self._sync_native_watches()
         self._wake_event.set()
         return MediaDirectoryWatchHandle(self, registration_id)
 
+    @property
+    def native_paths(self) -> frozenset[str]:
+        """Directories currently served by the native observer instead of polling."""
+
+        return self._native_paths
+
+    def record_entry_event(self, kind: str, path: str) -> None:
+        """Fold one native file event into its directory's coalescing window."""
+
+        directory = _normalize_directory(os.path.dirname(path))
+        if directory not in self._native_paths:
+            return
+        with self._lock:
+            was_idle = not self._pending_entries
+            self._record_entry_locked(directory, kind, path)
+        if was_idle:
+            # Only the first event of a burst needs to wake the thread to arm
+            # the window deadline; the rest just extend it.
+            self._wake_event.set()
+
+    def native_watch_lost(self, path: str) -> None:
+        """Return a natively watched directory to polling once it disappears.
+
+        Called from the observer's dispatch thread, so it must not touch the
+        observer; the monitor thread unschedules the dead watch on its next pass.
+        """
+
+        directory = _normalize_directory(path)
+        with self._lock:
+            if directory not in self._native_paths:
+                return
+            self._lost_native_paths.add(directory)
+            self._native_paths = self._native_paths - {directory}
+            self._mark_overflow_locked(directory)
+        self._wake_event.set()
+
     def poll_once(self) -> None:
         """Run one deterministic polling pass; also used by focused unit tests."""
 
+        native_paths = self._native_paths
         with self._lock:
             registrations = {
-                registration_id: tuple(registration.paths)
+                registration_id: tuple(path for path in registration.paths if path not in native_paths)
                 for registration_id, registration in self._registrations.items()
             }
+            entry_paths = {
+                path
+                for registration_id, paths in registrations.items()
+                if self._registrations[registration_id].on_entries is not None
+                for path in paths
+            }
         unique_paths = {path for paths in registrations.values() for path in paths}
         signatures = {path: self._signature_provider(path) for path in unique_paths}
         callbacks: list[tuple[DirectoryChangedCallback, str]] = []
+        changed_entry_paths: set[str] = set()
 
         with self._lock:
             for registration_id, paths in registrations.items():
@@ -128,11 +370,74 @@ class MediaDirectoryMonitor:
                     previous = registration.signatures[path]
                     current = signatures[path]
                     registration.signatures[path] = current
-                    if previous is _UNSET:
+                    if previous is _UNSET or previous == current:
                         continue
-                    if previous != current:
+                    if registration.on_entries is None:
                         callbacks.append((registration.callback, path))
+                    else:
+                        changed_entry_paths.add(path)
+            for path in list(self._entry_snapshots):
+                if path not in entry_paths:
+                    self._entry_snapshots.pop(path, None)
+            baseline_paths = entry_paths - self._entry_snapshots.keys()
+
+        # Listing a directory is the expensive part; only baselines and
+        # directories whose signature moved pay for it.
+        listings = {
+            path: self._entry_snapshot_provider(path)
+            for path in baseline_paths | changed_entry_paths
+        }
+        with self._lock:
+            for path, current in listings.items():
+                previous = self._entry_snapshots.get(path)
+                self._entry_snapshots[path] = current
+                if path not in changed_entry_paths:
+                    continue
+                if previous is None or current is None:
+                    self._mark_overflow_locked(path)
+                    continue
+                changes = diff_entry_snapshots(path, previous, current)
+                for kind, changed in (
+                    (ENTRY_ADDED, changes.added),
+                    (ENTRY_REMOVED, changes.removed),
+                    (ENTRY_MODIFIED, changes.modified),
+                ):
+                    for entry_path in changed:
+                        self._record_entry_locked(path, kind, entry_path)
+
+        self._dispatch(callbacks)
+        self.flush_entry_changes()
+
+    def flush_entry_changes(self, *, force: bool = False) -> None:
+        """Deliver every coalescing window that is closed (or all of them)."""
+
+        now = self._clock()
+        deliveries: list[tuple[_WatchRegistration, MediaEntryChanges]] = []
+        with self._lock:
+            for directory, pending in list(self._pending_entries.items()):
+                if not force and not self._window_closed(pending, now):
+                    continue
+                self._pending_entries.pop(directory, None)
+                changes = _changes_from_kinds(directory, pending.kinds, overflow=pending.overflow)
+                if not len(changes) and not changes.overflow:
+                    continue
+                for registration in self._registrations.values():
+                    if directory in registration.signatures:
+                        deliveries.append((registration, changes))
 
+        callbacks: list[tuple[DirectoryChangedCallback, str]] = []
+        for registration, changes in deliveries:
+            if registration.on_entries is None:
+                callbacks.append((registration.callback, changes.directory))
+                continue
+            try:
+                registration.on_entries(changes)
+            except Exception:
+                continue
+        self._dispatch(callbacks)
+
+    @staticmethod
+    def _dispatch(callbacks: list[tuple[DirectoryChangedCallback, str]]) -> None:
         for callback, path in callbacks:
             try:
                 callback(path)
@@ -141,6 +446,50 @@ class MediaDirectoryMonitor:
                 # one process-wide watcher used by every frontend session.
                 continue
 
+    def _window_closed(self, pending: _PendingEntries, now: float) -> bool:
+        return (
+            now - pending.last_at >= self.COALESCE_QUIET_SECONDS
+            or now - pending.first_at >= self.COALESCE_MAX_SECONDS
+        )
+
+    def _next_flush_delay(self) -> float | None:
+        with self._lock:
+            if not self._pending_entries:
+                return None
+            now = self._clock()
+            return max(
+                0.0,
+                min(
+                    min(pending.last_at + self.COALESCE_QUIET_SECONDS, pending.first_at + self.COALESCE_MAX_SECONDS)
+                    for pending in self._pending_entries.values()
+                )
+                - now,
+            )
+
+    def _pending_for_locked(self, directory: str) -> _PendingEntries:
+        now = self._clock()
+        pending = self._pending_entries.get(directory)
+        if pending is None:
+            pending = _PendingEntries(first_at=now, last_at=now)
+            self._pending_entries[directory] = pending
+        pending.last_at = now
+        return pending
+
+    def _record_entry_locked(self, directory: str, kind: str, path: str) -> None:
+        pending = self._pending_for_locked(directory)
+        if pending.overflow:
+            return
+        _fold_kind(pending.kinds, path, kind)
+        if len(pending.kinds) > self.MAX_BATCH_ENTRIES:
+            # Past this size a single directory scan is cheaper than replaying entries.
+            pending.kinds.clear()
+            pending.overflow = True
+
+    def _mark_overflow_locked(self, directory: str) -> None:
+        pending = self._pending_for_locked(directory)
+        pending.kinds.clear()
+        pending.overflow = True
+
     def _replace_paths(self, registration_id: str, paths: Iterable[str]) -> None:
         with self._lock:
             registration = self._registrations.get(registration_id)
@@ -149,6 +498,7 @@ class MediaDirectoryMonitor:
             self._replace_paths_locked(registration, paths)
             if self._auto_start:
                 self._ensure_thread_locked()
+        self._sync_native_watches()
         self._wake_event.set()
 
     @staticmethod
@@ -169,8 +519,61 @@ class MediaDirectoryMonitor:
     def _remove(self, registration_id: str) -> None:
         with self._lock:
             self._registrations.pop(registration_id, None)
+        self._sync_native_watches()
         self._wake_event.set()
 
+    def _sync_native_watches(self) -> None:
+        """Schedule native watches for watched paths; failures stay on polling."""
+
+        if not self._native_enabled:
+            return
+        with self._native_lock:
+            with self._lock:
+                wanted = {path for registration in self._registrations.values() for path in registration.paths}
+                self._lost_native_paths &= wanted
+            observer = self._observer
+            if observer is None and wanted:
+                observer = Observer()
+                observer.daemon = True
+                observer.start()
+                self._observer = observer
+            if observer is None:
+                return
+            dead = self._dead_native_paths(observer)
+            with self._lock:
+                for path in dead - self._lost_native_paths:
+                    self._mark_overflow_locked(path)
+                self._lost_native_paths |= dead
+                lost = set(self._lost_native_paths)
+            handler = _NativeEventHandler(self)
+            for path in list(self._native_watches):
+                if path not in wanted or path in lost:
+                    try:
+                        observer.unschedule(self._native_watches.pop(path))
+                    except (KeyError, OSError):
+                        continue
+            for path in wanted - self._native_watches.keys() - lost:
+                try:
+                    self._native_watches[path] = observer.schedule(handler, path, recursive=False)
+                except (OSError, RuntimeError):
+                    # Missing directories and exhausted inotify watch limits
+                    # fall back to signature polling for that path.
+                    continue
+            with self._lock:
+                self._native_paths = frozenset(self._native_watches.keys() - self._lost_native_paths)
+            if not wanted:
+                self._observer = None
+                observer.stop()
+
+    def _dead_native_paths(self, observer) -> set[str]:
+        """Watched paths whose emitter thread has exited (watch error or deletion)."""
+
+        emitters = getattr(observer, "emitters", None)
+        if emitters is None:
+            return set()
+        alive = {emitter.watch for emitter in emitters if emitter.is_alive()}
+        return {path for path, watch in self._native_watches.items() if watch not in alive}
+
     def _ensure_thread_locked(self) -> None:
         if self._thread is not None and self._thread.is_alive():
             return
@@ -187,8 +590,11 @@ class MediaDirectoryMonitor:
                 if not self._registrations:
                     self._thread = None
                     return
+            if self._native_watches:
+                self._sync_native_watches()
             self.poll_once()
-            self._wake_event.wait(self._interval_seconds)
+            delay = self._next_flush_delay()
+            self._wake_event.wait(self._interval_seconds if delay is None else min(delay, self._interval_seconds))
             self._wake_event.clear()
 
 
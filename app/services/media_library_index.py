@@ -0,0 +1,465 @@
+"""本地媒体库的持久化索引：路径映射到稳定 ID，重扫只写入变化的文件并支持服务端分页。"""
+
+from __future__ import annotations
+
+import os
+import sqlite3
+import threading
+import time
+from collections.abc import Iterable, Sequence
+from contextlib import closing
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable
+from uuid import uuid4
+
+from app.services.media_metadata_service import MediaMetadata, _CacheKey
+from app.services.media_metadata_store import MediaMetadataStore
+from app.utils.runtime_paths import user_data_root
+
+# 与 MediaMetadataStore 一致：SQLite 默认单条语句最多 999 个绑定参数。
+_LOOKUP_CHUNK = 500
+MAX_PAGE_SIZE = 1000
+SORT_COLUMNS = {"mtime": "mtime_ns", "title": "title_key", "size": "size"}
+CONTENT_TYPES = ("video", "image")
+
+
+def library_path_key(path: str | os.PathLike[str]) -> str:
+    """索引主键使用规范化绝对路径，Windows 下大小写不同的同一路径只登记一次。"""
+    raw = os.fspath(path)
+    try:
+        return os.path.normcase(os.path.abspath(os.path.expanduser(raw)))
+    except (OSError, TypeError, ValueError):
+        return os.path.normcase(raw)
+
+
+@dataclass(frozen=True)
+class MediaLibraryEntry:
+    """索引中的一个媒体文件；duration/resolution/format 来自元数据探测缓存。"""
+
+    id: str
+    local_path: str
+    title: str
+    ext: str
+    content_type: str
+    size: int
+    mtime_ns: int
+    duration: str = ""
+    resolution: str = ""
+    format: str = ""
+
+
+@dataclass(frozen=True)
+class MediaLibrarySyncResult:
+    total_count: int
+    video_count: int
+    image_count: int
+    added: int = 0
+    updated: int = 0
+    renamed: int = 0
+    removed: int = 0
+
+    @property
+    def changed(self) -> bool:
+        return bool(self.added or self.updated or self.renamed or self.removed)
+
+
+@dataclass(frozen=True)
+class MediaLibraryPage:
+    entries: tuple[MediaLibraryEntry, ...]
+    total_count: int
+    page: int
+    page_size: int
+
+    @property
+    def total_pages(self) -> int:
+        return max(1, -(-self.total_count // self.page_size))
+
+
+class MediaLibraryIndex:
+    """SQLite 媒体库索引，每个目录只登记直接子文件。
+
+    同步时按 (大小, mtime) 比对已登记的行，只写入新增、变化和消失的文件；消失
+    文件与新文件的大小和 mtime 完全一致时视为改名，沿用原 ID。ID 一经分配就持久
+    保存，重扫和重启都不会让同一文件换 ID。
+    """
+
+    def __init__(
+        self,
+        *,
+        db_path: str | os.PathLike[str] | None = None,
+        metadata_store: MediaMetadataStore | None = None,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self._db_path = Path(db_path or (Path(user_data_root()) / "cache" / "media_library.sqlite3"))
+        self._metadata_store = metadata_store
+        self._clock = clock
+        self._init_lock = threading.RLock()
+        self._initialized = False
+        # 同一目录的并发同步会互相把对方的新增当成改名，串行执行即可。
+        self._sync_lock = threading.Lock()
+
+    @property
+    def db_path(self) -> Path:
+        return self._db_path
+
+    def sync_directory(
+        self,
+        directory: str,
+        *,
+        video_extensions: Sequence[str],
+        image_extensions: Sequence[str],
+    ) -> MediaLibrarySyncResult:
+        """遍历目录一次并把差异写回索引；目录读取失败时抛出 OSError，索引保持原样。"""
+        video_exts = tuple(ext.lower() for ext in video_extensions)
+        image_exts = tuple(ext.lower() for ext in image_extensions)
+        media_exts = video_exts + image_exts
+        directory_key = library_path_key(directory)
+
+        scanned: dict[str, tuple[str, str, int, int]] = {}
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                if not entry.name.lower().endswith(media_exts):
+                    continue
+                try:
+                    if not entry.is_file():
+                        continue
+                    stat = entry.stat()
+                except OSError:
+                    continue
+                scanned[library_path_key(entry.path)] = (entry.path, entry.name, int(stat.st_size), int(stat.st_mtime_ns))
+
+        self._ensure_initialized()
+        with self._sync_lock, closing(self._connect()) as conn, conn:
+            known = {
+                path: (video_id, int(size), int(mtime_ns))
+                for path, video_id, size, mtime_ns in conn.execute(
+                    "SELECT path, id, size, mtime_ns FROM media_library WHERE directory = ?",
+                    (directory_key,),
+                )
+            }
+            gone = [path for path in known if path not in scanned]
+            added, updated, renamed, removed = self._write_changes(
+                conn, directory_key, known, scanned, gone, video_exts
+            )
+            conn.execute(
+                """
+                INSERT INTO media_library_dirs(directory, synced_at) VALUES (?, ?)
+                ON CONFLICT(directory) DO UPDATE SET synced_at = excluded.synced_at
+                """,
+                (directory_key, float(self._clock())),
+            )
+            counts = self._content_type_counts(conn, directory_key)
+        return MediaLibrarySyncResult(
+            total_count=sum(counts.values()),
+            video_count=counts.get("video", 0),
+            image_count=counts.get("image", 0),
+            added=added,
+            updated=updated,
+            renamed=renamed,
+            removed=removed,
+        )
+
+    def apply_changes(
+        self,
+        directory: str,
+        *,
+        upserts: Iterable[tuple[str, int, int]],
+        removed: Iterable[str],
+        video_extensions: Sequence[str],
+        image_extensions: Sequence[str],
+    ) -> dict[str, MediaLibraryEntry]:
+        """只写入目录监控报告的文件，不遍历目录；返回 upserts 中媒体文件的最新行，键为规范化路径。
+
+        upserts 为 (路径, 大小, mtime_ns)。同一批里消失的文件与新文件大小和 mtime
+        一致时同样按改名处理，沿用原 ID。
+        """
+        video_exts = tuple(ext.lower() for ext in video_extensions)
+        image_exts = tuple(ext.lower() for ext in image_extensions)
+        media_exts = video_exts + image_exts
+        directory_key = library_path_key(directory)
+        scanned: dict[str, tuple[str, str, int, int]] = {}
+        for local_path, size, mtime_ns in upserts:
+            name = os.path.basename(local_path)
+            if name.lower().endswith(media_exts):
+                scanned[library_path_key(local_path)] = (local_path, name, int(size), int(mtime_ns))
+        gone = list(dict.fromkeys(key for key in map(library_path_key, removed) if key not in scanned))
+        if not scanned and not gone:
+            return {}
+
+        self._ensure_initialized()
+        with self._sync_lock, closing(self._connect()) as conn, conn:
+            known = {
+                path: (video_id, int(size), int(mtime_ns))
+                for path, video_id, size, mtime_ns in self._rows_by_path(
+                    conn, "path, id, size, mtime_ns", [*scanned, *gone]
+                )
+            }
+            self._write_changes(conn, directory_key, known, scanned, [path for path in gone if path in known], video_exts)
+            return {
+                path: MediaLibraryEntry(*row)
+                for path, *row in self._rows_by_path(
+                    conn, "path, id, local_path, title, ext, content_type, size, mtime_ns", list(scanned)
+                )
+            }
+
+    @staticmethod
+    def _rows_by_path(conn: sqlite3.Connection, columns: str, paths: list[str]) -> list[tuple]:
+        rows: list[tuple] = []
+        for start in range(0, len(paths), _LOOKUP_CHUNK):
+            chunk = paths[start:start + _LOOKUP_CHUNK]
+            placeholders = ",".join("?" * len(chunk))
+            rows.extend(conn.execute(f"SELECT {columns} FROM media_library WHERE path IN ({placeholders})", chunk))
+        return rows
+
+    @staticmethod
+    def _write_changes(
+        conn: sqlite3.Connection,
+        directory_key: str,
+        known: dict[str, tuple[str, int, int]],
+        scanned: dict[str, tuple[str, str, int, int]],
+        gone: Iterable[str],
+        video_exts: tuple[str, ...],
+    ) -> tuple[int, int, int, int]:
+        """把扫描到的文件与已登记行的差异写回索引，返回 (新增, 更新, 改名, 删除) 行数。"""
+        vanished: dict[tuple[int, int], list[str]] = {}
+        for path in gone:
+            _video_id, size, mtime_ns = known[path]
+            vanished.setdefault((size, mtime_ns), []).append(path)
+
+        inserts: list[tuple] = []
+        updates: list[tuple] = []
+        renames: list[tuple] = []
+        for path, (local_path, name, size, mtime_ns) in scanned.items():
+            previous = known.get(path)
+            if previous is not None:
+                if previous[1:] != (size, mtime_ns):
+                    updates.append((size, mtime_ns, path))
+                continue
+            title, ext = os.path.splitext(name)
+            ext = ext.lower()
+            content_type = "video" if ext in video_exts else "image"
+            columns = (local_path, title, title.casefold(), ext, content_type, size, mtime_ns)
+            candidates = vanished.get((size, mtime_ns))
+            if candidates:
+                old_path = candidates.pop()
+                renames.append((path, *columns, old_path))
+                continue
+            inserts.append((uuid4().hex, directory_key, path, *columns))
+        removed = [path for paths in vanished.values() for path in paths]
+
+        conn.executemany("DELETE FROM media_library WHERE path = ?", [(path,) for path in removed])
+        conn.executemany(
+            """
+            UPDATE media_library SET path = ?, local_path = ?, title = ?, title_key = ?, ext = ?,
+                content_type = ?, size = ?, mtime_ns = ?
+            WHERE path = ?
+            """,
+            renames,
+        )
+        conn.executemany("UPDATE media_library SET size = ?, mtime_ns = ? WHERE path = ?", updates)
+        conn.executemany(
+            """
+            INSERT INTO media_library(
+                id, directory, path, local_path, title, title_key, ext, content_type, size, mtime_ns
+            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """,
+            inserts,
+        )
+        return len(inserts), len(updates), len(renames), len(removed)
+
+    def is_synced(self, directory: str) -> bool:
+        self._ensure_initialized()
+        with closing(self._connect()) as conn:
+            row = conn.execute(
+                "SELECT 1 FROM media_library_dirs WHERE directory = ?",
+                (library_path_key(directory),),
+            ).fetchone()
+        return row is not None
+
+    def query(
+        self,
+        directory: str,
+        *,
+        page: int = 1,
+        page_size: int = 20,
+        sort: str = "mtime",
+        descending: bool = True,
+        content_type: str = "",
+        keyword: str = "",
+    ) -> MediaLibraryPage:
+        """按排序列和筛选条件返回一页；页码超出范围时落到最后一页。"""
+        column = SORT_COLUMNS.get(sort)
+        if column is None:
+            raise ValueError(f"unsupported sort: {sort}")
+        if content_type and content_type not in CONTENT_TYPES:
+            raise ValueError(f"unsupported content type: {content_type}")
+        page_size = min(max(1, int(page_size)), MAX_PAGE_SIZE)
+        where = ["directory = ?"]
+        params: list[object] = [library_path_key(directory)]
+        if content_type:
+            where.append("content_type = ?")
+            params.append(content_type)
+        for term in str(keyword or "").casefold().split():
+            where.append("title_key LIKE ? ESCAPE '\\'")
+            escaped = term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+            params.append(f"%{escaped}%")
+        clause = " AND ".join(where)
+        direction = "DESC" if descending else "ASC"
+
+        self._ensure_initialized()
+        with closing(self._connect()) as conn:
+            total = int(conn.execute(f"SELECT COUNT(*) FROM media_library WHERE {clause}", params).fetchone()[0])
+            total_pages = max(1, -(-total // page_size))
+            current = min(max(1, int(page)), total_pages)
+            rows = conn.execute(
+                f"""
+                SELECT id, local_path, title, ext, content_type, size, mtime_ns
+                FROM media_library WHERE {clause}
+                ORDER BY {column} {direction}, id {direction}
+                LIMIT ? OFFSET ?
+                """,
+                (*params, page_size, (current - 1) * page_size),
+            ).fetchall()
+        entries = self._with_metadata([MediaLibraryEntry(*row) for row in rows])
+        return MediaLibraryPage(entries=tuple(entries), total_count=total, page=current, page_size=page_size)
+
+    def entries_by_id(self, ids: Iterable[str]) -> dict[str, MediaLibraryEntry]:
+        wanted = list(dict.fromkeys(str(video_id) for video_id in ids if video_id))
+        if not wanted:
+            return {}
+        self._ensure_initialized()
+        found: list[MediaLibraryEntry] = []
+        with closing(self._connect()) as conn:
+            for start in range(0, len(wanted), _LOOKUP_CHUNK):
+                chunk = wanted[start:start + _LOOKUP_CHUNK]
+                placeholders = ",".join("?" * len(chunk))
+                found.extend(
+                    MediaLibraryEntry(*row)
+                    for row in conn.execute(
+                        f"""
+                        SELECT id, local_path, title, ext, content_type, size, mtime_ns
+                        FROM media_library WHERE id IN ({placeholders})
+                        """,
+                        chunk,
+                    )
+                )
+        return {entry.id: entry for entry in self._with_metadata(found)}
+
+    def rename_path(self, old_path: str, new_path: str) -> None:
+        """应用内重命名后立即改写路径，保留原 ID，不等下一轮扫描按大小/mtime 配对。"""
+        title, ext = os.path.splitext(os.path.basename(new_path))
+        self._ensure_initialized()
+        with closing(self._connect()) as conn, conn:
+            conn.execute(
+                """
+                UPDATE media_library SET path = ?, directory = ?, local_path = ?, title = ?, title_key = ?, ext = ?
+                WHERE path = ?
+                """,
+                (
+                    library_path_key(new_path),
+                    library_path_key(os.path.dirname(new_path) or "."),
+                    new_path,
+                    title,
+                    title.casefold(),
+                    ext.lower(),
+                    library_path_key(old_path),
+                ),
+            )
+
+    def remove_paths(self, paths: Iterable[str]) -> int:
+        unique = list(dict.fromkeys(library_path_key(path) for path in paths if path))
+        if not unique:
+            return 0
+        self._ensure_initialized()
+        with closing(self._connect()) as conn, conn:
+            cursor = conn.executemany("DELETE FROM media_library WHERE path = ?", [(path,) for path in unique])
+            return int(cursor.rowcount or 0)
+
+    def count(self, directory: str | None = None) -> int:
+        self._ensure_initialized()
+        with closing(self._connect()) as conn:
+            if directory is None:
+                return int(conn.execute("SELECT COUNT(*) FROM media_library").fetchone()[0])
+            return sum(self._content_type_counts(conn, library_path_key(directory)).values())
+
+    def _with_metadata(self, entries: list[MediaLibraryEntry]) -> list[MediaLibraryEntry]:
+        """只为当前页补齐探测结果；未命中的条目保持空值，由调用方按需异步探测。"""
+        if self._metadata_store is None or not entries:
+            return entries
+        keys = [_CacheKey(path=entry.local_path, size=entry.size, mtime_ns=entry.mtime_ns) for entry in entries]
+        try:
+            found, _stale = self._metadata_store.get_many(keys)
+        except sqlite3.Error:
+            return entries
+        return [self._merge_metadata(entry, found.get(entry.local_path)) for entry in entries]
+
+    @staticmethod
+    def _merge_metadata(entry: MediaLibraryEntry, metadata: MediaMetadata | None) -> MediaLibraryEntry:
+        if metadata is None:
+            return entry
+        return MediaLibraryEntry(
+            id=entry.id,
+            local_path=entry.local_path,
+            title=entry.title,
+            ext=entry.ext,
+            content_type=entry.content_type,
+            size=entry.size,
+            mtime_ns=entry.mtime_ns,
+            duration=metadata.duration or "",
+            resolution=metadata.resolution or "",
+            format=metadata.format or "",
+        )
+
+    @staticmethod
+    def _content_type_counts(conn: sqlite3.Connection, directory_key: str) -> dict[str, int]:
+        return {
+            str(content_type): int(count)
+            for content_type, count in conn.execute(
+                "SELECT content_type, COUNT(*) FROM media_library WHERE directory = ? GROUP BY content_type",
+                (directory_key,),
+            )
+        }
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self._db_path, timeout=5.0)
+        conn.execute("PRAGMA busy_timeout = 5000")
+        # 索引可由重扫完整重建，最后几次写入丢失只会让下一轮多登记几行。
+        conn.execute("PRAGMA synchronous = NORMAL")
+        return conn
+
+    def _ensure_initialized(self) -> None:
+        if self._initialized:
+            return
+        with self._init_lock:
+            if self._initialized:
+                return
+            self._db_path.parent.mkdir(parents=True, exist_ok=True)
+            with closing(sqlite3.connect(self._db_path, timeout=5.0)) as conn:
+                conn.execute("PRAGMA busy_timeout = 5000")
+                conn.execute("PRAGMA journal_mode = WAL")
+                conn.executescript(
+                    """
+                    CREATE TABLE IF NOT EXISTS media_library (
+                        id TEXT PRIMARY KEY,
+                        directory TEXT NOT NULL,
+                        path TEXT NOT NULL UNIQUE,
+                        local_path TEXT NOT NULL,
+                        title TEXT NOT NULL,
+                        title_key TEXT NOT NULL,
+                        ext TEXT NOT NULL,
+                        content_type TEXT NOT NULL,
+                        size INTEGER NOT NULL,
+                        mtime_ns INTEGER NOT NULL
+                    );
+                    CREATE INDEX IF NOT EXISTS idx_media_library_mtime ON media_library(directory, mtime_ns);
+                    CREATE INDEX IF NOT EXISTS idx_media_library_title ON media_library(directory, title_key);
+                    CREATE INDEX IF NOT EXISTS idx_media_library_size ON media_library(directory, size);
+                    CREATE TABLE IF NOT EXISTS media_library_dirs (
+                        directory TEXT PRIMARY KEY,
+                        synced_at REAL NOT NULL
+                    );
+                    """
+                )
+                conn.commit()
+            self._initialized = True
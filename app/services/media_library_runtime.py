@@ -11,6 +11,7 @@ from app.core.state import VideoStatus, parse_video_status
 from app.exceptions import FileOperationError
 from app.models import VideoItem
 from app.services.file_service import ScanResult
+from app.services.media_directory_monitor import MediaEntryChanges
 from app.services.keyed_lock_pool import KeyedLockPool
 
 
@@ -57,6 +58,16 @@ class MediaScanReconcileOutcome:
     def changed(self) -> bool:
         return bool(self.added_ids or self.removed_ids)
 
+@dataclass(frozen=True)
+class MediaLibraryPageOutcome:
+    """One server-side page of the indexed media library."""
+
+    items: tuple[VideoItem, ...]
+    total_count: int
+    page: int
+    page_size: int
+    total_pages: int
+
 class MediaLibraryMixin:
     """GUI/Web host 共用的媒体库编排；文件 IO 结果通过统一 Outcome 返回。"""
 
@@ -71,6 +82,8 @@ class MediaLibraryMixin:
 
     @staticmethod
     def _build_scan_summary_message(result: ScanResult) -> str:
+        if result.truncated and result.indexed:
+            return f"📚 媒体库共 {result.original_count} 个文件，列表加载最新的 {result.total_count} 个，其余可在已完成页翻页查看。"
         if result.truncated:
             return f"⚠️ 文件过多 ({result.original_count}个)，仅加载最新的 {result.total_count} 个。"
         if result.total_count == 0:
@@ -180,11 +193,7 @@ class MediaLibraryMixin:
             self._prepare_local_item(item)
 
         snapshot = self._snapshot_video_references()
-        existing_by_path: dict[str, VideoItem] = {}
-        for item in snapshot.values():
-            path = self._normalize_library_path(getattr(item, "local_path", ""))
-            if path and path not in existing_by_path:
-                existing_by_path[path] = item
+        existing_by_path = self._videos_by_library_path(snapshot)
 
         resolved_items: list[VideoItem] = []
         additions: list[VideoItem] = []
@@ -213,32 +222,18 @@ class MediaLibraryMixin:
                 continue
             parent = self._normalize_library_path(os.path.dirname(path))
             outside_library = not self._path_is_within_directory(path, normalized_directory)
-            absent_direct_child = parent == normalized_directory and path not in scanned_paths
+            # 索引扫描只返回最新窗口，窗口外的直接子文件是否还在交给 missing_items 的逐个 stat 判断。
+            absent_direct_child = (
+                parent == normalized_directory
+                and path not in scanned_paths
+                and not (result.indexed and result.truncated)
+            )
             missing_nested_item = missing_items.get(video_id) is item
             duplicate_scanned_path = path in scanned_paths and video_id not in retained_ids
             if outside_library or absent_direct_child or missing_nested_item or duplicate_scanned_path:
                 expected_removals[video_id] = item
 
-        app_state = getattr(self, "app_state", None)
-        if app_state is not None and callable(getattr(app_state, "reconcile_videos", None)):
-            added_ids, removed_ids = app_state.reconcile_videos(
-                additions,
-                remove_if_matches=expected_removals,
-            )
-        else:
-            added_ids: list[str] = []
-            removed_ids: list[str] = []
-            with self._video_state_guard():
-                videos = getattr(self, "videos", {})
-                for video_id, expected in expected_removals.items():
-                    if videos.get(video_id) is expected:
-                        videos.pop(video_id, None)
-                        removed_ids.append(video_id)
-                for item in additions:
-                    if item.id not in videos:
-                        added_ids.append(item.id)
-                    videos[item.id] = item
-
+        added_ids, removed_ids = self._commit_media_reconcile(additions, expected_removals)
         return MediaScanReconcileOutcome(
             items=tuple(resolved_items),
             added_ids=tuple(added_ids),
@@ -246,6 +241,148 @@ class MediaLibraryMixin:
             retained_ids=tuple(sorted(retained_ids)),
         )
 
+    def _collect_media_entry_changes(
+        self,
+        directory: str,
+        batches: list[MediaEntryChanges],
+    ) -> tuple[list[VideoItem], set[str]]:
+        """在工作线程里把目录监控的逐文件差异写入索引，返回 (新增条目, 已确认消失的规范化路径)。
+
+        开销只与变化的文件数成正比。与全量扫描一致，只有保存目录的直接子文件会新增
+        条目；合集子目录的差异只用于发现已完成条目的文件被删除或移走。
+        """
+
+        normalized_directory = self._normalize_library_path(directory)
+        new_items: list[VideoItem] = []
+        removed_paths: set[str] = set()
+        for changes in batches:
+            is_root = self._normalize_library_path(changes.directory) == normalized_directory
+            new_items.extend(
+                self.file_service.apply_entry_changes(
+                    changes.directory,
+                    added=changes.added if is_root else (),
+                    removed=changes.removed,
+                    modified=changes.modified if is_root else (),
+                )
+            )
+            removed_paths.update(
+                self._normalize_library_path(path)
+                for path in changes.removed
+                if not os.path.lexists(path)
+            )
+        return new_items, removed_paths
+
+    def _reconcile_media_entry_changes(
+        self,
+        new_items: list[VideoItem],
+        removed_paths: set[str],
+    ) -> MediaScanReconcileOutcome:
+        """把 ``_collect_media_entry_changes`` 的结果并入运行时状态，已在状态中的路径不重复添加。"""
+
+        snapshot = self._snapshot_video_references()
+        existing_by_path = self._videos_by_library_path(snapshot)
+        additions: list[VideoItem] = []
+        for item in new_items:
+            path = self._normalize_library_path(getattr(item, "local_path", ""))
+            if not path or path in removed_paths or path in existing_by_path:
+                continue
+            self._prepare_local_item(item)
+            existing_by_path[path] = item
+            additions.append(item)
+
+        expected_removals = {
+            video_id: item
+            for video_id, item in snapshot.items()
+            if self._is_completed_library_item(item)
+            and self._normalize_library_path(getattr(item, "local_path", "")) in removed_paths
+        }
+        added_ids, removed_ids = self._commit_media_reconcile(additions, expected_removals)
+        return MediaScanReconcileOutcome(
+            items=tuple(additions),
+            added_ids=tuple(added_ids),
+            removed_ids=tuple(removed_ids),
+            retained_ids=(),
+        )
+
+    def _videos_by_library_path(self, snapshot: dict[str, VideoItem]) -> dict[str, VideoItem]:
+        existing_by_path: dict[str, VideoItem] = {}
+        for item in snapshot.values():
+            path = self._normalize_library_path(getattr(item, "local_path", ""))
+            if path and path not in existing_by_path:
+                existing_by_path[path] = item
+        return existing_by_path
+
+    def _commit_media_reconcile(
+        self,
+        additions: list[VideoItem],
+        expected_removals: dict[str, VideoItem],
+    ) -> tuple[list[str], list[str]]:
+        """一次性提交新增和删除；删除按对象身份校验，扫描期间被替换的条目保持不动。"""
+
+        app_state = getattr(self, "app_state", None)
+        if app_state is not None and callable(getattr(app_state, "reconcile_videos", None)):
+            return app_state.reconcile_videos(additions, remove_if_matches=expected_removals)
+        added_ids: list[str] = []
+        removed_ids: list[str] = []
+        with self._video_state_guard():
+            videos = getattr(self, "videos", {})
+            for video_id, expected in expected_removals.items():
+                if videos.get(video_id) is expected:
+                    videos.pop(video_id, None)
+                    removed_ids.append(video_id)
+            for item in additions:
+                if item.id not in videos:
+                    added_ids.append(item.id)
+                videos[item.id] = item
+        return added_ids, removed_ids
+
+    def _query_media_library_page(self, directory: str, **filters) -> MediaLibraryPageOutcome:
+        """分页读取媒体库索引；运行时状态之外的行只放进当前页覆盖层，翻页即整体替换，不并入 AppState。"""
+
+        page = self.file_service.query_library(directory, **filters)
+        snapshot = self._snapshot_video_references()
+        existing_by_path = self._videos_by_library_path(snapshot)
+
+        resolved_items: list[VideoItem] = []
+        page_items: dict[str, VideoItem] = {}
+        with self._video_state_guard():
+            previous_page = dict(getattr(self, "_library_page_items", None) or {})
+        for entry in page.entries:
+            existing = snapshot.get(entry.id) or existing_by_path.get(self._normalize_library_path(entry.local_path))
+            if existing is not None:
+                resolved_items.append(existing)
+                continue
+            # 同一行跨两次查询保持对象身份，进行中的删除/重命名按身份校验时不会被翻页打断。
+            item = previous_page.get(entry.id)
+            if item is None or item.local_path != entry.local_path:
+                item = self.file_service.library_item(entry)
+                self._prepare_local_item(item)
+            page_items[item.id] = item
+            resolved_items.append(item)
+
+        with self._video_state_guard():
+            self._library_page_items = page_items
+        return MediaLibraryPageOutcome(
+            items=tuple(resolved_items),
+            total_count=page.total_count,
+            page=page.page,
+            page_size=page.page_size,
+            total_pages=page.total_pages,
+        )
+
+    def _library_page_lookup(self, video_id: str) -> VideoItem | None:
+        """按 ID 取当前库分页覆盖层里的行，供行操作在条目不在运行时状态时回退使用。"""
+
+        with self._video_state_guard():
+            page_items = getattr(self, "_library_page_items", None)
+            return page_items.get(video_id) if page_items else None
+
+    def _discard_library_page_item(self, video_id: str) -> None:
+        with self._video_state_guard():
+            page_items = getattr(self, "_library_page_items", None)
+            if page_items:
+                page_items.pop(video_id, None)
+
     def _media_watch_directories(self, directory: str) -> tuple[str, ...]:
         """Watch the root plus collection folders represented in completed state."""
 
@@ -396,6 +533,7 @@ class MediaLibraryMixin:
                     outcome = self._superseded_delete_outcome(context)
                 else:
                     if current is context.video:
+                        self._discard_library_page_item(context.video_id)
                         if app_state is not None and hasattr(app_state, "videos"):
                             app_state.videos.pop(context.video_id, None)
                             task_state = getattr(app_state, "task_state", None)
@@ -589,7 +727,7 @@ class MediaLibraryMixin:
 
     def _video_lookup(self, video_id: str) -> VideoItem | None:
         with self._video_state_guard():
-            return self.videos.get(video_id)
+            return self.videos.get(video_id) or self._library_page_lookup(video_id)
 
     def _store_video_item(self, item: VideoItem) -> None:
         with self._media_item_guard(item.id):
@@ -4,6 +4,7 @@ from __future__ import annotations
 
 import json
 import re
+import sqlite3
 import subprocess
 import sys
 import threading
@@ -11,11 +12,14 @@ import time
 from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Callable
+from typing import TYPE_CHECKING, Callable, Iterable
 
 from app.core.downloaders.external import ExternalToolRunner, FFmpegExternalTool, build_hidden_startupinfo
 from app.debug_logger import debug_logger
 
+if TYPE_CHECKING:
+    from app.services.media_metadata_store import MediaMetadataStore
+
 
 @dataclass(frozen=True, slots=True)
 class MediaMetadata:
@@ -36,7 +40,8 @@ class MediaMetadataService:
     """异步探测本地媒体元数据，避免完成列表渲染时被 ffprobe/系统 Shell 阻塞。
 
     同一路径只去重正在执行的探测，``max_workers`` 只限制执行并发；不同路径的
-    待执行任务以及按路径保存的缓存都没有全局数量上限。
+    待执行任务以及按路径保存的内存缓存都没有全局数量上限。有效结果同时写入
+    ``MediaMetadataStore``，重启后内存未命中时先批量查持久化索引，不必重新探测。
     """
 
     DURATION_RE = re.compile(r"Duration:\s*(?P<clock>\d{2}:\d{2}:\d{2})(?:\.\d+)?")
@@ -51,6 +56,8 @@ class MediaMetadataService:
         ffmpeg_resolver: Callable[[], str | None] | None = None,
         runner: Callable[..., subprocess.CompletedProcess] | None = None,
         max_workers: int = 2,
+        store: MediaMetadataStore | None = None,
+        persistent: bool = True,
     ) -> None:
         self._ffprobe_resolver = ffprobe_resolver or (
             lambda: ExternalToolRunner.resolve_executable("ffprobe.exe", "ffprobe", ["-version"])
@@ -62,6 +69,14 @@ class MediaMetadataService:
         self._empty_cache: dict[str, tuple[_CacheKey, float]] = {}
         self._inflight: set[str] = set()
         self._shutdown = False
+        if store is None and persistent:
+            from app.services.media_metadata_store import MediaMetadataStore
+
+            store = MediaMetadataStore()
+        self._store = store
+        # 已经查过持久化索引的 (路径, 大小, mtime)，未命中的同一版本文件不再重复查询。
+        self._store_checked: dict[str, _CacheKey] = {}
+        self._sweep_submitted = False
         self._executor = ThreadPoolExecutor(
             max_workers=max(1, int(max_workers or 1)),
             thread_name_prefix="media-metadata-probe",
@@ -76,7 +91,83 @@ class MediaMetadataService:
             cached = self._cache.get(key.path)
             if cached and cached[0] == key and self._has_useful_metadata(cached[1]):
                 return cached[1]
-        return None
+            if self._store_checked.get(key.path) == key:
+                return None
+        return self._load_from_store([key]).get(key.path)
+
+    def cached_many(self, paths: Iterable[str | Path]) -> dict[str, MediaMetadata]:
+        """批量读取缓存，用于整批扫描结果；内存未命中的路径合并成一次持久化索引查询。"""
+        keys = [key for key in (self._cache_key(path) for path in paths) if key is not None]
+        results: dict[str, MediaMetadata] = {}
+        missing: list[_CacheKey] = []
+        with self._lock:
+            for key in keys:
+                cached = self._cache.get(key.path)
+                if cached and cached[0] == key and self._has_useful_metadata(cached[1]):
+                    results[key.path] = cached[1]
+                elif self._store_checked.get(key.path) != key:
+                    missing.append(key)
+        results.update(self._load_from_store(missing))
+        return results
+
+    def prefetch(self, paths: Iterable[str | Path]) -> int:
+        """只为从未见过的路径批量预热；已知路径交给 ``cached`` 逐个校验，不重复 stat。"""
+        with self._lock:
+            if self._store is None or self._shutdown:
+                return 0
+            unseen = [
+                path_text
+                for path_text in dict.fromkeys(str(Path(path)) for path in paths)
+                if path_text not in self._cache and path_text not in self._store_checked
+            ]
+        if not unseen:
+            return 0
+        return len(self.cached_many(unseen))
+
+    def _load_from_store(self, keys: list[_CacheKey]) -> dict[str, MediaMetadata]:
+        store = self._store
+        if store is None or not keys:
+            return {}
+        try:
+            found, stale = store.get_many(keys)
+        except (sqlite3.Error, OSError) as exc:
+            debug_logger.log_exception(
+                "MediaMetadataService",
+                "metadata_store_read_error",
+                exc,
+                context={"path_count": len(keys)},
+            )
+            return {}
+        with self._lock:
+            if self._shutdown:
+                return found
+            for key in keys:
+                self._store_checked[key.path] = key
+                if key.path in found:
+                    self._cache[key.path] = (key, found[key.path])
+                    self._empty_cache.pop(key.path, None)
+            sweep = not self._sweep_submitted
+            self._sweep_submitted = True
+        # 访问时间、失效记录和首次全表校验都放到后台线程，读路径只做一次查询。
+        if found:
+            self._submit_store_task("metadata_store_touch", store.touch, list(found))
+        if stale:
+            self._submit_store_task("metadata_store_invalidate", store.invalidate, stale)
+        if sweep:
+            self._submit_store_task("metadata_store_sweep", store.sweep)
+        return found
+
+    def _submit_store_task(self, action: str, func: Callable[..., object], *args: object) -> None:
+        def task() -> None:
+            try:
+                func(*args)
+            except (sqlite3.Error, OSError) as exc:
+                debug_logger.log_exception("MediaMetadataService", action, exc)
+
+        try:
+            self._executor.submit(task)
+        except RuntimeError:
+            return
 
     def ensure_probe(self, path: str | Path, callback: Callable[[MediaMetadata], None]) -> bool:
         """确保某个文件有后台探测；同一路径同一时刻只提交一个 worker。"""
@@ -98,8 +189,13 @@ class MediaMetadataService:
 
         def worker() -> None:
             try:
+                stored = None
+                with self._lock:
+                    unchecked = self._store_checked.get(key.path) != key
+                if unchecked:
+                    stored = self._load_from_store([key]).get(key.path)
                 try:
-                    metadata = self.probe(key.path)
+                    metadata = stored or self.probe(key.path)
                 except Exception as exc:  # pragma: no cover - 隔离后台工作线程的意外失败
                     debug_logger.log_exception(
                         "MediaMetadataService",
@@ -118,6 +214,16 @@ class MediaMetadataService:
                             self._cache.pop(key.path, None)
                             self._empty_cache[key.path] = (key, time.monotonic())
                         should_callback = True
+                if should_callback and stored is None and self._store is not None and self._has_useful_metadata(metadata):
+                    try:
+                        self._store.put(key, metadata)
+                    except (sqlite3.Error, OSError) as exc:
+                        debug_logger.log_exception(
+                            "MediaMetadataService",
+                            "metadata_store_write_error",
+                            exc,
+                            context={"path": key.path},
+                        )
                 if should_callback:
                     try:
                         callback(metadata)
@@ -0,0 +1,224 @@
+"""本地媒体元数据的持久化索引：重启后按 (路径, 大小, mtime) 直接复用探测结果。"""
+
+from __future__ import annotations
+
+import os
+import sqlite3
+import threading
+import time
+from contextlib import closing
+from pathlib import Path
+from typing import Callable, Iterable
+
+from app.services.media_metadata_service import MediaMetadata, _CacheKey
+from app.utils.runtime_paths import user_data_root
+
+# SQLite 默认单条语句最多 999 个绑定参数，批量查询按这个粒度分块。
+_LOOKUP_CHUNK = 500
+
+
+class MediaMetadataStore:
+    """SQLite 元数据索引，只保存有时长或分辨率的有效结果。
+
+    命中必须同时匹配文件大小和 mtime，否则视为文件已变化并删除旧记录；条目数超过
+    ``max_entries`` 时按最近访问时间淘汰最久未用的记录。
+    """
+
+    DEFAULT_MAX_ENTRIES = 50_000
+    SWEEP_BATCH = 1000
+
+    def __init__(
+        self,
+        *,
+        db_path: str | os.PathLike[str] | None = None,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self._db_path = Path(db_path or (Path(user_data_root()) / "cache" / "media_metadata.sqlite3"))
+        self._max_entries = max(1, int(max_entries or self.DEFAULT_MAX_ENTRIES))
+        self._clock = clock
+        self._init_lock = threading.RLock()
+        self._initialized = False
+
+    @property
+    def db_path(self) -> Path:
+        return self._db_path
+
+    @property
+    def max_entries(self) -> int:
+        return self._max_entries
+
+    def get_many(self, keys: Iterable[_CacheKey]) -> tuple[dict[str, MediaMetadata], list[str]]:
+        """批量查询；返回 (仍然有效的结果, 大小或 mtime 已变化的路径)。"""
+        wanted = {key.path: key for key in keys}
+        if not wanted:
+            return {}, []
+        self._ensure_initialized()
+        found: dict[str, MediaMetadata] = {}
+        stale: list[str] = []
+        paths = list(wanted)
+        with closing(self._connect()) as conn:
+            for start in range(0, len(paths), _LOOKUP_CHUNK):
+                chunk = paths[start:start + _LOOKUP_CHUNK]
+                placeholders = ",".join("?" * len(chunk))
+                rows = conn.execute(
+                    f"""
+                    SELECT path, size, mtime_ns, duration, resolution, format, content_type
+                    FROM media_metadata WHERE path IN ({placeholders})
+                    """,
+                    chunk,
+                ).fetchall()
+                for path, size, mtime_ns, duration, resolution, fmt, content_type in rows:
+                    key = wanted[path]
+                    if int(size) != key.size or int(mtime_ns) != key.mtime_ns:
+                        stale.append(path)
+                        continue
+                    found[path] = MediaMetadata(
+                        duration=duration,
+                        resolution=resolution,
+                        format=fmt,
+                        content_type=content_type,
+                    )
+        return found, stale
+
+    def put(self, key: _CacheKey, metadata: MediaMetadata) -> None:
+        self.put_many([(key, metadata)])
+
+    def put_many(self, entries: Iterable[tuple[_CacheKey, MediaMetadata]]) -> None:
+        now = float(self._clock())
+        rows = [
+            (
+                key.path,
+                key.size,
+                key.mtime_ns,
+                metadata.duration,
+                metadata.resolution,
+                metadata.format,
+                metadata.content_type,
+                now,
+            )
+            for key, metadata in entries
+            if metadata.duration or metadata.resolution
+        ]
+        if not rows:
+            return
+        self._ensure_initialized()
+        with closing(self._connect()) as conn, conn:
+            conn.executemany(
+                """
+                INSERT INTO media_metadata(
+                    path, size, mtime_ns, duration, resolution, format, content_type, accessed_at
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(path) DO UPDATE SET
+                    size = excluded.size,
+                    mtime_ns = excluded.mtime_ns,
+                    duration = excluded.duration,
+                    resolution = excluded.resolution,
+                    format = excluded.format,
+                    content_type = excluded.content_type,
+                    accessed_at = excluded.accessed_at
+                """,
+                rows,
+            )
+            self._evict_over_cap(conn)
+
+    def touch(self, paths: Iterable[str]) -> None:
+        """刷新命中记录的访问时间，供 LRU 淘汰使用。"""
+        unique = list(dict.fromkeys(paths))
+        if not unique:
+            return
+        now = float(self._clock())
+        self._ensure_initialized()
+        with closing(self._connect()) as conn, conn:
+            conn.executemany(
+                "UPDATE media_metadata SET accessed_at = ? WHERE path = ?",
+                [(now, path) for path in unique],
+            )
+
+    def invalidate(self, paths: Iterable[str]) -> int:
+        unique = list(dict.fromkeys(paths))
+        if not unique:
+            return 0
+        self._ensure_initialized()
+        with closing(self._connect()) as conn, conn:
+            cursor = conn.executemany("DELETE FROM media_metadata WHERE path = ?", [(path,) for path in unique])
+            return int(cursor.rowcount or 0)
+
+    def sweep(self, *, stat: Callable[[str], os.stat_result] = os.stat) -> int:
+        """分批检查全部记录，删除文件已不存在或大小/mtime 已变化的条目。"""
+        self._ensure_initialized()
+        removed = 0
+        last_path = ""
+        while True:
+            with closing(self._connect()) as conn:
+                rows = conn.execute(
+                    "SELECT path, size, mtime_ns FROM media_metadata WHERE path > ? ORDER BY path LIMIT ?",
+                    (last_path, self.SWEEP_BATCH),
+                ).fetchall()
+            if not rows:
+                return removed
+            stale: list[str] = []
+            for path, size, mtime_ns in rows:
+                try:
+                    result = stat(path)
+                except OSError:
+                    stale.append(path)
+                    continue
+                if int(result.st_size) != int(size) or int(result.st_mtime_ns) != int(mtime_ns):
+                    stale.append(path)
+            removed += self.invalidate(stale)
+            last_path = rows[-1][0]
+
+    def count(self) -> int:
+        self._ensure_initialized()
+        with closing(self._connect()) as conn:
+            return int(conn.execute("SELECT COUNT(*) FROM media_metadata").fetchone()[0])
+
+    def _evict_over_cap(self, conn: sqlite3.Connection) -> None:
+        overflow = int(conn.execute("SELECT COUNT(*) FROM media_metadata").fetchone()[0]) - self._max_entries
+        if overflow <= 0:
+            return
+        conn.execute(
+            """
+            DELETE FROM media_metadata WHERE path IN (
+                SELECT path FROM media_metadata ORDER BY accessed_at ASC, path ASC LIMIT ?
+            )
+            """,
+            (overflow,),
+        )
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self._db_path, timeout=5.0)
+        conn.execute("PRAGMA busy_timeout = 5000")
+        # 元数据可以重新探测，丢失最后几次写入无害，不需要 FULL 同步。
+        conn.execute("PRAGMA synchronous = NORMAL")
+        return conn
+
+    def _ensure_initialized(self) -> None:
+        if self._initialized:
+            return
+        with self._init_lock:
+            if self._initialized:
+                return
+            self._db_path.parent.mkdir(parents=True, exist_ok=True)
+            with closing(sqlite3.connect(self._db_path, timeout=5.0)) as conn:
+                conn.execute("PRAGMA busy_timeout = 5000")
+                conn.execute("PRAGMA journal_mode = WAL")
+                conn.executescript(
+                    """
+                    CREATE TABLE IF NOT EXISTS media_metadata (
+                        path TEXT PRIMARY KEY,
+                        size INTEGER NOT NULL,
+                        mtime_ns INTEGER NOT NULL,
+                        duration TEXT NOT NULL DEFAULT '',
+                        resolution TEXT NOT NULL DEFAULT '',
+                        format TEXT NOT NULL DEFAULT '',
+                        content_type TEXT NOT NULL DEFAULT '',
+                        accessed_at REAL NOT NULL
+                    );
+                    CREATE INDEX IF NOT EXISTS idx_media_metadata_accessed
+                    ON media_metadata(accessed_at);
+                    """
+                )
+                conn.commit()
+            self._initialized = True
@@ -628,6 +628,13 @@ class BaseSpider(threading.Thread):
             kwargs["proxy"] = {"server": proxy_server}
         return kwargs
 
+    @staticmethod
+    def _launch_chromium(playwright, **launch_kwargs):
+        """从进程级预热浏览器池租用 Chromium；返回对象的 close() 会把进程交还池。"""
+        from app.core.anti_detection.browser_pool import browser_pool
+
+        return browser_pool.launch(playwright, **launch_kwargs)
+
     @staticmethod
     def _playwright_chromium_user_agent(browser, fallback: str = "") -> str:
         """按实际 Chromium 主版本生成 UA，避免随机 UA 与 JS 引擎特征互相矛盾。"""
@@ -7,6 +7,7 @@ from typing import Any
 
 from app.exceptions import SpiderParseError
 from app.spiders.parser_cache import cached_parser_result
+from app.utils.bilibili_streams import dash_backup_urls
 
 class BilibiliParser:
     """只做结构化解析，不访问网络，便于 spider 和测试复用。"""
@@ -83,6 +84,16 @@ class BilibiliParser:
         except (KeyError, TypeError, IndexError) as exc:
             raise SpiderParseError("Bilibili 播放流结构不完整") from exc
 
+    @staticmethod
+    def parse_play_backup_urls(resp: dict[str, Any]) -> dict[str, list[str]]:
+        """提取首个 video/audio 流的 ``backupUrl`` 镜像，下载层据此做多镜像分段下载。"""
+        dash = ((resp or {}).get("data") or {}).get("dash") or {}
+        mirrors: dict[str, list[str]] = {}
+        for kind in ("video", "audio"):
+            streams = dash.get(kind) or []
+            mirrors[f"{kind}_backup_urls"] = dash_backup_urls(streams[0] if isinstance(streams, list) and streams else None)
+        return mirrors
+
     @staticmethod
     def clean_name(name: str) -> str:
         """清理 Windows 文件名禁用字符，保持平台 task builder 命名一致。"""
@@ -252,8 +252,8 @@ class BiliAPI:
             )
             raise SpiderParseError(f"failed to fetch Bilibili video info: {query_key}={target}") from e
 
-    def get_play_url(self, bvid, cid, trace_id=None):
-        
+    def get_play_url(self, bvid, cid, trace_id=None, mirrors=None):
+        """返回 (video_url, audio_url, quality_id)；传入 ``mirrors`` 字典时顺带填入 backupUrl 镜像。"""
         def _request(fnval):
             """按指定 fnval 请求播放流，并保留签名状态与原始响应。"""
             endpoint = "https://api.bilibili.com/x/player/wbi/playurl"
@@ -305,6 +305,8 @@ class BiliAPI:
             status_code=http_status,
             trace_id=trace_id,
         )
+        if mirrors is not None:
+            mirrors.update(self.parser.parse_play_backup_urls(resp))
         return self.parser.parse_play_url_response(resp)
 
 class BilibiliSpider(BaseSpider):
@@ -467,7 +469,8 @@ class BilibiliSpider(BaseSpider):
         self.log(f"🎬 解析流: {task['file_name'][:15]}...")
         try:
             api = api or self.api
-            v_url, a_url, q_id = api.get_play_url(task['bvid'], task['cid'], trace_id=task['trace_id'])
+            mirrors: dict[str, list[str]] = {}
+            v_url, a_url, q_id = api.get_play_url(task['bvid'], task['cid'], trace_id=task['trace_id'], mirrors=mirrors)
             if not v_url:
                 self.log("   ❌ 获取流失败")
                 self.debug_state(
@@ -503,6 +506,7 @@ class BilibiliSpider(BaseSpider):
                 "cid": task["cid"],
                 "preferred_filename": task["file_name"],
                 "cookies": cookie_dict,
+                **{key: urls for key, urls in mirrors.items() if urls},
             }
             if proxy_str:
                 meta["proxy"] = proxy_str
@@ -1426,7 +1430,8 @@ class BilibiliSpider(BaseSpider):
                 return _scan_result()
         try:
             with sync_playwright() as p:
-                browser = p.chromium.launch(
+                browser = self._launch_chromium(
+                    p,
                     **self._playwright_launch_kwargs(
                         headless=self._browser_headless(),
                         proxy=(getattr(self, "config", {}) or {}).get("proxy"),
@@ -1797,7 +1802,8 @@ class BilibiliSpider(BaseSpider):
         """打开扫码登录页，并在可取消等待中持久化登录 Cookie。"""
         try:
             with sync_playwright() as p:
-                browser = p.chromium.launch(
+                browser = self._launch_chromium(
+                    p,
                     **self._playwright_launch_kwargs(
                         headless=self._browser_headless(login_window=True),
                         proxy=(getattr(self, "config", {}) or {}).get("proxy"),
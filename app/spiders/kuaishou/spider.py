@@ -905,7 +905,8 @@ class KuaishouSpider(
         headless = self._browser_headless(login_window=True)
         target_url = entry_url or "https://www.kuaishou.com/"
         self._public_domain_policy_engine().require_public_url(target_url)
-        browser = playwright.chromium.launch(
+        browser = self._launch_chromium(
+            playwright,
             **self._playwright_launch_kwargs(
                 headless=headless,
                 proxy=(getattr(self, "config", {}) or {}).get("proxy"),
@@ -930,7 +931,8 @@ class KuaishouSpider(
 
     def _run_share_browser_session(self, playwright, auth_file: str) -> str:
         """用固定无头会话解析分享详情，不进入首页、登录检查或列表扫描。"""
-        browser = playwright.chromium.launch(
+        browser = self._launch_chromium(
+            playwright,
             **self._playwright_launch_kwargs(
                 # 分享链接是单资源解析入口，即使用户启用了“显示浏览器”也保持静默。
                 headless=True,
@@ -983,7 +985,8 @@ class KuaishouSpider(
         entry_url = self._entry_url_for_login()
         target_url = entry_url or "https://www.kuaishou.com/"
         self._public_domain_policy_engine().require_public_url(target_url)
-        browser = playwright.chromium.launch(
+        browser = self._launch_chromium(
+            playwright,
             **self._playwright_launch_kwargs(
                 headless=headless,
                 proxy=(getattr(self, "config", {}) or {}).get("proxy"),
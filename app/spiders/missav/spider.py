@@ -100,7 +100,7 @@ class MissAVSpider(BaseSpider):
                 self.log(f"🌐 MissAV 人工验证使用系统 {label} {browser.version}")
                 return browser
 
-        browser = playwright.chromium.launch(**launch_kwargs)
+        browser = self._launch_chromium(playwright, **launch_kwargs)
         if not headless:
             self.log(
                 f"⚠️ 未找到可用的系统 Chrome/Edge，改用内置浏览器 {browser.version}；"
@@ -1,7 +1,7 @@
 """为无副作用的 Spider 解析结果提供内部持久缓存。
 
-缓存键包含载荷哈希；载荷变化后旧哈希键不会被主动删除。持久化 TTL 仅在命中对应
-键时惰性处理，不构成全局保留上限，因此旧键可能在 SQLite 中累积。
+缓存键包含载荷哈希；载荷变化后旧哈希键不会被主动删除，而是由 ``CacheService``
+的后台清理按过期时间和最近访问时间淘汰，库体积受其字节数和行数上限约束。
 """
 
 from __future__ import annotations
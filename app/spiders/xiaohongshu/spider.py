@@ -342,7 +342,7 @@ class XiaohongshuSpider(BaseSpider):
             self.log(f"🌍 使用代理: {proxy}")
 
         with sync_playwright() as playwright:
-            browser = playwright.chromium.launch(**launch_kwargs)
+            browser = self._launch_chromium(playwright, **launch_kwargs)
             self._track_playwright_instance(playwright)
             self._track_playwright_browser(browser)
             try:
@@ -714,7 +714,7 @@ class XiaohongshuSpider(BaseSpider):
             launch_kwargs["proxy"] = {"server": proxy}
 
         with sync_playwright() as playwright:
-            browser = playwright.chromium.launch(**launch_kwargs)
+            browser = self._launch_chromium(playwright, **launch_kwargs)
             self._track_playwright_instance(playwright)
             self._track_playwright_browser(browser)
             try:
@@ -35,6 +35,7 @@ from app.ui.components.settings_platform_controls import (
 from shared.localization import normalize_language, platform_display_name, tr
 from shared.settings_metadata import (
     CONCURRENCY_OPTIONS,
+    ENGINE_OPTIONS,
     GROUP_DESCRIPTIONS,
     GROUP_HINTS,
     GROUP_ICONS,
@@ -1039,19 +1040,14 @@ class SettingsPage(PageFrame):
     def _build_download_settings(self, layout: QVBoxLayout, value: Any) -> None:
         options = self._dict_value(value, "_options", {})
 
-        max_concurrent = self._build_combo(
+        self._add_download_combo(
+            layout,
+            "并发数",
+            "max_concurrent",
             self._dict_value(options, "max_concurrent", CONCURRENCY_OPTIONS),
             self._dict_value(value, "max_concurrent", 3),
-            width=FORM_CONTROL_WIDTH,
-        )
-        max_concurrent.currentIndexChanged.connect(
-            lambda *_args, combo=max_concurrent: self._emit_setting_changed(
-                "download",
-                "max_concurrent",
-                current_combo_int_value(combo, 3),
-            )
+            lambda combo: current_combo_int_value(combo, 3),
         )
-        layout.addWidget(self._build_setting_row("并发数", max_concurrent))
 
         image_concurrency_switch = self._build_switch(
             self._dict_value(value, "image_respects_concurrency", False)
@@ -1065,33 +1061,23 @@ class SettingsPage(PageFrame):
         )
         layout.addWidget(self._build_setting_row("图片受并发数限制", image_concurrency_switch))
 
-        request_timeout = self._build_combo(
+        self._add_download_combo(
+            layout,
+            "请求超时（秒）",
+            "request_timeout",
             self._dict_value(options, "request_timeout", TIMEOUT_OPTIONS),
             self._dict_value(value, "request_timeout", 60),
-            width=FORM_CONTROL_WIDTH,
+            lambda combo: current_combo_int_value(combo, 60),
         )
-        request_timeout.currentIndexChanged.connect(
-            lambda *_args, combo=request_timeout: self._emit_setting_changed(
-                "download",
-                "request_timeout",
-                current_combo_int_value(combo, 60),
-            )
-        )
-        layout.addWidget(self._build_setting_row("请求超时（秒）", request_timeout))
 
-        max_retries = self._build_combo(
+        self._add_download_combo(
+            layout,
+            "重试次数",
+            "max_retries",
             self._dict_value(options, "max_retries", RETRY_OPTIONS),
             self._dict_value(value, "max_retries", 3),
-            width=FORM_CONTROL_WIDTH,
-        )
-        max_retries.currentIndexChanged.connect(
-            lambda *_args, combo=max_retries: self._emit_setting_changed(
-                "download",
-                "max_retries",
-                current_combo_int_value(combo, 3),
-            )
+            lambda combo: current_combo_int_value(combo, 3),
         )
-        layout.addWidget(self._build_setting_row("重试次数", max_retries))
 
         resume_switch = self._build_switch(self._dict_value(value, "resume_enabled", True))
         resume_switch.toggled.connect(
@@ -1099,19 +1085,14 @@ class SettingsPage(PageFrame):
         )
         layout.addWidget(self._build_setting_row("断点续传", resume_switch))
 
-        speed_limit = self._build_combo(
+        self._add_download_combo(
+            layout,
+            "下载速度限制（KB/s）",
+            "speed_limit_kb",
             self._dict_value(options, "speed_limit_kb", SPEED_LIMIT_OPTIONS),
             self._dict_value(value, "speed_limit_kb", 0),
-            width=FORM_CONTROL_WIDTH,
-        )
-        speed_limit.currentIndexChanged.connect(
-            lambda *_args, combo=speed_limit: self._emit_setting_changed(
-                "download",
-                "speed_limit_kb",
-                current_combo_int_value(combo, 0),
-            )
+            lambda combo: current_combo_int_value(combo, 0),
         )
-        layout.addWidget(self._build_setting_row("下载速度限制（KB/s）", speed_limit))
 
         video_only_switch = self._build_switch(self._dict_value(value, "video_only", False))
         video_only_switch.toggled.connect(
@@ -1119,6 +1100,30 @@ class SettingsPage(PageFrame):
         )
         layout.addWidget(self._build_setting_row("仅下载视频", video_only_switch))
 
+        self._add_download_combo(
+            layout,
+            "下载引擎",
+            "engine",
+            self._dict_value(options, "engine", ENGINE_OPTIONS),
+            self._dict_value(value, "engine", "thread"),
+            current_combo_value,
+        )
+
+    def _add_download_combo(
+        self,
+        layout: QVBoxLayout,
+        label: str,
+        key: str,
+        choices: Any,
+        current: Any,
+        read_value: Any,
+    ) -> None:
+        combo = self._build_combo(choices, current, width=FORM_CONTROL_WIDTH)
+        combo.currentIndexChanged.connect(
+            lambda *_args, combo=combo: self._emit_setting_changed("download", key, read_value(combo))
+        )
+        layout.addWidget(self._build_setting_row(label, combo))
+
     def _platform_icon_label(self, platform_id: str, platform_name: str) -> QLabel:
         label = QLabel()
         label.setObjectName("SettingsPlatformIcon")
@@ -9,6 +9,7 @@ from typing import Any
 
 from app.debug_logger import debug_logger
 from app.ui.viewmodels.latest_worker import LatestRequestWorker
+from shared.frontend_row_delta import apply_row_delta
 
 
 @dataclass(frozen=True)
@@ -93,23 +94,20 @@ def _build_delta_snapshot(request: FrontendSnapshotRequest, started: float) -> F
         delta_sections = {}
 
     if bool(delta.get("full")):
-        snapshot = dict(delta_sections)
-        if not snapshot:
-            snapshot = request.service.get_snapshot(mock=request.mock, sections=None)
-        snapshot["version"] = version
-        signatures = _remember_section_signatures(snapshot, None, dict(request.section_signatures or {}))
-        return _snapshot_result(
-            sequence=request.sequence,
-            service_token=request.service_token,
-            snapshot=snapshot,
-            changed_sections=None,
-            section_signatures=signatures,
-            skip_render=False,
-            started=started,
-        )
+        return _full_snapshot_result(request, dict(delta_sections), version, started)
 
     snapshot = dict(cached)
     snapshot.update(dict(delta_sections))
+    rows = delta.get("rows")
+    row_sections: set[str] = set()
+    row_changed: set[str] = set()
+    if isinstance(rows, Mapping):
+        applied = apply_row_delta(snapshot, rows)
+        if applied is None:
+            # 本地列表与服务端计数对不上，说明缓存已经漂移，只能整体重取。
+            return _full_snapshot_result(request, {}, version, started)
+        row_sections = {str(section) for section in rows.get("sections") or ()}
+        row_changed = applied
     missing_explicit_sections = _missing_explicit_sections(sections, delta_sections)
     if missing_explicit_sections:
         # 调用方明确请求的 `section` 未出现在 `delta` 中时，再补取局部快照，
@@ -118,9 +116,13 @@ def _build_delta_snapshot(request: FrontendSnapshotRequest, started: float) -> F
         snapshot.update({key: value for key, value in explicit_snapshot.items() if key in missing_explicit_sections})
 
     snapshot["version"] = version
-    requested = _changed_section_candidates(delta, delta_sections, missing_explicit_sections)
+    requested = _changed_section_candidates(delta, delta_sections, missing_explicit_sections) - row_sections
     signatures = dict(request.section_signatures or {})
     changed_sections = _changed_sections(snapshot, frozenset(requested), signatures) if requested else set()
+    # 行级合并已经精确知道哪些列表变化；不再对整表做签名，下次整段下发时重新比较。
+    for section in row_changed:
+        signatures.pop(section, None)
+    changed_sections |= row_changed
     return _snapshot_result(
         sequence=request.sequence,
         service_token=request.service_token,
@@ -132,6 +134,27 @@ def _build_delta_snapshot(request: FrontendSnapshotRequest, started: float) -> F
     )
 
 
+def _full_snapshot_result(
+    request: FrontendSnapshotRequest,
+    snapshot: dict[str, Any],
+    version: int,
+    started: float,
+) -> FrontendSnapshotResult:
+    if not snapshot:
+        snapshot = request.service.get_snapshot(mock=request.mock, sections=None)
+    snapshot["version"] = version
+    signatures = _remember_section_signatures(snapshot, None, dict(request.section_signatures or {}))
+    return _snapshot_result(
+        sequence=request.sequence,
+        service_token=request.service_token,
+        snapshot=snapshot,
+        changed_sections=None,
+        section_signatures=signatures,
+        skip_render=False,
+        started=started,
+    )
+
+
 def _snapshot_result(
     *,
     sequence: int,
@@ -6,14 +6,13 @@ from typing import Any
 
 from app.debug_logger import debug_logger
 from shared.localization import normalize_language, tr
-from app.ui.viewmodels import log_filtering
 from app.ui.viewmodels.latest_worker import LatestRequestWorker
-from shared.log_classification import cache_classification_facts, drop_classification_facts
+from shared.log_classification import drop_classification_facts
 from shared.log_display import decorate_log_item
 from shared.log_i18n import localize_log_text
 from shared.log_pipeline_rules import derive_event_stage, derive_log_scope, derive_scope_reason
 from shared.log_platforms import PlatformUiMeta
-from app.ui.viewmodels.pagination_state import clamp_page, page_for_match, page_slice, total_pages
+from shared.log_query_index import LogQueryIndex
 
 
 @dataclass(frozen=True)
@@ -66,73 +65,53 @@ def stable_log_item_id(item: Mapping[str, Any], index: int) -> str:
     )
 
 
-def query_log_items(request: LogQueryRequest) -> LogQueryResult:
-    """在后台完成日志分类缓存、筛选、排序、分页和本地化装饰。"""
-
-    all_items = [_prepare_query_row(item) for item in request.items if isinstance(item, Mapping)]
-    filtered_items = [
-        item
-        for item in all_items
-        if log_filtering.matches_filters(
-            item,
-            category=request.category,
-            level=request.level,
-            time_range=request.time_range,
-            platform_id=request.platform_id,
-            trace_query=request.trace_query,
-            keyword=request.keyword,
-            platform_options=request.platform_options,
-            platform_meta_by_id=request.platform_meta_by_id,
-        )
-    ]
-    sorted_items = log_filtering.sort_log_items(filtered_items)
-    current_page = int(request.page or 1)
-    if request.selected_id and request.selected_id_moves_page:
-        # 详情面板选中某条日志时，筛选/刷新后优先翻到该日志所在页。
-        selected_page = page_for_match(
-            sorted_items,
-            lambda item, index: stable_log_item_id(item, index) == request.selected_id,
-            request.page_size,
-        )
-        if selected_page is not None:
-            current_page = selected_page
-    current_page = clamp_page(current_page, len(sorted_items), request.page_size)
-    page_rows = [
-        _with_log_pipeline_fields(item)
-        for item in page_slice(sorted_items, current_page, request.page_size)
-    ]
-    selected_id = ""
-    if request.selected_id and any(
-        stable_log_item_id(item, index) == request.selected_id for index, item in enumerate(page_rows)
-    ):
-        selected_id = request.selected_id
-    elif page_rows:
-        selected_id = stable_log_item_id(page_rows[0], 0)
-    page_items = [_decorate_log_row(item, request) for item in page_rows]
+def query_log_items(request: LogQueryRequest, index: LogQueryIndex | None = None) -> LogQueryResult:
+    """在后台完成日志筛选、排序、分页和本地化装饰。
 
-    counts = log_filtering.category_counts(
-        all_items,
-        request.categories,
+    传入常驻 ``index`` 时只为新进入窗口的日志计算分类事实，筛选与计数按倒排表取命中；
+    不传则为本次请求临时建索引，语义不变。
+    """
+
+    if index is None:
+        index = LogQueryIndex()
+    index.sync(
+        request.items,
+        platform_options=request.platform_options,
+        platform_meta_by_id=request.platform_meta_by_id,
+    )
+    page = index.query(
+        categories=request.categories,
+        category=request.category,
         level=request.level,
         time_range=request.time_range,
         platform_id=request.platform_id,
         trace_query=request.trace_query,
         keyword=request.keyword,
-        platform_options=request.platform_options,
-        platform_meta_by_id=request.platform_meta_by_id,
+        page=request.page,
+        page_size=request.page_size,
+        selected_id=request.selected_id,
+        selected_id_moves_page=request.selected_id_moves_page,
     )
-    first_trace_id = _first_trace_id(page_items) or _first_trace_id(sorted_items)
+    page_rows = [_with_log_pipeline_fields(item) for item in page.rows]
+    selected_id = ""
+    if request.selected_id and any(
+        stable_log_item_id(item, position) == request.selected_id for position, item in enumerate(page_rows)
+    ):
+        selected_id = request.selected_id
+    elif page_rows:
+        selected_id = stable_log_item_id(page_rows[0], 0)
+    page_items = [_decorate_log_row(item, request) for item in page_rows]
     return LogQueryResult(
         sequence=request.sequence,
         page_items=page_items,
-        category_counts=counts,
-        total_count=len(all_items),
-        matched_count=len(sorted_items),
+        category_counts=page.category_counts,
+        total_count=page.total_count,
+        matched_count=page.matched_count,
         visible_count=len(page_items),
-        current_page=current_page,
-        total_pages=total_pages(len(sorted_items), request.page_size),
+        current_page=page.current_page,
+        total_pages=page.total_pages,
         selected_id=selected_id,
-        first_trace_id=first_trace_id,
+        first_trace_id=_first_trace_id(page_items) or page.first_trace_id,
     )
 
 
@@ -144,13 +123,6 @@ def _first_trace_id(items: Sequence[Mapping[str, Any]]) -> str:
     return ""
 
 
-def _prepare_query_row(item: Mapping[str, Any]) -> dict[str, Any]:
-    row = dict(item)
-    # 分类事实缓存只存在于 worker 临时行上，最终回传前会移除，避免污染快照。
-    cache_classification_facts(row)
-    return row
-
-
 def _with_log_pipeline_fields(item: Mapping[str, Any]) -> dict[str, Any]:
     row = dict(item)
     scope = str(row.get("log_scope") or derive_log_scope(row) or "")
@@ -201,9 +173,13 @@ def _decorate_log_row(item: Mapping[str, Any], request: LogQueryRequest) -> dict
 
 
 class LogQueryWorker:
-    """以最新状态为准，处理高开销的日志筛选、排序与分页。"""
+    """以最新状态为准，处理高开销的日志筛选、排序与分页。
+
+    索引只在 worker 线程内读写，跨请求常驻，新日志到达时增量登记。
+    """
 
     def __init__(self, on_result: Callable[[LogQueryResult], None]) -> None:
+        self._index = LogQueryIndex()
         self._worker = LatestRequestWorker(
             name="log-query-worker",
             on_result=on_result,
@@ -216,11 +192,12 @@ class LogQueryWorker:
     def shutdown(self) -> None:
         self._worker.shutdown()
 
-    @staticmethod
-    def _process(request: LogQueryRequest) -> LogQueryResult:
+    def _process(self, request: LogQueryRequest) -> LogQueryResult:
         try:
-            return query_log_items(request)
+            return query_log_items(request, self._index)
         except Exception as exc:
+            # 同步中途失败的索引可能只登记了一半，丢弃后下次请求整体重建。
+            self._index = LogQueryIndex()
             debug_logger.log_exception(
                 "LogQueryWorker",
                 "query_log_items",
@@ -0,0 +1,13 @@
+"""Bilibili DASH 播放流字段的共用解析，爬虫解析器和下载器取镜像地址时复用。"""
+
+from __future__ import annotations
+
+from typing import Any
+
+
+def dash_backup_urls(stream: Any) -> list[str]:
+    """返回单个 DASH 流的 ``backupUrl`` 镜像列表；字段缺失或结构异常时返回空列表。"""
+    if not isinstance(stream, dict):
+        return []
+    backups = stream.get("backupUrl") or stream.get("backup_url") or []
+    return [str(url) for url in backups if url] if isinstance(backups, list) else []
@@ -0,0 +1,246 @@
+"""调试日志的结构化旁路：每条记录追加为一行 JSON，并维护定长偏移索引。
+
+``debug_x.log`` 旁边生成 ``debug_x.jsonl``（记录正文）和 ``debug_x.idx``（索引）。索引每条 32 字节，
+依次为正文字节偏移、正文长度、毫秒时间戳、级别编码和 trace_id 哈希；条目序号即记录 ID。
+读端只需读取索引就能分页、按时间定位、按级别或 trace 过滤，命中后再按偏移读取对应 JSON，
+不必把多行文本日志重新跑一遍正则解析。
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import struct
+from collections.abc import Iterable
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, BinaryIO
+
+SIDECAR_SUFFIX = ".jsonl"
+INDEX_SUFFIX = ".idx"
+INDEX_ENTRY = struct.Struct("<QIqB3xQ")
+LEVEL_CODES = {"DEBUG": 10, "INFO": 20, "CMD": 25, "COMMAND": 25, "WARN": 30, "WARNING": 30, "ERROR": 40}
+_MAX_READ_SPAN_BYTES = 64 * 1024 * 1024
+
+
+def sidecar_paths(log_path: str | Path) -> tuple[Path, Path]:
+    """返回文本日志对应的 (JSONL 正文, 偏移索引) 路径。"""
+    path = Path(log_path)
+    return path.with_suffix(SIDECAR_SUFFIX), path.with_suffix(INDEX_SUFFIX)
+
+
+def level_code(level: str) -> int:
+    return LEVEL_CODES.get(str(level or "").strip().upper(), 0)
+
+
+def trace_hash(trace_id: str) -> int:
+    """trace_id 的 64 位摘要；空 trace 固定为 0，命中后仍需比对正文里的原值。"""
+    text = str(trace_id or "")
+    if not text:
+        return 0
+    digest = hashlib.blake2b(text.encode("utf-8", errors="replace"), digest_size=8).digest()
+    return int.from_bytes(digest, "little")
+
+
+@dataclass(frozen=True, slots=True)
+class EncodedRecord:
+    """编码好的记录，由日志写线程生成后批量拼接追加。"""
+
+    payload: bytes
+    timestamp_ms: int
+    level_code: int
+    trace_hash: int
+
+
+@dataclass(frozen=True, slots=True)
+class IndexEntry:
+    record_id: int
+    offset: int
+    length: int
+    timestamp_ms: int
+    level_code: int
+    trace_hash: int
+
+
+def encode_record(record: dict[str, Any], *, timestamp_ms: int) -> EncodedRecord:
+    payload = json.dumps(record, ensure_ascii=False, separators=(",", ":"), default=str).encode(
+        "utf-8",
+        errors="replace",
+    )
+    return EncodedRecord(
+        payload=payload,
+        timestamp_ms=int(timestamp_ms),
+        level_code=level_code(str(record.get("level") or "")),
+        trace_hash=trace_hash(str(record.get("trace_id") or "")),
+    )
+
+
+def append_records(sidecar: BinaryIO, index: BinaryIO, records: Iterable[EncodedRecord]) -> int:
+    """由唯一写线程调用：先写正文再追加索引，读端只信任完整且不越界的索引条目。"""
+    offset = os.fstat(sidecar.fileno()).st_size
+    index_size = os.fstat(index.fileno()).st_size
+    if index_size % INDEX_ENTRY.size:
+        # 上次写索引中途失败留下的半条目会让之后所有条目错位，先截回整条边界。
+        index.truncate(index_size - index_size % INDEX_ENTRY.size)
+    body = bytearray()
+    entries = bytearray()
+    count = 0
+    for record in records:
+        entries += INDEX_ENTRY.pack(
+            offset + len(body),
+            len(record.payload),
+            record.timestamp_ms,
+            record.level_code,
+            record.trace_hash,
+        )
+        body += record.payload
+        body += b"\n"
+        count += 1
+    if not count:
+        return 0
+    sidecar.write(body)
+    sidecar.flush()
+    index.write(entries)
+    index.flush()
+    return count
+
+
+class LogSidecarReader:
+    """按记录序号读取结构化旁路；所有方法都是无状态的文件读取，可在任意线程调用。"""
+
+    def __init__(self, log_path: str | Path) -> None:
+        self.log_path = Path(log_path)
+        self.sidecar_path, self.index_path = sidecar_paths(log_path)
+
+    def available(self) -> bool:
+        return self.index_path.is_file() and self.sidecar_path.is_file()
+
+    def count(self) -> int:
+        try:
+            return self.index_path.stat().st_size // INDEX_ENTRY.size
+        except OSError:
+            return 0
+
+    def generation(self) -> str:
+        """首条索引条目的摘要；日志被截断重写后随之变化，空索引返回空串。
+
+        截断后新写入的记录数可能超过旧记录数，仅比较条数无法识别，尾读方用它判断记录序号是否仍然有效。
+        """
+        try:
+            with self.index_path.open("rb") as handle:
+                data = handle.read(INDEX_ENTRY.size)
+        except OSError:
+            return ""
+        if len(data) < INDEX_ENTRY.size:
+            return ""
+        return hashlib.blake2b(data, digest_size=6).hexdigest()
+
+    def entries(self, start: int = 0, stop: int | None = None) -> list[IndexEntry]:
+        total = self.count()
+        start, stop = self._bounds(start, stop, total)
+        if start >= stop:
+            return []
+        try:
+            with self.index_path.open("rb") as handle:
+                handle.seek(start * INDEX_ENTRY.size)
+                data = handle.read((stop - start) * INDEX_ENTRY.size)
+        except OSError:
+            return []
+        return [
+            IndexEntry(start + position, *fields)
+            for position, fields in enumerate(INDEX_ENTRY.iter_unpack(data[: len(data) - len(data) % INDEX_ENTRY.size]))
+        ]
+
+    def read(self, start: int = 0, stop: int | None = None) -> list[tuple[int, dict[str, Any]]]:
+        """读取 ``[start, stop)`` 区间的记录，返回 (记录 ID, 记录) 列表。"""
+        return self.read_entries(self.entries(start, stop))
+
+    def tail(self, limit: int) -> list[tuple[int, dict[str, Any]]]:
+        total = self.count()
+        return self.read(max(0, total - max(0, int(limit))), total)
+
+    def read_entries(self, entries: list[IndexEntry]) -> list[tuple[int, dict[str, Any]]]:
+        """按索引条目读取正文；相邻条目合并成一次连续读取。"""
+        if not entries:
+            return []
+        try:
+            sidecar_size = self.sidecar_path.stat().st_size
+            handle = self.sidecar_path.open("rb")
+        except OSError:
+            return []
+        records: list[tuple[int, dict[str, Any]]] = []
+        with handle:
+            for span in self._spans(entries, sidecar_size):
+                first, last = span[0], span[-1]
+                handle.seek(first.offset)
+                data = handle.read(last.offset + last.length - first.offset)
+                for entry in span:
+                    begin = entry.offset - first.offset
+                    try:
+                        record = json.loads(data[begin : begin + entry.length])
+                    except (UnicodeDecodeError, ValueError):
+                        continue
+                    if isinstance(record, dict):
+                        records.append((entry.record_id, record))
+        return records
+
+    def seek_time(self, timestamp_ms: int) -> int:
+        """返回第一条时间戳不早于 ``timestamp_ms`` 的记录 ID；在索引文件上二分，每次探测只读一条。"""
+        target = int(timestamp_ms)
+        low, high = 0, self.count()
+        try:
+            with self.index_path.open("rb") as handle:
+                while low < high:
+                    middle = (low + high) // 2
+                    handle.seek(middle * INDEX_ENTRY.size)
+                    data = handle.read(INDEX_ENTRY.size)
+                    if len(data) < INDEX_ENTRY.size:
+                        high = middle
+                        continue
+                    if INDEX_ENTRY.unpack(data)[2] < target:
+                        low = middle + 1
+                    else:
+                        high = middle
+        except OSError:
+            return 0
+        return low
+
+    def find(
+        self,
+        *,
+        min_level: str | None = None,
+        trace_id: str | None = None,
+        start: int = 0,
+        stop: int | None = None,
+    ) -> list[IndexEntry]:
+        """只扫描定长索引筛选级别和 trace；trace 哈希命中后由调用方读取正文复核。"""
+        minimum = level_code(min_level) if min_level else 0
+        wanted_trace = trace_hash(trace_id) if trace_id else None
+        return [
+            entry
+            for entry in self.entries(start, stop)
+            if entry.level_code >= minimum and (wanted_trace is None or entry.trace_hash == wanted_trace)
+        ]
+
+    @staticmethod
+    def _bounds(start: int, stop: int | None, total: int) -> tuple[int, int]:
+        start = max(0, min(int(start), total))
+        stop = total if stop is None else max(start, min(int(stop), total))
+        return start, stop
+
+    @staticmethod
+    def _spans(entries: list[IndexEntry], sidecar_size: int) -> list[list[IndexEntry]]:
+        spans: list[list[IndexEntry]] = []
+        for entry in entries:
+            if entry.offset + entry.length > sidecar_size:
+                continue
+            if spans:
+                current = spans[-1]
+                previous = current[-1]
+                contiguous = entry.offset == previous.offset + previous.length + 1
+                if contiguous and entry.offset + entry.length - current[0].offset <= _MAX_READ_SPAN_BYTES:
+                    current.append(entry)
+                    continue
+            spans.append([entry])
+        return spans
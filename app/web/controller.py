@@ -13,7 +13,9 @@ from typing import Any, Callable
 from app.config import cfg
 from app.services.media_library_runtime import MediaLibraryMixin, MediaRenameOutcome
 from shared.controller_session import ControllerSessionMixin
+from app.core.anti_detection.browser_pool import browser_pool
 from app.core.download_manager import DownloadManager
+from app.core.downloaders.async_engine import async_download_loop
 from app.core.media_filter import IMAGE_EXTENSIONS as CORE_IMAGE_EXTENSIONS, should_skip_for_video_only
 from app.core.plugin_registry import registry
 from app.debug_logger import debug_logger
@@ -21,7 +23,11 @@ from app.exceptions import ConfigValidationError, FileOperationError
 from app.models import VideoItem
 from app.services.file_service import MediaDeleteMutationPlan, MediaLibraryService
 from app.services.frontend_event_aggregator import FrontendEventPriority, priority_for_topic, sections_for_topic
+from app.services.frontend_log_query import FrontendLogQueryService, search_log_history
 from app.services.frontend_state_service import FrontendStateService
+from app.services.media_directory_monitor import MediaEntryChanges
+from app.services.media_library_index import MediaLibraryIndex
+from app.services.media_metadata_store import MediaMetadataStore
 from shared.icon_contract import icon_manifest
 from app.web.controller_config_service import (
     DIRECTORY_NOT_AUTHORIZED_MESSAGE,
@@ -292,6 +298,7 @@ class WebController(WebMediaScanRuntimeMixin, ControllerSessionMixin, MediaLibra
         self._loop = loop
         self._send_func = send_func
         self.frontend_state_service = FrontendStateService(self)
+        self.log_query_service = FrontendLogQueryService(self.frontend_state_service.raw_log_items)
         self.bridge = WebSocketBridge(
             loop,
             send_func,
@@ -300,7 +307,11 @@ class WebController(WebMediaScanRuntimeMixin, ControllerSessionMixin, MediaLibra
         )
         self.frontend_state_service.set_frontend_event_emitter(self.bridge.emit)
 
-        self.file_service = MediaLibraryService(self.VIDEO_EXTENSIONS, self.IMAGE_EXTENSIONS)
+        self.file_service = MediaLibraryService(
+            self.VIDEO_EXTENSIONS,
+            self.IMAGE_EXTENSIONS,
+            library_index=MediaLibraryIndex(metadata_store=MediaMetadataStore()),
+        )
         self._dl_manager: DownloadManager | None = None
         self._dl_manager_lock = threading.RLock()
 
@@ -325,6 +336,8 @@ class WebController(WebMediaScanRuntimeMixin, ControllerSessionMixin, MediaLibra
         self._external_media_scan_task: asyncio.Task | None = None
         self._external_media_rescan_pending = False
         self._external_media_rescan_deferred = False
+        self._external_media_full_rescan = False
+        self._external_media_changes: dict[str, MediaEntryChanges] = {}
         self._external_media_rescan_retry_handle: asyncio.TimerHandle | None = None
         self._media_directory_watch_closed = False
         self._media_directory_watch_handle = None
@@ -361,7 +374,7 @@ class WebController(WebMediaScanRuntimeMixin, ControllerSessionMixin, MediaLibra
 
     def _video_lookup(self, video_id: str) -> VideoItem | None:
         with self._videos_lock:
-            return self.videos.get(video_id)
+            return self.videos.get(video_id) or self._library_page_lookup(video_id)
 
     def _video_state_guard(self):
         return self._videos_lock
@@ -1293,6 +1306,38 @@ class WebController(WebMediaScanRuntimeMixin, ControllerSessionMixin, MediaLibra
     def get_frontend_delta(self, since_version: int = 0, sections: frozenset[str] | set[str] | None = None) -> dict:
         return self.frontend_state_service.get_delta(since_version, sections=sections)
 
+    def query_logs(self, payload: dict | None = None) -> dict:
+        """Web 日志中心的服务端筛选与分页，结果只含当前页行 ID。"""
+        return self.log_query_service.query(payload or {})
+
+    def search_log_history(self, params: dict | None = None) -> dict:
+        """日志中心跨会话检索：按游标分页读取历史会话索引。"""
+        return search_log_history(params or {})
+
+    def set_download_priority(self, payload: dict | None = None) -> dict:
+        """调整排队任务的优先级（-2..2，越大越先下载），返回实际改动的任务数。"""
+        payload = payload or {}
+        video_ids = payload.get("video_ids")
+        if not isinstance(video_ids, list) or not video_ids or not all(isinstance(i, str) and i for i in video_ids):
+            return {"status": "error", "message": "video_ids must be a non-empty list of strings"}
+        priority = payload.get("priority")
+        if isinstance(priority, bool) or not isinstance(priority, int):
+            return {"status": "error", "message": "priority must be an integer"}
+        priority = max(-2, min(priority, 2))
+        manager = self._dl_manager
+        updated = manager.set_task_priority(video_ids, priority) if manager is not None else 0
+        return {"status": "ok", "updated": updated, "priority": priority}
+
+    def get_download_stats(self) -> dict:
+        """下载运行时统计：排队调度快照（含各车道等待直方图）、asyncio 引擎计数与浏览器池命中率。"""
+        manager = self._dl_manager
+        return {
+            "status": "ok",
+            "scheduler": manager.scheduler_stats() if manager is not None else {},
+            "engine": async_download_loop.stats(),
+            "browser_pool": browser_pool.stats(),
+        }
+
     def get_frontend_icons(self) -> dict:
         return icon_manifest()
 
@@ -1374,6 +1419,10 @@ class WebController(WebMediaScanRuntimeMixin, ControllerSessionMixin, MediaLibra
             if manager is not None:
                 manager.stop_all()
         finally:
+            try:
+                async_download_loop.close()
+            except Exception as exc:
+                debug_logger.log_exception("WebController", "shutdown_async_download_loop", exc)
             destroy_frontend_state = getattr(frontend_state_service, "destroy", None)
             if callable(destroy_frontend_state):
                 try:
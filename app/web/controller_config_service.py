@@ -57,6 +57,10 @@ class WebControllerConfigService:
             "speed_limit_kb",
             "video_only",
             "image_respects_concurrency",
+            "engine",
+            "platform_concurrency",
+            "platform_concurrency_limits",
+            "host_concurrency",
         },
         "playback": {
             "default_player",
@@ -7,7 +7,7 @@ from typing import Any
 
 from app.debug_logger import debug_logger
 from app.exceptions import MediaScanError
-from app.services.media_directory_monitor import media_directory_monitor
+from app.services.media_directory_monitor import MediaEntryChanges, media_directory_monitor
 
 
 class WebMediaScanRuntimeMixin:
@@ -25,14 +25,23 @@ class WebMediaScanRuntimeMixin:
                 return
             loop.call_soon_threadsafe(self._queue_external_media_rescan, path)
 
+        def on_entries_changed(changes: MediaEntryChanges) -> None:
+            loop = self._loop
+            if loop is None or loop.is_closed() or not loop.is_running():
+                return
+            loop.call_soon_threadsafe(self._queue_external_media_changes, changes)
+
         self._media_directory_watch_handle = media_directory_monitor.watch(
             self._media_watch_directories(self.current_save_dir),
             on_directory_changed,
+            on_entries=on_entries_changed,
         )
 
     def _stop_media_directory_watch(self) -> None:
         self._media_directory_watch_closed = True
         self._external_media_rescan_deferred = False
+        self._external_media_full_rescan = False
+        self._external_media_changes.clear()
         handle = getattr(self, "_media_directory_watch_handle", None)
         self._media_directory_watch_handle = None
         close = getattr(handle, "close", None)
@@ -82,9 +91,29 @@ class WebMediaScanRuntimeMixin:
             self._schedule_deferred_media_rescan_retry()
             return
         self._external_media_rescan_deferred = False
-        self._queue_external_media_rescan(self.current_save_dir)
+        self._schedule_external_media_refresh()
 
     def _queue_external_media_rescan(self, _changed_directory: str) -> None:
+        if self._media_directory_watch_closed or self._is_shutting_down:
+            return
+        self._external_media_full_rescan = True
+        self._schedule_external_media_refresh()
+
+    def _queue_external_media_changes(self, changes: MediaEntryChanges) -> None:
+        """按目录合并监控批次；溢出的批次无法逐条描述，退回整目录扫描。"""
+
+        if self._media_directory_watch_closed or self._is_shutting_down:
+            return
+        if changes.overflow:
+            self._queue_external_media_rescan(changes.directory)
+            return
+        previous = self._external_media_changes.get(changes.directory)
+        self._external_media_changes[changes.directory] = (
+            changes if previous is None else previous.merge(changes)
+        )
+        self._schedule_external_media_refresh()
+
+    def _schedule_external_media_refresh(self) -> None:
         if self._media_directory_watch_closed or self._is_shutting_down:
             return
         if self._download_work_pending():
@@ -97,9 +126,7 @@ class WebMediaScanRuntimeMixin:
             return
         self._external_media_rescan_deferred = False
         self._external_media_rescan_pending = False
-        task = self._loop.create_task(
-            self.async_scan_local_dir(announce=False, require_current=True)
-        )
+        task = self._loop.create_task(self._run_external_media_refresh())
         self._external_media_scan_task = task
         task.add_done_callback(self._finish_external_media_rescan)
 
@@ -114,7 +141,52 @@ class WebMediaScanRuntimeMixin:
             debug_logger.log_exception("WebController", "external_media_rescan", exc)
         if self._external_media_rescan_pending and not self._media_directory_watch_closed:
             self._external_media_rescan_pending = False
-            self._queue_external_media_rescan(self.current_save_dir)
+            self._schedule_external_media_refresh()
+
+    async def _run_external_media_refresh(self):
+        """整目录扫描优先；否则只把累积的逐文件差异并入状态。"""
+
+        if self._external_media_full_rescan:
+            # 整目录扫描会覆盖所有已累积的差异。
+            self._external_media_full_rescan = False
+            self._external_media_changes.clear()
+            return await self.async_scan_local_dir(announce=False, require_current=True)
+        batches = list(self._external_media_changes.values())
+        self._external_media_changes.clear()
+        if batches:
+            return await self._apply_external_media_changes(batches)
+        return None
+
+    async def _apply_external_media_changes(self, batches: list[MediaEntryChanges]):
+        directory = self.current_save_dir
+        try:
+            async with self._media_scan_lock:
+                new_items, removed_paths = await asyncio.get_running_loop().run_in_executor(
+                    None,
+                    self._collect_media_entry_changes,
+                    directory,
+                    batches,
+                )
+        except Exception as exc:
+            debug_logger.log_exception(
+                "WebController",
+                "apply_external_media_changes",
+                exc,
+                context={"directory": directory, "batches": len(batches)},
+            )
+            self._queue_external_media_rescan(directory)
+            return None
+        if self._normalize_library_path(directory) != self._normalize_library_path(self.current_save_dir):
+            return None
+
+        outcome = self._reconcile_media_entry_changes(new_items, removed_paths)
+        self._refresh_media_directory_watch_paths(self.current_save_dir)
+        if outcome.changed:
+            await self._send_recorded_frontend_event(
+                "videos.reconcile",
+                self._media_reconcile_payload(outcome),
+            )
+        return outcome
 
     @staticmethod
     def _media_reconcile_payload(outcome) -> dict[str, Any]:
@@ -278,6 +350,31 @@ class WebMediaScanRuntimeMixin:
             )
         return result, outcome
 
+    def query_media_library(self, params: dict | None = None) -> dict[str, Any]:
+        """已完成页的服务端分页：在媒体库索引上排序筛选当前保存目录，行字段与快照一致。"""
+
+        params = params or {}
+        try:
+            outcome = self._query_media_library_page(
+                self.current_save_dir,
+                page=_int_param(params.get("page"), 1),
+                page_size=_int_param(params.get("page_size"), 20),
+                sort=str(params.get("sort") or "mtime"),
+                descending=str(params.get("order") or "desc").lower() != "asc",
+                content_type=str(params.get("type") or ""),
+                keyword=str(params.get("keyword") or ""),
+            )
+        except (MediaScanError, ValueError) as exc:
+            return {"status": "error", "message": str(exc)}
+        return {
+            "status": "ok",
+            "items": [self.frontend_state_service.completed_row(item) for item in outcome.items],
+            "totalCount": outcome.total_count,
+            "currentPage": outcome.page,
+            "pageSize": outcome.page_size,
+            "totalPages": outcome.total_pages,
+        }
+
     @staticmethod
     def _scan_result_payload(result) -> dict[str, Any]:
         return {
@@ -286,4 +383,12 @@ class WebMediaScanRuntimeMixin:
             "image_count": result.image_count,
             "truncated": result.truncated,
             "original_count": result.original_count,
+            "indexed": result.indexed,
         }
+
+
+def _int_param(value: Any, default: int) -> int:
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return default
@@ -179,6 +179,46 @@ def build_rest_router(
             return {"version": 0, "base_version": since_version, "full": True, "sections": sections}
         return {"status": "error", "message": "frontend delta is unavailable"}
 
+    @router.post("/api/logs/query")
+    async def query_logs(request: Request, body: dict):
+        controller = get_request_context(request).controller
+        handler = getattr(controller, "query_logs", None)
+        if not callable(handler):
+            return _finalize_route_result(error_result("log query is unavailable", http_status=501))
+        return await _run_controller_worker_call(handler, body)
+
+    @router.get("/api/logs/history")
+    async def search_log_history(request: Request):
+        controller = get_request_context(request).controller
+        handler = getattr(controller, "search_log_history", None)
+        if not callable(handler):
+            return _finalize_route_result(error_result("log history is unavailable", http_status=501))
+        return await _run_controller_worker_call(handler, dict(request.query_params))
+
+    @router.get("/api/library")
+    async def query_media_library(request: Request):
+        controller = get_request_context(request).controller
+        handler = getattr(controller, "query_media_library", None)
+        if not callable(handler):
+            return _finalize_route_result(error_result("media library is unavailable", http_status=501))
+        return await _run_controller_worker_call(handler, dict(request.query_params))
+
+    @router.post("/api/downloads/priority")
+    async def set_download_priority(request: Request, body: dict):
+        controller = get_request_context(request).controller
+        handler = getattr(controller, "set_download_priority", None)
+        if not callable(handler):
+            return _finalize_route_result(error_result("download priority is unavailable", http_status=501))
+        return _finalize_route_result(await _run_controller_worker_call(handler, body), enforce_statuses={400})
+
+    @router.get("/api/downloads/stats")
+    async def get_download_stats(request: Request):
+        controller = get_request_context(request).controller
+        handler = getattr(controller, "get_download_stats", None)
+        if not callable(handler):
+            return _finalize_route_result(error_result("download stats are unavailable", http_status=501))
+        return await _run_controller_worker_call(handler)
+
     @router.get("/api/frontend/icons")
     async def get_frontend_icons(request: Request):
         controller = get_request_context(request).controller
@@ -161,6 +161,7 @@ function listPageDependencies() {
     },
     appendUiLog,
     playCompleted: id => playbackControllerService().playCompleted(id),
+    queryMediaLibrary,
     renderStatus: () => {
       renderStatus();
       playbackControllerService().updateControls();
@@ -183,10 +184,39 @@ function logCenterDependencies() {
     byId,
     writeClipboard,
     runOperation: performLogOperation,
+    queryLogs,
+    searchLogHistory,
     onFiltersChange: () => {},
   };
 }
 
+async function queryLogs(request) {
+  const response = await fetch("/api/logs/query", {
+    method: "POST",
+    headers: { "Content-Type": "application/json" },
+    body: JSON.stringify(request),
+  });
+  return response.ok ? response.json() : null;
+}
+
+async function searchLogHistory(params) {
+  const query = new URLSearchParams();
+  for (const [key, value] of Object.entries(params || {})) {
+    if (value !== undefined && value !== null && value !== "") query.set(key, String(value));
+  }
+  const response = await fetch(`/api/logs/history?${query.toString()}`);
+  return response.ok ? response.json() : null;
+}
+
+async function queryMediaLibrary(params) {
+  const query = new URLSearchParams();
+  for (const [key, value] of Object.entries(params || {})) {
+    if (value !== undefined && value !== null && value !== "") query.set(key, String(value));
+  }
+  const response = await fetch(`/api/library?${query.toString()}`);
+  return response.ok ? response.json() : null;
+}
+
 function configureLogCenterHelpers() {
   return logCenterService().configure(logCenterDependencies());
 }
@@ -1159,6 +1189,7 @@ window.syncLogFiltersFromDom = () => logCenterService().syncFiltersFromDom();
 function setLogPage(delta) { return logCenterService().setPage(delta); }
 function setLogPageSize(value) { return logCenterService().setPageSize(value); }
 function copySelectedLogTraceId() { return logCenterService().copyTraceId(); }
+function toggleLogHistory() { return logCenterService().toggleHistory(); }
 function copyCurrentLogDetail() { return logCenterService().copyDetail(); }
 function copyCurrentLogJson() { return logCenterService().copyJson(); }
 function exportCurrentLogDetail() { return logCenterService().exportDetail(); }
@@ -181,6 +181,33 @@
     return Array.from(new Set([...itemSections, ...extra]));
   }
 
+  const ROW_SECTIONS = ["queue_items", "active_downloads", "completed_items"];
+
+  function mergeRowDelta(state, rows) {
+    // 先移除变化的 ID，再按服务端位置插回新行；计数对不上说明本地列表已漂移，返回 null 触发重同步。
+    const requested = Array.isArray(rows.sections) ? rows.sections : ROW_SECTIONS;
+    const ids = new Set((rows.ids || []).map(id => String(id)).filter(Boolean));
+    const upserts = rows.upserts && typeof rows.upserts === "object" ? rows.upserts : {};
+    const counts = rows.counts && typeof rows.counts === "object" ? rows.counts : {};
+    const merged = {};
+    for (const section of ROW_SECTIONS.filter(name => requested.includes(name))) {
+      const current = state[section];
+      if (!Array.isArray(current)) return null;
+      const kept = current.filter(item => !(item && ids.has(String(item.id))));
+      const removed = kept.length !== current.length;
+      const entries = (Array.isArray(upserts[section]) ? upserts[section] : [])
+        .slice()
+        .sort((left, right) => Number(left.index || 0) - Number(right.index || 0));
+      for (const entry of entries) {
+        const index = Math.max(0, Math.min(Number(entry.index) || 0, kept.length));
+        kept.splice(index, 0, entry.row);
+      }
+      if (counts[section] !== undefined && Number(counts[section]) !== kept.length) return null;
+      if (removed || entries.length) merged[section] = kept;
+    }
+    return merged;
+  }
+
   function applyFrontendDelta(delta, generation = lifecycleGeneration) {
     if (!isCurrentGeneration(generation) || !delta || typeof delta !== "object") return false;
     const localVersion = Number(frontendVersion || 0);
@@ -210,6 +237,20 @@
       frontendSectionSignatures[key] = nextSignature;
     }
     if (delta.full) changed.push(...requestedChanged);
+    let rowSections = [];
+    if (!delta.full && delta.rows && typeof delta.rows === "object") {
+      const mergedRows = mergeRowDelta(nextState, delta.rows);
+      if (!mergedRows) {
+        appendUiLog("列表增量与本地状态不一致，正在重新同步...");
+        fetchFrontendState();
+        return false;
+      }
+      Object.assign(nextState, mergedRows);
+      rowSections = Object.keys(mergedRows);
+      // 行级合并已知道哪些列表变化，不再对整表序列化签名；下次整段下发时按需重算。
+      for (const key of rowSections) delete frontendSectionSignatures[key];
+      changed.push(...rowSections);
+    }
     frontendVersion = Number(delta.version || frontendVersion || 0);
     if (frontendVersion) nextState.version = frontendVersion;
     replaceState(nextState);
@@ -218,6 +259,9 @@
     for (const [key, value] of Object.entries(sections)) {
       changed.push(...patchSection(key, value, { source: "delta", delta }));
     }
+    for (const key of rowSections) {
+      changed.push(...patchSection(key, nextState[key], { source: "delta", delta }));
+    }
     if (Array.isArray(delta.deleted_ids) && delta.deleted_ids.length) {
       changed.push(...removeDeletedFromState(delta.deleted_ids, { source: "delta", delta }));
     }
@@ -336,6 +380,16 @@
     }
   }
 
+  // 支持 DecompressionStream 的浏览器声明 frames=deflate，服务端对大消息改发预压缩的二进制帧。
+  const DEFLATE_FRAMES = typeof window.DecompressionStream === "function"
+    && typeof window.Blob === "function"
+    && typeof window.Response === "function";
+
+  function inflateFrame(data) {
+    const stream = new window.Blob([data]).stream().pipeThrough(new window.DecompressionStream("deflate"));
+    return new window.Response(stream).text();
+  }
+
   function connectWS() {
     if (!active || typeof window.WebSocket !== "function") return null;
     const WebSocketType = window.WebSocket;
@@ -348,20 +402,39 @@
     const sequence = ++socketSequence;
     try {
       const protocol = location.protocol === "https:" ? "wss:" : "ws:";
-      const socket = new WebSocketType(`${protocol}//${location.host}/ws`);
+      const query = DEFLATE_FRAMES ? "?frames=deflate" : "";
+      const socket = new WebSocketType(`${protocol}//${location.host}/ws${query}`);
+      // 二进制帧需要异步解压；之后到达的文本帧排在它后面处理，保证消息顺序不变。
+      let inboundChain = null;
       ws = socket;
       socket.onopen = () => {
         if (!isCurrentGeneration(generation) || sequence !== socketSequence || ws !== socket) return;
         if (typeof dependencies.onConnected === "function") dependencies.onConnected(socket);
       };
-      socket.onmessage = event => {
+      const handleFrame = text => {
         if (!isCurrentGeneration(generation) || sequence !== socketSequence || ws !== socket) return;
         try {
-          handleServerMessage(JSON.parse(event.data), generation, socket);
+          handleServerMessage(JSON.parse(text), generation, socket);
         } catch (error) {
           appendUiLog("处理服务器消息失败", error.message || error);
         }
       };
+      socket.onmessage = event => {
+        if (!isCurrentGeneration(generation) || sequence !== socketSequence || ws !== socket) return;
+        if (typeof event.data === "string" && !inboundChain) {
+          handleFrame(event.data);
+          return;
+        }
+        const frame = typeof event.data === "string" ? Promise.resolve(event.data) : inflateFrame(event.data);
+        const chain = (inboundChain || Promise.resolve())
+          .then(() => frame)
+          .then(handleFrame)
+          .catch(error => appendUiLog("解压服务器消息失败", error.message || error))
+          .finally(() => {
+            if (inboundChain === chain) inboundChain = null;
+          });
+        inboundChain = chain;
+      };
       socket.onclose = () => {
         if (!isCurrentGeneration(generation) || sequence !== socketSequence || ws !== socket) return;
         ws = null;
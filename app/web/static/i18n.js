@@ -346,6 +346,7 @@ const FALLBACK_UI_TEXT = {
     "已复制详细信息": "Copied details",
     "已导出日志详情": "Exported log details",
     "复制TraceID": "Copy TraceID",
+    "历史会话": "History",
     "上一页": "Previous page",
     "下一页": "Next page",
     "当前日志没有可复制的 Trace ID": "No Trace ID is available for the current log",
@@ -833,6 +834,7 @@ const FALLBACK_UI_TEXT = {
     "已复制详细信息": "已複製詳細資訊",
     "已导出日志详情": "已匯出日誌詳情",
     "复制TraceID": "複製TraceID",
+    "历史会话": "歷史會話",
     "上一页": "上一頁",
     "下一页": "下一頁",
     "当前日志没有可复制的 Trace ID": "目前日誌沒有可複製的 Trace ID",
@@ -1397,6 +1399,7 @@ function applyStaticLanguage() {
     ["runLogOperation('open_latest')", "debug.log"],
     ["runLogOperation('open_error_summary')", "error.md"],
     ["copySelectedLogTraceId()", "复制TraceID"],
+    ["toggleLogHistory()", "历史会话"],
   ];
   for (const [onclick, label] of logActionLabels) {
     const button = document.querySelector(`#page-logs .log-actions [onclick="${onclick}"]`);
@@ -16,6 +16,7 @@
     rowSignatures: Object.create(null),
     htmlSignatures: Object.create(null),
     diagnosticsOperation: 0,
+    completedLibrary: { active: false, probedCount: -1, probeSequence: 0, sequence: 0 },
     generation: 0,
     disposed: true,
   };
@@ -36,6 +37,7 @@
     state.rowSignatures = Object.create(null);
     state.htmlSignatures = Object.create(null);
     state.diagnosticsOperation = 0;
+    state.completedLibrary = { active: false, probedCount: -1, probeSequence: 0, sequence: 0 };
     state.generation += 1;
     state.disposed = false;
     return window.UcpListPages;
@@ -464,6 +466,11 @@
   function renderCompleted(options = {}) {
     const items = Array.isArray(currentState().completed_items) ? currentState().completed_items : [];
     if (options.cleanupPlaybackPositions !== false) cleanupPlaybackPositions(items);
+    refreshCompletedLibraryMode(items);
+    if (state.completedLibrary.active) {
+      submitCompletedLibraryRequest();
+      return;
+    }
     const selectedId = selected("completed");
     const request = {
       items,
@@ -487,6 +494,48 @@
     submitListPageRequest("completed", request);
   }
 
+  function completedLibraryQuery() {
+    return typeof dependencies.queryMediaLibrary === "function" ? dependencies.queryMediaLibrary : null;
+  }
+
+  // 媒体库文件数超过运行时窗口（本地扫描上限）时，已完成页改由服务端索引分页，窗口内仍走本地 Worker。
+  function refreshCompletedLibraryMode(items) {
+    const query = completedLibraryQuery();
+    const library = state.completedLibrary;
+    if (!query || library.probedCount === items.length) return;
+    library.probedCount = items.length;
+    const sequence = ++library.probeSequence;
+    const generation = state.generation;
+    Promise.resolve(query({ page: 1, page_size: 1 })).then(result => {
+      if (state.disposed || generation !== state.generation || sequence !== library.probeSequence) return;
+      if (!result || result.status !== "ok") return;
+      const active = (Number(result.totalCount) || 0) > items.length;
+      if (active === library.active) return;
+      library.active = active;
+      renderCompleted({ cleanupPlaybackPositions: false });
+    }).catch(() => {});
+  }
+
+  function submitCompletedLibraryRequest() {
+    const library = state.completedLibrary;
+    const sequence = ++library.sequence;
+    const generation = state.generation;
+    Promise.resolve(completedLibraryQuery()({ page: state.completedPage, page_size: state.completedPageSize })).then(result => {
+      if (state.disposed || generation !== state.generation || sequence !== library.sequence) return;
+      if (!result || result.status !== "ok") return;
+      const items = Array.isArray(result.items) ? result.items : [];
+      const selectedId = selected("completed");
+      applyCompletedPageResult({
+        pageItems: items,
+        totalCount: result.totalCount,
+        totalPages: result.totalPages,
+        currentPage: result.currentPage,
+        pageSize: result.pageSize,
+        selectedId: items.some(item => item.id === selectedId) ? selectedId : (items[0] ? items[0].id : ""),
+      });
+    }).catch(() => {});
+  }
+
   function applyCompletedPageResult(result) {
     const items = Array.isArray(result.pageItems) ? result.pageItems : [];
     const totalPages = Number(result.totalPages) || 1;
@@ -708,6 +757,8 @@
       state.sequences[pageKey] = (Number(state.sequences[pageKey]) || 0) + 1;
       state.currentRequests[pageKey] = null;
     });
+    state.completedLibrary.sequence += 1;
+    state.completedLibrary.probeSequence += 1;
     clearListPageFallbacks();
     closeListPageWorker();
     state.rowSignatures = Object.create(null);
@@ -14,11 +14,13 @@
     queryWorker: null,
     detailWorker: null,
     fallbackTimer: null,
+    remoteQueryAvailable: false,
     queryWorkerAvailable: false,
     detailWorkerAvailable: false,
     detailWorkerRetryAttempted: false,
     query: { signature: "", result: null, pending: false },
     detail: { signature: "", result: null, pending: false },
+    history: { active: false, signature: "", cursors: [""], index: 0, result: null, pending: false, sequence: 0 },
     logItemsSignature: "",
     queryViewPolicy: { sequence: 0, followLatest: false, preserveViewport: false, applied: true },
     rowSignatures: Object.create(null),
@@ -36,11 +38,13 @@
     state.page = 1;
     state.pageSize = normalizeLogPageSize(localStorage.getItem("webui_log_page_size") || 20);
     state.selectedId = "";
+    state.remoteQueryAvailable = typeof dependencies.queryLogs === "function";
     state.queryWorkerAvailable = typeof Worker !== "undefined";
     state.detailWorkerAvailable = typeof Worker !== "undefined";
     state.detailWorkerRetryAttempted = false;
     state.query = { signature: "", result: null, pending: false };
     state.detail = { signature: "", result: null, pending: false };
+    state.history = { active: false, signature: "", cursors: [""], index: 0, result: null, pending: false, sequence: 0 };
     state.logItemsSignature = "";
     state.queryViewPolicy = { sequence: 0, followLatest: false, preserveViewport: false, applied: true };
     state.rowSignatures = Object.create(null);
@@ -277,6 +281,7 @@
       ["runLogOperation('open_latest')", "debug.log"],
       ["runLogOperation('open_error_summary')", "error.md"],
       ["copySelectedLogTraceId()", "\u590d\u5236TraceID"],
+      ["toggleLogHistory()", "\u5386\u53f2\u4f1a\u8bdd"],
     ];
     for (const [onclick, label] of actions) {
       const button = document.querySelector(`#page-logs .log-actions [onclick="${onclick}"]`);
@@ -519,6 +524,68 @@
     }, 0);
   }
 
+  function logItemsKey(items) {
+    const first = items[0];
+    const last = items[items.length - 1];
+    return { count: items.length, first: first ? baseLogItemId(first) : "", last: last ? baseLogItemId(last) : "" };
+  }
+
+  function remoteLogQueryResult(payload, items, sequence) {
+    // 服务端索引只回传当前页 ID；窗口指纹不一致或 ID 对不上时说明两边快照错开，交给本地 worker。
+    if (!payload || payload.status !== "ok" || !Array.isArray(payload.pageIds)) return null;
+    const local = logItemsKey(items);
+    const remote = payload.itemsKey || {};
+    if (Number(remote.count) !== local.count || remote.first !== local.first || remote.last !== local.last) return null;
+    const byId = new Map();
+    for (const item of items) {
+      const id = baseLogItemId(item);
+      if (!byId.has(id)) byId.set(id, item);
+    }
+    const pageItems = [];
+    for (const id of payload.pageIds) {
+      const item = byId.get(String(id));
+      if (!item) return null;
+      pageItems.push(item);
+    }
+    return {
+      sequence,
+      pageItems,
+      tabCounts: payload.tabCounts || emptyLogTabCounts(),
+      totalCount: Number(payload.totalCount) || 0,
+      matchedCount: Number(payload.matchedCount) || 0,
+      visibleCount: pageItems.length,
+      currentPage: Number(payload.currentPage) || 1,
+      totalPages: Number(payload.totalPages) || 1,
+      selectedId: String(payload.selectedId || ""),
+    };
+  }
+
+  async function submitRemoteLogQuery(items, sequence) {
+    const generation = state.generation;
+    const { items: _items, ...request } = buildLogQueryRequest(items, sequence);
+    let payload = null;
+    try {
+      payload = await requireDependency("queryLogs")({ ...request, itemsKey: logItemsKey(items) });
+    } catch (_error) {
+      payload = null;
+    }
+    if (state.disposed || generation !== state.generation || Number(sequence) !== state.querySequence) return;
+    if (!payload || payload.status !== "ok") state.remoteQueryAvailable = false;
+    const result = remoteLogQueryResult(payload, items, sequence);
+    if (result) receiveLogQueryResult(result);
+    else dispatchLocalLogQuery(items, sequence);
+  }
+
+  function dispatchLocalLogQuery(items, sequence) {
+    const worker = ensureLogQueryWorker();
+    if (!worker) {
+      scheduleLogQueryFallback(items, sequence);
+      return;
+    }
+    clearLogQueryFallback();
+    worker.postMessage(buildLogQueryRequest(items, sequence));
+  }
+
   function submitLogQuery(items, signature, viewPolicy = {}) {
     const sequence = ++state.querySequence;
     state.queryViewPolicy = {
@@ -528,17 +595,20 @@
       applied: false,
     };
     state.query = { signature, result: state.query.result, pending: true };
-    const worker = ensureLogQueryWorker();
-    if (!worker) {
-      scheduleLogQueryFallback(items, sequence);
+    if (state.remoteQueryAvailable && items.length) {
+      clearLogQueryFallback();
+      submitRemoteLogQuery(items, sequence);
       return;
     }
-    clearLogQueryFallback();
-    worker.postMessage(buildLogQueryRequest(items, sequence));
+    dispatchLocalLogQuery(items, sequence);
   }
 
   function render() {
     if (state.disposed) requireDependency("getState");
+    if (state.history.active) {
+      renderLogHistory();
+      return;
+    }
     syncLogStaticLanguage();
     syncLogFilterControls();
     const items = logQueryItems();
@@ -557,6 +627,97 @@
     if (state.query.result) renderLogQueryResult(state.query.result);
   }
 
+  function logHistoryRequest() {
+    // 历史检索没有分类维度；其余筛选原样交给服务端，时间范围作为 since 下界。
+    const filters = state.filters;
+    const request = { text: filters.keyword, trace_id: filters.trace, limit: state.pageSize > 0 ? state.pageSize : 500 };
+    if (filters.level !== "all") request.level = filters.level;
+    if (filters.platform !== "all") request.platform = filters.platform;
+    if (filters.time !== "all") request.since = filters.time;
+    return request;
+  }
+
+  async function submitLogHistorySearch() {
+    const history = state.history;
+    const sequence = ++history.sequence;
+    const generation = state.generation;
+    history.pending = true;
+    let payload = null;
+    try {
+      payload = await requireDependency("searchLogHistory")({ ...logHistoryRequest(), cursor: history.cursors[history.index] || "" });
+    } catch (_error) {
+      payload = null;
+    }
+    if (state.disposed || generation !== state.generation || sequence !== history.sequence) return;
+    history.pending = false;
+    history.result = payload && payload.status === "ok" && Array.isArray(payload.items)
+      ? payload
+      : { items: [], next_cursor: "" };
+    if (history.active && logsPageIsActive()) renderLogHistory();
+  }
+
+  function currentLogHistoryItems() {
+    const result = state.history.result;
+    return result && Array.isArray(result.items) ? result.items : [];
+  }
+
+  function renderLogHistory() {
+    const history = state.history;
+    syncLogStaticLanguage();
+    syncLogFilterControls();
+    const signature = JSON.stringify(logHistoryRequest());
+    if (history.signature !== signature) {
+      history.signature = signature;
+      history.cursors = [""];
+      history.index = 0;
+      history.result = null;
+      submitLogHistorySearch();
+    }
+    const items = ownLogItemIds(currentLogHistoryItems());
+    syncLogTabLabels(emptyLogTabCounts());
+    state.selectedId = items.some(item => logItemId(item) === state.selectedId) ? state.selectedId : (items.length ? logItemId(items[0]) : "");
+    patchLogTableRows(items);
+    syncLogEmptyState(items.length === 0 && !history.pending);
+    const total = byId("logTotal");
+    if (total) total.textContent = `${t("\u5386\u53f2\u4f1a\u8bdd")}: ${items.length}`;
+    const indicator = byId("logPageIndicator");
+    if (indicator) indicator.textContent = `#${history.index + 1}`;
+    const previous = byId("logPrevPage");
+    if (previous) previous.disabled = history.index <= 0;
+    const next = byId("logNextPage");
+    if (next) next.disabled = !(history.result && history.result.next_cursor);
+    renderLogDetail(items);
+  }
+
+  function moveLogHistoryPage(delta) {
+    const history = state.history;
+    if (delta > 0 && history.result && history.result.next_cursor) {
+      history.cursors = history.cursors.slice(0, history.index + 1);
+      history.cursors.push(String(history.result.next_cursor));
+      history.index += 1;
+    } else if (delta < 0 && history.index > 0) {
+      history.index -= 1;
+    } else {
+      return;
+    }
+    state.selectedId = "";
+    submitLogHistorySearch();
+  }
+
+  function toggleHistory() {
+    const history = state.history;
+    history.active = !history.active && typeof dependencies.searchLogHistory === "function";
+    history.signature = "";
+    history.result = null;
+    // 历史会话默认看全部时间，近 30 分钟的默认范围留给实时缓冲。
+    if (history.active && state.filters.time === "30m") state.filters.time = "all";
+    byId("logHistoryToggle")?.classList.toggle("active", history.active);
+    state.selectedId = "";
+    state.page = 1;
+    notifyFiltersChange();
+    render();
+  }
+
   function patchLogTableRows(items) {
     const tbody = byId("logBody");
     if (!tbody) return;
@@ -657,10 +818,13 @@
     render();
   }
 
+  function currentPageItems() {
+    if (state.history.active) return currentLogHistoryItems();
+    return (state.query.result && Array.isArray(state.query.result.pageItems)) ? state.query.result.pageItems : [];
+  }
+
   function currentLogDetailItem(itemsOverride) {
-    const items = Array.isArray(itemsOverride)
-      ? itemsOverride
-      : ((state.query.result && Array.isArray(state.query.result.pageItems)) ? state.query.result.pageItems : []);
+    const items = Array.isArray(itemsOverride) ? itemsOverride : currentPageItems();
     return items.find(row => logItemId(row) === state.selectedId) || null;
   }
 
@@ -821,7 +985,7 @@
   }
 
   function renderLogDetail(itemsOverride) {
-    const items = Array.isArray(itemsOverride) ? itemsOverride : ((state.query.result && state.query.result.pageItems) || []);
+    const items = Array.isArray(itemsOverride) ? itemsOverride : currentPageItems();
     const item = currentLogDetailItem(items);
     if (!item) {
       state.detailSequence += 1;
@@ -943,6 +1107,10 @@
   }
 
   function setPage(delta) {
+    if (state.history.active) {
+      moveLogHistoryPage(Number(delta) || 0);
+      return;
+    }
     state.page += Number(delta) || 0;
     render();
   }
@@ -956,7 +1124,7 @@
   }
 
   function currentLogTraceId() {
-    const items = (state.query.result && Array.isArray(state.query.result.pageItems)) ? state.query.result.pageItems : [];
+    const items = currentPageItems();
     const current = items.find(row => logItemId(row) === state.selectedId);
     const trace = String((current && current.trace_id) || "").trim();
     if (trace) return trace;
@@ -980,6 +1148,7 @@
     state.generation += 1;
     state.querySequence += 1;
     state.detailSequence += 1;
+    state.history.sequence += 1;
     clearLogQueryFallback();
     closeLogQueryWorker();
     closeLogDetailWorker();
@@ -996,6 +1165,7 @@
     setPage,
     setPageSize,
     syncFiltersFromDom: syncLogFiltersFromDom,
+    toggleHistory,
     copyTraceId,
     copyDetail,
     copyJson,
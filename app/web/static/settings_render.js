@@ -113,6 +113,7 @@
         settingCheckbox("\u65ad\u70b9\u7eed\u4f20", "resume_enabled", !!(value && value.resume_enabled), "download"),
         settingSelect("\u4e0b\u8f7d\u901f\u5ea6\u9650\u5236\uff08KB/s\uff09", "speed_limit_kb", value && value.speed_limit_kb, options.speed_limit_kb || [{ value: "0", label: "\u65e0\u9650\u5236" }], "download"),
         settingCheckbox("\u4ec5\u4e0b\u8f7d\u89c6\u9891", "video_only", !!(value && value.video_only), "download"),
+        settingSelect("\u4e0b\u8f7d\u5f15\u64ce", "engine", value && value.engine, options.engine || [], "download"),
       ].join("");
     }
     if (group === "\u5e73\u53f0\u8bbe\u7f6e") {
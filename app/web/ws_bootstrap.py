@@ -3,13 +3,13 @@
 from __future__ import annotations
 
 import asyncio
-import json
 from typing import Any, Awaitable, Callable
 
 from fastapi import WebSocket
 
 from app.web.logging_utils import log_web_exception
 from app.web.session_runtime import WebSessionContext
+from app.web.ws_transport import encode_json
 
 CreateTaskFn = Callable[[Awaitable[Any]], asyncio.Task[Any]]
 
@@ -17,7 +17,7 @@ async def _run_controller_worker_call(func: Callable[..., Any], *args: Any) -> A
     return await asyncio.get_running_loop().run_in_executor(None, func, *args)
 
 def _encode_message(event_type: str, data: Any) -> str:
-    return json.dumps({"type": event_type, "data": data}, ensure_ascii=False)
+    return encode_json({"type": event_type, "data": data}).decode("utf-8")
 
 async def _send_json(ws: WebSocket, event_type: str, data: Any) -> None:
     text = await _run_controller_worker_call(_encode_message, event_type, data)
@@ -0,0 +1,57 @@
+"""uvicorn WebSocket 协议：按连接决定是否协商 permessage-deflate。
+
+以 ``/ws?frames=deflate`` 连接的浏览器收到的是 ``ConnectionManager`` 预压缩后共享的
+二进制帧，再叠一层逐连接压缩只会重复消耗 CPU；其余客户端仍协商 permessage-deflate。
+"""
+
+from __future__ import annotations
+
+from typing import Any
+from urllib.parse import parse_qs, urlsplit
+
+from app.web.ws_transport import DEFLATE_FRAMES_PARAM
+
+_EXTENSIONS_HEADER = "Sec-WebSocket-Extensions"
+
+
+def wants_deflate_frames(path: str) -> bool:
+    """握手请求路径是否声明了自行解压预压缩帧。"""
+    values = parse_qs(urlsplit(path or "").query).get(DEFLATE_FRAMES_PARAM, [])
+    return any(value.lower() == "deflate" for value in values)
+
+
+def _drop_extension_offer(path: str, headers: Any) -> None:
+    if wants_deflate_frames(path) and _EXTENSIONS_HEADER in headers:
+        del headers[_EXTENSIONS_HEADER]
+
+
+def per_connection_deflate_protocol() -> Any:
+    """返回 uvicorn ``Config(ws=...)`` 取值。
+
+    websockets 实现下返回子类，在协商扩展前去掉声明了 ``frames=deflate`` 的连接的
+    扩展报价；其他实现（如 wsproto）没有对应钩子，沿用 ``"auto"``，所有连接照常协商。
+    """
+    try:
+        from uvicorn.protocols.websockets.auto import AutoWebSocketsProtocol
+    except ImportError:  # pragma: no cover - uvicorn 目录结构不同时退回默认协商
+        return "auto"
+
+    base: Any = AutoWebSocketsProtocol
+    module = getattr(base, "__module__", "")
+    if module.endswith(".websockets_sansio_impl"):
+
+        class SansIOProtocol(base):
+            def handle_connect(self, event: Any) -> None:
+                _drop_extension_offer(event.path, event.headers)
+                super().handle_connect(event)
+
+        return SansIOProtocol
+    if module.endswith(".websockets_impl"):
+
+        class LegacyProtocol(base):
+            async def process_request(self, path: str, request_headers: Any) -> Any:
+                _drop_extension_offer(path, request_headers)
+                return await super().process_request(path, request_headers)
+
+        return LegacyProtocol
+    return "auto"
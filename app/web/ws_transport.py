@@ -5,8 +5,11 @@ from __future__ import annotations
 import asyncio
 import json
 import threading
+import time
+import zlib
 from collections import deque
 from dataclasses import dataclass, field
+from functools import partial
 from typing import Any
 
 from fastapi import WebSocket
@@ -14,15 +17,41 @@ from fastapi import WebSocket
 from app.services.frontend_event_aggregator import FrontendEventPriority, priority_for_topic
 from app.web.logging_utils import log_web_exception
 
+try:
+    import orjson
+except ImportError:  # pragma: no cover - 可选加速依赖
+    orjson = None  # type: ignore[assignment]
+
+# 编码后超过该大小的消息，为声明支持的连接额外准备一份预压缩的二进制帧。
+DEFLATE_THRESHOLD_BYTES = 8 * 1024
+# 压缩后至少省下这一比例才发二进制帧，否则客户端解压不划算。
+DEFLATE_MIN_SAVING_RATIO = 0.1
+DEFLATE_LEVEL = 6
+# 浏览器以 ``/ws?frames=deflate`` 声明能用 DecompressionStream("deflate") 解压二进制帧。
+DEFLATE_FRAMES_PARAM = "frames"
+JSON_BACKEND = "orjson" if orjson is not None else "json"
+
+def encode_json(payload: Any) -> bytes:
+    """编码为 UTF-8 JSON；装有 orjson 时优先使用，遇到它不支持的值再回退标准库。"""
+    if orjson is not None:
+        try:
+            return orjson.dumps(payload, option=orjson.OPT_NON_STR_KEYS)
+        except TypeError:
+            pass
+    return json.dumps(payload, ensure_ascii=False).encode("utf-8")
+
 @dataclass(slots=True)
 class OutboundMessage:
-    """预序列化后的发送单元，入队后不再在发送循环里做 JSON 编码。"""
+    """预序列化后的发送单元：每条消息只编码一次，所有连接共享同一份文本和压缩帧。"""
 
     event_type: str
     data: Any
     text: str
     priority: FrontendEventPriority
     coalesce_key: tuple[str, str]
+    payload: bytes = b""
+    deflated: bytes | None = None
+    encode_seconds: float = 0.0
 
 @dataclass(slots=True)
 class WebSocketConnection:
@@ -35,12 +64,16 @@ class WebSocketConnection:
     queue_event: asyncio.Event = field(default_factory=asyncio.Event)
     outbound_queue: deque[OutboundMessage] = field(default_factory=deque)
     sender_task: asyncio.Task | None = None
+    deflate_frames: bool = False
     metrics: dict[str, int] = field(default_factory=lambda: {
         "enqueued": 0,
         "sent": 0,
         "coalesced": 0,
         "dropped_noisy": 0,
         "dropped_overflow": 0,
+        "bytes_sent": 0,
+        "deflated_sent": 0,
+        "bytes_saved": 0,
     })
 
 class ConnectionManager:
@@ -50,6 +83,16 @@ class ConnectionManager:
         self.active_connections: dict[str, list[WebSocketConnection]] = {}
         self._connections_lock = threading.Lock()
         self._max_queue_size = max(1, int(max_queue_size))
+        # 只在事件循环线程里更新，不需要额外加锁。
+        self._encode_metrics: dict[str, float] = {
+            "messages": 0,
+            "encode_seconds": 0.0,
+            "max_encode_seconds": 0.0,
+            "payload_bytes": 0,
+            "deflated_messages": 0,
+            "encodes_saved": 0,
+            "bytes_saved": 0,
+        }
 
     async def connect(self, ws: WebSocket, session_id: str) -> None:
         await ws.accept()
@@ -57,6 +100,7 @@ class ConnectionManager:
             ws=ws,
             session_id=session_id,
             send_lock=asyncio.Lock(),
+            deflate_frames=self._wants_deflate_frames(ws),
         )
         conn.sender_task = asyncio.create_task(self._sender_loop(conn))
         with self._connections_lock:
@@ -99,19 +143,41 @@ class ConnectionManager:
                 for session_connections in self.active_connections.values()
                 for conn in session_connections
             ]
+        encode = self._encode_metrics
+        messages = int(encode["messages"])
         return {
             "connection_count": len(connections),
             "max_queue_size": self._max_queue_size,
+            "encoding": {
+                "backend": JSON_BACKEND,
+                "messages": messages,
+                "encode_ms_total": round(encode["encode_seconds"] * 1000, 3),
+                "encode_ms_avg": round(encode["encode_seconds"] * 1000 / messages, 3) if messages else 0.0,
+                "encode_ms_max": round(encode["max_encode_seconds"] * 1000, 3),
+                "payload_bytes": int(encode["payload_bytes"]),
+                "deflate_threshold_bytes": DEFLATE_THRESHOLD_BYTES,
+                "deflated_messages": int(encode["deflated_messages"]),
+                "encodes_saved": int(encode["encodes_saved"]),
+                "bytes_saved": int(encode["bytes_saved"]),
+            },
             "connections": [
                 {
                     "session_id": conn.session_id,
                     "queue_size": len(conn.outbound_queue),
+                    "deflate_frames": conn.deflate_frames,
                     **dict(conn.metrics),
                 }
                 for conn in connections
             ],
         }
 
+    @staticmethod
+    def _wants_deflate_frames(ws: WebSocket) -> bool:
+        query_params = getattr(ws, "query_params", None)
+        if query_params is None:
+            return False
+        return str(query_params.get(DEFLATE_FRAMES_PARAM) or "").lower() == "deflate"
+
     async def _emit_to_connections(
         self,
         connections: list[WebSocketConnection],
@@ -120,19 +186,32 @@ class ConnectionManager:
     ) -> bool:
         if not connections:
             return False
-        message = await self._build_message_async(event_type, data)
+        # 没有连接声明支持二进制帧时不做压缩，避免白白消耗 CPU。
+        deflate = any(conn.deflate_frames for conn in connections)
+        message = await self._build_message_async(event_type, data, deflate=deflate)
+        self._record_encode(message, fanout=len(connections))
         accepted = False
         for conn in list(connections):
             accepted = await self._enqueue(conn, message) or accepted
         return accepted
 
-    async def _build_message_async(self, event_type: str, data: Any) -> OutboundMessage:
-        """JSON 序列化可能较重，放入线程池以免阻塞事件循环。"""
-        return await asyncio.get_running_loop().run_in_executor(None, self._build_message, event_type, data)
+    async def _build_message_async(self, event_type: str, data: Any, *, deflate: bool = False) -> OutboundMessage:
+        """JSON 序列化与压缩可能较重，放入线程池以免阻塞事件循环。"""
+        return await asyncio.get_running_loop().run_in_executor(
+            None,
+            partial(self._build_message, event_type, data, deflate=deflate),
+        )
 
-    def _build_message(self, event_type: str, data: Any) -> OutboundMessage:
+    def _build_message(self, event_type: str, data: Any, *, deflate: bool = False) -> OutboundMessage:
         normalized_type = str(event_type or "")
-        text = json.dumps({"type": normalized_type, "data": data}, ensure_ascii=False)
+        started = time.perf_counter()
+        payload = encode_json({"type": normalized_type, "data": data})
+        text = payload.decode("utf-8")
+        deflated = None
+        if deflate and len(payload) >= DEFLATE_THRESHOLD_BYTES:
+            compressed = zlib.compress(payload, DEFLATE_LEVEL)
+            if len(compressed) <= len(payload) * (1 - DEFLATE_MIN_SAVING_RATIO):
+                deflated = compressed
         priority = self._message_priority(normalized_type, data)
         return OutboundMessage(
             event_type=normalized_type,
@@ -140,8 +219,21 @@ class ConnectionManager:
             text=text,
             priority=priority,
             coalesce_key=self._coalesce_key(normalized_type, data),
+            payload=payload,
+            deflated=deflated,
+            encode_seconds=time.perf_counter() - started,
         )
 
+    def _record_encode(self, message: OutboundMessage, *, fanout: int) -> None:
+        metrics = self._encode_metrics
+        metrics["messages"] += 1
+        metrics["encode_seconds"] += message.encode_seconds
+        metrics["max_encode_seconds"] = max(metrics["max_encode_seconds"], message.encode_seconds)
+        metrics["payload_bytes"] += len(message.payload)
+        metrics["encodes_saved"] += max(0, fanout - 1)
+        if message.deflated is not None:
+            metrics["deflated_messages"] += 1
+
     @staticmethod
     def _message_priority(event_type: str, data: Any) -> FrontendEventPriority:
         """frontend_delta 自带优先级，其余消息沿用领域事件优先级。"""
@@ -235,10 +327,22 @@ class ConnectionManager:
                             conn.queue_event.clear()
                             break
                         message = conn.outbound_queue.popleft()
+                    deflated = message.deflated if conn.deflate_frames else None
                     try:
                         async with conn.send_lock:
-                            await conn.ws.send_text(message.text)
+                            if deflated is not None:
+                                await conn.ws.send_bytes(deflated)
+                            else:
+                                await conn.ws.send_text(message.text)
                         conn.metrics["sent"] += 1
+                        if deflated is not None:
+                            saved = len(message.payload) - len(deflated)
+                            conn.metrics["bytes_sent"] += len(deflated)
+                            conn.metrics["deflated_sent"] += 1
+                            conn.metrics["bytes_saved"] += saved
+                            self._encode_metrics["bytes_saved"] += saved
+                        else:
+                            conn.metrics["bytes_sent"] += len(message.payload)
                     except Exception as exc:
                         log_web_exception(
                             "ConnectionManager",
@@ -0,0 +1,71 @@
+"""Thin ``ucrawl logs`` command adapter over the cross-session log history index."""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+
+from cli.exit_codes import CliExitCode
+
+
+def add_logs_arguments(parser: argparse.ArgumentParser) -> None:
+    """Register the ``logs search`` subcommand."""
+
+    subparsers = parser.add_subparsers(
+        dest="logs_command",
+        title="log operations",
+        required=True,
+    )
+
+    search_parser = subparsers.add_parser(
+        "search",
+        help="search debug logs from earlier sessions",
+    )
+    search_parser.add_argument("text", nargs="?", default="", help="words that must all appear")
+    search_parser.add_argument("--trace-id", help="exact trace_id")
+    search_parser.add_argument("--platform", help="platform id, name or alias")
+    # The CLI keeps a minimum-level filter over raw levels; the log center's level
+    # dropdown and /api/logs/history match the derived display level exactly.
+    search_parser.add_argument(
+        "--level",
+        help="minimum raw level: debug, info, cmd, warn or error (warn also returns error)",
+    )
+    search_parser.add_argument("--since", help="lower time bound: 30m, 24h, 7d or an ISO date/time")
+    search_parser.add_argument("--until", help="upper time bound, same formats as --since")
+    search_parser.add_argument("--cursor", help="next_cursor from the previous page")
+    search_parser.add_argument("--limit", type=int, default=50, help="rows per page (max 500)")
+    search_parser.add_argument(
+        "--no-sync",
+        action="store_true",
+        help="query the existing index without ingesting new session files first",
+    )
+    search_parser.add_argument("--pretty", action="store_true", help="indent JSON output")
+
+
+def handle_logs_command(args: argparse.Namespace) -> int:
+    from app.services.log_history import get_log_history_index
+
+    index = get_log_history_index()
+    try:
+        if not args.no_sync:
+            index.sync()
+        result = index.search(
+            trace_id=args.trace_id,
+            platform=args.platform,
+            level=args.level,
+            text=args.text,
+            since=args.since,
+            until=args.until,
+            cursor=args.cursor,
+            limit=args.limit,
+        )
+    except ValueError as exc:
+        sys.stderr.write(f"{exc}\n")
+        return int(CliExitCode.USAGE)
+    finally:
+        index.close()
+
+    indent = 2 if args.pretty else None
+    sys.stdout.write(json.dumps(result, ensure_ascii=False, indent=indent) + "\n")
+    return int(CliExitCode.OK)
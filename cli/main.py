@@ -33,6 +33,8 @@ _ROOT_HELP_EPILOG = """\
       直接下载已知媒体或分享链接。
   ucrawl scan "D:/Downloads" --pretty
       扫描本地媒体目录并输出结构化结果。
+  ucrawl logs search "下载失败" --since 24h --level warn --pretty
+      检索历史会话日志；结果里的 next_cursor 传给 --cursor 翻页。
 
 继续了解:
   ucrawl <子命令> --help
@@ -55,6 +57,7 @@ def build_parser(
         add_interactive_arguments,
         handle_interactive_command,
     )
+    from cli.commands.logs import add_logs_arguments, handle_logs_command
     from cli.commands.platform_base import add_platform_subparsers
     from cli.commands.platforms import (
         add_platforms_arguments,
@@ -118,6 +121,13 @@ def build_parser(
     add_tools_arguments(tools_parser)
     tools_parser.set_defaults(_handler=handle_tools_command)
 
+    logs_parser = subparsers.add_parser(
+        "logs",
+        help="search debug logs across sessions",
+    )
+    add_logs_arguments(logs_parser)
+    logs_parser.set_defaults(_handler=handle_logs_command)
+
     add_platform_subparsers(subparsers, catalog)
     return parser
 
@@ -324,12 +324,18 @@ def main(argv: list[str] | None = None) -> int:
     signal.signal(signal.SIGTERM, _signal_handler)
 
     import uvicorn
+
+    from app.web.ws_protocol import per_connection_deflate_protocol
+
     server = uvicorn.Server(
         uvicorn.Config(
             app,
             host=args.host,
             port=args.port,
             log_level="warning",
+            # 声明 frames=deflate 的连接收 ConnectionManager 共享的预压缩帧，不再协商 permessage-deflate；
+            # 其余客户端照常协商。
+            ws=per_connection_deflate_protocol(),
             ssl_certfile=args.ssl_certfile,
             ssl_keyfile=args.ssl_keyfile,
         )
@@ -0,0 +1,49 @@
+from __future__ import annotations
+
+from collections.abc import Mapping, MutableMapping
+from typing import Any
+
+# 这些列表按视频 ID 逐行增量；失败页依赖失败记录库和日志摘录，仍整段刷新。
+ROW_SECTIONS = ("queue_items", "active_downloads", "completed_items")
+
+
+def apply_row_delta(snapshot: MutableMapping[str, Any], rows: Mapping[str, Any]) -> set[str] | None:
+    """把服务端行级增量合并进缓存快照，返回实际变化的 section。
+
+    只处理 ``rows["sections"]`` 覆盖的列表：先从中移除 ``ids``，再按 ``index`` 升序插入
+    ``upserts``，这样条目跨列表迁移（排队 -> 下载中 -> 已完成）也只需要一次变更。合并后
+    任一列表长度与服务端 ``counts`` 不一致时返回 ``None``，调用方必须放弃增量改做全量重同步。
+    """
+
+    changed_ids = {str(item_id) for item_id in rows.get("ids") or () if item_id}
+    upserts = rows.get("upserts") if isinstance(rows.get("upserts"), Mapping) else {}
+    counts = rows.get("counts") if isinstance(rows.get("counts"), Mapping) else {}
+    requested = set(rows.get("sections") or ROW_SECTIONS)
+    covered = [section for section in ROW_SECTIONS if section in requested]
+    changed: set[str] = set()
+    merged: dict[str, list[Any]] = {}
+    for section in covered:
+        current = snapshot.get(section)
+        if not isinstance(current, list):
+            return None
+        kept = [
+            item
+            for item in current
+            if not (isinstance(item, Mapping) and str(item.get("id") or "") in changed_ids)
+        ]
+        removed = len(kept) != len(current)
+        entries = sorted(
+            (entry for entry in upserts.get(section) or () if isinstance(entry, Mapping)),
+            key=lambda entry: int(entry.get("index") or 0),
+        )
+        for entry in entries:
+            index = max(0, min(int(entry.get("index") or 0), len(kept)))
+            kept.insert(index, entry.get("row"))
+        expected = counts.get(section)
+        if expected is not None and int(expected) != len(kept):
+            return None
+        if removed or entries:
+            changed.add(section)
+        merged[section] = kept
+    snapshot.update({section: merged[section] for section in changed})
+    return changed
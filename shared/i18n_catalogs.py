@@ -147,6 +147,7 @@ CATALOGS: dict[str, dict[str, str]] = {'zh-CN': {},
            '复制': 'Copy',
            '复制 Trace ID': 'Copy Trace ID',
            '复制TraceID': 'Copy TraceID',
+           '历史会话': 'History',
            '复制当前选中日志的 Trace ID；如果当前日志没有 Trace ID，则尝试复制当前筛选结果中的第一个有效 Trace ID。': 'Copy the selected log Trace ID. If it '
                                                                                 'has no Trace ID, copy the first valid '
                                                                                 'Trace ID from the filtered results.',
@@ -628,7 +629,13 @@ CATALOGS: dict[str, dict[str, str]] = {'zh-CN': {},
            '检测中': 'Checking',
            '这通常表示你正在使用本地构建或预发布构建，无需更新。': 'This usually means you are using a local or pre-release build, so no update '
                                          'is needed.',
-           '自动清理过期失败记录': 'Automatically clear expired failed records'},
+           '自动清理过期失败记录': 'Automatically clear expired failed records',
+           '下载引擎': 'Download engine',
+           '线程（默认）': 'Threads (default)',
+           'asyncio 协程': 'asyncio coroutines',
+           '线程引擎兼容全部下载路径；asyncio 协程在少量线程上并发传输，无法走协程的请求自动回退线程。': 'The thread engine supports every download path; asyncio runs transfers '
+                                                                'concurrently on a few threads and falls back to threads for requests it cannot handle.',
+           '传输并发模型': 'Transfer concurrency model'},
  'zh-TW': {'0（不重试）': '0（不重試）',
            '1 页（推荐）': '1 頁（推薦）',
            '10 个视频': '10 個影片',
@@ -769,6 +776,7 @@ CATALOGS: dict[str, dict[str, str]] = {'zh-CN': {},
            '复制': '複製',
            '复制 Trace ID': '複製 Trace ID',
            '复制TraceID': '複製TraceID',
+           '历史会话': '歷史會話',
            '复制当前选中日志的 Trace ID；如果当前日志没有 Trace ID，则尝试复制当前筛选结果中的第一个有效 Trace ID。': '複製目前選中日誌的 Trace ID；若目前日誌沒有 Trace '
                                                                                 'ID，則嘗試複製目前篩選結果中的第一個有效 Trace ID。',
            '外观设置': '外觀設定',
@@ -1224,4 +1232,9 @@ CATALOGS: dict[str, dict[str, str]] = {'zh-CN': {},
            '自定义': '自訂',
            '检测中': '檢測中',
            '这通常表示你正在使用本地构建或预发布构建，无需更新。': '這通常表示你正在使用本機建置或預發布建置，無需更新。',
-           '自动清理过期失败记录': '自動清理過期失敗記錄'}}
+           '自动清理过期失败记录': '自動清理過期失敗記錄',
+           '下载引擎': '下載引擎',
+           '线程（默认）': '執行緒（預設）',
+           'asyncio 协程': 'asyncio 協程',
+           '线程引擎兼容全部下载路径；asyncio 协程在少量线程上并发传输，无法走协程的请求自动回退线程。': '執行緒引擎相容全部下載路徑；asyncio 協程在少量執行緒上並行傳輸，無法走協程的請求自動回退執行緒。',
+           '传输并发模型': '傳輸並行模型'}}
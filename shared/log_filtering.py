@@ -1,3 +1,5 @@
+"""日志中心筛选规则：GUI 查询 worker、Web REST 查询和日志索引共用同一套判定。"""
+
 from __future__ import annotations
 
 from datetime import datetime, timedelta
@@ -16,6 +18,9 @@ from shared.log_platforms import PlatformUiMeta, builtin_platform_metas
 
 ALL_LABELS = {"", "all", "\u5168\u90e8"}
 TIME_RANGE_MINUTES = {
+    "30m": 30,
+    "1h": 60,
+    "24h": 24 * 60,
     "\u8fd1 30 \u5206\u949f": 30,
     "\u8fd1 1 \u5c0f\u65f6": 60,
     "\u8fd1 24 \u5c0f\u65f6": 24 * 60,
@@ -10,6 +10,7 @@
 from __future__ import annotations
 
 import re
+from functools import lru_cache
 from typing import Any
 
 from shared.localization import normalize_language, platform_display_name, tr
@@ -1325,9 +1326,9 @@ def _localized(language_map: dict[str, str], language: str) -> str:
     return language_map.get(language) or language_map.get("zh-CN") or ""
 
 
-def _apply_runtime_phrase_translations(text: str, language: str) -> str:
-    """替换运行时短语，始终先处理较长 source，避免短词截断长句。"""
-    target_index = {"zh-CN": 0, "en-US": 1, "zh-TW": 2}.get(language, 0)
+@lru_cache(maxsize=None)
+def _runtime_phrase_replacements(target_index: int) -> tuple[tuple[str, str], ...]:
+    """按目标语言展开并排序的短语替换表；短语表是模块常量，每种语言只需构建一次。"""
     replacements: list[tuple[str, str]] = []
     for entry in _RUNTIME_LOG_PHRASE_TRANSLATIONS:
         target = entry[target_index] or entry[0]
@@ -1335,9 +1336,14 @@ def _apply_runtime_phrase_translations(text: str, language: str) -> str:
             if source and source != target:
                 replacements.append((source, target))
     replacements.sort(key=lambda item: len(item[0]), reverse=True)
+    return tuple(replacements)
+
 
+def _apply_runtime_phrase_translations(text: str, language: str) -> str:
+    """替换运行时短语，始终先处理较长 source，避免短词截断长句。"""
+    target_index = {"zh-CN": 0, "en-US": 1, "zh-TW": 2}.get(language, 0)
     result = text
-    for source, target in replacements:
+    for source, target in _runtime_phrase_replacements(target_index):
         result = result.replace(source, target)
     return result
 
@@ -0,0 +1,489 @@
+"""日志中心增量查询索引。
+
+GUI 日志查询 worker 与 Web REST 查询共用：每条日志只在进入缓冲窗口时计算一次分类事实、
+级别、平台、trace、时间和检索文本，并登记到分类/级别/平台/trace/词元倒排表以及按时间
+排序的序列。之后的筛选、计数和分页只触及命中集合，判定语义与 ``shared.log_filtering``
+的逐条匹配保持一致。索引本身不加锁，调用方需保证同一时刻只有一个线程同步或查询。
+"""
+
+from __future__ import annotations
+
+import re
+from bisect import bisect_left, insort
+from collections import deque
+from collections.abc import Callable, Collection, Iterable, Mapping, Sequence
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Any
+
+from shared import log_filtering
+from shared.log_classification import (
+    cache_classification_facts,
+    derive_result_type,
+    normalized_raw_level,
+    result_display_text,
+)
+from shared.log_display import resolve_item_platform_id
+from shared.log_pipeline_rules import derive_log_scope
+from shared.log_platforms import PlatformUiMeta
+
+RowKey = tuple[str, str, str]
+
+_TOKEN_RE = re.compile(r"\w+")
+_EMPTY: frozenset[int] = frozenset()
+# 一次淘汰超过时间序列 1/8 时整体过滤重建，比逐条二分删除更省。
+_ORDER_REBUILD_RATIO = 8
+
+
+def row_key(item: Mapping[str, Any]) -> RowKey:
+    """日志行身份：显式 ID 加时间和摘要，日志截断后复用的序号 ID 不会被认成旧行。"""
+    return (
+        str(item.get("id") or ""),
+        str(item.get("time") or ""),
+        str(item.get("message_summary") or item.get("message") or ""),
+    )
+
+
+@dataclass(slots=True)
+class _IndexedRow:
+    serial: int
+    key: RowKey
+    row: dict[str, Any]
+    category: str
+    level: str
+    platform_id: str
+    trace: str
+    timestamp: datetime
+    search_text: str
+    tokens: frozenset[str]
+
+    @property
+    def sort_key(self) -> tuple[datetime, int]:
+        return self.timestamp, self.serial
+
+
+@dataclass(frozen=True, slots=True)
+class LogIndexPage:
+    """一次查询的当前页；``rows`` 是索引内的工作行，交给 UI 前需复制装饰并移除分类缓存。"""
+
+    rows: list[dict[str, Any]]
+    category_counts: dict[str, int]
+    total_count: int
+    matched_count: int
+    current_page: int
+    total_pages: int
+    first_trace_id: str
+
+
+class _NewestFirst:
+    """未筛选时直接按时间序列倒序取页，不为全量命中物化列表。"""
+
+    __slots__ = ("_order",)
+
+    def __init__(self, order: list[tuple[datetime, int]]) -> None:
+        self._order = order
+
+    def __len__(self) -> int:
+        return len(self._order)
+
+    def __getitem__(self, index: int | slice) -> Any:
+        last = len(self._order) - 1
+        if isinstance(index, slice):
+            start, stop, _step = index.indices(len(self._order))
+            return [self._order[last - position][1] for position in range(start, stop)]
+        return self._order[last - index][1]
+
+    def position(self, sort_key: tuple[datetime, int]) -> int | None:
+        found = bisect_left(self._order, sort_key)
+        if found >= len(self._order) or self._order[found] != sort_key:
+            return None
+        return len(self._order) - 1 - found
+
+
+class LogQueryIndex:
+    """按日志缓冲增量维护的倒排索引；``prepare`` 用于在入索引前补齐展示字段。"""
+
+    def __init__(self, *, prepare: Callable[[Mapping[str, Any]], dict[str, Any]] | None = None) -> None:
+        self._prepare = prepare
+        self._platform_options: tuple[PlatformUiMeta, ...] = ()
+        self._platform_meta_by_id: dict[str, PlatformUiMeta] = {}
+        self._platform_signature: tuple[str, ...] | None = None
+        self._source: Sequence[Any] | None = None
+        self._source_length = 0
+        self._indexed = 0
+        self._rebuilds = 0
+        self._reset()
+
+    def _reset(self) -> None:
+        self._keys: deque[RowKey | None] = deque()
+        self._base = 0
+        self._rows: dict[int, _IndexedRow] = {}
+        self._serial_by_key: dict[RowKey, int] = {}
+        self._serial_by_id: dict[str, int] = {}
+        self._by_category: dict[str, set[int]] = {}
+        self._by_level: dict[str, set[int]] = {}
+        self._by_platform: dict[str, set[int]] = {}
+        self._by_trace: dict[str, set[int]] = {}
+        self._by_token: dict[str, set[int]] = {}
+        self._order: list[tuple[datetime, int]] = []
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "rows": len(self._rows),
+            "tokens": len(self._by_token),
+            "traces": len(self._by_trace),
+            "indexed": self._indexed,
+            "rebuilds": self._rebuilds,
+        }
+
+    def sync(
+        self,
+        items: Sequence[Any],
+        *,
+        platform_options: Sequence[PlatformUiMeta],
+        platform_meta_by_id: Mapping[str, PlatformUiMeta],
+    ) -> None:
+        """与当前日志窗口对齐；头部淘汰加尾部追加只处理变化的行，其他形态整体重排。"""
+        signature = (*sorted(platform_meta_by_id), "|", *(meta.id for meta in platform_options))
+        if signature != self._platform_signature:
+            # 平台元数据决定每行的平台解析结果，变化后不能复用旧行。
+            self._platform_signature = signature
+            self._platform_options = tuple(platform_options)
+            self._platform_meta_by_id = dict(platform_meta_by_id)
+            self._rebuild(items, reuse=False)
+        elif items is self._source and len(items) == self._source_length:
+            return
+        elif not self._shift_window(items):
+            self._rebuild(items, reuse=True)
+        self._source = items
+        self._source_length = len(items)
+
+    def query(
+        self,
+        *,
+        categories: Sequence[str],
+        category: str,
+        level: str,
+        time_range: str,
+        platform_id: str | None,
+        trace_query: str,
+        keyword: str,
+        page: int,
+        page_size: int,
+        selected_id: str = "",
+        selected_id_moves_page: bool = True,
+        limit: int = 0,
+        now: datetime | None = None,
+    ) -> LogIndexPage:
+        """筛选、计数并取出一页；``limit`` 大于 0 时只保留最新的 ``limit`` 条命中。"""
+        base = self._filter(
+            level=level,
+            time_range=time_range,
+            platform_id=platform_id,
+            trace_query=trace_query,
+            keyword=keyword,
+            now=now,
+        )
+        counts = self._category_counts(base, categories)
+        if str(category or "").strip().lower() in log_filtering.ALL_LABELS:
+            matched = base
+        else:
+            bucket = self._by_category.get(category, _EMPTY)
+            matched = set(bucket) if base is None else base & bucket
+        ordered = self._ordered(matched)
+        matched_count = len(ordered) if limit <= 0 else min(len(ordered), int(limit))
+
+        current_page = int(page or 1)
+        if selected_id and selected_id_moves_page:
+            # 详情面板选中某条日志时，筛选/刷新后优先翻到该日志所在页。
+            position = self._position_of(selected_id, ordered)
+            if position is not None and position < matched_count:
+                current_page = 1 if page_size <= 0 else position // page_size + 1
+        pages = 1 if page_size <= 0 else max(1, (matched_count + page_size - 1) // page_size)
+        current_page = max(1, min(current_page, pages))
+        if page_size <= 0:
+            start, stop = 0, matched_count
+        else:
+            start = (current_page - 1) * page_size
+            stop = min(matched_count, start + page_size)
+        rows = [self._rows[serial].row for serial in ordered[start:stop]]
+        return LogIndexPage(
+            rows=rows,
+            category_counts=counts,
+            total_count=len(self._rows),
+            matched_count=matched_count,
+            current_page=current_page,
+            total_pages=pages,
+            first_trace_id=_first_trace_id(rows) or self._first_trace_in(ordered, matched_count),
+        )
+
+    def _shift_window(self, items: Sequence[Any]) -> bool:
+        """识别“头部淘汰 + 尾部追加”；只校验首尾行身份，窗口中间的日志行视为不可变。"""
+        kept = 0
+        if self._keys:
+            first = items[0] if len(items) else None
+            if not isinstance(first, Mapping):
+                return False
+            serial = self._serial_by_key.get(row_key(first))
+            if serial is None:
+                return False
+            dropped = serial - self._base
+            kept = len(self._keys) - dropped
+            if kept > len(items) or _key_or_none(items[kept - 1]) != self._keys[-1]:
+                return False
+            self._drop_front(dropped)
+        for position in range(kept, len(items)):
+            self._append(items[position], None)
+        return True
+
+    def _rebuild(self, items: Iterable[Any], *, reuse: bool) -> None:
+        previous = {entry.key: entry for entry in self._rows.values()} if reuse else {}
+        self._rebuilds += 1
+        self._reset()
+        for item in items:
+            self._append(item, previous, keep_sorted=False)
+        self._order.sort()
+
+    def _append(
+        self,
+        item: Any,
+        previous: dict[RowKey, _IndexedRow] | None,
+        *,
+        keep_sorted: bool = True,
+    ) -> None:
+        serial = self._base + len(self._keys)
+        if not isinstance(item, Mapping):
+            self._keys.append(None)
+            return
+        key = row_key(item)
+        entry = previous.pop(key, None) if previous else None
+        if entry is None:
+            entry = self._build(serial, key, item)
+        else:
+            entry.serial = serial
+        self._keys.append(key)
+        self._insert(entry, keep_sorted=keep_sorted)
+
+    def _build(self, serial: int, key: RowKey, item: Mapping[str, Any]) -> _IndexedRow:
+        row = self._prepare(item) if self._prepare is not None else dict(item)
+        # 分类事实缓存只存在于索引内的工作行，不会写回调用方的原始日志行。
+        cache_classification_facts(row)
+        search_text = log_filtering.searchable_text(row, include_detail=True).lower()
+        self._indexed += 1
+        return _IndexedRow(
+            serial=serial,
+            key=key,
+            row=row,
+            category=derive_log_scope(row),
+            level=result_display_text(derive_result_type(row), normalized_raw_level(row)),
+            platform_id=resolve_item_platform_id(row, self._platform_options, self._platform_meta_by_id),
+            trace=str(row.get("trace_id") or "").lower(),
+            timestamp=log_filtering.item_datetime(row) or datetime.min,
+            search_text=search_text,
+            tokens=frozenset(_TOKEN_RE.findall(search_text)),
+        )
+
+    def _insert(self, entry: _IndexedRow, *, keep_sorted: bool) -> None:
+        serial = entry.serial
+        self._rows[serial] = entry
+        self._serial_by_key[entry.key] = serial
+        explicit_id = str(entry.row.get("id") or "")
+        if explicit_id:
+            self._serial_by_id[explicit_id] = serial
+        _post(self._by_category, entry.category, serial)
+        _post(self._by_level, entry.level, serial)
+        _post(self._by_platform, entry.platform_id, serial)
+        _post(self._by_trace, entry.trace, serial)
+        for token in entry.tokens:
+            _post(self._by_token, token, serial)
+        sort_key = entry.sort_key
+        if not keep_sorted or not self._order or sort_key >= self._order[-1]:
+            self._order.append(sort_key)
+        else:
+            insort(self._order, sort_key)
+
+    def _drop_front(self, count: int) -> None:
+        removed: list[tuple[datetime, int]] = []
+        for _index in range(count):
+            self._keys.popleft()
+            entry = self._rows.pop(self._base, None)
+            self._base += 1
+            if entry is None:
+                continue
+            serial = entry.serial
+            if self._serial_by_key.get(entry.key) == serial:
+                del self._serial_by_key[entry.key]
+            explicit_id = str(entry.row.get("id") or "")
+            if explicit_id and self._serial_by_id.get(explicit_id) == serial:
+                del self._serial_by_id[explicit_id]
+            _unpost(self._by_category, entry.category, serial)
+            _unpost(self._by_level, entry.level, serial)
+            _unpost(self._by_platform, entry.platform_id, serial)
+            _unpost(self._by_trace, entry.trace, serial)
+            for token in entry.tokens:
+                _unpost(self._by_token, token, serial)
+            removed.append(entry.sort_key)
+        if len(removed) * _ORDER_REBUILD_RATIO > len(self._order):
+            self._order = [sort_key for sort_key in self._order if sort_key[1] >= self._base]
+            return
+        for sort_key in removed:
+            del self._order[bisect_left(self._order, sort_key)]
+
+    def _filter(
+        self,
+        *,
+        level: str,
+        time_range: str,
+        platform_id: str | None,
+        trace_query: str,
+        keyword: str,
+        now: datetime | None,
+    ) -> set[int] | None:
+        """返回满足非分类筛选的行序号；``None`` 表示没有任何筛选条件。"""
+        pools: list[Collection[int]] = []
+        level = str(level or "").strip()
+        if level and level not in log_filtering.ALL_LABELS:
+            pools.append(self._by_level.get(level, _EMPTY))
+        minutes = log_filtering.TIME_RANGE_MINUTES.get(str(time_range or ""))
+        if minutes is not None:
+            cutoff = (now or datetime.now()) - timedelta(minutes=minutes)
+            start = bisect_left(self._order, (cutoff, -1))
+            pools.append({serial for _timestamp, serial in self._order[start:]})
+        platform = str(platform_id or "").strip().lower()
+        if platform and platform != "all":
+            pools.append(self._platform_serials(platform))
+        trace = str(trace_query or "").strip().lower()
+        if trace:
+            pools.append(_union(postings for value, postings in self._by_trace.items() if trace in value))
+        keyword = str(keyword or "").strip().lower()
+        if not pools and not keyword:
+            return None
+
+        result: set[int] | None = None
+        for pool in sorted(pools, key=len):
+            result = set(pool) if result is None else result & pool
+            if not result:
+                return set()
+        if keyword:
+            candidates = self._keyword_candidates(keyword, result)
+            result = {serial for serial in candidates if keyword in self._rows[serial].search_text}
+        return result
+
+    def _platform_serials(self, platform: str) -> set[int]:
+        matched = set(self._by_platform.get(platform, _EMPTY))
+        # 未能解析出平台的行沿用文本回退匹配；这部分通常只是极少数旧格式日志。
+        for serial in self._by_platform.get("", _EMPTY):
+            if log_filtering.matches_platform(
+                self._rows[serial].row,
+                platform,
+                platform_options=self._platform_options,
+                platform_meta_by_id=self._platform_meta_by_id,
+            ):
+                matched.add(serial)
+        return matched
+
+    def _keyword_candidates(self, keyword: str, within: set[int] | None) -> Collection[int]:
+        """用词元倒排收窄候选；关键词里的每个词元必然是某个日志词元的子串。"""
+        terms = set(_TOKEN_RE.findall(keyword))
+        if not terms:
+            return self._rows.keys() if within is None else within
+        candidates = within
+        # 长词元区分度更高，先用它收窄候选集合。
+        for term in sorted(terms, key=len, reverse=True):
+            postings = _union(serials for token, serials in self._by_token.items() if term in token)
+            candidates = postings if candidates is None else candidates & postings
+            if not candidates:
+                return ()
+        return candidates if candidates is not None else ()
+
+    def _category_counts(self, base: set[int] | None, categories: Sequence[str]) -> dict[str, int]:
+        counts = {key: 0 for key in categories}
+        total = len(self._rows) if base is None else len(base)
+        if total or "all" in counts:
+            counts["all"] = total
+        for key in counts:
+            if key == "all":
+                continue
+            bucket = self._by_category.get(key, _EMPTY)
+            counts[key] = len(bucket) if base is None else len(base & bucket)
+        return counts
+
+    def _ordered(self, matched: set[int] | None) -> _NewestFirst | list[int]:
+        """按时间倒序排列命中；时间相同时后到的日志在前，与 ``sort_log_items`` 一致。"""
+        if matched is None:
+            return _NewestFirst(self._order)
+        if len(matched) * 4 >= len(self._order):
+            return [serial for _timestamp, serial in reversed(self._order) if serial in matched]
+        return sorted(matched, key=lambda serial: self._rows[serial].sort_key, reverse=True)
+
+    def _position_of(self, selected_id: str, ordered: _NewestFirst | list[int]) -> int | None:
+        serial = self._serial_by_id.get(selected_id)
+        if serial is not None:
+            if isinstance(ordered, _NewestFirst):
+                return ordered.position(self._rows[serial].sort_key)
+            try:
+                return ordered.index(serial)
+            except ValueError:
+                return None
+        # 没有显式 id 的旧日志沿用“时间|trace|摘要|序号”的稳定 ID，只能逐行比对。
+        for position in range(len(ordered)):
+            if _stable_id(self._rows[ordered[position]].row, position) == selected_id:
+                return position
+        return None
+
+    def _first_trace_in(self, ordered: _NewestFirst | list[int], limit: int) -> str:
+        for position in range(limit):
+            trace_id = _first_trace_id([self._rows[ordered[position]].row])
+            if trace_id:
+                return trace_id
+        return ""
+
+
+def _stable_id(item: Mapping[str, Any], index: int) -> str:
+    return "|".join(
+        [
+            str(item.get("time") or ""),
+            str(item.get("trace_id") or ""),
+            str(item.get("message_summary") or item.get("message") or ""),
+            str(index),
+        ]
+    )
+
+
+def _first_trace_id(items: Iterable[Mapping[str, Any]]) -> str:
+    for item in items:
+        trace_id = str(item.get("trace_id") or item.get("traceId") or "")
+        if trace_id:
+            return trace_id
+    return ""
+
+
+def _key_or_none(item: Any) -> RowKey | None:
+    return row_key(item) if isinstance(item, Mapping) else None
+
+
+def _post(postings: dict[str, set[int]], value: str, serial: int) -> None:
+    bucket = postings.get(value)
+    if bucket is None:
+        postings[value] = {serial}
+    else:
+        bucket.add(serial)
+
+
+def _unpost(postings: dict[str, set[int]], value: str, serial: int) -> None:
+    bucket = postings.get(value)
+    if bucket is None:
+        return
+    bucket.discard(serial)
+    if not bucket:
+        del postings[value]
+
+
+def _union(groups: Iterable[set[int]]) -> set[int]:
+    merged: set[int] = set()
+    for group in groups:
+        merged |= group
+    return merged
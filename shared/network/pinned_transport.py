@@ -3,8 +3,11 @@
 from __future__ import annotations
 
 import ipaddress
+import queue
 import re
+import threading
 import time
+from collections import OrderedDict
 from collections.abc import Callable, Mapping, Sequence
 from dataclasses import dataclass
 from typing import Any
@@ -22,6 +25,9 @@ _CURL_WRITEFUNC_ERROR = 0xFFFFFFFF
 _SENSITIVE_REDIRECT_HEADERS = frozenset(
     {"authorization", "cookie", "proxy-authorization"}
 )
+_STREAM_QUEUE_CHUNKS = 16
+_STREAM_POLL_SECONDS = 0.1
+_STREAM_END = object()
 
 
 @dataclass(frozen=True, slots=True)
@@ -240,6 +246,26 @@ def _close_session(session: Any) -> None:
         close()
 
 
+def _validated_request_method(method: str, body: bytes | None, max_redirects: int) -> str:
+    normalized_method = str(method or "").upper()
+    if normalized_method not in {
+        "GET",
+        "POST",
+        "PUT",
+        "DELETE",
+        "OPTIONS",
+        "HEAD",
+        "TRACE",
+        "PATCH",
+    }:
+        raise ValueError("unsupported HTTP method")
+    if body is not None and type(body) is not bytes:
+        raise TypeError("body must be bytes or None")
+    if max_redirects < 0:
+        raise ValueError("max_redirects must not be negative")
+    return normalized_method
+
+
 class PinnedTransport:
     """Perform one operation in one private curl session with pinned DNS."""
 
@@ -269,23 +295,7 @@ class PinnedTransport:
         body: bytes | None = None,
         max_redirects: int = 5,
     ) -> PinnedResponse:
-        normalized_method = str(method or "").upper()
-        if normalized_method not in {
-            "GET",
-            "POST",
-            "PUT",
-            "DELETE",
-            "OPTIONS",
-            "HEAD",
-            "TRACE",
-            "PATCH",
-        }:
-            raise ValueError("unsupported HTTP method")
-        if body is not None and type(body) is not bytes:
-            raise TypeError("body must be bytes or None")
-        if max_redirects < 0:
-            raise ValueError("max_redirects must not be negative")
-
+        normalized_method = _validated_request_method(method, body, max_redirects)
         request_headers = _copy_request_headers(headers)
         target = canonicalize_request_target(url)
         redirect_chain = [target.url]
@@ -401,3 +411,554 @@ class PinnedTransport:
             if session is not None:
                 _close_session(session)
         raise DomainPolicyViolation("public redirect limit exceeded")
+
+
+def _pooled_session_factory():
+    from curl_cffi import requests as curl_requests
+
+    # One leased session runs one transfer at a time, possibly from a fresh producer
+    # thread, so the curl handle (and its connection cache) must not be thread-local.
+    return curl_requests.Session(impersonate="chrome", use_thread_local_curl=False)
+
+
+class PinnedSessionPool:
+    """Keep idle curl sessions per canonical origin and validated address set.
+
+    Pinned requests always disable proxies, so the proxy is constant and not part
+    of the key. A session is only handed back to a caller whose fresh DNS answer
+    produced exactly the same address set, so reuse never widens what was pinned.
+    """
+
+    def __init__(
+        self,
+        *,
+        session_factory: Callable[[], Any] | None = None,
+        max_idle_per_key: int = 4,
+        max_keys: int = 64,
+    ) -> None:
+        if max_idle_per_key < 0 or max_keys <= 0:
+            raise ValueError("pool limits must be positive")
+        self._session_factory = session_factory or _pooled_session_factory
+        self._max_idle_per_key = int(max_idle_per_key)
+        self._max_keys = int(max_keys)
+        self._lock = threading.Lock()
+        self._idle: OrderedDict[tuple[Any, ...], list[tuple[Any, dict[Any, Any]]]] = OrderedDict()
+        self._created = 0
+        self._reused = 0
+        self._discarded = 0
+
+    @staticmethod
+    def key(target: CanonicalRequestTarget, addresses: Sequence[str]) -> tuple[Any, ...]:
+        """Return the reuse key for one canonical target and its validated addresses."""
+
+        return (
+            target.scheme,
+            target.host,
+            target.port,
+            tuple(sorted({str(address).lower() for address in addresses})),
+        )
+
+    def acquire(self, key: tuple[Any, ...]) -> tuple[Any, dict[Any, Any]]:
+        """Lease an idle session for ``key`` or create one; returns (session, base options)."""
+
+        with self._lock:
+            idle = self._idle.get(key)
+            if idle:
+                session, base_options = idle.pop()
+                if not idle:
+                    del self._idle[key]
+                self._reused += 1
+                return session, base_options
+        candidate = self._session_factory()
+        options = getattr(candidate, "curl_options", {})
+        if not isinstance(options, dict):
+            _close_session(candidate)
+            raise DomainPolicyViolation("curl session cannot enforce pinned DNS")
+        with self._lock:
+            self._created += 1
+        return candidate, dict(options)
+
+    def release(
+        self,
+        key: tuple[Any, ...],
+        session: Any,
+        base_options: dict[Any, Any],
+        *,
+        reusable: bool,
+    ) -> None:
+        """Return a leased session; cookies and per-request curl options never survive."""
+
+        evicted: list[Any] = []
+        if reusable and self._max_idle_per_key:
+            try:
+                cookies = getattr(session, "cookies", None)
+                clear = getattr(cookies, "clear", None)
+                if callable(clear):
+                    clear()
+                session.curl_options = dict(base_options)
+            except Exception:
+                reusable = False
+        else:
+            reusable = False
+        with self._lock:
+            if reusable:
+                idle = self._idle.setdefault(key, [])
+                self._idle.move_to_end(key)
+                if len(idle) < self._max_idle_per_key:
+                    idle.append((session, base_options))
+                    session = None
+                while len(self._idle) > self._max_keys:
+                    _old_key, stale = self._idle.popitem(last=False)
+                    evicted.extend(entry[0] for entry in stale)
+            if session is not None:
+                evicted.append(session)
+            self._discarded += len(evicted)
+        for stale_session in evicted:
+            _close_session(stale_session)
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return {
+                "created": self._created,
+                "reused": self._reused,
+                "discarded": self._discarded,
+                "idle": sum(len(idle) for idle in self._idle.values()),
+                "keys": len(self._idle),
+            }
+
+    def close(self) -> None:
+        with self._lock:
+            sessions = [entry[0] for idle in self._idle.values() for entry in idle]
+            self._idle.clear()
+            self._discarded += len(sessions)
+        for session in sessions:
+            _close_session(session)
+
+
+pinned_session_pool = PinnedSessionPool()
+
+
+def _parse_header_line(
+    line: bytes,
+    status: list[int],
+    headers: dict[str, str],
+) -> bool:
+    """Fold one raw header line into ``status``/``headers``; True at a final header block end."""
+
+    text = line.decode("latin-1").rstrip("\r\n")
+    if text.startswith("HTTP/"):
+        parts = text.split(" ", 2)
+        status[0] = int(parts[1]) if len(parts) > 1 and parts[1].isdigit() else 0
+        headers.clear()
+        return False
+    if not text:
+        return status[0] >= 200
+    name, separator, value = text.partition(":")
+    if separator and name.strip():
+        name = name.strip()
+        value = value.strip()
+        existing = next((key for key in headers if key.lower() == name.lower()), None)
+        if existing is None:
+            headers[name] = value
+        else:
+            headers[existing] = f"{headers[existing]}, {value}"
+    return False
+
+
+class _PinnedTransfer:
+    """Run one curl transfer on a producer thread and hand body chunks over a bounded queue."""
+
+    def __init__(
+        self,
+        session: Any,
+        *,
+        method: str,
+        url: str,
+        headers: Mapping[str, str],
+        body: bytes | None,
+        curl_options: dict[Any, Any],
+        timeout: float,
+        max_bytes: int,
+    ) -> None:
+        self.status_code = 0
+        self.headers: dict[str, str] = {}
+        self.error: BaseException | None = None
+        self.completed = False
+        self._session = session
+        self._method = method
+        self._url = url
+        self._request_headers = dict(headers)
+        self._body = body
+        self._curl_options = curl_options
+        self._timeout = timeout
+        self._max_bytes = max_bytes
+        self._received = 0
+        self._too_large = False
+        self._saw_body = False
+        self._status = [0]
+        self._ready = threading.Event()
+        self._abort = threading.Event()
+        self._chunks: queue.Queue[Any] = queue.Queue(maxsize=_STREAM_QUEUE_CHUNKS)
+        self._thread = threading.Thread(
+            target=self._run,
+            name="ucrawl-pinned-transfer",
+            daemon=True,
+        )
+
+    def start(self) -> None:
+        self._thread.start()
+        if not self._ready.wait(self._timeout):
+            self.abort()
+            raise TimeoutError("public request deadline exceeded")
+        if self.error is not None and not self._saw_body and self.status_code == 0:
+            self.abort()
+            raise self.error
+
+    def _on_header(self, line: bytes) -> int:
+        if self._abort.is_set():
+            return _CURL_WRITEFUNC_ERROR
+        if _parse_header_line(bytes(line), self._status, self.headers):
+            self.status_code = self._status[0]
+            self._ready.set()
+        return len(line)
+
+    def _put(self, item: Any) -> bool:
+        while not self._abort.is_set():
+            try:
+                self._chunks.put(item, timeout=_STREAM_POLL_SECONDS)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _on_body(self, chunk: bytes) -> int:
+        if self._received + len(chunk) > self._max_bytes:
+            self._too_large = True
+            return _CURL_WRITEFUNC_ERROR
+        self._received += len(chunk)
+        self._saw_body = True
+        self._ready.set()
+        if not self._put(bytes(chunk)):
+            return _CURL_WRITEFUNC_ERROR
+        return len(chunk)
+
+    def _run(self) -> None:
+        response: Any | None = None
+        try:
+            response = self._perform()
+            if not self.status_code:
+                self.status_code = int(getattr(response, "status_code", 0) or 0)
+                self.headers = _response_headers(response)
+            if not self._saw_body:
+                payload = bytes(getattr(response, "content", b"") or b"")
+                if payload:
+                    self._on_body(payload)
+                    if self._too_large:
+                        raise DomainPolicyViolation("public response exceeds size limit")
+            self.completed = not self._abort.is_set()
+        except BaseException as exc:  # noqa: BLE001 - surfaced to the consumer thread
+            if not self._abort.is_set():
+                self.error = (
+                    DomainPolicyViolation("public response exceeds size limit")
+                    if self._too_large
+                    else exc
+                )
+        finally:
+            if response is not None:
+                _close_response(response)
+            self._ready.set()
+            self._put(_STREAM_END)
+
+    def _perform(self) -> Any:
+        from curl_cffi.const import CurlOpt
+
+        self._session.curl_options = {
+            **self._curl_options,
+            CurlOpt.HEADERFUNCTION: self._on_header,
+        }
+        return self._session.request(
+            self._method,
+            self._url,
+            headers=self._request_headers,
+            data=self._body,
+            allow_redirects=False,
+            timeout=self._timeout,
+            content_callback=self._on_body,
+        )
+
+    def chunks(self):
+        while True:
+            try:
+                item = self._chunks.get(timeout=_STREAM_POLL_SECONDS)
+            except queue.Empty:
+                if self._abort.is_set():
+                    return
+                continue
+            if item is _STREAM_END:
+                if self.error is not None:
+                    raise self.error
+                return
+            yield item
+
+    @property
+    def finished(self) -> bool:
+        return not self._thread.is_alive()
+
+    def abort(self) -> None:
+        """Stop the producer; a stalled server only delays this by one bounded join."""
+
+        self._abort.set()
+        while True:
+            try:
+                self._chunks.get_nowait()
+            except queue.Empty:
+                break
+        self._thread.join(min(self._timeout, 5.0))
+
+
+class PinnedStreamResponse:
+    """Expose one pinned transfer as a lazily consumed stream.
+
+    Status and headers are available as soon as the final header block arrives;
+    ``iter_content`` yields bytes while curl is still receiving them. The leased
+    session goes back to the pool on ``close`` and only when the body was fully read.
+    """
+
+    def __init__(
+        self,
+        transfer: _PinnedTransfer,
+        *,
+        url: str,
+        redirect_chain: tuple[str, ...],
+        on_close: Callable[[bool], None],
+    ) -> None:
+        self.status_code = transfer.status_code
+        self.url = url
+        self.headers: Mapping[str, str] = dict(transfer.headers)
+        self.redirect_chain = redirect_chain
+        self._transfer = transfer
+        self._on_close = on_close
+        self._prefix = bytearray()
+        self._chunks = transfer.chunks()
+        self._content: bytes | None = None
+        self._consumed = False
+        self._closed = False
+        self._lock = threading.Lock()
+
+    def peek(self, size: int) -> bytes:
+        """Return up to ``size`` leading bytes without consuming them from the stream."""
+
+        with self._lock:
+            while len(self._prefix) < size and not self._consumed:
+                try:
+                    self._prefix.extend(next(self._chunks))
+                except StopIteration:
+                    self._consumed = True
+            return bytes(self._prefix[:size])
+
+    @property
+    def content(self) -> bytes:
+        """Read and cache the rest of the body; bounded by the transport size limit."""
+
+        if self._content is None:
+            self._content = b"".join(self.iter_content())
+        return self._content
+
+    @property
+    def text(self) -> str:
+        return self.content.decode("utf-8", errors="replace")
+
+    def iter_content(self, chunk_size: int = 256 * 1024):
+        """Yield body bytes as curl delivers them, re-sliced to at most ``chunk_size``."""
+
+        if self._content is not None:
+            yield from PinnedResponse(self.status_code, self.url, {}, self._content).iter_content(chunk_size)
+            return
+        size = max(1, int(chunk_size))
+        with self._lock:
+            pending = bytes(self._prefix)
+            self._prefix.clear()
+        while True:
+            while len(pending) >= size:
+                yield pending[:size]
+                pending = pending[size:]
+            with self._lock:
+                if self._consumed:
+                    break
+                try:
+                    chunk = next(self._chunks)
+                except StopIteration:
+                    self._consumed = True
+                    break
+            pending += chunk
+        if pending:
+            yield pending
+        self.close()
+
+    def close(self) -> None:
+        if self._closed:
+            return
+        self._closed = True
+        if not self._consumed:
+            self._transfer.abort()
+        reusable = self._consumed and self._transfer.completed and self._transfer.finished
+        self._on_close(reusable)
+
+    def __enter__(self) -> PinnedStreamResponse:
+        return self
+
+    def __exit__(self, *_exc: object) -> None:
+        self.close()
+
+
+class PooledPinnedTransport:
+    """Pinned transport that reuses curl connections and streams response bodies.
+
+    Every hop is re-resolved and re-validated exactly like ``PinnedTransport``; a
+    session is reused only under the same canonical origin and address set, and
+    cross-origin redirects drop credentials and switch to a different lease.
+    """
+
+    def __init__(
+        self,
+        *,
+        policy: DomainPolicyEngine | Any = PUBLIC_DOMAIN_POLICY,
+        pool: PinnedSessionPool | None = None,
+        timeout: float = 60.0,
+        max_response_bytes: int = 64 * 1024 * 1024,
+    ) -> None:
+        if timeout <= 0:
+            raise ValueError("timeout must be positive")
+        if max_response_bytes <= 0:
+            raise ValueError("max_response_bytes must be positive")
+        self._policy = policy
+        self._pool = pool if pool is not None else pinned_session_pool
+        self._timeout = float(timeout)
+        self._max_response_bytes = int(max_response_bytes)
+
+    def request(
+        self,
+        method: str,
+        url: str,
+        *,
+        headers: Mapping[str, str],
+        body: bytes | None = None,
+        max_redirects: int = 5,
+    ) -> PinnedResponse:
+        """Buffer one pooled response for callers that need the whole body."""
+
+        response = self.stream(
+            method,
+            url,
+            headers=headers,
+            body=body,
+            max_redirects=max_redirects,
+        )
+        try:
+            payload = response.content
+        finally:
+            response.close()
+        return PinnedResponse(
+            status_code=response.status_code,
+            url=response.url,
+            headers=dict(response.headers),
+            body=payload,
+            redirect_chain=response.redirect_chain,
+        )
+
+    def stream(
+        self,
+        method: str,
+        url: str,
+        *,
+        headers: Mapping[str, str],
+        body: bytes | None = None,
+        max_redirects: int = 5,
+    ) -> PinnedStreamResponse:
+        normalized_method = _validated_request_method(method, body, max_redirects)
+        request_headers = _copy_request_headers(headers)
+        target = canonicalize_request_target(url)
+        redirect_chain = [target.url]
+        deadline = time.monotonic() + self._timeout
+        current_method = normalized_method
+        current_body = body
+        lease: tuple[tuple[Any, ...], Any, dict[Any, Any]] | None = None
+        lease_reusable = True
+
+        def release(reusable: bool) -> None:
+            nonlocal lease
+            if lease is not None:
+                key, session, base_options = lease
+                lease = None
+                self._pool.release(key, session, base_options, reusable=reusable)
+
+        try:
+            for redirect_count in range(max_redirects + 1):
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise TimeoutError("public request deadline exceeded")
+                addresses = self._policy.resolve_public_addresses(target.url)
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise TimeoutError("public request deadline exceeded")
+                resolve_options = curl_resolve_options(target, addresses, disable_proxy=True)
+                key = self._pool.key(target, addresses)
+                if lease is not None and lease[0] != key:
+                    release(lease_reusable)
+                if lease is None:
+                    lease = (key, *self._pool.acquire(key))
+                _key, session, base_options = lease
+                transfer = _PinnedTransfer(
+                    session,
+                    method=current_method,
+                    url=target.url,
+                    headers=request_headers,
+                    body=current_body,
+                    curl_options={**base_options, **resolve_options},
+                    timeout=remaining,
+                    max_bytes=self._max_response_bytes,
+                )
+                transfer.start()
+                location = transfer.headers.get("Location") or next(
+                    (value for name, value in transfer.headers.items() if name.lower() == "location"),
+                    "",
+                )
+                if transfer.status_code not in DomainPolicyEngine.REDIRECT_STATUS_CODES or not location:
+                    response = PinnedStreamResponse(
+                        transfer,
+                        url=target.url,
+                        redirect_chain=tuple(redirect_chain),
+                        on_close=release,
+                    )
+                    return response
+                for _chunk in transfer.chunks():
+                    pass
+                lease_reusable = transfer.completed
+                if redirect_count >= max_redirects:
+                    raise DomainPolicyViolation("public redirect limit exceeded")
+
+                next_target = canonicalize_request_target(urljoin(target.url, location))
+                origin_changed = (target.scheme, target.host, target.port) != (
+                    next_target.scheme,
+                    next_target.host,
+                    next_target.port,
+                )
+                if origin_changed:
+                    request_headers = {
+                        key: value
+                        for key, value in request_headers.items()
+                        if key.lower() not in _SENSITIVE_REDIRECT_HEADERS
+                    }
+                    release(lease_reusable)
+                if transfer.status_code == 303 or (
+                    transfer.status_code in {301, 302} and current_method == "POST"
+                ):
+                    current_method = "GET"
+                    current_body = None
+                target = next_target
+                redirect_chain.append(target.url)
+        except BaseException:
+            release(False)
+            raise
+        release(False)
+        raise DomainPolicyViolation("public redirect limit exceeded")
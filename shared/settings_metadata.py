@@ -53,6 +53,10 @@ CONCURRENCY_OPTIONS = [
     {"value": "3", "label": "3（推荐）"},
     {"value": "5", "label": "5"},
 ]
+ENGINE_OPTIONS = [
+    {"value": "thread", "label": "线程（默认）"},
+    {"value": "asyncio", "label": "asyncio 协程"},
+]
 TIMEOUT_OPTIONS = ["30", "60", "90", "120", "180", "300"]
 RETRY_OPTIONS = ["0", "1", "2", "3", "5", "10"]
 SPEED_LIMIT_OPTIONS = [
@@ -103,6 +107,7 @@ SETTING_DESCRIPTIONS = {
     "断点续传": "支持未完成任务继续下载。",
     "下载速度限制（KB/s）": "限制最大下载速度，0 表示无限制。",
     "仅下载视频": "跳过封面和图片资源。",
+    "下载引擎": "线程引擎兼容全部下载路径；asyncio 协程在少量线程上并发传输，无法走协程的请求自动回退线程。",
     "打开方式": "本地预览时使用的播放器。",
     "手动播放方式": "设置手动点击播放或预览时使用的播放器。",
     "记住播放进度": "下次播放同一文件时恢复位置。",
@@ -133,6 +138,7 @@ SETTING_SHORT_DESCRIPTIONS = {
     "断点续传": "继续未完成任务",
     "下载速度限制（KB/s）": "限制最大下载速度",
     "仅下载视频": "跳过图片资源",
+    "下载引擎": "传输并发模型",
     "打开方式": "默认播放方式",
     "手动播放方式": "点击播放键时使用",
     "记住播放进度": "下次恢复播放位置",
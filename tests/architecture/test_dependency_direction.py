@@ -20,6 +20,7 @@ LEGACY_SHARED_ADAPTERS = (
     "app/ui/viewmodels/log_classification.py",
     "app/ui/viewmodels/log_detail_payloads.py",
     "app/ui/viewmodels/log_display.py",
+    "app/ui/viewmodels/log_filtering.py",
     "app/ui/viewmodels/log_i18n.py",
     "app/ui/viewmodels/log_pipeline_rules.py",
     "app/ui/viewmodels/settings_catalog.py",
@@ -43,9 +44,11 @@ SHARED_FRONTEND_CONTRACTS = (
     "shared/log_contract.py",
     "shared/log_detail_payloads.py",
     "shared/log_display.py",
+    "shared/log_filtering.py",
     "shared/log_i18n.py",
     "shared/log_pipeline_rules.py",
     "shared/log_platforms.py",
+    "shared/log_query_index.py",
     "shared/settings_metadata.py",
 )
 
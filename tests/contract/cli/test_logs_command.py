@@ -0,0 +1,61 @@
+"""CLI contract for ``ucrawl logs search``."""
+
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+import pytest
+
+from app.utils.log_sidecar import append_records, encode_record, sidecar_paths
+
+
+def _write_session(logs_dir: Path) -> None:
+    session = logs_dir / "debug_20261016_100000_MainProcess.log"
+    session.touch()
+    body, index = sidecar_paths(session)
+    records = [
+        {"time": "2026-10-16 10:00:00", "level": "INFO", "source": "BiliAPI", "message": "playurl ok", "trace_id": "bili-1"},
+        {"time": "2026-10-16 10:00:01", "level": "ERROR", "source": "BiliAPI", "message": "playurl failed", "trace_id": "bili-1"},
+        {"time": "2026-10-16 10:00:02", "level": "ERROR", "source": "DownloadWorker", "message": "merge failed"},
+    ]
+    with body.open("ab") as body_handle, index.open("ab") as index_handle:
+        append_records(
+            body_handle,
+            index_handle,
+            [encode_record(record, timestamp_ms=1_790_000_000_000 + offset) for offset, record in enumerate(records)],
+        )
+
+
+@pytest.fixture
+def history_index(tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    from app.services import log_history
+
+    _write_session(tmp_path)
+    monkeypatch.setattr(
+        log_history,
+        "get_log_history_index",
+        lambda: log_history.LogHistoryIndex(logs_dir=tmp_path),
+    )
+    return tmp_path
+
+
+def test_logs_search_syncs_index_and_emits_cursor_page(history_index, capsys: pytest.CaptureFixture[str]) -> None:
+    from cli.main import main
+
+    assert main(["logs", "search", "failed", "--level", "error", "--limit", "1"]) == 0
+    first = json.loads(capsys.readouterr().out)
+    assert [item["message"] for item in first["items"]] == ["merge failed"]
+    assert first["next_cursor"]
+
+    assert main(["logs", "search", "failed", "--level", "error", "--limit", "1", "--cursor", first["next_cursor"]]) == 0
+    second = json.loads(capsys.readouterr().out)
+    assert [item["trace_id"] for item in second["items"]] == ["bili-1"]
+    assert second["next_cursor"] == ""
+
+
+def test_logs_search_rejects_invalid_bounds_as_usage_error(history_index, capsys: pytest.CaptureFixture[str]) -> None:
+    from cli.main import main
+
+    assert main(["logs", "search", "--since", "yesterday"]) == 2
+    assert "invalid time bound" in capsys.readouterr().err
@@ -196,6 +196,82 @@ class StateEndpointTests(unittest.TestCase):
         self.assertIn("base_version", data)
         self.assertIn("sections", data)
 
+    def test_log_query_endpoint_returns_page_ids_for_current_window(self):
+        response = self.client.post(
+            "/api/logs/query",
+            json={"filters": {"category": "all", "level": "all"}, "page": 1, "pageSize": 5, "sequence": 7},
+        )
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+
+        self.assertEqual(data.get("status"), "ok")
+        self.assertEqual(data["sequence"], 7)
+        self.assertLessEqual(len(data["pageIds"]), 5)
+        self.assertEqual(data["itemsKey"]["count"], data["totalCount"])
+        self.assertIn("all", data["tabCounts"])
+
+    def test_log_history_endpoint_searches_session_index_with_cursor(self):
+        from app.services import frontend_log_query
+        from app.services.log_history import LogHistoryIndex
+
+        with TemporaryDirectory() as logs_dir:
+            index = LogHistoryIndex(logs_dir=logs_dir)
+            try:
+                with patch.object(frontend_log_query, "get_log_history_index", return_value=index):
+                    ok = self.client.get("/api/logs/history", params={"text": "failed", "limit": 5}).json()
+                    bad = self.client.get("/api/logs/history", params={"cursor": "@@"}).json()
+            finally:
+                index.close()
+
+        self.assertEqual(ok.get("status"), "ok")
+        self.assertEqual(ok["items"], [])
+        self.assertEqual(ok["next_cursor"], "")
+        self.assertTrue(_is_error_response(bad))
+
+    def test_library_endpoint_pages_indexed_save_directory_with_stable_ids(self):
+        controller = self.client._ucrawl_context.controller
+        previous_dir = controller.current_save_dir
+        with TemporaryDirectory() as media_dir:
+            for name in ("b.mp4", "a.mp4", "c.jpg"):
+                Path(media_dir, name).write_bytes(b"x")
+            controller.current_save_dir = media_dir
+            try:
+                params = {"page": 1, "page_size": 2, "sort": "title", "order": "asc"}
+                first = self.client.get("/api/library", params=params).json()
+                again = self.client.get("/api/library", params=params).json()
+                bad = self.client.get("/api/library", params={"sort": "duration"}).json()
+            finally:
+                controller.current_save_dir = previous_dir
+
+        self.assertEqual(first.get("status"), "ok")
+        self.assertEqual((first["totalCount"], first["totalPages"]), (3, 2))
+        self.assertEqual([item["title"] for item in first["items"]], ["a", "b"])
+        self.assertEqual([item["id"] for item in again["items"]], [item["id"] for item in first["items"]])
+        self.assertTrue(all(controller._video_lookup(item["id"]) for item in first["items"]))
+        self.assertTrue(_is_error_response(bad))
+
+    def test_download_priority_and_stats_endpoints_reach_the_scheduler(self):
+        controller = self.client._ucrawl_context.controller
+        manager = Mock()
+        manager.set_task_priority.return_value = 2
+        manager.scheduler_stats.return_value = {"queued": {"normal": 2}, "wait_seconds": {"normal": {"count": 3}}}
+        previous_manager = controller._dl_manager
+        controller._dl_manager = manager
+        try:
+            updated = self.client.post("/api/downloads/priority", json={"video_ids": ["a", "b"], "priority": 5})
+            bad = self.client.post("/api/downloads/priority", json={"video_ids": "a", "priority": 1})
+            stats = self.client.get("/api/downloads/stats").json()
+        finally:
+            controller._dl_manager = previous_manager
+
+        self.assertEqual(updated.json(), {"status": "ok", "updated": 2, "priority": 2})
+        manager.set_task_priority.assert_called_once_with(["a", "b"], 2)
+        self.assertEqual(bad.status_code, 400)
+        self.assertEqual(stats["scheduler"]["wait_seconds"], {"normal": {"count": 3}})
+        self.assertIn("submitted", stats["engine"])
+        self.assertIn("hit_rate", stats["browser_pool"])
+        self.assertIn("lease_latency_ms", stats["browser_pool"])
+
     def test_i18n_catalog_endpoint_serves_shared_language_files(self):
         response = self.client.get("/api/i18n/en-US")
         self.assertEqual(response.status_code, 200)
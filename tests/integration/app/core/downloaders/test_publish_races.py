@@ -174,7 +174,7 @@ class DownloadPublishRaceTests(unittest.TestCase):
                 "app.core.downloaders.bilibili.FFmpegExternalTool.build_merge_command",
                 return_value=["ffmpeg", "output"],
             ), patch(
-                "app.core.downloaders.bilibili.requests.get",
+                "app.core.downloaders.bilibili.pooled_get",
                 return_value=_StreamResponse(),
             ), patch.object(
                 BilibiliDownloader,
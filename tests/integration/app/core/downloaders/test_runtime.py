@@ -22,6 +22,7 @@ from app.core.download_manager import DownloadManager, DownloadWorker
 from app.core.download_manager_core import PendingDownloadQueue
 from app.core.lib.douyin.tools.session import create_client, request_params
 from app.core.downloaders import BaseDownloader, ChunkedDownloader, FFmpegDownloader, FFmpegExternalTool, NM3U8DLREExternalTool, N_m3u8DL_RE_Downloader
+from app.core.downloaders import hls_proxy
 from app.core.downloaders.bilibili import BilibiliDownloader
 from app.core.downloaders.douyin import DouyinDownloader
 from app.core.downloaders.kuaishou import KuaishouDownloader
@@ -94,7 +95,7 @@ class DownloaderStrategyTests(unittest.TestCase):
         transport.request.return_value = response
 
         with patch(
-            "app.core.downloaders.m3u8.PinnedTransport",
+            "app.core.downloaders.m3u8.PooledPinnedTransport",
             return_value=transport,
         ) as transport_factory:
             result = N_m3u8DL_RE_Downloader._curl_cffi_session_response(
@@ -123,7 +124,7 @@ class DownloaderStrategyTests(unittest.TestCase):
         session = Mock()
         transport = Mock()
         transport.request.side_effect = DomainPolicyViolation("private redirect")
-        with patch("app.core.downloaders.m3u8.PinnedTransport", return_value=transport):
+        with patch("app.core.downloaders.m3u8.PooledPinnedTransport", return_value=transport):
             with self.assertRaises(DomainPolicyViolation):
                 N_m3u8DL_RE_Downloader._curl_cffi_get_bytes(
                     session,
@@ -150,7 +151,7 @@ class DownloaderStrategyTests(unittest.TestCase):
 
         self.assertEqual(calls, [42])
 
-    @patch("app.core.downloaders.base.requests.get")
+    @patch("app.core.downloaders.base.pooled_get")
     def test_base_downloader_zero_retries_still_makes_initial_attempt(self, mocked_get):
         mocked_get.return_value = self._make_stream_response([b"ok"], headers={"content-length": "2"})
 
@@ -169,7 +170,7 @@ class DownloaderStrategyTests(unittest.TestCase):
 
         self.assertEqual(mocked_get.call_count, 1)
 
-    @patch("app.core.downloaders.base.requests.get")
+    @patch("app.core.downloaders.base.pooled_get")
     def test_base_resume_rejects_mismatched_content_range(self, mocked_get):
         mocked_get.return_value = self._make_stream_response(
             [b"567890"],
@@ -195,7 +196,7 @@ class DownloaderStrategyTests(unittest.TestCase):
             self.assertFalse(Path(save_path + ".downloading").exists())
 
     @patch("app.core.downloaders.base.time.sleep", return_value=None)
-    @patch("app.core.downloaders.base.requests.get")
+    @patch("app.core.downloaders.base.pooled_get")
     def test_base_downloader_resumes_when_response_ends_before_content_length(
         self,
         mocked_get,
@@ -227,7 +228,7 @@ class DownloaderStrategyTests(unittest.TestCase):
         self.assertEqual(mocked_get.call_args_list[1].kwargs["headers"]["Range"], "bytes=2-")
 
     @patch("app.core.downloaders.base.time.sleep", return_value=None)
-    @patch("app.core.downloaders.base.requests.get")
+    @patch("app.core.downloaders.base.pooled_get")
     def test_base_downloader_rejects_unsolicited_partial_response(
         self,
         mocked_get,
@@ -265,7 +266,7 @@ class DownloaderStrategyTests(unittest.TestCase):
         replace.assert_called_once_with("source.downloading", "target.mp4")
         remove.assert_not_called()
 
-    @patch("app.core.downloaders.base.requests.get")
+    @patch("app.core.downloaders.base.pooled_get")
     def test_base_downloader_rejects_private_redirect_without_retrying(self, mocked_get):
         from shared.runtime_options import DomainPolicyEngine
 
@@ -300,7 +301,7 @@ class DownloaderStrategyTests(unittest.TestCase):
 
     @patch("app.core.downloaders.base.TransferRateLimiter")
     @patch("app.core.downloaders.base.cfg.get")
-    @patch("app.core.downloaders.base.requests.get")
+    @patch("app.core.downloaders.base.pooled_get")
     def test_base_http_download_applies_configured_speed_limit(self, mocked_get, mocked_cfg_get, limiter_type):
         mocked_get.return_value = self._make_stream_response([b"ab", b"cd"], headers={"content-length": "4"})
         mocked_cfg_get.side_effect = lambda section, key, default=None: 1024 if (section, key) == ("download", "speed_limit_kb") else default
@@ -314,12 +315,13 @@ class DownloaderStrategyTests(unittest.TestCase):
                 max_retries=0,
             )
 
-        limiter_type.assert_called_once_with(1024)
+        limiter_type.assert_called_once()
+        self.assertEqual(limiter_type.call_args.args, (1024,))
         self.assertEqual(limiter_type.return_value.throttle.call_count, 2)
 
     @patch("app.core.downloaders.base.time.sleep", return_value=None)
     @patch("app.core.downloaders.base.debug_logger.log")
-    @patch("app.core.downloaders.base.requests.get")
+    @patch("app.core.downloaders.base.pooled_get")
     def test_base_downloader_logs_http_retry(self, mocked_get, mocked_log, _mocked_sleep):
         """HTTP 初次断线后应记录 retry 日志，并把 trace_id 带到失败排查链路。"""
         mocked_get.side_effect = [
@@ -588,7 +590,7 @@ class DownloaderStrategyTests(unittest.TestCase):
 
         self.assertEqual(command[-3:], ["-f", "mp4", "video.mp4.downloading"])
 
-    @patch("app.core.downloaders.ffmpeg.requests.head")
+    @patch("app.core.downloaders.ffmpeg.pooled_head")
     @patch("app.core.downloaders.ffmpeg.subprocess.Popen")
     @patch("app.core.downloaders.ffmpeg.FFmpegExternalTool.resolve_executable", return_value="ffmpeg.exe")
     def test_ffmpeg_downloader_reports_structured_progress(
@@ -629,7 +631,7 @@ class DownloaderStrategyTests(unittest.TestCase):
         self.assertEqual(progress, [10, 50, 100])
         process.stderr.close.assert_called()
 
-    @patch("app.core.downloaders.ffmpeg.requests.head")
+    @patch("app.core.downloaders.ffmpeg.pooled_head")
     @patch("app.core.downloaders.ffmpeg.subprocess.Popen")
     @patch("app.core.downloaders.ffmpeg.FFmpegExternalTool.resolve_executable", return_value="ffmpeg.exe")
     def test_ffmpeg_downloader_writes_temp_file_then_promotes_on_success(
@@ -671,7 +673,7 @@ class DownloaderStrategyTests(unittest.TestCase):
 
         self.assertEqual(progress, [100])
 
-    @patch("app.core.downloaders.ffmpeg.requests.head")
+    @patch("app.core.downloaders.ffmpeg.pooled_head")
     @patch("app.core.downloaders.ffmpeg.subprocess.Popen")
     @patch("app.core.downloaders.ffmpeg.FFmpegExternalTool.resolve_executable", return_value="ffmpeg.exe")
     def test_public_ffmpeg_download_only_receives_validating_loopback_url(
@@ -736,7 +738,7 @@ class DownloaderStrategyTests(unittest.TestCase):
         self.assertEqual(progress_value, 1)
 
     @patch("app.core.downloaders.ffmpeg.time.sleep", return_value=None)
-    @patch("app.core.downloaders.ffmpeg.requests.head")
+    @patch("app.core.downloaders.ffmpeg.pooled_head")
     @patch("app.core.downloaders.ffmpeg.subprocess.Popen")
     @patch("app.core.downloaders.ffmpeg.FFmpegExternalTool.resolve_executable", return_value="ffmpeg.exe")
     def test_ffmpeg_downloader_refreshes_douyin_stream_url_between_retries(
@@ -800,7 +802,7 @@ class DownloaderStrategyTests(unittest.TestCase):
     @patch.object(FFmpegDownloader, "PROGRESS_TIMEOUT_SEC", 0.01)
     @patch.object(FFmpegDownloader, "STDERR_POLL_INTERVAL_SEC", 0.005)
     @patch("app.core.downloaders.ffmpeg.time.sleep", return_value=None)
-    @patch("app.core.downloaders.ffmpeg.requests.head")
+    @patch("app.core.downloaders.ffmpeg.pooled_head")
     @patch("app.core.downloaders.ffmpeg.subprocess.Popen")
     @patch("app.core.downloaders.ffmpeg.cfg.get")
     @patch("app.core.downloaders.ffmpeg.FFmpegExternalTool.resolve_executable", return_value="ffmpeg.exe")
@@ -1394,7 +1396,7 @@ class DownloaderStrategyTests(unittest.TestCase):
 
         self.assertIn("mounts", mocked_client.call_args.kwargs)
 
-    @patch("app.core.downloaders.chunked.requests.head", side_effect=requests.RequestException("boom"))
+    @patch("app.core.downloaders.chunked.pooled_head", side_effect=requests.RequestException("boom"))
     def test_chunked_downloader_raises_when_head_request_fails(self, _mocked_head):
         """验证 `test_chunked_downloader_raises_when_head_request_fails` 对应场景是否符合预期，供 `DownloaderStrategyTests` 使用。"""
         item = VideoItem(url="https://example.com/video.mp4", title="demo", source="douyin")
@@ -1402,7 +1404,7 @@ class DownloaderStrategyTests(unittest.TestCase):
         with self.assertRaises(StreamDownloadError):
             ChunkedDownloader().download(item, "demo.mp4", lambda _value: None, lambda: False)
 
-    @patch("app.core.downloaders.chunked.requests.head")
+    @patch("app.core.downloaders.chunked.pooled_head")
     def test_chunked_downloader_rejects_missing_content_length(self, mocked_head):
         """验证 `test_chunked_downloader_rejects_missing_content_length` 对应场景是否符合预期，供 `DownloaderStrategyTests` 使用。"""
         head_response = Mock()
@@ -1414,7 +1416,7 @@ class DownloaderStrategyTests(unittest.TestCase):
         with self.assertRaises(StreamDownloadError):
             ChunkedDownloader().download(item, "demo.mp4", lambda _value: None, lambda: False)
 
-    @patch("app.core.downloaders.chunked.requests.head")
+    @patch("app.core.downloaders.chunked.pooled_head")
     def test_chunked_downloader_rejects_servers_without_range_support(self, mocked_head):
         """验证 `test_chunked_downloader_rejects_servers_without_range_support` 对应场景是否符合预期，供 `DownloaderStrategyTests` 使用。"""
         head_response = Mock()
@@ -1428,8 +1430,8 @@ class DownloaderStrategyTests(unittest.TestCase):
 
     @patch("app.core.downloaders.chunked.debug_logger.log")
     @patch("app.core.downloaders.chunked.time.sleep", return_value=None)
-    @patch("app.core.downloaders.chunked.requests.get")
-    @patch("app.core.downloaders.chunked.requests.head")
+    @patch("app.core.downloaders.chunked.pooled_get")
+    @patch("app.core.downloaders.chunked.pooled_head")
     @patch("app.core.downloaders.chunked.cfg.get")
     def test_chunked_downloader_resumes_part_file_after_retry(
         self,
@@ -1477,8 +1479,8 @@ class DownloaderStrategyTests(unittest.TestCase):
         self.assertTrue(any(call.kwargs.get("action") == "chunk_retry" for call in mocked_log.call_args_list))
 
     @patch("app.core.downloaders.chunked.time.sleep", return_value=None)
-    @patch("app.core.downloaders.chunked.requests.get")
-    @patch("app.core.downloaders.chunked.requests.head")
+    @patch("app.core.downloaders.chunked.pooled_get")
+    @patch("app.core.downloaders.chunked.pooled_head")
     @patch("app.core.downloaders.chunked.cfg.get")
     def test_chunked_downloader_rejects_oversized_stale_part(
         self,
@@ -1517,8 +1519,8 @@ class DownloaderStrategyTests(unittest.TestCase):
         self.assertEqual(mocked_get.call_args.kwargs["headers"]["Range"], "bytes=0-9")
 
     @patch("app.core.downloaders.chunked.time.sleep", return_value=None)
-    @patch("app.core.downloaders.chunked.requests.get")
-    @patch("app.core.downloaders.chunked.requests.head")
+    @patch("app.core.downloaders.chunked.pooled_get")
+    @patch("app.core.downloaders.chunked.pooled_head")
     @patch("app.core.downloaders.chunked.cfg.get")
     def test_chunked_downloader_rejects_mismatched_content_range(
         self,
@@ -1553,7 +1555,7 @@ class DownloaderStrategyTests(unittest.TestCase):
     @patch.object(BilibiliDownloader, "_run_merge_process")
     @patch("app.core.downloaders.bilibili.FFmpegExternalTool.build_merge_command", return_value=["ffmpeg", "-i", "video", "output"])
     @patch("app.core.downloaders.bilibili.FFmpegExternalTool.resolve_executable", return_value="ffmpeg.exe")
-    @patch("app.core.downloaders.bilibili.requests.get")
+    @patch("app.core.downloaders.bilibili.pooled_get")
     def test_bilibili_downloader_downloads_video_only_streams_when_audio_missing(
         self,
         mocked_get,
@@ -1588,7 +1590,7 @@ class DownloaderStrategyTests(unittest.TestCase):
     @patch.object(BilibiliDownloader, "_run_merge_process")
     @patch("app.core.downloaders.bilibili.FFmpegExternalTool.build_merge_command", return_value=["ffmpeg", "-i", "video", "output"])
     @patch("app.core.downloaders.bilibili.FFmpegExternalTool.resolve_executable", return_value="ffmpeg.exe")
-    @patch("app.core.downloaders.bilibili.requests.get")
+    @patch("app.core.downloaders.bilibili.pooled_get")
     def test_bilibili_downloader_records_temp_sidecars_for_delete_cleanup(
         self,
         mocked_get,
@@ -1625,7 +1627,7 @@ class DownloaderStrategyTests(unittest.TestCase):
     @patch("app.core.downloaders.bilibili.debug_logger.log")
     @patch("app.core.downloaders.bilibili.FFmpegExternalTool.build_merge_command", return_value=["ffmpeg", "-i", "video", "output"])
     @patch("app.core.downloaders.bilibili.FFmpegExternalTool.resolve_executable", return_value="ffmpeg.exe")
-    @patch("app.core.downloaders.bilibili.requests.get")
+    @patch("app.core.downloaders.bilibili.pooled_get")
     def test_bilibili_downloader_retries_incomplete_read_with_range_resume(
         self,
         mocked_get,
@@ -1677,7 +1679,7 @@ class DownloaderStrategyTests(unittest.TestCase):
     @patch("app.core.downloaders.bilibili.time.sleep", return_value=None)
     @patch("app.core.downloaders.bilibili.FFmpegExternalTool.build_merge_command", return_value=["ffmpeg", "-i", "video", "output"])
     @patch("app.core.downloaders.bilibili.FFmpegExternalTool.resolve_executable", return_value="ffmpeg.exe")
-    @patch("app.core.downloaders.bilibili.requests.get")
+    @patch("app.core.downloaders.bilibili.pooled_get")
     def test_bilibili_retries_short_stream_before_publishing_for_merge(
         self,
         mocked_get,
@@ -1786,7 +1788,7 @@ class DownloaderStrategyTests(unittest.TestCase):
     @patch.object(BilibiliDownloader, "_run_merge_process", side_effect=MergeError("ffmpeg failed"))
     @patch("app.core.downloaders.bilibili.FFmpegExternalTool.build_merge_command", return_value=["ffmpeg", "-i", "video", "output"])
     @patch("app.core.downloaders.bilibili.FFmpegExternalTool.resolve_executable", return_value="ffmpeg.exe")
-    @patch("app.core.downloaders.bilibili.requests.get")
+    @patch("app.core.downloaders.bilibili.pooled_get")
     def test_bilibili_downloader_raises_merge_error_when_ffmpeg_fails(
         self,
         mocked_get,
@@ -2445,10 +2447,10 @@ https://cdn.example.com/seg2.m4s?token=1
         fake_curl_cffi = types.ModuleType("curl_cffi")
         fake_curl_cffi.requests = object()
         transport = Mock()
-        transport.request.side_effect = DomainPolicyViolation("private upstream")
+        transport.stream.side_effect = DomainPolicyViolation("private upstream")
 
         with patch.dict(sys.modules, {"curl_cffi": fake_curl_cffi}), patch(
-            "app.core.downloaders.m3u8.PinnedTransport",
+            "app.core.downloaders.m3u8.PooledPinnedTransport",
             return_value=transport,
         ), patch.object(downloader, "_curl_cffi_get_response") as mocked_get:
             with self.assertRaises(DomainPolicyViolation):
@@ -2466,10 +2468,10 @@ https://cdn.example.com/seg2.m4s?token=1
         fake_curl_cffi = types.ModuleType("curl_cffi")
         fake_curl_cffi.requests = object()
         transport = Mock()
-        transport.request.side_effect = DomainPolicyViolation("private redirect")
+        transport.stream.side_effect = DomainPolicyViolation("private redirect")
 
         with patch.dict(sys.modules, {"curl_cffi": fake_curl_cffi}), patch(
-            "app.core.downloaders.m3u8.PinnedTransport",
+            "app.core.downloaders.m3u8.PooledPinnedTransport",
             return_value=transport,
         ), patch.object(downloader, "_curl_cffi_get_response") as mocked_get:
             with self.assertRaises(DomainPolicyViolation):
@@ -2489,10 +2491,10 @@ https://cdn.example.com/seg2.m4s?token=1
         fake_curl_cffi.requests = object()
         policy = Mock(spec=DomainPolicyEngine)
         transport = Mock()
-        transport.request.return_value = response
+        transport.stream.return_value = response
 
         with patch.dict(sys.modules, {"curl_cffi": fake_curl_cffi}), patch(
-            "app.core.downloaders.m3u8.PinnedTransport",
+            "app.core.downloaders.m3u8.PooledPinnedTransport",
             return_value=transport,
         ) as transport_factory, patch.object(downloader, "_curl_cffi_get_response") as mocked_get:
             result = downloader._hls_proxy_open_upstream(
@@ -2505,10 +2507,11 @@ https://cdn.example.com/seg2.m4s?token=1
         self.assertIs(result, response)
         transport_factory.assert_called_once_with(
             policy=policy,
+            pool=hls_proxy.hls_pinned_session_pool,
             timeout=60,
             max_response_bytes=256 * 1024 * 1024,
         )
-        transport.request.assert_called_once_with(
+        transport.stream.assert_called_once_with(
             "GET",
             "https://CDN.Example./video.mp4",
             headers={"Range": "bytes=0-"},
@@ -3080,8 +3083,11 @@ https://cdn.example.com/seg2.ts
                 self.assertEqual(fp.read(), b"aaabbb")
 
         self.assertEqual(fake_session.calls[0][0], "https://surrit.com/demo/playlist.m3u8")
-        self.assertEqual(fake_session.calls[1][0], "https://surrit.com/demo/seg1.ts")
-        self.assertEqual(fake_session.calls[2][0], "https://cdn.example.com/seg2.ts")
+        # 分段由并发抓取池获取，请求顺序不固定；落盘顺序已由文件内容断言。
+        self.assertEqual(
+            sorted(call[0] for call in fake_session.calls[1:]),
+            ["https://cdn.example.com/seg2.ts", "https://surrit.com/demo/seg1.ts"],
+        )
         self.assertTrue(all(call[3] is False for call in fake_session.calls))
 
     @patch.object(N_m3u8DL_RE_Downloader, "_cleanup_external_temp_files")
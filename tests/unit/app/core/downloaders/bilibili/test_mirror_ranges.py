@@ -0,0 +1,161 @@
+"""Bilibili DASH multi-mirror ranged fetch: throughput scoring, mirror switching and URL refresh."""
+
+from __future__ import annotations
+
+from pathlib import Path
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+import requests
+
+from app.core.downloaders import bilibili as bilibili_module
+from app.core.downloaders.bilibili import BilibiliDownloader
+from app.core.downloaders.mirror_ranges import SAMPLE_BYTES, MirrorPool, MirrorRangeFetcher
+from app.core.downloaders.range_store import PreallocatedFileStore
+from app.models import VideoItem
+
+PAYLOAD = bytes(range(256)) * (4 * 1024 * 1024 // 256 + 64)
+
+
+class _FakeResponse:
+    def __init__(self, body: bytes, *, start: int, total: int, status: int = 206, on_chunk=None) -> None:
+        self.status_code = status
+        self.headers = {"content-range": f"bytes {start}-{start + len(body) - 1}/{total}"}
+        self._body = body
+        self._on_chunk = on_chunk
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_exc):
+        return False
+
+    def raise_for_status(self) -> None:
+        if self.status_code >= 400:
+            raise requests.HTTPError(f"{self.status_code} Client Error")
+
+    def iter_content(self, chunk_size: int):
+        for offset in range(0, len(self._body), 64 * 1024):
+            if self._on_chunk is not None:
+                self._on_chunk()
+            yield self._body[offset:offset + 64 * 1024]
+
+
+def _store(tmp_path: Path, total: int) -> PreallocatedFileStore:
+    store = PreallocatedFileStore(str(tmp_path / "stream.m4s.ranges"), total)
+    store.open(reuse=False)
+    return store
+
+
+def test_pool_prefers_unmeasured_then_fastest_mirror_per_connection():
+    pool = MirrorPool(["https://slow", "https://fast", "https://fresh"])
+    pool.record("https://slow", SAMPLE_BYTES, 10.0)
+    pool.record("https://fast", SAMPLE_BYTES, 0.1)
+
+    assert pool.acquire() == "https://fresh"
+    assert pool.acquire(exclude=["https://fresh"]) == "https://fast"
+    assert pool.is_slow("https://slow")
+    assert not pool.is_slow("https://fast")
+
+
+def test_connection_leaves_slow_mirror_and_finishes_range_on_fast_one(tmp_path):
+    total = len(PAYLOAD)
+    clock = [0.0]
+    served: dict[str, int] = {}
+
+    def open_range(url, start, end):
+        served[url] = served.get(url, 0) + 1
+        step = 1.0 if "slow" in url else 0.001
+
+        def tick():
+            clock[0] += step
+
+        return _FakeResponse(PAYLOAD[start:end + 1], start=start, total=total, on_chunk=tick)
+
+    pool = MirrorPool(["https://slow/video.m4s", "https://fast/video.m4s"])
+    pool.record("https://fast/video.m4s", SAMPLE_BYTES, 0.01)
+    store = _store(tmp_path, total)
+    fetcher = MirrorRangeFetcher(
+        pool,
+        store,
+        open_range=open_range,
+        connections=1,
+        max_retries=2,
+        should_stop=lambda: False,
+        on_bytes=lambda _count: None,
+        clock=lambda: clock[0],
+    )
+
+    fetcher.run()
+    store.close()
+
+    assert Path(store.path).read_bytes() == PAYLOAD
+    assert fetcher.mirror_switches == 1
+    assert served == {"https://slow/video.m4s": 1, "https://fast/video.m4s": 1}
+    mirrors = {entry["url"]: entry["downloaded"] for entry in pool.snapshot()}
+    assert mirrors["https://fast/video.m4s"] > mirrors["https://slow/video.m4s"]
+
+
+def test_expired_mirrors_are_replaced_through_refresh(tmp_path):
+    total = len(PAYLOAD)
+    refreshed = ["https://fresh/video.m4s"]
+
+    def open_range(url, start, end):
+        if "expired" in url:
+            return _FakeResponse(b"", start=start, total=total, status=403)
+        return _FakeResponse(PAYLOAD[start:end + 1], start=start, total=total)
+
+    refresh = MagicMock(return_value=refreshed)
+    store = _store(tmp_path, total)
+    fetcher = MirrorRangeFetcher(
+        MirrorPool(["https://expired-a/video.m4s", "https://expired-b/video.m4s"]),
+        store,
+        open_range=open_range,
+        connections=2,
+        max_retries=2,
+        should_stop=lambda: False,
+        on_bytes=lambda _count: None,
+        refresh=refresh,
+    )
+
+    fetcher.run()
+    store.close()
+
+    refresh.assert_called_once()
+    assert Path(store.path).read_bytes() == PAYLOAD
+
+
+def test_downloader_fetches_stream_across_backup_mirrors(monkeypatch, tmp_path):
+    settings = {("bilibili", "range_connections"): 4}
+    monkeypatch.setattr(
+        bilibili_module,
+        "cfg",
+        SimpleNamespace(get=lambda section, key, default=None: settings.get((section, key), default)),
+    )
+    monkeypatch.setattr(bilibili_module.FFmpegExternalTool, "resolve_executable", lambda: "ffmpeg")
+    merged_inputs: list[bytes] = []
+
+    def merge(_command, **kwargs):
+        merged_inputs.append(Path(kwargs["temp_v"]).read_bytes())
+        Path(kwargs["save_path"]).write_bytes(b"merged")
+
+    monkeypatch.setattr(BilibiliDownloader, "_run_merge_process", MagicMock(side_effect=merge))
+    hosts: list[str] = []
+
+    def pooled_get(url, *, headers, **_kwargs):
+        hosts.append(url.split("/")[2])
+        start, end = (int(value) for value in headers["Range"][len("bytes="):].split("-"))
+        return _FakeResponse(PAYLOAD[start:end + 1], start=start, total=len(PAYLOAD))
+
+    monkeypatch.setattr(bilibili_module, "pooled_get", pooled_get)
+    item = VideoItem(url="https://cdn-a.example.com/video.m4s", title="Bili", source="bilibili")
+    item.meta["video_backup_urls"] = ["https://cdn-b.example.com/video.m4s"]
+    save_path = tmp_path / "demo.mp4"
+
+    BilibiliDownloader().download(item, str(save_path), lambda *_args, **_kwargs: None, lambda: False)
+
+    assert save_path.read_bytes() == b"merged"
+    assert merged_inputs == [PAYLOAD]
+    assert {"cdn-a.example.com", "cdn-b.example.com"} <= set(hosts)
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["demo.mp4"]
+
@@ -0,0 +1,150 @@
+"""Bilibili DASH streaming mux: bytes go straight to one ffmpeg process, with temp-file fallback."""
+
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+import pytest
+
+from app.core.downloaders import bilibili as bilibili_module
+from app.core.downloaders.bilibili import BilibiliDownloader
+from app.core.downloaders.dash_stream_mux import DashStreamMuxer
+from app.models import VideoItem
+
+# 充当 ffmpeg：依次连接每个 tcp:// 输入读到 EOF，再把内容按 "V:..|A:.." 写进输出文件。
+FAKE_FFMPEG = """
+import socket, sys
+*inputs, output = sys.argv[1:]
+parts = []
+for url in inputs:
+    host, port = url[len("tcp://"):].split(":")
+    with socket.create_connection((host, int(port))) as conn:
+        chunks = []
+        while True:
+            data = conn.recv(65536)
+            if not data:
+                break
+            chunks.append(data)
+    parts.append(b"".join(chunks))
+with open(output, "wb") as fp:
+    fp.write(b"V:" + parts[0] + (b"|A:" + parts[1] if len(parts) > 1 else b""))
+"""
+
+
+def _fake_command(self: DashStreamMuxer) -> list[str]:
+    urls = [sink.url for sink in self.inputs.values()]
+    return [sys.executable, "-c", FAKE_FFMPEG, *urls, self._output_path]
+
+
+def _response(chunks: list[bytes], *, status: int = 200, headers: dict[str, str] | None = None) -> MagicMock:
+    response = MagicMock()
+    response.status_code = status
+    response.headers = headers or {"content-length": str(sum(len(chunk) for chunk in chunks))}
+    response.iter_content.return_value = iter(chunks)
+    response.raise_for_status.return_value = None
+    response.__enter__.return_value = response
+    response.__exit__.return_value = False
+    return response
+
+
+@pytest.fixture
+def stream_env(monkeypatch):
+    settings = {("bilibili", "stream_mux"): True}
+    monkeypatch.setattr(
+        bilibili_module,
+        "cfg",
+        SimpleNamespace(get=lambda section, key, default=None: settings.get((section, key), default)),
+    )
+    monkeypatch.setattr(bilibili_module.FFmpegExternalTool, "resolve_executable", lambda: "ffmpeg")
+    monkeypatch.setattr(DashStreamMuxer, "command", _fake_command)
+    monkeypatch.setattr(bilibili_module.time, "sleep", lambda _seconds: None)
+    merge = MagicMock(side_effect=lambda *_args, **kwargs: Path(kwargs["save_path"]).write_bytes(b"merged"))
+    monkeypatch.setattr(BilibiliDownloader, "_run_merge_process", merge)
+    responses: dict[str, list[MagicMock]] = {"video": [], "audio": []}
+    calls: list[tuple[str, dict[str, str]]] = []
+
+    def pooled_get(url, *, headers, **_kwargs):
+        name = "video" if "video" in url else "audio"
+        calls.append((name, dict(headers)))
+        return responses[name].pop(0)
+
+    monkeypatch.setattr(bilibili_module, "pooled_get", pooled_get)
+    return SimpleNamespace(settings=settings, responses=responses, calls=calls, merge=merge)
+
+
+def _download(tmp_path: Path) -> Path:
+    item = VideoItem(url="https://cdn.example.com/video.m4s", title="Bili", source="bilibili")
+    item.meta["audio_url"] = "https://cdn.example.com/audio.m4s"
+    save_path = tmp_path / "demo.mp4"
+    BilibiliDownloader().download(item, str(save_path), lambda *_args, **_kwargs: None, lambda: False)
+    return save_path
+
+
+def test_streams_are_muxed_as_they_arrive_without_temp_files(stream_env, tmp_path):
+    stream_env.responses["video"].append(_response([b"vid", b"eo"]))
+    stream_env.responses["audio"].append(_response([b"aud", b"io"]))
+
+    save_path = _download(tmp_path)
+
+    assert save_path.read_bytes() == b"V:video|A:audio"
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["demo.mp4"]
+    stream_env.merge.assert_not_called()
+
+
+def test_interrupted_stream_continues_with_range_into_the_same_mux(stream_env, tmp_path):
+    stream_env.responses["video"].extend([
+        _response([b"vid"], headers={"content-length": "5"}),
+        _response([b"eo"], status=206, headers={"content-length": "2", "content-range": "bytes 3-4/5"}),
+    ])
+    stream_env.responses["audio"].append(_response([b"audio"]))
+
+    save_path = _download(tmp_path)
+
+    video_calls = [headers for name, headers in stream_env.calls if name == "video"]
+    assert save_path.read_bytes() == b"V:video|A:audio"
+    assert video_calls[1]["Range"] == "bytes=3-"
+    stream_env.merge.assert_not_called()
+
+
+def test_range_unsupported_mid_stream_falls_back_to_temp_file_merge(stream_env, tmp_path):
+    stream_env.responses["video"].extend([
+        _response([b"vid"], headers={"content-length": "5"}),
+        _response([b"video"]),
+        _response([b"video"]),
+    ])
+    stream_env.responses["audio"].extend([_response([b"audio"]), _response([b"audio"])])
+
+    save_path = _download(tmp_path)
+
+    assert save_path.read_bytes() == b"merged"
+    stream_env.merge.assert_called_once()
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["demo.mp4"]
+
+
+def test_leftover_stream_cache_resumes_through_temp_file_path(stream_env, tmp_path):
+    (tmp_path / "demo_video.m4s").write_bytes(b"vid")
+    stream_env.responses["video"].append(
+        _response([b"eo"], status=206, headers={"content-length": "2", "content-range": "bytes 3-4/5"})
+    )
+    stream_env.responses["audio"].append(_response([b"audio"]))
+
+    save_path = _download(tmp_path)
+
+    video_calls = [headers for name, headers in stream_env.calls if name == "video"]
+    assert save_path.read_bytes() == b"merged"
+    assert video_calls[0]["Range"] == "bytes=3-"
+    stream_env.merge.assert_called_once()
+
+
+def test_stream_mux_is_opt_in(stream_env, tmp_path):
+    stream_env.settings[("bilibili", "stream_mux")] = False
+    stream_env.responses["video"].append(_response([b"video"]))
+    stream_env.responses["audio"].append(_response([b"audio"]))
+
+    save_path = _download(tmp_path)
+
+    assert save_path.read_bytes() == b"merged"
+    stream_env.merge.assert_called_once()
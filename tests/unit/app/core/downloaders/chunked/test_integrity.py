@@ -54,8 +54,8 @@ class ChunkedDownloaderIntegrityTests(unittest.TestCase):
         return default
 
     @patch("app.core.downloaders.chunked.time.sleep", return_value=None)
-    @patch("app.core.downloaders.chunked.requests.get")
-    @patch("app.core.downloaders.chunked.requests.head")
+    @patch("app.core.downloaders.chunked.pooled_get")
+    @patch("app.core.downloaders.chunked.pooled_head")
     @patch("app.core.downloaders.chunked.cfg.get")
     def test_unexpected_worker_exception_cannot_publish_partial_target(
         self,
@@ -78,8 +78,8 @@ class ChunkedDownloaderIntegrityTests(unittest.TestCase):
             self.assertFalse(Path(f"{target}.merging").exists())
 
     @patch("app.core.downloaders.chunked.time.sleep", return_value=None)
-    @patch("app.core.downloaders.chunked.requests.get")
-    @patch("app.core.downloaders.chunked.requests.head")
+    @patch("app.core.downloaders.chunked.pooled_get")
+    @patch("app.core.downloaders.chunked.pooled_head")
     @patch("app.core.downloaders.chunked.cfg.get")
     def test_completed_part_without_matching_source_manifest_is_not_reused(
         self,
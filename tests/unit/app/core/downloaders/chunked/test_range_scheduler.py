@@ -0,0 +1,210 @@
+from __future__ import annotations
+
+import json
+import os
+import re
+import tempfile
+import threading
+import time
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from unittest.mock import patch
+
+from app.core.downloaders.chunked import ChunkedDownloader
+from app.core.downloaders.range_scheduler import (
+    MIN_SPLIT_BYTES,
+    RangeScheduler,
+    ThroughputTuner,
+    plan_ranges,
+)
+from app.models import VideoItem
+
+MIB = 1024 * 1024
+
+
+class RangeSchedulerTests(unittest.TestCase):
+    def test_plan_ranges_covers_file_contiguously(self):
+        tasks = plan_ranges(10, 3)
+
+        self.assertEqual([(task.start, task.end) for task in tasks], [(0, 2), (3, 5), (6, 9)])
+
+    def test_idle_worker_steals_back_half_of_largest_inflight_range(self):
+        scheduler = RangeScheduler(plan_ranges(8 * MIB, 2))
+        slow = scheduler.acquire()
+        fast = scheduler.acquire()
+        scheduler.claim(fast, fast.length)
+        scheduler.claim(slow, MIB)
+
+        stolen = scheduler.acquire()
+
+        self.assertIsNotNone(stolen)
+        self.assertEqual(slow.end + 1, stolen.start)
+        self.assertEqual(stolen.end, 4 * MIB - 1)
+        self.assertGreater(stolen.start, slow.next_offset)
+        self.assertEqual(scheduler.split_count, 1)
+        self.assertEqual([item[0] for item in scheduler.layout()], [0, 2, 1])
+
+    def test_claim_is_truncated_at_new_end_after_split(self):
+        scheduler = RangeScheduler(plan_ranges(4 * MIB, 1))
+        victim = scheduler.acquire()
+        stolen = scheduler.acquire()
+
+        allowed = scheduler.claim(victim, 4 * MIB)
+
+        self.assertEqual(allowed, stolen.start)
+        self.assertTrue(victim.complete)
+
+    def test_small_remaining_ranges_are_not_split(self):
+        scheduler = RangeScheduler(plan_ranges(2 * MIN_SPLIT_BYTES - 1, 1))
+        scheduler.acquire()
+
+        self.assertIsNone(scheduler.acquire())
+        self.assertFalse(scheduler.has_work())
+
+    def test_last_worker_never_retires(self):
+        scheduler = RangeScheduler(plan_ranges(10, 1))
+        scheduler.register_worker()
+        scheduler.register_worker()
+        scheduler.set_retire_target(5)
+
+        self.assertTrue(scheduler.should_retire())
+        self.assertFalse(scheduler.should_retire())
+
+
+class ThroughputTunerTests(unittest.TestCase):
+    def test_adds_workers_while_throughput_improves_and_backs_off(self):
+        tuner = ThroughputTuner(initial=2, maximum=4, window_seconds=1.0, hold_windows=1)
+
+        tuner.observe(0, 0.0)
+        self.assertEqual(tuner.observe(100, 1.0), 3)
+        self.assertEqual(tuner.observe(300, 2.0), 4)
+        # 第 4 个连接没有带来提升：回退一步并保持一个窗口。
+        self.assertEqual(tuner.observe(500, 3.0), 3)
+        self.assertEqual(tuner.observe(700, 4.0), 3)
+        self.assertEqual(tuner.observe(900, 5.0), 4)
+
+
+class ResumeManifestTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self._tmp = tempfile.TemporaryDirectory()
+        self.manifest = os.path.join(self._tmp.name, ".demo.mp4.parts.json")
+        self.identity = {"url": "https://cdn.example/demo.mp4", "total_size": 10, "etag": '"v1"', "last_modified": ""}
+
+    def tearDown(self) -> None:
+        self._tmp.cleanup()
+
+    def _write(self, payload: dict) -> None:
+        Path(self.manifest).write_text(json.dumps(payload), encoding="utf-8")
+
+    def test_version_one_layout_is_upgraded_to_ranges(self):
+        self._write({"version": 1, **self.identity, "chunks": [[0, 4], [5, 9]]})
+
+        tasks = ChunkedDownloader._load_resume_ranges(self.manifest, self.identity)
+
+        self.assertEqual([(task.part_id, task.start, task.end) for task in tasks], [(0, 0, 4), (1, 5, 9)])
+
+    def test_version_two_layout_keeps_split_part_ids(self):
+        self._write({"version": 2, **self.identity, "ranges": [[0, 0, 2], [2, 3, 5], [1, 6, 9]]})
+
+        tasks = ChunkedDownloader._load_resume_ranges(self.manifest, self.identity)
+
+        self.assertEqual([task.part_id for task in tasks], [0, 2, 1])
+
+    def test_gapped_or_mismatched_manifest_is_rejected(self):
+        self._write({"version": 2, **self.identity, "ranges": [[0, 0, 2], [1, 4, 9]]})
+        self.assertIsNone(ChunkedDownloader._load_resume_ranges(self.manifest, self.identity))
+
+        self._write({"version": 2, **self.identity, "etag": '"v2"', "ranges": [[0, 0, 9]]})
+        self.assertIsNone(ChunkedDownloader._load_resume_ranges(self.manifest, self.identity))
+
+
+class _RangeHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # 分片取 4 MiB：慢速分片读过首块后剩余仍不少于 2 * MIN_SPLIT_BYTES，空闲连接才能拆走后半段。
+    body = bytes(range(256)) * (12 * MIB // 256)
+
+    def do_HEAD(self) -> None:  # noqa: N802 - BaseHTTPRequestHandler 约定
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(self.body)))
+        self.send_header("Accept-Ranges", "bytes")
+        self.send_header("ETag", '"v1"')
+        self.end_headers()
+
+    def do_GET(self) -> None:  # noqa: N802 - BaseHTTPRequestHandler 约定
+        start, end = (int(value) for value in re.match(r"bytes=(\d+)-(\d+)", self.headers["Range"]).groups())
+        payload = self.body[start : end + 1]
+        self.send_response(206)
+        self.send_header("Content-Length", str(len(payload)))
+        self.send_header("Content-Range", f"bytes {start}-{end}/{len(self.body)}")
+        self.end_headers()
+        # 从文件开头发起的请求模拟被限速的 CDN 节点。
+        delay = 0.02 if start == 0 else 0.0
+        try:
+            for offset in range(0, len(payload), 64 * 1024):
+                self.wfile.write(payload[offset : offset + 64 * 1024])
+                if delay:
+                    time.sleep(delay)
+        except (BrokenPipeError, ConnectionResetError):
+            return
+
+    def log_message(self, *_args) -> None:
+        return
+
+
+class ChunkedWorkStealingTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), _RangeHandler)
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}/demo.mp4"
+
+    def tearDown(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+        self.thread.join(2)
+
+    def _download(self, *, preallocate: bool) -> dict:
+        def cfg_get(section, key, default=None):
+            if (section, key) == ("download", "max_concurrent"):
+                return 4
+            if (section, key) == ("download", "chunked_preallocate"):
+                return preallocate
+            return default
+
+        with tempfile.TemporaryDirectory() as temp_dir, patch(
+            "app.core.downloaders.chunked.cfg.get", side_effect=cfg_get
+        ), patch.object(ChunkedDownloader, "CHUNK_SIZE", 4 * MIB), patch(
+            "app.core.downloaders.chunked.debug_logger.log"
+        ) as mocked_log:
+            save_path = os.path.join(temp_dir, "demo.mp4")
+            ChunkedDownloader().download(
+                VideoItem(url=self.url, title="demo", source="douyin"),
+                save_path,
+                lambda *_args, **_kwargs: None,
+                lambda: False,
+            )
+
+            self.assertEqual(Path(save_path).read_bytes(), _RangeHandler.body)
+            self.assertEqual(sorted(os.listdir(temp_dir)), ["demo.mp4"])
+
+        return next(
+            call.kwargs["details"] for call in mocked_log.call_args_list if call.kwargs.get("action") == "range_schedule"
+        )
+
+    def test_slow_range_is_split_and_parts_are_merged_in_order(self):
+        schedule = self._download(preallocate=False)
+
+        self.assertFalse(schedule["single_file"])
+        self.assertGreaterEqual(schedule["splits"], 1)
+        self.assertGreater(schedule["ranges"], 3)
+
+    def test_slow_range_is_split_and_written_into_preallocated_file(self):
+        schedule = self._download(preallocate=True)
+
+        self.assertTrue(schedule["single_file"])
+        self.assertGreaterEqual(schedule["splits"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
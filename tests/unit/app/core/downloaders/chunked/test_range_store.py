@@ -0,0 +1,149 @@
+from __future__ import annotations
+
+import json
+import os
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import Mock, patch
+
+from app.core.downloaders.chunked import ChunkedDownloader
+from app.core.downloaders.range_scheduler import RangeScheduler, RangeTask, plan_ranges
+from app.core.downloaders.range_store import PartFileStore, PreallocatedFileStore
+from app.models import VideoItem
+
+IDENTITY = {"url": "https://example.com/video.mp4", "total_size": 10, "etag": '"v1"', "last_modified": ""}
+
+
+class PreallocatedFileStoreTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self._tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self._tmp.name, ".demo.mp4.ranges.downloading")
+
+    def tearDown(self) -> None:
+        self._tmp.cleanup()
+
+    def test_out_of_order_writes_land_at_their_offsets(self):
+        store = PreallocatedFileStore(self.path, 10)
+        store.open(reuse=False)
+        try:
+            self.assertEqual(os.path.getsize(self.path), 10)
+            store.write_at(5, b"56789")
+            store.write_at(0, memoryview(b"01234"))
+            store.sync()
+        finally:
+            store.close()
+
+        self.assertEqual(Path(self.path).read_bytes(), b"0123456789")
+
+    def test_seek_write_fallback_without_pwrite(self):
+        store = PreallocatedFileStore(self.path, 6)
+        store.open(reuse=False)
+        try:
+            with patch("app.core.downloaders.range_store.os.pwrite", None, create=True):
+                store.write_at(3, b"def")
+                store.write_at(0, b"abc")
+        finally:
+            store.close()
+
+        self.assertEqual(Path(self.path).read_bytes(), b"abcdef")
+
+    def test_reuse_keeps_existing_bytes_only_when_size_matches(self):
+        Path(self.path).write_bytes(b"0123456789")
+        store = PreallocatedFileStore(self.path, 10)
+        store.open(reuse=True)
+        store.close()
+        self.assertEqual(Path(self.path).read_bytes(), b"0123456789")
+
+        store = PreallocatedFileStore(self.path, 12)
+        store.open(reuse=True)
+        store.close()
+        self.assertEqual(Path(self.path).read_bytes(), b"\0" * 12)
+
+
+class PartFileStoreTests(unittest.TestCase):
+    def test_oversized_stale_part_is_truncated_before_resume(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            store = PartFileStore(temp_dir, "demo.mp4")
+            Path(store.part_path(0)).write_bytes(b"stale-data!!")
+
+            self.assertEqual(store.prepare_attempt(RangeTask(0, 0, 9), resume_enabled=True), 0)
+            self.assertEqual(os.path.getsize(store.part_path(0)), 0)
+
+
+class SingleFileResumeTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self._tmp = tempfile.TemporaryDirectory()
+        self.manifest = os.path.join(self._tmp.name, ".demo.mp4.parts.json")
+        self.range_file = os.path.join(self._tmp.name, ".demo.mp4.ranges.downloading")
+
+    def tearDown(self) -> None:
+        self._tmp.cleanup()
+
+    def _write_manifest(self, completed: list[list[int]]) -> None:
+        Path(self.manifest).write_text(
+            json.dumps({"version": 3, **IDENTITY, "completed": completed}),
+            encoding="utf-8",
+        )
+
+    def test_completed_intervals_restore_gaps_as_pending_ranges(self):
+        self._write_manifest([[0, 2], [6, 7]])
+        Path(self.range_file).write_bytes(b"\0" * 10)
+
+        tasks = ChunkedDownloader._load_resume_intervals(self.manifest, IDENTITY, self.range_file, 10)
+
+        self.assertEqual(
+            [(task.start, task.end, task.complete) for task in tasks],
+            [(0, 2, True), (3, 5, False), (6, 7, True), (8, 9, False)],
+        )
+
+    def test_range_file_with_wrong_size_is_not_resumed(self):
+        self._write_manifest([[0, 2]])
+        Path(self.range_file).write_bytes(b"\0" * 4)
+
+        self.assertIsNone(ChunkedDownloader._load_resume_intervals(self.manifest, IDENTITY, self.range_file, 10))
+
+    def test_written_intervals_only_cover_committed_bytes(self):
+        scheduler = RangeScheduler(plan_ranges(10, 2))
+        first = scheduler.acquire()
+        second = scheduler.acquire()
+        scheduler.claim(first, 3)
+        scheduler.commit(first, 3)
+        scheduler.claim(second, 4)
+
+        self.assertEqual(scheduler.written_intervals(), [[0, 2]])
+
+    @patch("app.core.downloaders.chunked.time.sleep", return_value=None)
+    @patch("app.core.downloaders.chunked.pooled_get")
+    @patch("app.core.downloaders.chunked.pooled_head")
+    def test_interrupted_single_file_download_fetches_only_missing_bytes(self, mocked_head, mocked_get, _sleep):
+        self._write_manifest([[0, 3]])
+        Path(self.range_file).write_bytes(b"0123" + b"\0" * 6)
+        head_response = Mock()
+        head_response.url = IDENTITY["url"]
+        head_response.headers = {"content-length": "10", "accept-ranges": "bytes", "etag": '"v1"'}
+        head_response.raise_for_status.return_value = None
+        mocked_head.return_value = head_response
+        stream = Mock()
+        stream.status_code = 206
+        stream.headers = {"content-length": "6", "content-range": "bytes 4-9/10"}
+        stream.iter_content.return_value = iter([b"456789"])
+        stream.__enter__ = Mock(return_value=stream)
+        stream.__exit__ = Mock(return_value=False)
+        mocked_get.return_value = stream
+        save_path = os.path.join(self._tmp.name, "demo.mp4")
+
+        ChunkedDownloader().download(
+            VideoItem(url=IDENTITY["url"], title="demo", source="douyin"),
+            save_path,
+            lambda *_args, **_kwargs: None,
+            lambda: False,
+        )
+
+        self.assertEqual(Path(save_path).read_bytes(), b"0123456789")
+        self.assertEqual(mocked_get.call_args.kwargs["headers"]["Range"], "bytes=4-9")
+        self.assertEqual(sorted(os.listdir(self._tmp.name)), ["demo.mp4"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,35 @@
+from __future__ import annotations
+
+import unittest
+
+from app.core.downloaders.hls_crypto import aes_128_cbc_decrypt, aes_backend_available, pkcs7_unpad_length
+from app.exceptions import ExternalToolError
+
+# NIST SP 800-38A F.2.2 CBC-AES128.Decrypt，前两个分组。
+NIST_KEY = bytes.fromhex("2b7e151628aed2a6abf7158809cf4f3c")
+NIST_IV = bytes.fromhex("000102030405060708090a0b0c0d0e0f")
+NIST_CIPHERTEXT = bytes.fromhex("7649abac8119b246cee98e9b12e9197d5086cb9b507219ee95db113a917678b2")
+NIST_PLAINTEXT = bytes.fromhex("6bc1bee22e409f96e93d7e117393172aae2d8a571e03ac9c9eb76fac45af8e51")
+
+
+class HlsSegmentCryptoTests(unittest.TestCase):
+    def test_pkcs7_unpad_length_only_strips_valid_padding(self):
+        self.assertEqual(pkcs7_unpad_length(b"abc" + bytes([13]) * 13), 3)
+        self.assertEqual(pkcs7_unpad_length(b"ts-packet-aligned"[:16]), 16)
+        self.assertEqual(pkcs7_unpad_length(b"x" * 15 + b"\x02"), 16)
+        self.assertEqual(pkcs7_unpad_length(b""), 0)
+
+    def test_unaligned_ciphertext_is_rejected_before_decryption(self):
+        with self.assertRaises(ExternalToolError):
+            aes_128_cbc_decrypt(b"x" * 17, NIST_KEY, NIST_IV)
+
+    @unittest.skipUnless(aes_backend_available(), "pycryptodome or cryptography is not installed")
+    def test_decrypts_known_vector_into_preallocated_buffer(self):
+        decrypted = aes_128_cbc_decrypt(NIST_CIPHERTEXT, NIST_KEY, NIST_IV)
+
+        self.assertIsInstance(decrypted, bytearray)
+        self.assertEqual(bytes(decrypted), NIST_PLAINTEXT)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,198 @@
+from __future__ import annotations
+
+import os
+import tempfile
+import time
+import unittest
+from pathlib import Path
+from types import SimpleNamespace
+
+from app.core.downloaders.base import TransferRateLimiter
+from app.core.downloaders.hls_journal import (
+    JOURNAL_FILE_NAME,
+    JOURNAL_MAX_AGE_SECONDS,
+    HlsSegmentJournal,
+    is_resumable_workspace,
+    record_workspace_failure,
+    sweep_orphaned_hls_workspaces,
+)
+from app.core.downloaders.hls_segments import HlsSegmentWriter
+from app.exceptions import DownloaderStoppedError
+
+PLAYLIST_URL = "https://cdn.example/live/index.m3u8"
+
+
+def _playlist(count: int, *, media_sequence: int = 100) -> SimpleNamespace:
+    segments = [
+        SimpleNamespace(absolute_uri=f"https://cdn.example/seg{index}.ts", init_section=None)
+        for index in range(count)
+    ]
+    return SimpleNamespace(segments=segments, media_sequence=media_sequence)
+
+
+def _segment_bytes(url: str) -> bytes:
+    index = int(url.rsplit("seg", 1)[1].split(".", 1)[0])
+    return f"<segment-{index}>".encode()
+
+
+class HlsSegmentJournalTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self._tmp = tempfile.TemporaryDirectory()
+        self.workspace = Path(self._tmp.name) / "clip_curl_cffi_hls"
+        self.workspace.mkdir()
+        self.raw_path = self.workspace / "clip.ts"
+
+    def tearDown(self) -> None:
+        self._tmp.cleanup()
+
+    def _run(self, playlist, *, fetched: list[str], stop_after: int | None = None) -> HlsSegmentJournal:
+        journal = HlsSegmentJournal.open(
+            self.workspace,
+            self.raw_path,
+            playlist_url=PLAYLIST_URL,
+            playlist=playlist,
+        )
+
+        def fetch(url: str) -> bytes:
+            fetched.append(url)
+            return _segment_bytes(url)
+
+        def stop() -> bool:
+            return stop_after is not None and len(fetched) >= stop_after
+
+        writer = HlsSegmentWriter(
+            fetch_bytes=fetch,
+            decode_segment=lambda _segment, data: data,
+            rate_limiter=TransferRateLimiter(0),
+            check_stop_func=stop,
+            max_workers=1,
+            journal=journal,
+        )
+        output = journal.open_output()
+        try:
+            writer.write(playlist.segments, output)
+        finally:
+            output.close()
+            journal.close()
+        return journal
+
+    def _expected(self, count: int) -> bytes:
+        return b"".join(_segment_bytes(f"https://cdn.example/seg{index}.ts") for index in range(count))
+
+    def test_resume_skips_segments_already_recorded(self):
+        playlist = _playlist(5)
+        fetched: list[str] = []
+        with self.assertRaises(DownloaderStoppedError):
+            self._run(playlist, fetched=fetched, stop_after=3)
+
+        resumed: list[str] = []
+        journal = self._run(playlist, fetched=resumed)
+
+        self.assertEqual(resumed, [f"https://cdn.example/seg{index}.ts" for index in range(3, 5)])
+        self.assertEqual(self.raw_path.read_bytes(), self._expected(5))
+        self.assertEqual(journal.completed_count, 5)
+
+    def test_changed_playlist_identity_restarts_from_zero(self):
+        with self.assertRaises(DownloaderStoppedError):
+            self._run(_playlist(5), fetched=[], stop_after=3)
+
+        fetched: list[str] = []
+        self._run(_playlist(5, media_sequence=200), fetched=fetched)
+
+        self.assertEqual(len(fetched), 5)
+        self.assertEqual(self.raw_path.read_bytes(), self._expected(5))
+
+    def test_torn_tail_is_truncated_before_resume(self):
+        with self.assertRaises(DownloaderStoppedError):
+            self._run(_playlist(4), fetched=[], stop_after=2)
+        # 模拟崩溃：裸文件多出未记日志的半段，日志末尾还有一行残缺记录。
+        with self.raw_path.open("ab") as fp:
+            fp.write(b"<partial")
+        with (self.workspace / JOURNAL_FILE_NAME).open("ab") as fp:
+            fp.write(b'{"index":2,"off')
+
+        fetched: list[str] = []
+        self._run(_playlist(4), fetched=fetched)
+
+        self.assertEqual(len(fetched), 2)
+        self.assertEqual(self.raw_path.read_bytes(), self._expected(4))
+
+    def test_corrupted_recorded_segment_is_refetched(self):
+        with self.assertRaises(DownloaderStoppedError):
+            self._run(_playlist(4), fetched=[], stop_after=2)
+        data = bytearray(self.raw_path.read_bytes())
+        data[-2] ^= 0xFF
+        self.raw_path.write_bytes(bytes(data))
+
+        fetched: list[str] = []
+        self._run(_playlist(4), fetched=fetched)
+
+        self.assertEqual(fetched[0], "https://cdn.example/seg1.ts")
+        self.assertEqual(self.raw_path.read_bytes(), self._expected(4))
+
+    def test_resume_disabled_ignores_existing_journal(self):
+        with self.assertRaises(DownloaderStoppedError):
+            self._run(_playlist(4), fetched=[], stop_after=2)
+
+        journal = HlsSegmentJournal.open(
+            self.workspace,
+            self.raw_path,
+            playlist_url=PLAYLIST_URL,
+            playlist=_playlist(4),
+            resume_enabled=False,
+        )
+
+        self.assertEqual(journal.completed_count, 0)
+        self.assertFalse(journal.resumable)
+
+    def test_resumable_workspace_requires_fresh_journal_and_raw_bytes(self):
+        with self.assertRaises(DownloaderStoppedError):
+            self._run(_playlist(4), fetched=[], stop_after=2)
+
+        self.assertTrue(is_resumable_workspace(self.workspace))
+        self.assertFalse(
+            is_resumable_workspace(self.workspace, now=time.time() + JOURNAL_MAX_AGE_SECONDS + 60)
+        )
+        self.raw_path.write_bytes(b"")
+        self.assertFalse(is_resumable_workspace(self.workspace))
+
+    def test_startup_sweep_keeps_resumable_workspace(self):
+        with self.assertRaises(DownloaderStoppedError):
+            self._run(_playlist(4), fetched=[], stop_after=2)
+        stale = Path(self._tmp.name) / "other_curl_cffi_hls"
+        stale.mkdir()
+        playwright_dir = Path(self._tmp.name) / "clip_playwright_hls"
+        playwright_dir.mkdir()
+        temp_root = Path(self._tmp.name) / ".ucp-nm3u8-tmp"
+        temp_root.mkdir()
+
+        cleaned = sweep_orphaned_hls_workspaces([self._tmp.name], temp_root_name=".ucp-nm3u8-tmp")
+
+        self.assertEqual(cleaned, 3)
+        self.assertTrue(self.workspace.exists())
+        self.assertFalse(stale.exists())
+        self.assertFalse(playwright_dir.exists())
+        self.assertFalse(temp_root.exists())
+
+    def test_startup_sweep_removes_expired_workspace(self):
+        with self.assertRaises(DownloaderStoppedError):
+            self._run(_playlist(4), fetched=[], stop_after=2)
+        expired = time.time() - JOURNAL_MAX_AGE_SECONDS - 60
+        os.utime(self.workspace / JOURNAL_FILE_NAME, (expired, expired))
+
+        cleaned = sweep_orphaned_hls_workspaces([self._tmp.name], temp_root_name=".ucp-nm3u8-tmp")
+
+        self.assertEqual(cleaned, 1)
+        self.assertFalse(self.workspace.exists())
+
+    def test_failed_workspace_is_kept_only_until_the_last_retry(self):
+        self.workspace.mkdir(parents=True, exist_ok=True)
+
+        kept = [record_workspace_failure(self.workspace, max_failures=2) for _ in range(3)]
+
+        self.assertEqual(kept, [True, True, False])
+        self.assertFalse(record_workspace_failure(self.workspace, max_failures=0))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,171 @@
+from __future__ import annotations
+
+import io
+import threading
+import time
+import unittest
+from types import SimpleNamespace
+
+from app.core.downloaders.base import TransferRateLimiter
+from app.core.downloaders.hls_segments import HlsSegmentWriter
+from app.exceptions import DownloaderStoppedError
+
+
+def _segments(count: int, *, init_uri: str | None = None) -> list[SimpleNamespace]:
+    init_section = SimpleNamespace(absolute_uri=init_uri) if init_uri else None
+    return [
+        SimpleNamespace(absolute_uri=f"https://cdn.example/seg{index}.ts", init_section=init_section)
+        for index in range(count)
+    ]
+
+
+class HlsSegmentWriterTests(unittest.TestCase):
+    def _writer(self, fetch, *, stop=lambda: False, workers: int = 4, budget: int = 64 * 1024 * 1024):
+        return HlsSegmentWriter(
+            fetch_bytes=fetch,
+            decode_segment=lambda _segment, data: data,
+            rate_limiter=TransferRateLimiter(0),
+            check_stop_func=stop,
+            max_workers=workers,
+            max_inflight_bytes=budget,
+        )
+
+    def test_concurrent_fetch_writes_segments_in_playlist_order(self):
+        def fetch(url: str) -> bytes:
+            index = int(url.rsplit("seg", 1)[1].split(".", 1)[0])
+            # 前面的分段更慢，确保完成顺序与播放列表顺序相反。
+            time.sleep(0.02 * (5 - index))
+            return f"[{index}]".encode()
+
+        output = io.BytesIO()
+        progress: list[tuple[int, int]] = []
+        written = self._writer(fetch).write(_segments(6), output, lambda index, total: progress.append((index, total)))
+
+        self.assertEqual(output.getvalue(), b"[0][1][2][3][4][5]")
+        self.assertEqual(written, len(output.getvalue()))
+        self.assertEqual([index for index, _total in progress], [1, 2, 3, 4, 5, 6])
+
+    def test_fetches_overlap_up_to_worker_limit(self):
+        active = 0
+        peak = 0
+        lock = threading.Lock()
+
+        def fetch(_url: str) -> bytes:
+            nonlocal active, peak
+            with lock:
+                active += 1
+                peak = max(peak, active)
+            time.sleep(0.03)
+            with lock:
+                active -= 1
+            return b"x"
+
+        self._writer(fetch, workers=3).write(_segments(9), io.BytesIO())
+
+        self.assertEqual(peak, 3)
+
+    def test_inflight_budget_limits_prefetch_window(self):
+        requested: list[str] = []
+        release = threading.Event()
+
+        def fetch(url: str) -> bytes:
+            requested.append(url)
+            if url.endswith("seg0.ts"):
+                release.wait(1)
+            return b"x" * 1024
+
+        writer = self._writer(fetch, workers=8, budget=1)
+        thread = threading.Thread(target=writer.write, args=(_segments(8), io.BytesIO()))
+        thread.start()
+        time.sleep(0.1)
+        self.assertEqual(requested, ["https://cdn.example/seg0.ts"])
+        release.set()
+        thread.join(2)
+        self.assertEqual(len(requested), 8)
+
+    def test_init_section_is_written_once(self):
+        def fetch(url: str) -> bytes:
+            return b"INIT" if url.endswith("init.mp4") else b"m"
+
+        output = io.BytesIO()
+        self._writer(fetch).write(_segments(3, init_uri="https://cdn.example/init.mp4"), output)
+
+        self.assertEqual(output.getvalue(), b"INITmmm")
+
+    def test_stop_request_aborts_pending_fetches(self):
+        fetched: list[str] = []
+        stop = threading.Event()
+
+        def fetch(url: str) -> bytes:
+            fetched.append(url)
+            stop.set()
+            return b"x"
+
+        with self.assertRaises(DownloaderStoppedError):
+            self._writer(fetch, stop=stop.is_set, workers=2).write(_segments(50), io.BytesIO())
+
+        self.assertLess(len(fetched), 50)
+
+    def test_single_worker_fetches_inline_on_calling_thread(self):
+        caller = threading.get_ident()
+        threads: set[int] = set()
+
+        def fetch(_url: str) -> bytes:
+            threads.add(threading.get_ident())
+            return b"x"
+
+        self._writer(fetch, workers=1).write(_segments(3), io.BytesIO())
+
+        self.assertEqual(threads, {caller})
+
+    def test_decode_stage_runs_off_the_writer_thread_and_keeps_order(self):
+        writer_thread = threading.current_thread().name
+        decode_threads: set[str] = set()
+
+        def fetch(url: str) -> bytes:
+            index = int(url.rsplit("seg", 1)[1].split(".", 1)[0])
+            time.sleep(0.01 * (5 - index))
+            return f"<{index}>".encode()
+
+        def decode(_segment, data: bytes) -> bytes:
+            decode_threads.add(threading.current_thread().name)
+            return data.upper()
+
+        writer = HlsSegmentWriter(
+            fetch_bytes=fetch,
+            decode_segment=decode,
+            rate_limiter=TransferRateLimiter(0),
+            check_stop_func=lambda: False,
+            max_workers=4,
+            decode_workers=2,
+        )
+        output = io.BytesIO()
+        writer.write(_segments(6), output)
+
+        self.assertEqual(output.getvalue(), b"<0><1><2><3><4><5>")
+        self.assertNotIn(writer_thread, decode_threads)
+        self.assertTrue(all(name.startswith("hls-decode") for name in decode_threads))
+
+    def test_decode_failure_surfaces_on_writer_thread(self):
+        def decode(_segment, data: bytes) -> bytes:
+            if data == b"bad":
+                raise ValueError("corrupt segment")
+            return data
+
+        writer = HlsSegmentWriter(
+            fetch_bytes=lambda url: b"bad" if url.endswith("seg2.ts") else b"ok",
+            decode_segment=decode,
+            rate_limiter=TransferRateLimiter(0),
+            check_stop_func=lambda: False,
+            max_workers=3,
+            decode_workers=2,
+        )
+        output = io.BytesIO()
+
+        with self.assertRaises(ValueError):
+            writer.write(_segments(5), output)
+        self.assertEqual(output.getvalue(), b"okok")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,284 @@
+"""asyncio 下载引擎：协程传输与线程引擎结果一致，且不再为分片创建线程。"""
+
+from __future__ import annotations
+
+import asyncio
+import io
+import tempfile
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from app.core.downloaders import async_engine
+from app.core.downloaders.async_engine import ENGINE_ASYNCIO, ENGINE_THREAD, async_download_loop
+from app.core.downloaders.base import BaseDownloader
+from app.core.downloaders.bandwidth import TransferRateLimiter
+from app.core.downloaders.chunked import ChunkedDownloader
+from app.core.downloaders.hls_segments import HlsSegmentWriter
+from app.exceptions import DownloaderStoppedError
+from app.models import VideoItem
+
+PAYLOAD = bytes(range(256)) * 4096
+
+
+class _RangeHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def _send_body(self, include_body: bool) -> None:
+        start, end = 0, len(PAYLOAD) - 1
+        range_header = self.headers.get("Range")
+        if range_header:
+            first, _, last = range_header[len("bytes="):].partition("-")
+            start = int(first)
+            end = int(last) if last else end
+            self.send_response(206)
+            self.send_header("Content-Range", f"bytes {start}-{end}/{len(PAYLOAD)}")
+        else:
+            self.send_response(200)
+        self.send_header("Accept-Ranges", "bytes")
+        self.send_header("ETag", '"v1"')
+        self.send_header("Content-Length", str(end - start + 1))
+        self.end_headers()
+        if include_body:
+            self.wfile.write(PAYLOAD[start:end + 1])
+
+    def do_HEAD(self) -> None:  # noqa: N802 - BaseHTTPRequestHandler 约定
+        self._send_body(False)
+
+    def do_GET(self) -> None:  # noqa: N802 - BaseHTTPRequestHandler 约定
+        self._send_body(True)
+
+    def log_message(self, *_args) -> None:
+        return
+
+
+def _cfg_get(engine: str):
+    settings = {
+        ("download", "engine"): engine,
+        ("download", "max_concurrent"): 1,
+        ("download", "max_retries"): 0,
+        ("download", "chunked_preallocate"): True,
+    }
+    return lambda section, key, default=None: settings.get((section, key), default)
+
+
+class AsyncDownloadEngineTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), _RangeHandler)
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}/video.mp4"
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.temp_dir.cleanup)
+
+    def tearDown(self) -> None:
+        async_download_loop.close()
+        self.server.shutdown()
+        self.server.server_close()
+        self.thread.join(2)
+
+    def _chunked_download(self, engine: str) -> Path:
+        target = Path(self.temp_dir.name, f"{engine}.mp4")
+        item = VideoItem(url=self.url, title=engine, source="douyin")
+        with patch.object(async_engine.cfg, "get", _cfg_get(engine)):
+            ChunkedDownloader().download(item, str(target), lambda *_args, **_kwargs: None, lambda: False)
+        return target
+
+    def test_chunked_download_runs_ranges_as_coroutines_without_threads(self):
+        thread_result = self._chunked_download(ENGINE_THREAD)
+        real_thread = threading.Thread
+        range_threads: list[str] = []
+
+        def spy_thread(*args, **kwargs):
+            target = kwargs.get("target")
+            if getattr(target, "__module__", "") == "app.core.downloaders.chunked":
+                range_threads.append(target.__qualname__)
+            return real_thread(*args, **kwargs)
+
+        with patch("app.core.downloaders.chunked.threading.Thread", side_effect=spy_thread):
+            async_result = self._chunked_download(ENGINE_ASYNCIO)
+
+        self.assertEqual(thread_result.read_bytes(), PAYLOAD)
+        self.assertEqual(async_result.read_bytes(), PAYLOAD)
+        self.assertEqual(range_threads, [])
+        self.assertGreater(async_download_loop.stats()["submitted"], 1)
+        self.assertEqual(sorted(path.name for path in Path(self.temp_dir.name).iterdir()), ["asyncio.mp4", "thread.mp4"])
+
+    def test_http_download_resumes_partial_file_on_event_loop(self):
+        target = Path(self.temp_dir.name, "resume.mp4")
+        Path(f"{target}.downloading").write_bytes(PAYLOAD[:1000])
+        progress: list[int] = []
+        callback_threads: set[str] = set()
+
+        def on_progress(percent, **_kwargs) -> None:
+            progress.append(percent)
+            callback_threads.add(threading.current_thread().name)
+
+        with patch.object(async_engine.cfg, "get", _cfg_get(ENGINE_ASYNCIO)):
+            BaseDownloader()._download_http_file(
+                url=self.url,
+                save_path=str(target),
+                headers={},
+                check_stop_func=lambda: False,
+                progress_callback=on_progress,
+                support_resume=True,
+            )
+
+        self.assertEqual(target.read_bytes(), PAYLOAD)
+        self.assertEqual(progress[-1], 100)
+        self.assertNotIn("ucrawl-async-download", callback_threads)
+
+    def test_file_writes_run_off_the_event_loop_thread(self):
+        from app.core.downloaders.range_store import PreallocatedFileStore
+
+        io_threads: set[str] = set()
+        real_open, real_write_at = open, PreallocatedFileStore.write_at
+
+        def spy_open(*args, **kwargs):
+            io_threads.add(threading.current_thread().name)
+            return real_open(*args, **kwargs)
+
+        def spy_write_at(store, offset, data):
+            io_threads.add(threading.current_thread().name)
+            return real_write_at(store, offset, data)
+
+        target = Path(self.temp_dir.name, "plain.mp4")
+        with (
+            patch.object(async_engine.cfg, "get", _cfg_get(ENGINE_ASYNCIO)),
+            patch("app.core.downloaders.base.open", spy_open, create=True),
+            patch.object(PreallocatedFileStore, "write_at", spy_write_at),
+        ):
+            BaseDownloader()._download_http_file(
+                url=self.url,
+                save_path=str(target),
+                headers={},
+                check_stop_func=lambda: False,
+                progress_callback=None,
+            )
+            chunked = self._chunked_download(ENGINE_ASYNCIO)
+
+        self.assertEqual(target.read_bytes(), PAYLOAD)
+        self.assertEqual(chunked.read_bytes(), PAYLOAD)
+        self.assertTrue(io_threads)
+        self.assertNotIn("ucrawl-async-download", io_threads)
+
+    def test_network_chunks_are_buffered_into_few_threaded_writes(self):
+        writes: list[int] = []
+        real_open = open
+
+        class _CountingFile:
+            def __init__(self, *args, **kwargs) -> None:
+                self._fp = real_open(*args, **kwargs)
+
+            def write(self, data) -> int:
+                writes.append(len(data))
+                return self._fp.write(data)
+
+            def close(self) -> None:
+                self._fp.close()
+
+            def __enter__(self):
+                return self
+
+            def __exit__(self, *_exc) -> None:
+                self.close()
+
+        target = Path(self.temp_dir.name, "buffered.mp4")
+        with (
+            patch.object(async_engine.cfg, "get", _cfg_get(ENGINE_ASYNCIO)),
+            patch("app.core.downloaders.base.open", _CountingFile, create=True),
+        ):
+            BaseDownloader()._download_http_file(
+                url=self.url,
+                save_path=str(target),
+                headers={},
+                check_stop_func=lambda: False,
+                progress_callback=None,
+            )
+
+        self.assertEqual(target.read_bytes(), PAYLOAD)
+        self.assertEqual(sum(writes), len(PAYLOAD))
+        self.assertLessEqual(len(writes), -(-len(PAYLOAD) // async_engine.WRITE_BUFFER_BYTES) + 1)
+
+    def test_stop_request_cancels_coroutine_and_waits_for_it(self):
+        exited = threading.Event()
+
+        async def slow() -> None:
+            try:
+                await asyncio.sleep(30)
+            finally:
+                exited.set()
+
+        calls = iter([False, False, True])
+        with self.assertRaises(DownloaderStoppedError):
+            async_download_loop.run(slow(), lambda: next(calls, True))
+
+        self.assertTrue(exited.is_set())
+
+    def test_hls_segments_fetched_on_loop_are_written_in_playlist_order(self):
+        delays = {"s0": 0.05, "s1": 0.0, "s2": 0.02}
+
+        async def fetch(url: str) -> bytes:
+            await asyncio.sleep(delays[url])
+            return url.encode()
+
+        writer = HlsSegmentWriter(
+            fetch_bytes=lambda url: url.encode(),
+            decode_segment=lambda _segment, data: data,
+            rate_limiter=TransferRateLimiter(0),
+            check_stop_func=lambda: False,
+            max_workers=3,
+            submit_fetch=lambda url: async_download_loop.submit(fetch(url)),
+        )
+        segments = [SimpleNamespace(absolute_uri=name, init_section=None) for name in delays]
+        output = io.BytesIO()
+
+        writer.write(segments, output)
+
+        self.assertEqual(output.getvalue(), b"s0s1s2")
+
+    def test_encrypted_hls_playlist_decodes_segments_fetched_on_loop(self):
+        from Crypto.Cipher import AES
+        from Crypto.Util.Padding import pad
+
+        from app.core.downloaders.m3u8 import N_m3u8DL_RE_Downloader
+
+        key_bytes = bytes(range(16))
+        key = SimpleNamespace(method="AES-128", absolute_uri="key.bin", iv=None)
+        plain = {f"s{index}": f"segment-{index}".encode() * 50 for index in range(4)}
+        encrypted = {
+            name: AES.new(key_bytes, AES.MODE_CBC, index.to_bytes(16, "big")).encrypt(pad(body, 16))
+            for index, (name, body) in enumerate(plain.items())
+        }
+
+        async def fetch(url: str) -> bytes:
+            await asyncio.sleep(0.01 * (3 - int(url[1:])))
+            return encrypted[url]
+
+        playlist = SimpleNamespace(
+            segments=[
+                SimpleNamespace(absolute_uri=name, init_section=None, key=key, media_sequence=index)
+                for index, name in enumerate(plain)
+            ]
+        )
+        target = Path(self.temp_dir.name, "encrypted.ts")
+
+        with patch.object(async_engine.cfg, "get", _cfg_get(ENGINE_ASYNCIO)):
+            N_m3u8DL_RE_Downloader()._write_hls_segments(
+                playlist,
+                target,
+                lambda url: key_bytes if url == "key.bin" else encrypted[url],
+                lambda *_args, **_kwargs: None,
+                lambda: False,
+                max_workers=3,
+                submit_fetch=lambda url: async_download_loop.submit(fetch(url)),
+            )
+
+        self.assertEqual(target.read_bytes(), b"".join(plain.values()))
+
+
+if __name__ == "__main__":
+    unittest.main()
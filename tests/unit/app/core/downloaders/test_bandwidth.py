@@ -0,0 +1,144 @@
+from __future__ import annotations
+
+import gc
+import threading
+import time
+import unittest
+from unittest.mock import patch
+
+from app.core.download_queue import PendingDownloadQueue
+from app.core.downloaders.bandwidth import BandwidthScheduler, TransferRateLimiter, task_weight
+from app.exceptions import DownloaderStoppedError
+from app.models import VideoItem
+
+KIB = 1024
+
+
+class _FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        self.now += seconds
+
+
+class BandwidthSchedulerTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.clock = _FakeClock()
+        self.scheduler = BandwidthScheduler(clock=self.clock, sleep=self.clock.sleep)
+
+    def _limiter(self, limit_kb: int, **kwargs) -> TransferRateLimiter:
+        return TransferRateLimiter(limit_kb, scheduler=self.scheduler, **kwargs)
+
+    def test_single_task_is_held_to_global_limit(self):
+        limiter = self._limiter(100)
+
+        for _ in range(10):
+            limiter.throttle(100 * KIB)
+
+        # 首个窗口可以用掉一个突发额度，其余按 100 KB/s 平均。
+        self.assertAlmostEqual(self.clock.now, 10.0, delta=0.7)
+
+    def test_concurrent_tasks_share_one_global_cap_by_weight(self):
+        heavy = self._limiter(300, label="heavy", weight=2.0)
+        light = self._limiter(300, label="light", weight=1.0)
+        heavy.throttle(1)
+        light.throttle(1)
+
+        stats = {task["label"]: task for task in self.scheduler.stats()["tasks"]}
+
+        self.assertEqual(self.scheduler.stats()["limit_bps"], 300 * KIB)
+        self.assertEqual(stats["heavy"]["allocated_bps"], 200 * KIB)
+        self.assertEqual(stats["light"]["allocated_bps"], 100 * KIB)
+
+    def test_idle_task_quota_is_borrowed_by_active_task(self):
+        busy = self._limiter(100, label="busy")
+        idle = self._limiter(100, label="idle")
+        idle.throttle(1)
+        self.clock.now += 5.0
+
+        busy.throttle(1)
+
+        stats = {task["label"]: task for task in self.scheduler.stats()["tasks"]}
+        self.assertEqual(stats["busy"]["allocated_bps"], 100 * KIB)
+        self.assertEqual(stats["idle"]["allocated_bps"], 0)
+
+    def test_unlimited_scheduler_only_records_achieved_rate(self):
+        limiter = self._limiter(0, label="free")
+
+        limiter.throttle(4 * KIB)
+        self.clock.now += 1.0
+        limiter.throttle(4 * KIB)
+
+        report = limiter.report()
+        self.assertEqual(self.clock.now, 1.0)
+        self.assertEqual(report["allocated_bps"], 0)
+        self.assertEqual(report["achieved_bps"], 8 * KIB)
+
+    def test_stop_request_interrupts_wait(self):
+        limiter = self._limiter(1)
+
+        with self.assertRaises(DownloaderStoppedError):
+            limiter.throttle(1024 * KIB, lambda: self.clock.now > 0.5)
+
+    def test_finished_task_leaves_recent_report(self):
+        limiter = self._limiter(0, label="done")
+        limiter.throttle(KIB)
+        del limiter
+        gc.collect()
+
+        stats = self.scheduler.stats()
+
+        self.assertEqual(stats["tasks"], [])
+        self.assertEqual([item["label"] for item in stats["recent"]], ["done"])
+
+    def test_task_weight_uses_priority_and_platform(self):
+        item = VideoItem(url="https://example.com/a.mp4", title="a", source="bilibili")
+        item.meta["queue_priority"] = 1
+
+        self.assertEqual(task_weight(item, {"bilibili": 1.5}), 3.0)
+        item.meta["queue_priority"] = "bad"
+        self.assertEqual(task_weight(item, {}), 1.0)
+
+    def test_queue_priority_and_configured_platform_weight_reach_the_limiter(self):
+        pending = PendingDownloadQueue()
+        urgent = VideoItem(url="https://cdn.example.com/a.mp4", title="urgent", source="bilibili")
+        normal = VideoItem(url="https://cdn.example.com/b.mp4", title="normal", source="douyin")
+        pending.put_many([(normal, "downloads"), (urgent, "downloads")])
+        pending.set_priority([urgent.id], 1)
+        settings = {("download", "platform_bandwidth_weights"): {"bilibili": 1.5, "douyin": "bad"}}
+
+        with patch("app.core.downloaders.bandwidth.cfg.get", lambda section, key, default=None: settings.get((section, key), default)):
+            dispatched = [pending.get_nowait()[0] for _ in range(2)]
+            weights = {item.title: task_weight(item) for item in dispatched}
+
+        self.assertEqual(weights, {"urgent": 3.0, "normal": 1.0})
+        limiter = TransferRateLimiter(0, label="urgent", weight=weights["urgent"], scheduler=self.scheduler)
+        self.assertEqual(limiter.report()["weight"], 3.0)
+
+
+class BandwidthSchedulerRealClockTests(unittest.TestCase):
+    def test_two_concurrent_tasks_do_not_exceed_global_limit(self):
+        scheduler = BandwidthScheduler()
+        limiters = [TransferRateLimiter(512, scheduler=scheduler) for _ in range(2)]
+        started = time.monotonic()
+
+        def pump(limiter: TransferRateLimiter) -> None:
+            for _ in range(8):
+                limiter.throttle(32 * KIB)
+
+        threads = [threading.Thread(target=pump, args=(limiter,)) for limiter in limiters]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(5)
+
+        # 合计 512 KiB，全局 512 KB/s：至少需要约 1 秒减去初始突发额度。
+        self.assertGreaterEqual(time.monotonic() - started, 0.6)
+
+
+if __name__ == "__main__":
+    unittest.main()
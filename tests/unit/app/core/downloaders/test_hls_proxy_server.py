@@ -0,0 +1,253 @@
+from __future__ import annotations
+
+import http.client
+import socket
+import struct
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+import pytest
+
+from app.core.downloaders import hls_proxy as subject
+
+ROOT_URL = "https://media.example/master.m3u8"
+SEGMENT_URL = "https://media.example:443/seg-0.ts"
+PLAYLIST = "#EXTM3U\n#EXT-X-TARGETDURATION:4\n#EXTINF:4,\nseg-0.ts\n#EXT-X-ENDLIST\n"
+
+
+class _SegmentResponse:
+    def __init__(self, url: str, body: bytes) -> None:
+        self.url = url
+        self.redirect_chain = (url,)
+        self.status_code = 200
+        self.headers = {"Content-Type": "video/mp2t", "Content-Length": str(len(body))}
+        self._body = body
+
+    def iter_content(self, chunk_size: int = 256 * 1024):
+        for offset in range(0, len(self._body), chunk_size):
+            yield self._body[offset : offset + chunk_size]
+
+    def close(self) -> None:
+        return
+
+
+class _CountingDownloader:
+    def __init__(self, opens: list[str], *, gate: threading.Event | None = None) -> None:
+        self.opens = opens
+        self.gate = gate
+
+    @staticmethod
+    def _headers_for_hls_proxy_upstream(_upstream_url: str, headers: dict[str, str]) -> dict[str, str]:
+        return dict(headers)
+
+    def _hls_proxy_open_upstream(self, upstream_url: str, _headers, _upstream_proxy, *, domain_policy=None):
+        del domain_policy
+        self.opens.append(upstream_url)
+        if self.gate is not None:
+            self.gate.wait(timeout=2)
+        return _SegmentResponse(upstream_url, b"ts-payload" * 100)
+
+
+@pytest.fixture(autouse=True)
+def _empty_segment_cache():
+    subject.hls_segment_cache.clear()
+    yield
+    subject.hls_segment_cache.clear()
+
+
+def _started_proxy(downloader, headers: dict[str, str] | None = None) -> subject._LocalHlsProxy:
+    proxy = subject._LocalHlsProxy(downloader, ROOT_URL, headers or {}, None).start()
+    proxy.record_playlist(ROOT_URL, PLAYLIST)
+    return proxy
+
+
+def _get(local_url: str) -> tuple[int, bytes]:
+    parts = urlsplit(local_url)
+    connection = http.client.HTTPConnection(parts.hostname, parts.port, timeout=5)
+    try:
+        connection.request("GET", f"{parts.path}?{parts.query}")
+        response = connection.getresponse()
+        return response.status, response.read()
+    finally:
+        connection.close()
+
+
+def test_preview_and_download_proxies_share_one_upstream_segment_fetch() -> None:
+    opens: list[str] = []
+    preview = _started_proxy(_CountingDownloader(opens))
+    download = _started_proxy(_CountingDownloader(opens))
+    try:
+        first = _get(preview.local_url_for(SEGMENT_URL))
+        second = _get(download.local_url_for(SEGMENT_URL))
+        deadline = time.monotonic() + 2
+        while download.progress_snapshot()[1] == 0 and time.monotonic() < deadline:
+            time.sleep(0.01)
+    finally:
+        preview.stop()
+        download.stop()
+
+    assert first == second == (200, b"ts-payload" * 100)
+    assert opens == [SEGMENT_URL]
+    assert download.progress_snapshot()[1] == len(first[1])
+    assert subject.hls_segment_cache.stats()["hits"] == 1
+
+
+def test_concurrent_requests_for_one_segment_wait_for_single_upstream_fetch() -> None:
+    opens: list[str] = []
+    gate = threading.Event()
+    proxy = _started_proxy(_CountingDownloader(opens, gate=gate))
+    waits_before = subject.hls_segment_cache.stats()["waits"]
+    try:
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            futures = [pool.submit(_get, proxy.local_url_for(SEGMENT_URL)) for _index in range(4)]
+            deadline = time.monotonic() + 2
+            while subject.hls_segment_cache.stats()["waits"] - waits_before < 3 and time.monotonic() < deadline:
+                time.sleep(0.01)
+            gate.set()
+            results = [future.result(timeout=5) for future in futures]
+    finally:
+        proxy.stop()
+
+    assert {status for status, _body in results} == {200}
+    assert opens == [SEGMENT_URL]
+
+
+def test_segment_cache_is_partitioned_by_upstream_credentials() -> None:
+    opens: list[str] = []
+    first = _started_proxy(_CountingDownloader(opens), {"Cookie": "sid=first"})
+    second = _started_proxy(_CountingDownloader(opens), {"Cookie": "sid=second"})
+    try:
+        assert _get(first.local_url_for(SEGMENT_URL))[0] == 200
+        assert _get(second.local_url_for(SEGMENT_URL))[0] == 200
+    finally:
+        first.stop()
+        second.stop()
+
+    assert opens == [SEGMENT_URL, SEGMENT_URL]
+
+
+def test_async_server_reuses_bounded_upstream_workers() -> None:
+    opens: list[str] = []
+    proxy = subject._LocalHlsProxy(_CountingDownloader(opens), ROOT_URL, {}, None).start()
+    playlist = "#EXTM3U\n" + "".join(f"#EXTINF:4,\nseg-{index}.ts\n" for index in range(24))
+    proxy.record_playlist(ROOT_URL, playlist)
+    try:
+        statuses = [
+            _get(proxy.local_url_for(f"https://media.example:443/seg-{index}.ts"))[0]
+            for index in range(24)
+        ]
+        assert proxy.server is not None
+        workers = list(proxy.server._executor._threads)
+    finally:
+        proxy.stop()
+
+    assert statuses == [200] * 24
+    assert len(opens) == 24
+    # 工作线程归还空闲名额晚于结果返回时，线程池可能再起一个线程；但远少于请求数。
+    assert 1 <= len(workers) <= 4
+
+
+def test_client_disconnect_mid_segment_is_not_logged_as_proxy_error(monkeypatch) -> None:
+    closed = threading.Event()
+
+    class _ClosingResponse(_SegmentResponse):
+        def close(self) -> None:
+            closed.set()
+
+    class _LargeSegmentDownloader(_CountingDownloader):
+        def _hls_proxy_open_upstream(self, upstream_url: str, _headers, _upstream_proxy, *, domain_policy=None):
+            return _ClosingResponse(upstream_url, b"x" * (32 * 1024 * 1024))
+
+    logged: list[str] = []
+    monkeypatch.setattr(
+        subject.debug_logger,
+        "log_exception",
+        lambda _component, action, *_args, **_kwargs: logged.append(action),
+    )
+    proxy = _started_proxy(_LargeSegmentDownloader([]))
+    try:
+        parts = urlsplit(proxy.local_url_for(SEGMENT_URL))
+        with socket.create_connection((parts.hostname, parts.port), timeout=5) as client:
+            client.sendall(f"GET {parts.path}?{parts.query} HTTP/1.1\r\nHost: localhost\r\n\r\n".encode())
+            assert client.recv(1024).startswith(b"HTTP/1.0 200")
+            client.setsockopt(socket.SOL_SOCKET, socket.SO_LINGER, struct.pack("ii", 1, 0))
+        assert closed.wait(10)
+    finally:
+        proxy.stop()
+
+    assert "local_hls_proxy_error" not in logged
+
+
+def test_unpinned_upstream_sessions_are_reused_per_origin_and_proxy() -> None:
+    created: list[object] = []
+
+    class _Session:
+        def __init__(self, **_kwargs) -> None:
+            self.cookies = {"leak": "1"}
+            self.closed = False
+            created.append(self)
+
+        def close(self) -> None:
+            self.closed = True
+
+    curl_requests = type("curl_requests", (), {"Session": _Session})
+    sessions = subject._HlsUpstreamSessions(2)
+
+    with sessions.lease(curl_requests, "https://cdn.example/a.ts", None) as first:
+        pass
+    with sessions.lease(curl_requests, "https://cdn.example:443/b.ts", None) as again:
+        pass
+    with sessions.lease(curl_requests, "https://cdn.example/c.ts", "http://proxy.example:8080") as proxied:
+        pass
+    with pytest.raises(OSError):
+        with sessions.lease(curl_requests, "https://cdn.example/d.ts", None) as failed:
+            raise OSError("upstream reset")
+
+    assert again is first and first.cookies == {}
+    assert proxied is not first
+    assert failed is first and failed.closed
+    assert len(created) == 2
+    assert sessions.idle_count() == 1
+
+
+def test_truncated_upstream_segment_is_not_cached() -> None:
+    body = b"ts-payload" * 100
+
+    class _TruncatedResponse(_SegmentResponse):
+        def __init__(self, url: str) -> None:
+            super().__init__(url, body[:400])
+            self.headers["Content-Length"] = str(len(body))
+
+    class _FlakyDownloader(_CountingDownloader):
+        def _hls_proxy_open_upstream(self, upstream_url: str, _headers, _upstream_proxy, *, domain_policy=None):
+            self.opens.append(upstream_url)
+            if len(self.opens) == 1:
+                return _TruncatedResponse(upstream_url)
+            return _SegmentResponse(upstream_url, body)
+
+    opens: list[str] = []
+    hits_before = subject.hls_segment_cache.stats()["hits"]
+    proxy = _started_proxy(_FlakyDownloader(opens))
+    try:
+        with pytest.raises(http.client.IncompleteRead):
+            _get(proxy.local_url_for(SEGMENT_URL))
+        second = _get(proxy.local_url_for(SEGMENT_URL))
+    finally:
+        proxy.stop()
+
+    assert second == (200, body)
+    assert opens == [SEGMENT_URL, SEGMENT_URL]
+    assert subject.hls_segment_cache.stats()["hits"] == hits_before
+
+
+def test_connection_over_the_request_limit_gets_503(monkeypatch) -> None:
+    proxy = _started_proxy(_CountingDownloader([]))
+    monkeypatch.setattr(proxy, "acquire_request_slot", lambda: False)
+    try:
+        status, payload = _get(proxy.local_url_for(SEGMENT_URL))
+    finally:
+        proxy.stop()
+
+    assert (status, payload) == (503, b"503 Service Unavailable\n")
@@ -0,0 +1,122 @@
+from __future__ import annotations
+
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import patch
+
+from app.core.downloaders.chunked import ChunkedDownloader
+from app.core.downloaders.http_pool import CONNECTIONS_PER_TASK, DownloadSessionPool, configured_pool_maxsize
+from shared.network_proxy import requests_proxy_mapping
+
+
+class _KeepAliveHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self) -> None:  # noqa: N802 - BaseHTTPRequestHandler 约定
+        body = b"payload"
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("Set-Cookie", "tracking=1; Path=/")
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *_args) -> None:
+        return
+
+
+class DownloadSessionPoolTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), _KeepAliveHandler)
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}/video.mp4"
+        self.pool = DownloadSessionPool()
+
+    def tearDown(self) -> None:
+        self.pool.close()
+        self.server.shutdown()
+        self.server.server_close()
+        self.thread.join(2)
+
+    def _get(self, url: str | None = None, **kwargs):
+        kwargs.setdefault("proxies", requests_proxy_mapping())
+        with self.pool.request("GET", url or self.url, stream=True, timeout=5, **kwargs) as response:
+            return response.content
+
+    def test_sequential_requests_reuse_one_connection(self):
+        for _ in range(5):
+            self.assertEqual(self._get(), b"payload")
+
+        stats = self.pool.stats()
+
+        self.assertEqual(stats["sessions"], 1)
+        self.assertEqual(stats["requests"], 5)
+        self.assertEqual(stats["new_connections"], 1)
+        self.assertEqual(stats["reused_connections"], 4)
+        self.assertEqual(stats["reuse_rate"], 0.8)
+
+    def test_sessions_are_keyed_by_host_and_proxy(self):
+        direct = self.pool.session_for(self.url, requests_proxy_mapping())
+        same_host = self.pool.session_for(self.url.replace("video.mp4", "audio.m4a"), None)
+        proxied = self.pool.session_for(self.url, requests_proxy_mapping("http://127.0.0.1:9"))
+        other_host = self.pool.session_for("https://cdn.example/video.mp4")
+
+        self.assertIs(direct, same_host)
+        self.assertIsNot(direct, proxied)
+        self.assertIsNot(direct, other_host)
+        self.assertFalse(direct.trust_env)
+
+    def test_server_cookies_are_not_carried_between_requests(self):
+        self._get()
+
+        self.assertEqual(len(self.pool.session_for(self.url).cookies), 0)
+
+    def test_least_recently_used_session_is_evicted_with_counters_kept(self):
+        pool = DownloadSessionPool(max_sessions=1)
+        try:
+            with pool.request("GET", self.url, timeout=5, proxies=requests_proxy_mapping()) as response:
+                response.content
+            first = pool.session_for(self.url)
+            pool.session_for("https://cdn.example/other.mp4")
+
+            stats = pool.stats()
+
+            self.assertIsNot(pool.session_for(self.url), first)
+            self.assertEqual(stats["sessions_evicted"], 1)
+            self.assertEqual(stats["requests"], 1)
+            self.assertEqual(stats["new_connections"], 1)
+        finally:
+            pool.close()
+
+    def test_counters_survive_host_pool_eviction_inside_a_session(self):
+        with patch("app.core.downloaders.http_pool.ADAPTER_HOST_POOLS", 1):
+            session = self.pool.session_for(self.url)
+        other_host = self.url.replace("127.0.0.1", "localhost")
+        for url in (self.url, self.url, other_host):
+            with session.get(url, timeout=5, proxies=requests_proxy_mapping()) as response:
+                response.content
+
+        stats = self.pool.stats()
+
+        self.assertEqual(stats["requests"], 3)
+        self.assertEqual(stats["new_connections"], 2)
+        self.assertEqual(stats["reuse_rate"], round(1 / 3, 4))
+
+    def test_request_hooks_are_forwarded_per_request(self):
+        seen: list[int] = []
+
+        self._get(hooks={"response": lambda response, *_args, **_kwargs: seen.append(response.status_code)})
+
+        self.assertEqual(seen, [200])
+
+    def test_pool_maxsize_scales_with_configured_concurrency(self):
+        self.assertEqual(CONNECTIONS_PER_TASK, ChunkedDownloader.THREAD_COUNT)
+        with patch("app.core.downloaders.http_pool.cfg.get", return_value=4):
+            self.assertEqual(configured_pool_maxsize(), 32)
+        with patch("app.core.downloaders.http_pool.cfg.get", return_value="bad"):
+            self.assertEqual(configured_pool_maxsize(), 24)
+
+
+if __name__ == "__main__":
+    unittest.main()
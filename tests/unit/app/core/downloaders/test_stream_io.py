@@ -0,0 +1,114 @@
+from __future__ import annotations
+
+import io
+import unittest
+from unittest.mock import Mock
+
+import requests
+from urllib3.exceptions import ProtocolError
+from urllib3.response import HTTPResponse
+
+from app.core.downloaders.stream_io import (
+    MAX_READ_SIZE,
+    MIN_READ_SIZE,
+    AdaptiveReadSizer,
+    ProgressThrottle,
+    iter_response_buffers,
+)
+
+
+def _response(raw) -> requests.Response:
+    response = requests.Response()
+    response.status_code = 200
+    response.raw = raw
+    return response
+
+
+class _BrokenStream(io.RawIOBase):
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, _buffer) -> int:
+        raise ProtocolError("connection reset")
+
+
+class AdaptiveReadSizerTests(unittest.TestCase):
+    def test_read_size_grows_with_throughput_and_stays_in_bounds(self):
+        sizer = AdaptiveReadSizer()
+
+        self.assertEqual(sizer.size, MIN_READ_SIZE)
+        sizer.observe(MIN_READ_SIZE, 0.0001)
+        self.assertEqual(sizer.size, MAX_READ_SIZE)
+
+    def test_slow_connection_keeps_minimum_read_size(self):
+        sizer = AdaptiveReadSizer()
+
+        for _ in range(5):
+            sizer.observe(MIN_READ_SIZE, 2.0)
+
+        self.assertEqual(sizer.size, MIN_READ_SIZE)
+
+    def test_rate_limit_caps_reads_even_when_the_socket_buffer_is_fast(self):
+        sizer = AdaptiveReadSizer()
+        sizer.observe(MIN_READ_SIZE, 0.0001)
+
+        self.assertEqual(sizer.capped(0), MAX_READ_SIZE)
+        self.assertEqual(sizer.capped(100 * 1024), MIN_READ_SIZE)
+        self.assertEqual(sizer.capped(4 * 1024 * 1024), 128 * 1024)
+
+
+class ProgressThrottleTests(unittest.TestCase):
+    def test_emits_once_per_interval_unless_forced(self):
+        now = [0.0]
+        throttle = ProgressThrottle(0.25, clock=lambda: now[0])
+
+        self.assertTrue(throttle.ready())
+        now[0] = 0.1
+        self.assertFalse(throttle.ready())
+        self.assertTrue(throttle.ready(force=True))
+        now[0] = 0.4
+        self.assertTrue(throttle.ready())
+
+
+class IterResponseBuffersTests(unittest.TestCase):
+    def test_reads_real_stream_into_reused_buffer(self):
+        body = bytes(range(256)) * 8192
+        raw = HTTPResponse(body=io.BytesIO(body), preload_content=False)
+
+        received = bytearray()
+        chunk_types = set()
+        for chunk in iter_response_buffers(_response(raw), fallback_chunk_size=8192):
+            chunk_types.add(type(chunk))
+            received.extend(chunk)
+
+        self.assertEqual(bytes(received), body)
+        self.assertEqual(chunk_types, {memoryview})
+
+    def test_rate_limiter_caps_each_read(self):
+        body = bytes(range(256)) * 8192
+        raw = HTTPResponse(body=io.BytesIO(body), preload_content=False)
+        limiter = Mock(bytes_per_second=100 * 1024)
+
+        sizes = [len(chunk) for chunk in iter_response_buffers(_response(raw), fallback_chunk_size=8192, rate_limiter=limiter)]
+
+        self.assertEqual(sum(sizes), len(body))
+        self.assertEqual(max(sizes), MIN_READ_SIZE)
+
+    def test_falls_back_to_iter_content_for_non_urllib3_responses(self):
+        response = Mock()
+        response.iter_content.return_value = iter([b"ab", b"cd"])
+
+        chunks = list(iter_response_buffers(response, fallback_chunk_size=4096))
+
+        self.assertEqual(chunks, [b"ab", b"cd"])
+        response.iter_content.assert_called_once_with(chunk_size=4096)
+
+    def test_protocol_errors_are_translated_like_iter_content(self):
+        raw = HTTPResponse(body=io.BufferedReader(_BrokenStream()), preload_content=False)
+
+        with self.assertRaises(requests.exceptions.ChunkedEncodingError):
+            list(iter_response_buffers(_response(raw), fallback_chunk_size=8192))
+
+
+if __name__ == "__main__":
+    unittest.main()
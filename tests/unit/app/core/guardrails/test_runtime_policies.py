@@ -464,19 +464,21 @@ class UIAsyncGuardrailTests(unittest.TestCase):
         self.assertIn("build_rest_router", server_text)
         self.assertNotIn("os.listdir(", server_text)
 
-    def test_cache_service_sqlite_connections_are_context_managed(self) -> None:
+    def test_cache_service_sqlite_connections_are_owned_and_closed(self) -> None:
         project_root = PROJECT_ROOT
         text = (project_root / "app" / "services" / "cache_service.py").read_text(
             encoding="utf-8",
             errors="ignore",
         )
         sqlite_lines = [line.strip() for line in text.splitlines() if "sqlite3.connect(" in line]
+        close_body = text.split("    def close(self)", 1)[1].split("\n    def ", 1)[0]
 
-        self.assertTrue(sqlite_lines)
-        self.assertNotIn("self._conn", text)
-        self.assertNotIn("self._connection", text)
-        self.assertIn("from contextlib import closing", text)
-        self.assertTrue(all(line.startswith("with closing(sqlite3.connect(") for line in sqlite_lines))
+        # 长连接只允许在按线程登记的唯一入口创建，线程退出时由终结器关闭，其余由 close() 统一关闭。
+        self.assertEqual(sqlite_lines, ["conn = sqlite3.connect("])
+        self.assertIn("self._connections.add(holder)", text)
+        self.assertIn("weakref.finalize(self, _close_connection_quietly, conn)", text)
+        self.assertIn("self._connections.clear()", close_body)
+        self.assertIn("_close_connection_quietly(conn)", close_body)
 
     def test_failed_record_store_sqlite_connections_are_context_managed(self) -> None:
         project_root = PROJECT_ROOT
@@ -1267,7 +1269,7 @@ class UIAsyncGuardrailTests(unittest.TestCase):
         emit_block = text.split("async def _emit_to_connections", 1)[1].split("    def _build_message", 1)[0]
         build_async_block = text.split("async def _build_message_async", 1)[1].split("    def _build_message", 1)[0]
 
-        self.assertIn("message = await self._build_message_async(event_type, data)", emit_block)
+        self.assertIn("message = await self._build_message_async(event_type, data, deflate=deflate)", emit_block)
         self.assertIn("run_in_executor", build_async_block)
         self.assertNotIn("message = self._build_message(event_type, data)", emit_block)
 
@@ -0,0 +1,141 @@
+"""进程级预热浏览器池：租约命中、上下文隔离、回收与冷启动回退。"""
+
+from __future__ import annotations
+
+import tempfile
+import time
+import unittest
+from unittest.mock import MagicMock, patch
+
+from app.core.anti_detection import browser_pool as browser_pool_module
+from app.core.anti_detection.browser_pool import BrowserPool, PooledBrowser, WarmBrowser, launch_key
+from app.spiders.base import BaseSpider
+
+
+class _FakeProcess:
+    def __init__(self) -> None:
+        self.pid = 0
+        self.returncode = None
+
+    def poll(self):
+        return self.returncode
+
+    def terminate(self) -> None:
+        self.returncode = -15
+
+    def wait(self, timeout=None):
+        return self.returncode
+
+    def kill(self) -> None:
+        self.returncode = -9
+
+
+class _FakePlaywright:
+    def __init__(self, executable: str) -> None:
+        self.chromium = MagicMock()
+        self.chromium.executable_path = executable
+        self.chromium.connect_over_cdp.side_effect = lambda endpoint, **_kwargs: MagicMock(endpoint=endpoint)
+
+
+class BrowserPoolTests(unittest.TestCase):
+    def setUp(self) -> None:
+        executable = tempfile.NamedTemporaryFile(delete=False)
+        executable.close()
+        self.addCleanup(lambda: __import__("os").unlink(executable.name))
+        self.playwright = _FakePlaywright(executable.name)
+        self.spawned: list[WarmBrowser] = []
+        self.settings = {("common", "browser_pool_size"): 1, ("common", "browser_pool_recycle_after"): 20}
+        cfg_patch = patch.object(
+            browser_pool_module.cfg,
+            "get",
+            lambda section, key, default=None: self.settings.get((section, key), default),
+        )
+        cfg_patch.start()
+        self.addCleanup(cfg_patch.stop)
+        self.pool = BrowserPool(spawn=self._spawn)
+        self.addCleanup(self.pool.close)
+
+    def _spawn(self, _executable: str, key) -> WarmBrowser:
+        warm = WarmBrowser(key, _FakeProcess(), f"http://127.0.0.1:{9000 + len(self.spawned)}")
+        self.spawned.append(warm)
+        return warm
+
+    def _settle(self) -> None:
+        deadline = time.monotonic() + 2
+        while self.pool.stats()["warming"] and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+    def test_second_lease_reuses_warm_process_and_closes_leased_contexts(self):
+        self.settings[("common", "browser_pool_size")] = 2
+        first = self.pool.launch(self.playwright, headless=True, args=["--flag"])
+        context = first.new_context(user_agent="ua")
+        self._settle()
+        # 池按需增长：首次租用不会在后台多启动一个进程。
+        self.assertEqual(len(self.spawned), 1)
+        first.close()
+
+        second = self.pool.launch(self.playwright, headless=True, args=["--flag"])
+        second.close()
+
+        self.assertIsInstance(first, PooledBrowser)
+        context.close.assert_called_once()
+        self.assertEqual(len(self.spawned), 1)
+        stats = self.pool.stats()
+        self.assertEqual((stats["leases"], stats["hits"], stats["misses"]), (2, 1, 1))
+        self.assertEqual(stats["hit_rate"], 0.5)
+        self.assertEqual(stats["lease_latency_ms"]["count"], 2)
+
+    def test_process_is_recycled_after_context_budget_or_failed_close(self):
+        self.settings[("common", "browser_pool_recycle_after")] = 1
+        leased = self.pool.launch(self.playwright, headless=True)
+        leased.new_context()
+        self._settle()
+        leased.close()
+        self.assertFalse(self.spawned[0].alive())
+        self._settle()
+
+        broken = self.pool.launch(self.playwright, headless=True)
+        broken.new_context().close.side_effect = RuntimeError("driver stopped")
+        broken.close()
+
+        self.assertFalse(self.spawned[1].alive())
+        self.assertEqual(self.pool.stats()["recycled"], 2)
+
+    def test_crashed_idle_process_is_replaced_on_next_lease(self):
+        leased = self.pool.launch(self.playwright, headless=False)
+        self._settle()
+        leased.close()
+        for warm in self.spawned:
+            warm.process.returncode = 1
+
+        replacement = self.pool.launch(self.playwright, headless=False)
+
+        self.assertGreaterEqual(self.pool.stats()["crashed"], 1)
+        self.assertTrue(replacement._warm.alive())
+
+    def test_unpoolable_launch_or_disabled_pool_uses_cold_launch(self):
+        self.pool.launch(self.playwright, headless=False, channel="chrome")
+        self.settings[("common", "browser_pool_size")] = 0
+        self.pool.launch(self.playwright, headless=True)
+
+        self.assertEqual(self.playwright.chromium.launch.call_count, 2)
+        self.assertEqual(self.pool.stats()["fallbacks"], 2)
+        self.assertEqual(self.spawned, [])
+        self.assertIsNone(launch_key({"headless": True, "proxy": {"server": "http://p", "username": "u"}}))
+
+    def test_spider_stop_path_returns_tracked_browser_to_pool(self):
+        spider = BaseSpider.__new__(BaseSpider)
+        with patch.object(browser_pool_module, "browser_pool", self.pool):
+            browser = spider._launch_chromium(self.playwright, headless=True, args=[])
+        spider._track_playwright_browser(browser)
+        self._settle()
+
+        spider._close_tracked_playwright_browser()
+
+        self.assertIsNone(spider._tracked_playwright_browser())
+        self.assertEqual(self.pool.stats()["leased"], 0)
+        self.assertTrue(self.spawned[0].alive())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,132 @@
+"""下载排队调度：分组轮转、优先级、图片车道与平台/主机并发上限。"""
+
+import queue
+import unittest
+
+from app.core.download_queue import LANE_HEAVY, LANE_LIGHT, PendingDownloadQueue
+from app.models import VideoItem
+
+
+def _video(name: str, *, source: str = "douyin", host: str = "cdn.example.com", group: str = "", priority: int = 0, image: bool = False) -> VideoItem:
+    suffix = "jpg" if image else "mp4"
+    item = VideoItem(url=f"https://{host}/{name}.{suffix}", title=name, source=source)
+    if group:
+        item.meta["queue_group"] = group
+    if priority:
+        item.meta["queue_priority"] = priority
+    return item
+
+
+def _titles(pending: PendingDownloadQueue, count: int) -> list[str]:
+    return [pending.get_nowait()[0].title for _ in range(count)]
+
+
+class PendingDownloadQueueTests(unittest.TestCase):
+
+    def test_groups_take_turns_instead_of_first_batch_draining_first(self):
+        pending = PendingDownloadQueue()
+        pending.put_many([(_video(f"a{index}", group="batch-a"), "downloads") for index in range(3)])
+        pending.put_many([(_video(f"b{index}", group="batch-b"), "downloads") for index in range(2)])
+
+        self.assertEqual(_titles(pending, 5), ["a0", "b0", "a1", "b1", "a2"])
+
+    def test_higher_priority_is_dispatched_first_and_can_be_raised_while_queued(self):
+        pending = PendingDownloadQueue()
+        pending.put((_video("normal"), "downloads"))
+        pending.put((_video("urgent", priority=5), "downloads"))
+        late = _video("late")
+        pending.put((late, "downloads"))
+
+        self.assertEqual(pending.set_priority([late.id], 9), 1)
+        self.assertEqual(_titles(pending, 3), ["late", "urgent", "normal"])
+
+    def test_light_lane_dispatches_while_heavy_lane_is_full(self):
+        pending = PendingDownloadQueue()
+        pending.bind_capacity(lambda: {LANE_LIGHT})
+        pending.put((_video("movie"), "downloads"))
+        pending.put((_video("cover", image=True), "downloads"))
+
+        self.assertEqual(pending.get_nowait()[0].title, "cover")
+        with self.assertRaises(queue.Empty):
+            pending.get_nowait()
+        self.assertEqual(pending.qsize(), 1)
+
+        pending.bind_capacity(lambda: {LANE_HEAVY, LANE_LIGHT})
+        self.assertEqual(pending.get_nowait()[0].title, "movie")
+
+    def test_platform_limit_parks_group_until_release(self):
+        pending = PendingDownloadQueue()
+        pending.set_limits(platform_limits={"douyin": 1})
+        pending.put_many([(_video("d0"), "downloads"), (_video("d1"), "downloads")])
+        pending.put((_video("k0", source="kuaishou"), "downloads"))
+
+        first = pending.get_nowait()[0]
+        self.assertEqual(first.title, "d0")
+        self.assertEqual(pending.get_nowait()[0].title, "k0")
+        with self.assertRaises(queue.Empty):
+            pending.get_nowait()
+        self.assertEqual(pending.stats()["parked_groups"], 1)
+
+        pending.release(first)
+        self.assertEqual(pending.get_nowait()[0].title, "d1")
+
+    def test_host_limit_applies_across_platforms(self):
+        pending = PendingDownloadQueue()
+        pending.set_limits(host_limit=1)
+        pending.put((_video("x", source="douyin", host="shared.example.com"), "downloads"))
+        pending.put((_video("y", source="kuaishou", host="shared.example.com"), "downloads"))
+        pending.put((_video("z", source="kuaishou", host="other.example.com", group="batch-z"), "downloads"))
+
+        self.assertEqual(_titles(pending, 2), ["x", "z"])
+        with self.assertRaises(queue.Empty):
+            pending.get_nowait()
+
+    def test_configured_default_and_per_platform_limits_apply_together(self):
+        from types import SimpleNamespace
+
+        from app.core.download_manager_core import DownloadManagerCore
+
+        pending = PendingDownloadQueue()
+        manager = SimpleNamespace(queue=pending)
+        applied = DownloadManagerCore.set_scheduler_limits(
+            manager,
+            platform_concurrency=2,
+            platform_concurrency_limits={"douyin": 1},
+            host_concurrency=0,
+        )
+
+        self.assertEqual(
+            applied,
+            {"platform_concurrency": 2, "platform_concurrency_limits": {"douyin": 1}, "host_concurrency": 0},
+        )
+        legacy = DownloadManagerCore.set_scheduler_limits(manager, platform_concurrency={"kuaishou": 3})
+        self.assertEqual(legacy["platform_concurrency_limits"], {"kuaishou": 3})
+        self.assertEqual(legacy["platform_concurrency"], 2)
+
+    def test_requeue_restores_original_position_and_releases_limit(self):
+        pending = PendingDownloadQueue()
+        pending.set_limits(default_platform_limit=1)
+        pending.put_many([(_video("first"), "downloads"), (_video("second"), "downloads")])
+
+        first, _save_dir = pending.get_nowait()
+        self.assertTrue(pending.requeue(first))
+        self.assertFalse(pending.requeue(first))
+
+        self.assertEqual(pending.get_nowait()[0].title, "first")
+        self.assertEqual(pending.snapshot_video_ids(), {pending.drain()[0][0].id})
+
+    def test_removed_tasks_are_skipped_and_wait_histogram_counts_dispatches(self):
+        pending = PendingDownloadQueue()
+        doomed = _video("doomed")
+        pending.put_many([(doomed, "downloads"), (_video("kept"), "downloads")])
+
+        self.assertEqual(pending.remove_videos([doomed.id]), [doomed])
+        self.assertEqual(pending.get_nowait()[0].title, "kept")
+
+        waits = pending.stats()["wait_seconds"][LANE_HEAVY]
+        self.assertEqual(waits["count"], 1)
+        self.assertEqual(sum(waits["counts"]), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -286,16 +286,16 @@ class StateAndEventTests(unittest.TestCase):
 
             self.assertIsNone(getattr(cache, "_disk_cache", None))
 
-    def test_cache_service_does_not_update_memory_when_all_persistent_writes_fail(self):
+    def test_cache_service_does_not_update_memory_when_persistent_encoding_fails(self):
         with TemporaryDirectory(ignore_cleanup_errors=True) as temp_dir:
             cache = CacheService(namespace="test-cache-consistency", cache_dir=temp_dir)
             cache.set("key", "old")
 
-            with patch.object(cache, "_write_sqlite_persistent", side_effect=RuntimeError("sqlite full")):
-                with self.assertRaises(RuntimeError):
-                    cache.set("key", "new", persist=True)
+            with self.assertRaises(TypeError):
+                cache.set("key", object(), persist=True)
 
             self.assertEqual(cache.get("key"), "old")
+            self.assertEqual(cache.stats()["pending_writes"], 0)
 
     def test_cache_service_treats_corrupt_persistent_value_as_cache_miss(self):
         with TemporaryDirectory(ignore_cleanup_errors=True) as temp_dir:
@@ -358,7 +358,7 @@ class StateAndEventTests(unittest.TestCase):
                 cache._memory_cache["key"] = "memory-value"
 
             with (
-                patch("app.services.cache_service.sqlite3.connect", side_effect=sqlite3.Error("sqlite locked")),
+                patch.object(cache, "_connection", side_effect=sqlite3.Error("sqlite locked")),
                 patch("app.services.cache_service.debug_logger.log_exception") as log_exception,
             ):
                 cache.delete("key")
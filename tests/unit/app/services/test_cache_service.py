@@ -0,0 +1,138 @@
+import sqlite3
+import threading
+import time
+from unittest.mock import patch
+
+import pytest
+
+from app.services import cache_service as cache_module
+from app.services.cache_service import CacheService
+
+
+def _stored_keys(cache: CacheService) -> set[str]:
+    with sqlite3.connect(cache._db_path) as conn:
+        return {row[0] for row in conn.execute("SELECT key FROM cache_entries")}
+
+
+@pytest.fixture
+def make_cache(tmp_path):
+    created: list[CacheService] = []
+
+    def factory(**kwargs) -> CacheService:
+        kwargs.setdefault("write_behind_seconds", 60.0)
+        cache = CacheService(namespace="test-cache", cache_dir=str(tmp_path), **kwargs)
+        created.append(cache)
+        return cache
+
+    yield factory
+    for cache in created:
+        cache.close()
+
+
+def test_persistent_writes_are_batched_behind_one_wal_connection(make_cache):
+    real_connect = sqlite3.connect
+    with patch.object(cache_module.sqlite3, "connect", side_effect=real_connect) as connect:
+        cache = make_cache()
+        for index in range(20):
+            cache.set(f"key-{index}", {"index": index}, persist=True)
+        assert cache.get("key-7") == {"index": 7}
+        rows_before_flush = cache.stats()["rows"]
+        cache.flush()
+
+    assert connect.call_count == 1
+    assert rows_before_flush == 0
+    assert len(_stored_keys(cache)) == 20
+    stats = cache.stats()
+    assert (stats["writes"], stats["flushes"], stats["pending_writes"], stats["rows"]) == (20, 1, 0, 20)
+    with sqlite3.connect(cache._db_path) as conn:
+        assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+
+
+def test_connections_of_finished_threads_are_closed(make_cache):
+    cache = make_cache()
+    cache.set("key", "value", persist=True)
+    cache.flush()
+    baseline = len(cache._connections)
+    seen: list[str] = []
+    real_connect = sqlite3.connect
+
+    with patch.object(cache_module.sqlite3, "connect", side_effect=real_connect) as connect:
+        for _round in range(5):
+            worker = threading.Thread(target=lambda: seen.append(cache._read_local_persistent("key")[0]))
+            worker.start()
+            worker.join()
+
+    assert seen == ["value"] * 5
+    assert connect.call_count == 5
+    assert len(cache._connections) == baseline
+
+
+def test_delete_revokes_queued_write_before_it_reaches_disk(make_cache):
+    cache = make_cache()
+    cache.set("key", "value", persist=True)
+
+    cache.delete("key")
+    cache.flush()
+
+    assert cache.get("key") is None
+    assert _stored_keys(cache) == set()
+
+
+def test_flush_failure_is_logged_and_drops_the_batch(make_cache):
+    cache = make_cache()
+    cache.set("key", "value", persist=True)
+
+    with (
+        patch.object(cache, "_write_sqlite_persistent", side_effect=sqlite3.OperationalError("disk full")),
+        patch.object(cache_module.debug_logger, "log_exception") as log_exception,
+    ):
+        cache.flush()
+
+    assert log_exception.call_args.args[:2] == ("CacheService", "flush_write_behind")
+    assert cache.stats()["flush_errors"] == 1
+    assert cache.stats()["pending_writes"] == 0
+
+
+def test_sweep_drops_expired_rows_then_least_recently_used(make_cache):
+    cache = make_cache(max_persistent_rows=3)
+    cache.set("expired", "gone", ttl_seconds=-1, persist=True)
+    for index in range(5):
+        cache.set(f"key-{index}", "x" * 100, persist=True)
+    cache.flush()
+    time.sleep(0.01)
+    with cache._memory_lock:
+        cache._memory_cache.pop("key-0", None)
+    assert cache.get("key-0") == "x" * 100
+
+    cache.sweep()
+
+    remaining = _stored_keys(cache)
+    assert len(remaining) == 3
+    assert "key-0" in remaining
+    assert "expired" not in remaining
+    stats = cache.stats()
+    assert (stats["expired"], stats["evicted"], stats["sweeps"]) == (1, 2, 1)
+
+
+def test_sweep_enforces_byte_budget(make_cache):
+    cache = make_cache(max_persistent_bytes=4096)
+    for index in range(8):
+        cache.set(f"blob-{index}", b"\x00" * 1024, persist=True)
+
+    cache.sweep()
+
+    assert 0 < cache.stats()["bytes"] <= 4096
+
+
+def test_immutable_values_skip_copy_and_mutable_values_stay_isolated(make_cache):
+    cache = make_cache()
+    frozen = ("video", 80, frozenset({"a"}))
+    mutable = ("video", ["nested"])
+    cache.set("frozen", frozen)
+    cache.set("mutable", mutable)
+
+    assert cache.get("frozen") is frozen
+    assert cache.get("mutable") is not mutable
+    assert cache.get("mutable") == mutable
+    stats = cache.stats()
+    assert (stats["memory_hits"], stats["misses"], stats["hit_rate"]) == (3, 0, 1.0)
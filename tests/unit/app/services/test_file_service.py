@@ -78,6 +78,41 @@ class MediaLibraryServiceTests(unittest.TestCase):
         self.assertTrue(result.truncated)
         self.assertEqual(result.original_count, 3)
 
+    def test_indexed_scan_keeps_ids_and_pages_beyond_the_window(self):
+        """索引扫描只实例化最新窗口，ID 跨服务实例保持不变，窗口外文件仍可分页取得。"""
+        from app.services.media_library_index import MediaLibraryIndex
+
+        base = os.path.join(self.temp_dir.name, "media")
+        os.makedirs(base)
+        for index in range(3):
+            path = os.path.join(base, f"video-{index}.mp4")
+            with open(path, "wb") as fp:
+                fp.write(b"test")
+            os.utime(path, (1_700_000_000 + index, 1_700_000_000 + index))
+        db_path = os.path.join(self.temp_dir.name, "library.sqlite3")
+
+        def indexed_service() -> MediaLibraryService:
+            return MediaLibraryService(
+                (".mp4",),
+                (".jpg",),
+                library_index=MediaLibraryIndex(db_path=db_path),
+            )
+
+        first = indexed_service().scan_directory(base, max_scan_count=2)
+        service = indexed_service()
+        second = service.scan_directory(base, max_scan_count=2)
+        older = service.query_library(base, page=2, page_size=2)
+
+        self.assertTrue(first.indexed and first.truncated)
+        self.assertEqual((first.total_count, first.original_count), (2, 3))
+        self.assertEqual([item.title for item in first.items], ["video-2", "video-1"])
+        self.assertEqual([item.id for item in second.items], [item.id for item in first.items])
+        self.assertEqual([entry.title for entry in older.entries], ["video-0"])
+
+        _, new_path = service.rename_media(second.items[0], "renamed", base)
+        self.assertEqual(service.query_library(base).entries[0].local_path, new_path)
+        self.assertEqual(service.query_library(base).entries[0].id, first.items[0].id)
+
     def test_rename_media_rejects_conflicting_name(self):
         """验证 `test_rename_media_rejects_conflicting_name` 对应场景是否符合预期，供 `MediaLibraryServiceTests` 使用。"""
         base = self.temp_dir.name
@@ -208,9 +243,10 @@ class MediaLibraryServiceTests(unittest.TestCase):
         file_path = os.path.join(base, "demo.mp4")
         http_temp = file_path + ".downloading"
         chunk_temp = os.path.join(base, ".demo.mp4.part0")
+        range_temp = os.path.join(base, ".demo.mp4.ranges.downloading")
         explicit_temp = os.path.join(base, "demo.custom.tmp")
         unrelated = os.path.join(base, "demo_cover.m4s")
-        for path in (file_path, http_temp, chunk_temp, explicit_temp, unrelated):
+        for path in (file_path, http_temp, chunk_temp, range_temp, explicit_temp, unrelated):
             with open(path, "wb") as fp:
                 fp.write(b"test")
         item = VideoItem(url="", title="demo", source="douyin")
@@ -223,6 +259,7 @@ class MediaLibraryServiceTests(unittest.TestCase):
         self.assertFalse(os.path.exists(file_path))
         self.assertFalse(os.path.exists(http_temp))
         self.assertFalse(os.path.exists(chunk_temp))
+        self.assertFalse(os.path.exists(range_temp))
         self.assertFalse(os.path.exists(explicit_temp))
         self.assertTrue(os.path.exists(unrelated))
 
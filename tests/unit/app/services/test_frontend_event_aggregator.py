@@ -164,3 +164,39 @@ def test_log_events_are_coalesced_but_keep_versioned_sections():
     assert len(state.pending_events) == 1
     assert state.pending_events[0]["payload"]["message"] == "second"
     assert aggregator.sections_since(base_version) == frozenset({"log_items", "app_status"})
+
+def test_row_changes_since_tracks_upserted_and_removed_ids():
+    aggregator = FrontendEventAggregator()
+
+    aggregator.record("settings.update", {"section": "download"})
+    base_version = aggregator.version
+    aggregator.record("videos.update", {"video_id": "v1", "progress": 20})
+    aggregator.record("videos.upsert_many", {"video_ids": ["v2", "v3"]})
+    aggregator.record("videos.remove", {"video_id": "v3"})
+
+    assert aggregator.row_changes_since(base_version) == {"v1": "upsert", "v2": "upsert", "v3": "remove"}
+    assert aggregator.row_changes_since(aggregator.version) == {}
+
+
+def test_list_event_without_ids_forces_section_resync():
+    aggregator = FrontendEventAggregator()
+
+    aggregator.record("videos.update", {"video_id": "v1", "progress": 20})
+    base_version = aggregator.version
+    aggregator.record("videos.replace", {"count": 2})
+    after_replace = aggregator.version
+    aggregator.record("videos.update", {"video_id": "v2", "progress": 30})
+
+    assert aggregator.row_changes_since(base_version) is None
+    assert aggregator.row_changes_since(after_replace) == {"v2": "upsert"}
+
+
+def test_truncated_row_history_forces_section_resync():
+    aggregator = FrontendEventAggregator(max_pending_events=1)
+    limit = aggregator._row_history.maxlen
+
+    for index in range(limit + 2):
+        aggregator.record("videos.update", {"video_id": f"v{index}", "progress": 1})
+
+    assert aggregator.row_changes_since(1) is None
+    assert aggregator.row_changes_since(aggregator.version - 1) == {f"v{limit + 1}": "upsert"}
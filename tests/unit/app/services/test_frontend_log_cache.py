@@ -4,7 +4,9 @@ import threading
 from pathlib import Path
 from unittest.mock import patch
 
+from app.debug_logger import _BatchedLogWriter
 from app.services.frontend_log_cache import FrontendLogCache
+from app.utils.log_sidecar import LogSidecarReader
 
 
 class FakeCacheService:
@@ -392,3 +394,90 @@ def test_tail_log_cache_hit_hydrates_reader_without_reparsing(tmp_path):
 
     assert [item["message_summary"] for item in cached] == ["cached"]
     assert [item["message_summary"] for item in updated] == ["cached", "appended"]
+
+
+def test_tail_log_reader_pages_structured_sidecar_without_parsing_text(tmp_path):
+    log_file = Path(tmp_path) / "latest_debug.log"
+    log_file.write_text("text is not parsed when a sidecar exists\n", encoding="utf-8")
+    writer = _BatchedLogWriter(flush_interval_seconds=0)
+
+    def append(action: str, level: str = "INFO") -> None:
+        record = {"time": "2026-06-30 10:00:00", "level": level, "source": "Test", "action": action}
+        text = f"[2026-06-30 10:00:00] [{level}] Test / {action}\n"
+        writer.submit((log_file,), text, (record, 0))
+
+    for index in range(5):
+        append(f"old-{index}")
+    writer.flush()
+    cache = FrontendLogCache(
+        cache_service=FakeCacheService(),
+        log_path_provider=lambda: log_file,
+        limit_provider=lambda: 100,
+    )
+    try:
+        with patch("app.services.frontend_log_cache.log_adapter.parse_debug_log_text") as parse_debug_log_text:
+            parse_debug_log_text.side_effect = AssertionError("sidecar reads must not parse text")
+            initial = cache._tail_reader.read(limit=3)
+            append("new-5", level="COMMAND")
+            writer.flush()
+            with patch.object(LogSidecarReader, "tail", side_effect=AssertionError("only new records are read")):
+                updated = cache._tail_reader.read(limit=3)
+    finally:
+        writer.close()
+
+    assert [item["action"] for item in initial] == ["old-2", "old-3", "old-4"]
+    assert [item["action"] for item in updated] == ["old-3", "old-4", "new-5"]
+    assert updated[-1]["level"] == "CMD"
+    assert updated[-1]["id"].endswith(":r5")
+
+
+def test_tail_log_reader_retails_sidecar_cleared_and_regrown_past_old_count(tmp_path):
+    log_file = Path(tmp_path) / "latest_debug.log"
+    log_file.write_text("", encoding="utf-8")
+    writer = _BatchedLogWriter(flush_interval_seconds=0)
+    clock = iter(range(1_000, 2_000))
+
+    def append(action: str) -> None:
+        record = {"time": "2026-06-30 10:00:00", "level": "INFO", "source": "Test", "action": action}
+        writer.submit((log_file,), f"[2026-06-30 10:00:00] [INFO] Test / {action}\n", (record, next(clock)))
+
+    cache = FrontendLogCache(
+        cache_service=FakeCacheService(),
+        log_path_provider=lambda: log_file,
+        limit_provider=lambda: 100,
+    )
+    try:
+        for index in range(3):
+            append(f"old-{index}")
+        writer.flush()
+        before = cache._tail_reader.read(limit=10)
+        writer.truncate((log_file,))
+        for index in range(5):
+            append(f"new-{index}")
+        writer.flush()
+        after = cache._tail_reader.read(limit=10)
+    finally:
+        writer.close()
+
+    assert [item["action"] for item in before] == ["old-0", "old-1", "old-2"]
+    assert [item["action"] for item in after] == [f"new-{index}" for index in range(5)]
+    assert not {item["id"] for item in before} & {item["id"] for item in after}
+
+
+def test_tail_log_reader_resets_when_latest_log_is_cleared(tmp_path):
+    log_file = Path(tmp_path) / "latest_debug.log"
+    log_file.write_text("[2026-06-30 10:00:00] [INFO] Test / before\n", encoding="utf-8")
+    cache = FrontendLogCache(
+        cache_service=FakeCacheService(),
+        log_path_provider=lambda: log_file,
+        limit_provider=lambda: 100,
+    )
+    reader = cache._tail_reader
+    with patch("app.services.frontend_log_cache.debug_logger") as logger:
+        logger.latest_clear_generation = 0
+        assert [item["message_summary"] for item in reader.read(limit=10)] == ["before"]
+        logger.latest_clear_generation = 1
+        with patch.object(reader, "reset", wraps=reader.reset) as reset:
+            reader.read(limit=10)
+
+    reset.assert_called_once_with()
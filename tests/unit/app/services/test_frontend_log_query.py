@@ -0,0 +1,52 @@
+from unittest.mock import patch
+
+from app.services import frontend_log_query as query_module
+from app.services.frontend_log_query import FrontendLogQueryService
+
+
+def _rows() -> list[dict]:
+    return [
+        {"id": "a", "time": "2026-06-30 10:00:00", "level": "INFO", "message": "crawl started"},
+        {"id": "b", "time": "2026-06-30 10:01:00", "level": "WARNING", "message": "slow segment"},
+        {"id": "c", "time": "2026-06-30 10:02:00", "level": "ERROR", "message": "segment failed"},
+    ]
+
+
+def test_query_returns_only_page_ids_and_window_fingerprint():
+    rows = _rows()
+    service = FrontendLogQueryService(lambda: rows)
+
+    result = service.query({"filters": {"keyword": "segment"}, "page": 1, "pageSize": 1, "sequence": 3})
+
+    assert result["status"] == "ok"
+    assert result["sequence"] == 3
+    assert result["pageIds"] == ["c"]
+    assert (result["matchedCount"], result["totalPages"], result["totalCount"]) == (2, 2, 3)
+    assert result["selectedId"] == "c"
+    assert result["itemsKey"] == {"count": 3, "first": "a", "last": "c"}
+
+
+def test_query_maps_web_level_aliases_and_reuses_index_between_requests():
+    rows = _rows()
+    service = FrontendLogQueryService(lambda: rows)
+
+    service.query({"filters": {}})
+    rows.append({"id": "d", "time": "2026-06-30 10:03:00", "level": "WARN", "message": "retrying"})
+    result = service.query({"filters": {"level": "warning"}, "pageSize": 10, "selectedId": "b"})
+
+    assert result["pageIds"] == ["d", "b"]
+    assert result["selectedId"] == "b"
+    assert service.stats()["indexed"] == 4
+
+
+def test_query_failure_is_logged_and_reported_as_error():
+    def broken_source():
+        raise RuntimeError("buffer unavailable")
+
+    service = FrontendLogQueryService(broken_source)
+
+    with patch.object(query_module.debug_logger, "log_exception") as log_exception:
+        result = service.query({"filters": {}})
+
+    assert result == {"status": "error", "message": "log query failed"}
+    assert log_exception.call_args.args[:2] == ("FrontendLogQueryService", "query")
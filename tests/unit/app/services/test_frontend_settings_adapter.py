@@ -115,6 +115,8 @@ def test_build_settings_snapshot_matches_frontend_contract_shape():
     assert snapshot["\u57fa\u7840\u8bbe\u7f6e"]["filename_template_label"] == "\u9ed8\u8ba4"
     assert snapshot["\u57fa\u7840\u8bbe\u7f6e"]["last_source"] == "bilibili"
     assert snapshot["\u4e0b\u8f7d\u8bbe\u7f6e"]["max_concurrent"] == 3
+    assert snapshot["\u4e0b\u8f7d\u8bbe\u7f6e"]["engine"] == "thread"
+    assert [option["value"] for option in snapshot["\u4e0b\u8f7d\u8bbe\u7f6e"]["_options"]["engine"]] == ["thread", "asyncio"]
     assert snapshot["\u65e5\u5fd7\u8bbe\u7f6e"]["retention_days"] == 1
     assert snapshot["\u65e5\u5fd7\u8bbe\u7f6e"]["failed_record_retention_days"] == 7
     assert "failed_record_retention_days" in snapshot["\u65e5\u5fd7\u8bbe\u7f6e"]["_options"]
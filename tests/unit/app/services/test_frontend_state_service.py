@@ -16,6 +16,7 @@ from app.services.app_state import AppState
 from app.services.failed_record_store import FailedRecordStore
 from app.services.frontend_state_service import FrontendStateService, QUEUE_STATUSES
 from app.services.media_metadata_service import MediaMetadata
+from shared.frontend_row_delta import apply_row_delta
 
 class FrontendStateServiceTests(unittest.TestCase):
     def test_external_config_change_refreshes_service_snapshot_and_delta(self):
@@ -2858,6 +2859,75 @@ class FrontendStateServiceTests(unittest.TestCase):
         self.assertIn("log_items", delta["sections"])
         self.assertNotIn("queue_items", delta["sections"])
 
+    def _row_delta_service(self):
+        queued = VideoItem(url="https://example.com/q", title="queued", source="douyin")
+        queued.status = "⏳ 等待中"
+        active = VideoItem(url="https://example.com/a", title="active", source="douyin")
+        active.status = "⏳ 下载中..."
+        active.progress = 42
+        completed = VideoItem(url="", title="done", source="local")
+        completed.status = "✅ 本地"
+        completed.progress = 100
+        completed.local_path = __file__
+        videos = {item.id: item for item in (completed, queued, active)}
+        controller = SimpleNamespace(videos=videos, _dl_manager=None, current_spider=None)
+        return FrontendStateService(controller), queued, active
+
+    def test_get_delta_sends_only_changed_rows_for_progress(self):
+        service, _queued, active = self._row_delta_service()
+        base_version = service.frontend_version
+
+        service.record_event("videos.update", {"video_id": active.id, "progress": 50})
+        delta = service.get_delta(base_version)
+
+        self.assertNotIn("active_downloads", delta["sections"])
+        self.assertIn("app_status", delta["sections"])
+        self.assertEqual(delta["rows"]["ids"], [active.id])
+        self.assertEqual(delta["rows"]["counts"], {"queue_items": 1, "active_downloads": 1, "completed_items": 1})
+        self.assertEqual(
+            [(entry["index"], entry["row"]["id"]) for entry in delta["rows"]["upserts"]["active_downloads"]],
+            [(0, active.id)],
+        )
+        self.assertNotIn("queue_items", delta["rows"]["upserts"])
+
+    def test_row_delta_moves_item_across_lists_like_full_snapshot(self):
+        service, queued, _active = self._row_delta_service()
+        cached = service.get_snapshot()
+        base_version = cached["version"]
+
+        queued.status = "⏳ 下载中..."
+        service.record_event("task_started", {"video_id": queued.id})
+        delta = service.get_delta(base_version)
+        changed = apply_row_delta(cached, delta["rows"])
+
+        expected = service.get_snapshot()
+        self.assertEqual(changed, {"queue_items", "active_downloads"})
+        for section in ("queue_items", "active_downloads", "completed_items"):
+            self.assertEqual(
+                [item["id"] for item in cached[section]],
+                [item["id"] for item in expected[section]],
+            )
+
+    def test_row_delta_falls_back_to_sections_after_list_event_without_ids(self):
+        service, _queued, _active = self._row_delta_service()
+        base_version = service.frontend_version
+
+        service.record_event("videos.replace", {"count": 3})
+        delta = service.get_delta(base_version)
+
+        self.assertIsNone(delta["rows"])
+        self.assertIn("queue_items", delta["sections"])
+
+    def test_explicitly_requested_list_section_is_returned_whole(self):
+        service, _queued, active = self._row_delta_service()
+        base_version = service.frontend_version
+
+        service.record_event("videos.update", {"video_id": active.id, "progress": 60})
+        delta = service.get_delta(base_version, sections={"active_downloads"})
+
+        self.assertIn("active_downloads", delta["sections"])
+        self.assertIsNone(delta["rows"])
+
     def test_get_delta_reports_deleted_ids(self):
         service = FrontendStateService()
         service.record_event("video_removed", {"video_id": "v1"})
@@ -0,0 +1,187 @@
+import time
+from pathlib import Path
+
+import pytest
+
+from app.services.log_history import LogHistoryIndex, decode_cursor, parse_time_bound
+from app.utils.log_sidecar import append_records, encode_record, sidecar_paths
+
+_BASE_MS = 1_790_000_000_000
+
+
+def _append_session(path: Path, records: list[dict], *, start_ms: int = _BASE_MS) -> None:
+    path.touch()
+    body, index = sidecar_paths(path)
+    with body.open("ab") as body_handle, index.open("ab") as index_handle:
+        append_records(
+            body_handle,
+            index_handle,
+            [encode_record(record, timestamp_ms=start_ms + offset * 1000) for offset, record in enumerate(records)],
+        )
+
+
+def _records(count: int) -> list[dict]:
+    return [
+        {
+            "time": f"2026-10-16 10:00:{number:02d}",
+            "level": "ERROR" if number % 4 == 0 else "INFO",
+            "source": "DouyinSpider" if number % 2 else "DownloadWorker",
+            "action": "fetch",
+            "message": f"下载失败 segment{number} timeout",
+            "trace_id": f"trace-{number % 3}",
+        }
+        for number in range(count)
+    ]
+
+
+@pytest.fixture
+def make_index(tmp_path):
+    created: list[LogHistoryIndex] = []
+
+    def factory(**kwargs) -> LogHistoryIndex:
+        index = LogHistoryIndex(logs_dir=tmp_path, **kwargs)
+        created.append(index)
+        return index
+
+    yield factory
+    for index in created:
+        index.close()
+
+
+def test_sync_ingests_sidecar_sessions_incrementally(tmp_path, make_index):
+    session = tmp_path / "debug_20261016_100000_MainProcess.log"
+    _append_session(session, _records(10))
+    index = make_index()
+
+    assert index.sync() == {"files": 1, "ingested": 10, "pruned": 0}
+    _append_session(session, _records(2), start_ms=_BASE_MS + 60_000)
+    assert index.sync()["ingested"] == 2
+    assert index.sync()["ingested"] == 0
+    assert index.stats()["records"] == 12
+
+
+def test_display_level_matches_the_live_dropdown_exactly(tmp_path, make_index):
+    from app.services.frontend_log_query import search_log_history
+
+    _append_session(
+        tmp_path / "debug_20261016_100000_MainProcess.log",
+        [
+            {"level": "INFO", "source": "DownloadWorker", "action": "finish", "message": "下载完成", "status_code": "DL_SUCCESS"},
+            {"level": "INFO", "source": "DownloadWorker", "action": "fetch", "message": "下载失败 segment timeout"},
+            {"level": "WARNING", "source": "DownloadWorker", "action": "retry", "message": "retry"},
+            {"level": "ERROR", "source": "DownloadWorker", "action": "merge", "message": "merge"},
+        ],
+    )
+    index = make_index()
+    index.sync()
+
+    def numbers(result):
+        return sorted(int(item["id"].rsplit(":", 1)[1]) for item in result["items"])
+
+    assert numbers(index.search(display_level="SUCCESS")) == [0]
+    assert numbers(index.search(display_level="ok")) == [0]
+    assert numbers(index.search(display_level="ERROR")) == [1, 3]
+    assert numbers(index.search(display_level="WARN")) == [2]
+    assert numbers(index.search(level="warn")) == [2, 3]
+    assert numbers(search_log_history({"level": "SUCCESS"}, index=index)) == [0]
+    with pytest.raises(ValueError, match="invalid level"):
+        index.search(display_level="verbose")
+
+
+def test_index_from_an_older_schema_is_rebuilt(tmp_path, make_index):
+    import sqlite3
+
+    _append_session(tmp_path / "debug_20261016_100000_MainProcess.log", _records(3))
+    conn = sqlite3.connect(tmp_path / "log_history.db")
+    conn.execute("CREATE TABLE log_records (id INTEGER PRIMARY KEY, level TEXT)")
+    conn.execute("CREATE TABLE log_files (name TEXT PRIMARY KEY, records INTEGER)")
+    conn.commit()
+    conn.close()
+
+    index = make_index()
+
+    assert index.sync()["ingested"] == 3
+    assert len(index.search(display_level="ERROR")["items"]) == 3
+
+
+def test_search_pages_newest_first_with_cursor_and_filters(tmp_path, make_index):
+    _append_session(tmp_path / "debug_20261016_100000_MainProcess.log", _records(12))
+    index = make_index()
+    index.sync()
+
+    first = index.search(text="失败 timeout", level="error", limit=2)
+    second = index.search(text="失败 timeout", level="error", limit=2, cursor=first["next_cursor"])
+
+    assert [item["id"] for item in first["items"]] == [
+        "history:debug_20261016_100000_MainProcess.log:8",
+        "history:debug_20261016_100000_MainProcess.log:4",
+    ]
+    assert [item["id"] for item in second["items"]] == ["history:debug_20261016_100000_MainProcess.log:0"]
+    assert second["next_cursor"] == ""
+    assert {item["trace_id"] for item in index.search(trace_id="trace-1")["items"]} == {"trace-1"}
+    assert {item["platform_id"] for item in index.search(platform="抖音")["items"]} == {"douyin"}
+    assert len(index.search(since=_BASE_MS / 1000 + 10)["items"]) == 2
+
+
+def test_legacy_text_sessions_are_parsed_once_and_pruned_with_retention(tmp_path, make_index):
+    legacy = tmp_path / "debug_20261001_090000_MainProcess.log"
+    legacy.write_text(
+        "-" * 88 + "\n"
+        "[2026-10-01 09:00:00] [WARN] DownloadWorker / retry\n"
+        "说明: 网络重试 connection reset\n"
+        "追踪ID: bili_trace_9\n",
+        encoding="utf-8",
+    )
+    index = make_index()
+
+    assert index.sync()["ingested"] == 1
+    assert index.sync()["ingested"] == 0
+    assert [item["trace_id"] for item in index.search(text="重试")["items"]] == ["bili_trace_9"]
+
+    legacy.unlink()
+
+    assert index.sync()["pruned"] == 1
+    assert index.search(text="重试")["items"] == []
+
+
+def test_large_text_sessions_are_parsed_in_record_aligned_blocks(tmp_path, make_index, monkeypatch):
+    from app.services import log_history
+
+    monkeypatch.setattr(log_history, "_TEXT_BLOCK_BYTES", 200)
+    legacy = tmp_path / "debug_20261001_090000_MainProcess.log"
+    legacy.write_text(
+        "".join(
+            f"[2026-10-01 09:00:{number:02d}] [INFO] DownloadWorker / fetch\n"
+            f"说明: segment {number} fetched\n"
+            f"追踪ID: trace_{number}\n"
+            for number in range(30)
+        ),
+        encoding="utf-8",
+    )
+    index = make_index()
+
+    assert index.sync()["ingested"] == 30
+    [item] = index.search(trace_id="trace_17")["items"]
+    assert item["id"] == "history:debug_20261001_090000_MainProcess.log:17"
+    assert item["message"] == "segment 17 fetched"
+    assert "trace_17" in item["detail"]
+
+
+def test_current_session_is_excluded(tmp_path, make_index):
+    current = tmp_path / "debug_20261016_110000_MainProcess.log"
+    _append_session(current, _records(3))
+    index = make_index(exclude=lambda: (current,))
+
+    assert index.sync()["ingested"] == 0
+
+
+def test_invalid_cursor_and_time_bound_raise_value_error(make_index):
+    index = make_index()
+
+    with pytest.raises(ValueError):
+        index.search(cursor="not a cursor")
+    with pytest.raises(ValueError):
+        parse_time_bound("yesterday")
+    with pytest.raises(ValueError):
+        decode_cursor("")
+    assert parse_time_bound("2h", now=time.time()) <= int((time.time() - 7200) * 1000) + 1000
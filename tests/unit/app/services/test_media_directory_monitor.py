@@ -1,6 +1,55 @@
+import os
 import unittest
+from types import SimpleNamespace
+from unittest.mock import patch
 
-from app.services.media_directory_monitor import MediaDirectoryMonitor
+from app.services import media_directory_monitor as monitor_module
+from app.services.media_directory_monitor import MediaDirectoryMonitor, MediaEntryChanges
+
+
+class _FakeEmitter:
+    def __init__(self, watch: str) -> None:
+        self.watch = watch
+        self.alive = True
+
+    def is_alive(self) -> bool:
+        return self.alive
+
+
+class _FakeObserver:
+    """Stands in for watchdog's Observer; tests drive the scheduled handler directly."""
+
+    instances: list["_FakeObserver"] = []
+
+    def __init__(self) -> None:
+        self.daemon = False
+        self.handler = None
+        self.scheduled: dict[str, _FakeEmitter] = {}
+        self.unscheduled: list[str] = []
+        _FakeObserver.instances.append(self)
+
+    @property
+    def emitters(self) -> set[_FakeEmitter]:
+        return set(self.scheduled.values())
+
+    def start(self) -> None:
+        return
+
+    def stop(self) -> None:
+        return
+
+    def schedule(self, handler, path: str, recursive: bool = False) -> str:
+        self.handler = handler
+        self.scheduled[path] = _FakeEmitter(path)
+        return path
+
+    def unschedule(self, watch: str) -> None:
+        self.unscheduled.append(watch)
+        del self.scheduled[watch]
+
+
+def _file_event(path: str, dest_path: str = "", *, is_directory: bool = False) -> SimpleNamespace:
+    return SimpleNamespace(src_path=path, dest_path=dest_path, is_directory=is_directory)
 
 
 class MediaDirectoryMonitorTests(unittest.TestCase):
@@ -74,6 +123,194 @@ class MediaDirectoryMonitorTests(unittest.TestCase):
         first.close()
         second.close()
 
+    def test_entry_subscribers_receive_coalesced_per_file_diffs(self):
+        state = {"signature": (1, 1, 0, 1), "files": {"a.mp4": (1, 10), "b.mp4": (2, 20)}}
+        now = [100.0]
+        batches: list[MediaEntryChanges] = []
+        coarse: list[str] = []
+        listings: list[str] = []
+
+        def snapshot(path: str):
+            listings.append(path)
+            return dict(state["files"])
+
+        monitor = MediaDirectoryMonitor(
+            signature_provider=lambda _path: state["signature"],
+            entry_snapshot_provider=snapshot,
+            native=False,
+            clock=lambda: now[0],
+            auto_start=False,
+        )
+        handle = monitor.watch(["D:/media"], coarse.append, on_entries=batches.append)
+        monitor.poll_once()
+        monitor.poll_once()
+        self.assertEqual(len(listings), 1)
+
+        state["signature"] = (2, 1, 0, 1)
+        state["files"] = {"a.mp4": (5, 11), "c.mp4": (3, 30)}
+        monitor.poll_once()
+        now[0] += 0.25
+        state["signature"] = (3, 1, 0, 1)
+        state["files"] = {"a.mp4": (5, 11), "d.mp4": (4, 40)}
+        monitor.poll_once()
+        self.assertEqual(batches, [])
+
+        now[0] += 0.5
+        monitor.poll_once()
+
+        self.assertEqual(coarse, [])
+        self.assertEqual(len(listings), 3)
+        [changes] = batches
+        self.assertEqual([path[-5:] for path in changes.added], ["d.mp4"])
+        self.assertEqual([path[-5:] for path in changes.removed], ["b.mp4"])
+        self.assertEqual([path[-5:] for path in changes.modified], ["a.mp4"])
+        handle.close()
+
+    def test_unreadable_listing_and_large_batches_overflow_to_full_rescan(self):
+        state = {"signature": (1, 1, 0, 1), "files": {}}
+        batches: list[MediaEntryChanges] = []
+        monitor = MediaDirectoryMonitor(
+            signature_provider=lambda _path: state["signature"],
+            entry_snapshot_provider=lambda _path: state["files"],
+            native=False,
+            auto_start=False,
+        )
+        monitor.MAX_BATCH_ENTRIES = 2
+        handle = monitor.watch(["D:/media"], lambda _path: None, on_entries=batches.append)
+        monitor.poll_once()
+
+        state["signature"] = (2, 1, 0, 1)
+        state["files"] = {f"{number}.mp4": (1, number) for number in range(3)}
+        monitor.poll_once()
+        monitor.flush_entry_changes(force=True)
+        state["signature"] = (3, 1, 0, 1)
+        state["files"] = None
+        monitor.poll_once()
+        monitor.flush_entry_changes(force=True)
+
+        self.assertEqual([(changes.overflow, len(changes)) for changes in batches], [(True, 0), (True, 0)])
+        handle.close()
+
+    def _native_monitor(self, now: list[float], polled: list[str]) -> tuple[MediaDirectoryMonitor, list[_FakeObserver]]:
+        _FakeObserver.instances.clear()
+        patcher = patch.object(monitor_module, "Observer", _FakeObserver)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        def signature(path: str):
+            polled.append(path)
+            return (1, 1, 0, 1)
+
+        monitor = MediaDirectoryMonitor(
+            signature_provider=signature,
+            entry_snapshot_provider=lambda _path: {},
+            native=True,
+            clock=lambda: now[0],
+            auto_start=False,
+        )
+        return monitor, _FakeObserver.instances
+
+    def test_native_file_events_coalesce_into_net_batches(self):
+        now = [10.0]
+        polled: list[str] = []
+        batches: list[MediaEntryChanges] = []
+        monitor, observers = self._native_monitor(now, polled)
+        handle = monitor.watch(["D:/media"], lambda _path: None, on_entries=batches.append)
+        [observer] = observers
+        [directory] = monitor.native_paths
+        handler = observer.handler
+        self.assertIsInstance(handler, monitor_module._NativeEventHandler)
+
+        handler.on_created(_file_event(os.path.join(directory, "a.mp4")))
+        handler.on_moved(_file_event(os.path.join(directory, "a.mp4"), os.path.join(directory, "b.mp4")))
+        handler.on_created(_file_event(os.path.join(directory, "tmp.part")))
+        handler.on_deleted(_file_event(os.path.join(directory, "tmp.part")))
+        handler.on_modified(_file_event(os.path.join(directory, "old.mp4")))
+        handler.on_created(_file_event(os.path.join(directory, "sub"), is_directory=True))
+        monitor.record_entry_event("added", os.path.join(directory, "nested", "x.mp4"))
+        monitor.poll_once()
+        self.assertEqual(batches, [])
+
+        now[0] += monitor.COALESCE_QUIET_SECONDS
+        monitor.flush_entry_changes()
+
+        self.assertEqual(polled, [])
+        [changes] = batches
+        self.assertEqual([path[-5:] for path in changes.added], ["b.mp4"])
+        self.assertEqual(changes.removed, ())
+        self.assertEqual([path[-7:] for path in changes.modified], ["old.mp4"])
+        handle.close()
+        self.assertEqual(observer.unscheduled, [directory])
+
+    def test_native_event_bursts_overflow_to_full_rescan(self):
+        now = [10.0]
+        batches: list[MediaEntryChanges] = []
+        monitor, observers = self._native_monitor(now, [])
+        monitor.MAX_BATCH_ENTRIES = 2
+        handle = monitor.watch(["D:/media"], lambda _path: None, on_entries=batches.append)
+        [directory] = monitor.native_paths
+
+        for number in range(3):
+            observers[0].handler.on_created(_file_event(os.path.join(directory, f"{number}.mp4")))
+        now[0] += monitor.COALESCE_MAX_SECONDS
+        monitor.flush_entry_changes()
+
+        self.assertEqual([(changes.overflow, len(changes)) for changes in batches], [(True, 0)])
+        handle.close()
+
+    def test_deleted_native_directory_returns_to_polling(self):
+        now = [10.0]
+        polled: list[str] = []
+        batches: list[MediaEntryChanges] = []
+        monitor, observers = self._native_monitor(now, polled)
+        handle = monitor.watch(["D:/media"], lambda _path: None, on_entries=batches.append)
+        [observer] = observers
+        [directory] = monitor.native_paths
+
+        observer.handler.on_deleted(_file_event(directory, is_directory=True))
+        self.assertEqual(monitor.native_paths, frozenset())
+        monitor._sync_native_watches()
+        monitor.poll_once()
+        monitor.flush_entry_changes(force=True)
+
+        self.assertEqual(observer.unscheduled, [directory])
+        self.assertEqual(observer.scheduled, {})
+        self.assertEqual(polled, [directory])
+        self.assertEqual([changes.overflow for changes in batches], [True])
+        handle.close()
+
+    def test_native_watch_whose_emitter_died_returns_to_polling(self):
+        now = [10.0]
+        polled: list[str] = []
+        batches: list[MediaEntryChanges] = []
+        monitor, observers = self._native_monitor(now, polled)
+        handle = monitor.watch(["D:/media", "D:/album"], lambda _path: None, on_entries=batches.append)
+        [observer] = observers
+        album = next(path for path in monitor.native_paths if path.endswith("album"))
+
+        observer.scheduled[album].alive = False
+        monitor._sync_native_watches()
+        monitor.poll_once()
+        monitor.flush_entry_changes(force=True)
+
+        self.assertEqual(observer.unscheduled, [album])
+        self.assertNotIn(album, monitor.native_paths)
+        self.assertEqual(len(monitor.native_paths), 1)
+        self.assertEqual(polled, [album])
+        self.assertEqual([(changes.directory, changes.overflow) for changes in batches], [(album, True)])
+        handle.close()
+
+    def test_merging_batches_keeps_only_the_net_change_per_file(self):
+        first = MediaEntryChanges("media", added=("new",), removed=("gone",), modified=("edit",))
+        later = MediaEntryChanges("media", added=("gone",), removed=("new", "edit"), modified=("other",))
+
+        merged = first.merge(later)
+
+        self.assertEqual(merged.added, ())
+        self.assertEqual(merged.removed, ("edit",))
+        self.assertEqual(merged.modified, ("gone", "other"))
+        self.assertTrue(first.merge(MediaEntryChanges("media", overflow=True)).overflow)
+
 
 if __name__ == "__main__":
     unittest.main()
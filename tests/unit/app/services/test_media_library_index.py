@@ -0,0 +1,135 @@
+import os
+from pathlib import Path
+
+import pytest
+
+from app.services.media_library_index import MediaLibraryIndex, library_path_key
+from app.services.media_metadata_service import MediaMetadata, _CacheKey
+from app.services.media_metadata_store import MediaMetadataStore
+
+_VIDEO = (".mp4", ".mkv")
+_IMAGE = (".jpg",)
+
+
+def _write(path: Path, size: int, mtime: int) -> Path:
+    path.write_bytes(b"x" * size)
+    os.utime(path, (mtime, mtime))
+    return path
+
+
+def _sync(index: MediaLibraryIndex, directory: Path):
+    return index.sync_directory(str(directory), video_extensions=_VIDEO, image_extensions=_IMAGE)
+
+
+@pytest.fixture
+def library(tmp_path):
+    media = tmp_path / "downloads"
+    media.mkdir()
+    return media, MediaLibraryIndex(db_path=tmp_path / "library.sqlite3")
+
+
+def test_sync_is_incremental_and_ids_survive_restart(tmp_path, library):
+    media, index = library
+    for number in range(5):
+        _write(media / f"clip{number}.mp4", 10 + number, 1_700_000_000 + number)
+    _write(media / "cover.jpg", 3, 1_700_000_100)
+    (media / "notes.txt").write_text("skip", encoding="utf-8")
+
+    first = _sync(index, media)
+    ids = {entry.local_path: entry.id for entry in index.query(str(media), page_size=50).entries}
+    _write(media / "clip0.mp4", 99, 1_700_000_200)
+    (media / "clip1.mp4").unlink()
+    second = _sync(index, media)
+    reopened = MediaLibraryIndex(db_path=tmp_path / "library.sqlite3")
+
+    assert (first.total_count, first.video_count, first.image_count, first.added) == (6, 5, 1, 6)
+    assert (second.added, second.updated, second.removed, second.total_count) == (0, 1, 1, 5)
+    assert not _sync(reopened, media).changed
+    assert {entry.local_path: entry.id for entry in reopened.query(str(media), page_size=50).entries} == {
+        path: video_id for path, video_id in ids.items() if not path.endswith("clip1.mp4")
+    }
+
+
+def test_external_rename_keeps_the_id_of_the_vanished_file(library):
+    media, index = library
+    original = _write(media / "before.mp4", 42, 1_700_000_000)
+    _sync(index, media)
+    [entry] = index.query(str(media)).entries
+
+    original.rename(media / "after.mp4")
+    result = _sync(index, media)
+    [renamed] = index.query(str(media)).entries
+
+    assert (result.renamed, result.added, result.removed) == (1, 0, 0)
+    assert (renamed.id, renamed.title) == (entry.id, "after")
+
+
+def test_query_sorts_filters_and_clamps_pages(library):
+    media, index = library
+    _write(media / "Beta.mp4", 30, 1_700_000_003)
+    _write(media / "alpha.mkv", 10, 1_700_000_001)
+    _write(media / "gamma 100%.mp4", 20, 1_700_000_002)
+    _write(media / "poster.jpg", 5, 1_700_000_004)
+    _sync(index, media)
+
+    assert [entry.title for entry in index.query(str(media), sort="title", descending=False).entries] == [
+        "alpha",
+        "Beta",
+        "gamma 100%",
+        "poster",
+    ]
+    by_size = index.query(str(media), sort="size", content_type="video", page=9, page_size=2)
+    assert (by_size.page, by_size.total_pages, by_size.total_count) == (2, 2, 3)
+    assert [entry.title for entry in by_size.entries] == ["alpha"]
+    assert [entry.title for entry in index.query(str(media), keyword="100%").entries] == ["gamma 100%"]
+    assert index.query(str(media), keyword="a_").total_count == 0
+    with pytest.raises(ValueError):
+        index.query(str(media), sort="duration")
+
+
+def test_page_entries_carry_probed_metadata_and_app_mutations_update_rows(tmp_path, library):
+    media, _unused = library
+    store = MediaMetadataStore(db_path=tmp_path / "metadata.sqlite3")
+    index = MediaLibraryIndex(db_path=tmp_path / "with_metadata.sqlite3", metadata_store=store)
+    clip = _write(media / "clip.mp4", 8, 1_700_000_000)
+    _sync(index, media)
+    stat = clip.stat()
+    store.put(_CacheKey(str(clip), stat.st_size, stat.st_mtime_ns), MediaMetadata(duration="00:42", resolution="1920x1080"))
+
+    [entry] = index.query(str(media)).entries
+    renamed = media / "renamed.mp4"
+    clip.rename(renamed)
+    index.rename_path(str(clip), str(renamed))
+
+    assert (entry.duration, entry.resolution) == ("00:42", "1920x1080")
+    assert index.entries_by_id([entry.id])[entry.id].local_path == str(renamed)
+    assert index.remove_paths([str(renamed)]) == 1
+    assert index.count(str(media)) == 0
+
+
+def test_apply_changes_touches_only_reported_files_and_keeps_rename_ids(library):
+    media, index = library
+    _write(media / "kept.mp4", 7, 1_700_000_000)
+    moved = _write(media / "moved.mp4", 9, 1_700_000_001)
+    _sync(index, media)
+    ids = {entry.title: entry.id for entry in index.query(str(media)).entries}
+
+    renamed = moved.rename(media / "renamed.mp4")
+    fresh = _write(media / "fresh.jpg", 3, 1_700_000_002)
+    entries = index.apply_changes(
+        str(media),
+        upserts=[
+            (str(path), path.stat().st_size, path.stat().st_mtime_ns)
+            for path in (renamed, fresh, media / "notes.txt")
+            if path.exists()
+        ],
+        removed=[str(moved)],
+        video_extensions=_VIDEO,
+        image_extensions=_IMAGE,
+    )
+
+    assert sorted(entry.title for entry in entries.values()) == ["fresh", "renamed"]
+    assert entries[library_path_key(renamed)].id == ids["moved"]
+    assert entries[library_path_key(fresh)].content_type == "image"
+    assert {entry.title: entry.id for entry in index.query(str(media)).entries}["kept"] == ids["kept"]
+    assert index.count(str(media)) == 3
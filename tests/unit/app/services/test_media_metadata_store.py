@@ -0,0 +1,137 @@
+from __future__ import annotations
+
+import os
+import subprocess
+import threading
+import time
+import unittest
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from unittest.mock import Mock
+
+from app.services.media_metadata_service import MediaMetadata, MediaMetadataService, _CacheKey
+from app.services.media_metadata_store import MediaMetadataStore
+
+FFPROBE_OUTPUT = '{"format":{"duration":"12","format_name":"mp4"},"streams":[{"codec_type":"video","width":640,"height":360}]}'
+METADATA = MediaMetadata(duration="00:00:12", resolution="640 x 360", format="MP4", content_type="video")
+
+
+class MediaMetadataStoreTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self._tmp = TemporaryDirectory()
+        self.root = Path(self._tmp.name)
+        self.now = 100.0
+        self.store = MediaMetadataStore(db_path=self.root / "meta.sqlite3", max_entries=2, clock=lambda: self.now)
+
+    def tearDown(self) -> None:
+        self._tmp.cleanup()
+
+    def _media(self, name: str, payload: bytes = b"media") -> _CacheKey:
+        path = self.root / name
+        path.write_bytes(payload)
+        return MediaMetadataService._cache_key(path)
+
+    def test_bulk_lookup_validates_size_and_mtime(self):
+        first = self._media("a.mp4")
+        second = self._media("b.mp4")
+        self.store.put_many([(first, METADATA), (second, METADATA)])
+        changed = _CacheKey(second.path, second.size + 1, second.mtime_ns)
+
+        found, stale = self.store.get_many([first, changed])
+
+        self.assertEqual(found, {first.path: METADATA})
+        self.assertEqual(stale, [second.path])
+
+    def test_empty_metadata_is_not_persisted(self):
+        key = self._media("a.mp4")
+
+        self.store.put(key, MediaMetadata(format="MP4", content_type="video"))
+
+        self.assertEqual(self.store.count(), 0)
+
+    def test_least_recently_used_entry_is_evicted_over_cap(self):
+        first = self._media("a.mp4")
+        second = self._media("b.mp4")
+        third = self._media("c.mp4")
+        self.store.put(first, METADATA)
+        self.now += 1
+        self.store.put(second, METADATA)
+        self.now += 1
+        self.store.touch([first.path])
+        self.now += 1
+
+        self.store.put(third, METADATA)
+
+        found, _stale = self.store.get_many([first, second, third])
+        self.assertEqual(sorted(found), [first.path, third.path])
+
+    def test_sweep_removes_missing_and_changed_files(self):
+        kept = self._media("a.mp4")
+        changed = self._media("b.mp4")
+        missing = self._media("c.mp4")
+        store = MediaMetadataStore(db_path=self.root / "sweep.sqlite3")
+        store.put_many([(kept, METADATA), (changed, METADATA), (missing, METADATA)])
+        Path(changed.path).write_bytes(b"longer media")
+        os.remove(missing.path)
+
+        self.assertEqual(store.sweep(), 2)
+        self.assertEqual(store.count(), 1)
+
+
+class MediaMetadataServicePersistenceTests(unittest.TestCase):
+    def test_warm_restart_reads_metadata_without_probing(self):
+        with TemporaryDirectory() as tmp:
+            db_path = Path(tmp) / "meta.sqlite3"
+            path = Path(tmp) / "clip.mp4"
+            path.write_bytes(b"media")
+            done = threading.Event()
+            runner = Mock(return_value=subprocess.CompletedProcess([], 0, stdout=FFPROBE_OUTPUT, stderr=""))
+            first = MediaMetadataService(
+                ffprobe_resolver=lambda: "ffprobe",
+                runner=runner,
+                store=MediaMetadataStore(db_path=db_path),
+            )
+            try:
+                self.assertTrue(first.ensure_probe(path, lambda _metadata: done.set()))
+                self.assertTrue(done.wait(2))
+            finally:
+                first.shutdown(wait=True)
+
+            restarted_runner = Mock()
+            second = MediaMetadataService(
+                ffprobe_resolver=lambda: "ffprobe",
+                runner=restarted_runner,
+                store=MediaMetadataStore(db_path=db_path),
+            )
+            try:
+                warmed = second.cached_many([path])
+                self.assertEqual(second.prefetch([path]), 0)
+                self.assertEqual(second.cached(path), METADATA)
+            finally:
+                second.shutdown(wait=True)
+
+        self.assertEqual(warmed, {str(path): METADATA})
+        self.assertEqual(runner.call_count, 1)
+        restarted_runner.assert_not_called()
+
+    def test_changed_file_misses_persistent_entry(self):
+        with TemporaryDirectory() as tmp:
+            store = MediaMetadataStore(db_path=Path(tmp) / "meta.sqlite3")
+            path = Path(tmp) / "clip.mp4"
+            path.write_bytes(b"media")
+            store.put(MediaMetadataService._cache_key(path), METADATA)
+            path.write_bytes(b"re-encoded media")
+            service = MediaMetadataService(ffprobe_resolver=lambda: None, store=store)
+            try:
+                self.assertIsNone(service.cached(path))
+                deadline = time.monotonic() + 2
+                while store.count() and time.monotonic() < deadline:
+                    time.sleep(0.01)
+            finally:
+                service.shutdown(wait=True)
+
+            self.assertEqual(store.count(), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
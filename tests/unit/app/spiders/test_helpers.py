@@ -383,6 +383,31 @@ class SpiderHelperTests(unittest.TestCase):
             ("https://cdn.example.com/video.m4s", "https://cdn.example.com/audio.m4s", 80),
         )
 
+    def test_bilibili_parser_collects_backup_mirrors_for_first_streams(self):
+        parser = BilibiliParser()
+
+        mirrors = parser.parse_play_backup_urls(
+            {
+                "code": 0,
+                "data": {
+                    "dash": {
+                        "video": [
+                            {
+                                "baseUrl": "https://cdn.example.com/video.m4s",
+                                "backupUrl": ["https://bak1.example.com/video.m4s", ""],
+                            }
+                        ],
+                        "audio": [{"baseUrl": "https://cdn.example.com/audio.m4s", "backup_url": None}],
+                    }
+                },
+            }
+        )
+
+        self.assertEqual(
+            mirrors,
+            {"video_backup_urls": ["https://bak1.example.com/video.m4s"], "audio_backup_urls": []},
+        )
+
     def test_bilibili_spider_formats_second_stage_choice_with_parent_context(self):
         """第二层候选必须带父级标题，避免终端只显示裸 `[01] 标题`。"""
         title = BilibiliSpider._format_episode_choice(
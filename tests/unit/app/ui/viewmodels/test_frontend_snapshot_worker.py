@@ -58,6 +58,74 @@ class FrontendSnapshotWorkerTests(unittest.TestCase):
         self.assertEqual(result.changed_sections, {"active_downloads", "app_status"})
         self.assertFalse(result.skip_render)
 
+    def _row_delta_request(self, rows):
+        class FakeService:
+            def __init__(self):
+                self.snapshot_calls = []
+
+            def get_delta(self, since_version=0, sections=None):
+                return {
+                    "version": 5,
+                    "base_version": since_version,
+                    "full": False,
+                    "changed_sections": ["active_downloads", "app_status"],
+                    "sections": {"app_status": {"active_count": 1}},
+                    "rows": rows,
+                }
+
+            def get_snapshot(self, *, mock=False, sections=None):
+                self.snapshot_calls.append(sections)
+                return {"queue_items": [], "active_downloads": [{"id": "v1", "progress": 90}], "version": 5}
+
+        service = FakeService()
+        request = FrontendSnapshotRequest(
+            sequence=1,
+            service=service,
+            service_token=id(service),
+            mock=False,
+            sections=None,
+            cached_snapshot={
+                "version": 4,
+                "queue_items": [{"id": "q1"}],
+                "active_downloads": [{"id": "v1", "progress": 10}],
+                "completed_items": [],
+                "app_status": {"active_count": 1},
+            },
+            section_signatures={"active_downloads": "stale"},
+            use_delta=True,
+            base_version=4,
+        )
+        return service, request
+
+    def test_build_frontend_snapshot_merges_row_delta_without_refetching_lists(self):
+        service, request = self._row_delta_request(
+            {
+                "sections": ["queue_items", "active_downloads", "completed_items"],
+                "ids": ["v1"],
+                "upserts": {"active_downloads": [{"index": 0, "row": {"id": "v1", "progress": 40}}]},
+                "counts": {"queue_items": 1, "active_downloads": 1, "completed_items": 0},
+            }
+        )
+
+        result = build_frontend_snapshot(request)
+
+        self.assertEqual(service.snapshot_calls, [])
+        self.assertEqual(result.snapshot["active_downloads"], [{"id": "v1", "progress": 40}])
+        self.assertEqual(result.snapshot["queue_items"], [{"id": "q1"}])
+        self.assertEqual(result.changed_sections, {"active_downloads", "app_status"})
+        self.assertNotIn("active_downloads", result.section_signatures)
+
+    def test_build_frontend_snapshot_resyncs_when_row_counts_drift(self):
+        service, request = self._row_delta_request(
+            {"sections": ["queue_items"], "ids": [], "upserts": {}, "counts": {"queue_items": 3}}
+        )
+
+        result = build_frontend_snapshot(request)
+
+        self.assertEqual(service.snapshot_calls, [None])
+        self.assertIsNone(result.changed_sections)
+        self.assertEqual(result.snapshot["active_downloads"], [{"id": "v1", "progress": 90}])
+
     def test_build_frontend_snapshot_fetches_explicit_section_when_delta_is_current(self):
         class FakeService:
             def __init__(self):
@@ -4,6 +4,7 @@ import threading
 
 from shared.log_platforms import builtin_platform_metas
 from shared.log_classification import CLASSIFICATION_FACTS_KEY
+from shared.log_query_index import LogQueryIndex
 from app.ui.viewmodels.log_query_worker import LogQueryRequest, LogQueryWorker, query_log_items
 
 
@@ -194,3 +195,20 @@ def test_log_query_worker_delivers_latest_result_after_rapid_submits():
         worker.shutdown()
 
     assert received[-1] == 2
+
+
+def test_query_log_items_with_persistent_index_only_indexes_appended_rows():
+    rows = [
+        {"id": f"row-{index}", "time": f"2026-06-30 10:{index:02d}:00", "level": "INFO", "message": f"task {index}"}
+        for index in range(6)
+    ]
+    index = LogQueryIndex()
+
+    first = query_log_items(_request(rows[:4], keyword="task"), index)
+    second = query_log_items(_request(rows[1:], keyword="task"), index)
+
+    assert [item["id"] for item in first.page_items] == ["row-3", "row-2"]
+    assert [item["id"] for item in second.page_items] == ["row-5", "row-4"]
+    assert second.matched_count == 5
+    assert index.stats()["indexed"] == 6
+    assert second.page_items == query_log_items(_request(rows[1:], keyword="task")).page_items
@@ -0,0 +1,106 @@
+from __future__ import annotations
+
+import pytest
+
+from app.utils.log_sidecar import INDEX_ENTRY, LogSidecarReader, append_records, encode_record, sidecar_paths
+
+
+def _write(log_path, records):
+    sidecar_path, index_path = sidecar_paths(log_path)
+    with sidecar_path.open("ab") as sidecar, index_path.open("ab") as index:
+        append_records(
+            sidecar,
+            index,
+            [encode_record(record, timestamp_ms=1_000 * position) for position, record in records],
+        )
+
+
+def _records(count, *, start=0):
+    return [
+        (
+            start + index,
+            {
+                "time": f"2026-07-07 00:00:{(start + index) % 60:02d}",
+                "level": "ERROR" if (start + index) % 4 == 0 else "INFO",
+                "source": "Bench",
+                "action": f"step-{start + index}",
+                "message": f"消息 {start + index}",
+                "trace_id": f"trace-{(start + index) % 3}",
+            },
+        )
+        for index in range(count)
+    ]
+
+
+def test_reader_pages_tails_and_seeks_by_index(tmp_path):
+    log_path = tmp_path / "debug_session.log"
+    _write(log_path, _records(10))
+    _write(log_path, _records(5, start=10))
+    reader = LogSidecarReader(log_path)
+
+    assert reader.available()
+    assert reader.count() == 15
+    assert [record["action"] for _id, record in reader.read(3, 6)] == ["step-3", "step-4", "step-5"]
+    assert [record_id for record_id, _record in reader.tail(2)] == [13, 14]
+    assert reader.seek_time(7_500) == 8
+    assert reader.read(14)[0][1]["message"] == "消息 14"
+
+
+def test_seek_time_bisects_index_file_without_loading_entries(tmp_path, monkeypatch):
+    log_path = tmp_path / "debug_session.log"
+    _write(log_path, _records(64))
+    reader = LogSidecarReader(log_path)
+    monkeypatch.setattr(LogSidecarReader, "entries", lambda *_args, **_kwargs: pytest.fail("seek_time loaded the index"))
+
+    assert reader.seek_time(-1) == 0
+    assert reader.seek_time(0) == 0
+    assert reader.seek_time(31_000) == 31
+    assert reader.seek_time(31_001) == 32
+    assert reader.seek_time(10**9) == 64
+    assert LogSidecarReader(tmp_path / "missing.log").seek_time(0) == 0
+
+
+def test_generation_changes_when_index_is_truncated_and_rewritten(tmp_path):
+    log_path = tmp_path / "debug_session.log"
+    reader = LogSidecarReader(log_path)
+    assert reader.generation() == ""
+
+    _write(log_path, _records(3))
+    first = reader.generation()
+    _write(log_path, _records(2, start=3))
+    assert reader.generation() == first
+
+    for path in sidecar_paths(log_path):
+        path.write_bytes(b"")
+    _write(log_path, [(7, record) for _position, record in _records(5)])
+    assert reader.generation() not in {"", first}
+
+
+def test_find_filters_on_index_without_decoding_records(tmp_path):
+    log_path = tmp_path / "debug_session.log"
+    _write(log_path, _records(12))
+    reader = LogSidecarReader(log_path)
+
+    errors = reader.find(min_level="ERROR")
+    traced = reader.find(trace_id="trace-1", start=4)
+
+    assert [entry.record_id for entry in errors] == [0, 4, 8]
+    assert [entry.record_id for entry in traced] == [4, 7, 10]
+    assert {record["trace_id"] for _id, record in reader.read_entries(traced)} == {"trace-1"}
+
+
+def test_reader_ignores_torn_index_tail_and_out_of_range_entries(tmp_path):
+    log_path = tmp_path / "debug_session.log"
+    _write(log_path, _records(3))
+    sidecar_path, index_path = sidecar_paths(log_path)
+    with index_path.open("ab") as index:
+        index.write(INDEX_ENTRY.pack(10_000, 10, 0, 20, 0))
+        index.write(b"\x00" * 7)
+
+    reader = LogSidecarReader(log_path)
+
+    assert reader.count() == 4
+    assert [record_id for record_id, _record in reader.read()] == [0, 1, 2]
+    _write(log_path, _records(1, start=3))
+    assert index_path.stat().st_size % INDEX_ENTRY.size == 0
+    assert reader.read(4)[0][1]["action"] == "step-3"
@@ -96,6 +96,15 @@ class WebControllerRuntimeTests(unittest.TestCase):
         frontend_state.app_state.shutdown.assert_called_once()
         frontend_state.cache_service.close.assert_called_once()
 
+    def test_shutdown_closes_async_download_loop(self):
+        from app.web.controller import WebController
+
+        controller = WebController(None, lambda *_args, **_kwargs: None)
+        with patch("app.web.controller.async_download_loop") as loop:
+            controller.shutdown()
+
+        loop.close.assert_called_once_with()
+
     def test_start_crawl_waits_for_shutdown_lifecycle_lock(self):
         from app.web.controller import WebController
 
@@ -322,6 +331,71 @@ class WebControllerRuntimeTests(unittest.TestCase):
         finally:
             controller.shutdown()
 
+    def test_external_entry_changes_reconcile_only_the_reported_files(self):
+        import asyncio
+        from app.services.media_directory_monitor import MediaEntryChanges
+        from app.services.media_library_index import MediaLibraryIndex
+        from app.web.controller import WebController
+
+        sent: list[tuple[str, dict | None]] = []
+        controller = WebController(None, lambda event_type, data=None: sent.append((event_type, data)))
+        controller.async_scan_local_dir = AsyncMock()
+        try:
+            with TemporaryDirectory() as tmp:
+                controller.current_save_dir = tmp
+                controller.file_service.library_index = MediaLibraryIndex(db_path=Path(tmp) / "library.sqlite3")
+                media_path = Path(tmp) / "burst.mp4"
+                media_path.write_bytes(b"video")
+
+                async def apply(**changes):
+                    controller._loop = asyncio.get_running_loop()
+                    controller._queue_external_media_changes(MediaEntryChanges(tmp, **changes))
+                    return await controller._external_media_scan_task
+
+                added = asyncio.run(apply(added=(str(media_path), str(Path(tmp) / "notes.txt"))))
+                media_path.unlink()
+                removed = asyncio.run(apply(removed=(str(media_path),)))
+
+            controller.async_scan_local_dir.assert_not_awaited()
+            [item] = added.items
+            self.assertEqual(item.local_path, str(media_path))
+            self.assertEqual(removed.removed_ids, (item.id,))
+            self.assertIsNone(controller._video_lookup(item.id))
+            self.assertEqual([event_type for event_type, _data in sent].count("videos.reconcile"), 2)
+        finally:
+            controller.shutdown()
+
+    def test_library_pages_stay_out_of_runtime_state_and_evict_on_page_change(self):
+        from app.services.media_library_index import MediaLibraryIndex
+        from app.web.controller import WebController
+
+        sent: list[tuple[str, dict | None]] = []
+        controller = WebController(None, lambda event_type, data=None: sent.append((event_type, data)))
+        try:
+            with TemporaryDirectory() as tmp:
+                controller.current_save_dir = tmp
+                controller.file_service.library_index = MediaLibraryIndex(db_path=Path(tmp) / "library.sqlite3")
+                for name in ("a.mp4", "b.mp4", "c.mp4"):
+                    Path(tmp, name).write_bytes(b"video")
+                params = {"page": 1, "page_size": 2, "sort": "title", "order": "asc"}
+
+                first = controller.query_media_library(params)
+                again = controller.query_media_library(params)
+                first_ids = [row["id"] for row in first["items"]]
+                first_item = controller._video_lookup(first_ids[0])
+                self.assertIs(controller._video_lookup(again["items"][0]["id"]), first_item)
+                self.assertEqual(controller.get_media_path(first_ids[0]), str(Path(tmp, "a.mp4")))
+
+                second = controller.query_media_library({**params, "page": 2})
+
+            self.assertEqual(controller.videos, {})
+            self.assertEqual([row["title"] for row in second["items"]], ["c"])
+            self.assertEqual(set(controller._library_page_items), {second["items"][0]["id"]})
+            self.assertIsNone(controller._video_lookup(first_ids[0]))
+            self.assertNotIn("videos.reconcile", [event_type for event_type, _data in sent])
+        finally:
+            controller.shutdown()
+
     def test_external_media_rescan_retry_is_cancelled_on_shutdown(self):
         import asyncio
         from app.web.controller import WebController
@@ -4,9 +4,21 @@ import asyncio
 import json
 import threading
 import unittest
+import zlib
 from unittest.mock import patch
 
-from app.web.ws_transport import ConnectionManager, WebSocketConnection
+from app.web import ws_transport
+from app.web.ws_transport import DEFLATE_THRESHOLD_BYTES, ConnectionManager, WebSocketConnection
+
+class _RecordingWebSocket:
+    def __init__(self) -> None:
+        self.frames: list[str | bytes] = []
+
+    async def send_text(self, text: str) -> None:
+        self.frames.append(text)
+
+    async def send_bytes(self, data: bytes) -> None:
+        self.frames.append(data)
 
 class WsTransportBackpressureTests(unittest.IsolatedAsyncioTestCase):
     def _connection(self) -> WebSocketConnection:
@@ -21,7 +33,7 @@ class WsTransportBackpressureTests(unittest.IsolatedAsyncioTestCase):
 
         self.assertEqual(len(conn.outbound_queue), 1)
         self.assertEqual(conn.metrics["coalesced"], 1)
-        self.assertIn('"progress": 90', conn.outbound_queue[0].text)
+        self.assertEqual(json.loads(conn.outbound_queue[0].text)["data"]["progress"], 90)
 
     async def test_emit_builds_json_message_off_event_loop_thread(self):
         manager = ConnectionManager(max_queue_size=8)
@@ -29,13 +41,13 @@ class WsTransportBackpressureTests(unittest.IsolatedAsyncioTestCase):
         manager.active_connections["s1"] = [conn]
         main_thread = threading.get_ident()
         encode_threads: list[int] = []
-        original_dumps = json.dumps
+        original_encode = ws_transport.encode_json
 
-        def dumps(*args, **kwargs):
+        def encode(*args, **kwargs):
             encode_threads.append(threading.get_ident())
-            return original_dumps(*args, **kwargs)
+            return original_encode(*args, **kwargs)
 
-        with patch("app.web.ws_transport.json.dumps", side_effect=dumps):
+        with patch("app.web.ws_transport.encode_json", side_effect=encode):
             accepted = await manager.emit_to_session(
                 "s1",
                 "frontend_delta",
@@ -134,5 +146,116 @@ class WsTransportBackpressureTests(unittest.IsolatedAsyncioTestCase):
         self.assertEqual([message.event_type for message in conn.outbound_queue], ["task_error"])
         self.assertEqual(conn.metrics["dropped_overflow"], 1)
 
+class WsTransportEncodeOnceTests(unittest.IsolatedAsyncioTestCase):
+    def _connection(self, session_id: str, *, deflate_frames: bool = False) -> WebSocketConnection:
+        return WebSocketConnection(
+            ws=_RecordingWebSocket(),
+            session_id=session_id,
+            send_lock=asyncio.Lock(),
+            deflate_frames=deflate_frames,
+        )
+
+    async def _drain(self, manager: ConnectionManager, conn: WebSocketConnection) -> None:
+        conn.sender_task = asyncio.create_task(manager._sender_loop(conn))
+        for _ in range(20):
+            await asyncio.sleep(0)
+        conn.sender_task.cancel()
+
+    async def test_broadcast_encodes_once_and_shares_bytes_across_connections(self):
+        manager = ConnectionManager(max_queue_size=8)
+        first = self._connection("s1")
+        second = self._connection("s2")
+        manager.active_connections = {"s1": [first], "s2": [second]}
+
+        with patch("app.web.ws_transport.encode_json", wraps=ws_transport.encode_json) as encoder:
+            await manager.broadcast("task_finished", {"video_id": "v1", "title": "标题"})
+
+        self.assertEqual(encoder.call_count, 1)
+        self.assertIs(first.outbound_queue[0], second.outbound_queue[0])
+        self.assertEqual(json.loads(first.outbound_queue[0].text)["data"]["title"], "标题")
+        metrics = manager.connection_metrics()["encoding"]
+        self.assertEqual(metrics["messages"], 1)
+        self.assertEqual(metrics["encodes_saved"], 1)
+        self.assertGreaterEqual(metrics["encode_ms_total"], 0.0)
+
+    async def test_large_payload_is_predeflated_only_for_opted_in_connections(self):
+        manager = ConnectionManager(max_queue_size=8)
+        plain = self._connection("s1")
+        deflating = self._connection("s2", deflate_frames=True)
+        manager.active_connections = {"s1": [plain], "s2": [deflating]}
+        rows = [{"id": f"video-{index}", "title": "重复标题"} for index in range(DEFLATE_THRESHOLD_BYTES // 16)]
+
+        await manager.broadcast("frontend_delta", {"priority": "normal", "sections": {"queue_items": rows}})
+        await self._drain(manager, plain)
+        await self._drain(manager, deflating)
+
+        text_frame = plain.ws.frames[0]
+        binary_frame = deflating.ws.frames[0]
+        self.assertIsInstance(text_frame, str)
+        self.assertIsInstance(binary_frame, bytes)
+        self.assertEqual(json.loads(zlib.decompress(binary_frame)), json.loads(text_frame))
+        saved = len(text_frame.encode("utf-8")) - len(binary_frame)
+        self.assertEqual(deflating.metrics["bytes_saved"], saved)
+        self.assertEqual(plain.metrics["bytes_saved"], 0)
+        metrics = manager.connection_metrics()["encoding"]
+        self.assertEqual(metrics["deflated_messages"], 1)
+        self.assertEqual(metrics["bytes_saved"], saved)
+
+    async def test_small_payload_stays_text_frame_even_when_opted_in(self):
+        manager = ConnectionManager(max_queue_size=8)
+        conn = self._connection("s1", deflate_frames=True)
+        manager.active_connections = {"s1": [conn]}
+
+        await manager.emit_to_session("s1", "task_started", {"video_id": "v1"})
+        await self._drain(manager, conn)
+
+        self.assertIsInstance(conn.ws.frames[0], str)
+        self.assertEqual(conn.metrics["deflated_sent"], 0)
+
+    def test_encode_json_falls_back_for_values_orjson_rejects(self):
+        payload = {"big": 2**70, 1: "int-key"}
+
+        decoded = json.loads(ws_transport.encode_json(payload))
+
+        self.assertEqual(decoded, {"big": 2**70, "1": "int-key"})
+
+class WsPerConnectionDeflateTests(unittest.TestCase):
+    def test_permessage_deflate_is_negotiated_only_for_clients_without_deflate_frames(self):
+        import socket
+        import time
+
+        import uvicorn
+        from websockets.sync.client import connect
+
+        from app.web.ws_protocol import per_connection_deflate_protocol
+
+        async def app(scope, receive, send):
+            if scope["type"] == "websocket":
+                await receive()
+                await send({"type": "websocket.accept"})
+                await send({"type": "websocket.close"})
+
+        with socket.socket() as probe:
+            probe.bind(("127.0.0.1", 0))
+            port = probe.getsockname()[1]
+        server = uvicorn.Server(
+            uvicorn.Config(app, host="127.0.0.1", port=port, log_level="error", ws=per_connection_deflate_protocol())
+        )
+        thread = threading.Thread(target=server.run, daemon=True)
+        thread.start()
+        self.addCleanup(thread.join, 5)
+        self.addCleanup(setattr, server, "should_exit", True)
+        deadline = time.monotonic() + 5
+        while not server.started and time.monotonic() < deadline:
+            time.sleep(0.02)
+
+        negotiated = {}
+        for query in ("", "?frames=deflate"):
+            with connect(f"ws://127.0.0.1:{port}/ws{query}") as client:
+                negotiated[query] = client.response.headers.get("Sec-WebSocket-Extensions", "")
+
+        self.assertIn("permessage-deflate", negotiated[""])
+        self.assertEqual(negotiated["?frames=deflate"], "")
+
 if __name__ == "__main__":
     unittest.main()
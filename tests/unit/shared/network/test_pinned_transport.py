@@ -9,7 +9,7 @@ from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 from pathlib import Path
-from threading import Barrier, Thread
+from threading import Barrier, Event, Thread
 from unittest.mock import Mock
 from urllib.parse import urlsplit
 
@@ -19,7 +19,9 @@ from curl_cffi.const import CurlOpt
 from shared.network import pinned_transport as pinned_transport_module
 from shared.network.pinned_transport import (
     PinnedResponse,
+    PinnedSessionPool,
     PinnedTransport,
+    PooledPinnedTransport,
     canonicalize_host,
     canonicalize_request_target,
     curl_resolve_options,
@@ -570,6 +572,122 @@ def test_real_curl_response_overflow_is_translated_to_policy_violation(monkeypat
         thread.join(timeout=2)
 
 
+class _CookieSession(_RecordingSession):
+    def __init__(self, responses: deque[_FakeResponse], barrier: Barrier | None = None) -> None:
+        super().__init__(responses, barrier)
+        self.cookies = {"sid": "from-previous-operation"}
+
+
+def test_pooled_transport_reuses_sessions_only_for_the_same_pinned_address_set() -> None:
+    factory = _RecordingSessionFactory(
+        [
+            _FakeResponse(200, "https://one.example:443/a", {}, b"a"),
+            _FakeResponse(200, "https://one.example:443/b", {}, b"b"),
+            _FakeResponse(200, "https://two.example:443/c", {}, b"c"),
+        ],
+        session_type=_CookieSession,
+    )
+    pool = PinnedSessionPool(session_factory=factory)
+    transport = PooledPinnedTransport(policy=_CapturingPolicy(), pool=pool)
+
+    bodies = [
+        transport.request("GET", url, headers={}).body
+        for url in ("https://one.example/a", "https://one.example/b", "https://two.example/c")
+    ]
+
+    assert bodies == [b"a", b"b", b"c"]
+    assert [len(session.calls) for session in factory.sessions] == [2, 1]
+    assert all(session.cookies == {} for session in factory.sessions)
+    assert all(session.curl_options == {CurlOpt.NOSIGNAL: 1} for session in factory.sessions)
+    assert pool.stats() == {"created": 2, "reused": 1, "discarded": 0, "idle": 2, "keys": 2}
+
+
+def test_pooled_cross_origin_redirect_drops_credentials_and_switches_lease() -> None:
+    factory = _RecordingSessionFactory(
+        [
+            _FakeResponse(302, "https://one.example:443/start", {"Location": "https://two.example/final"}),
+            _FakeResponse(200, "https://two.example:443/final", {}, b"ok"),
+        ]
+    )
+    transport = PooledPinnedTransport(
+        policy=_CapturingPolicy(),
+        pool=PinnedSessionPool(session_factory=factory),
+    )
+
+    response = transport.request(
+        "GET",
+        "https://one.example/start",
+        headers={"Authorization": "Bearer private", "X-Public": "kept"},
+    )
+
+    assert response.redirect_chain == ("https://one.example:443/start", "https://two.example:443/final")
+    assert len(factory.sessions) == 2
+    assert factory.sessions[1].calls[0]["headers"] == {"X-Public": "kept"}
+    assert factory.sessions[1].calls[0]["curl_options"][CurlOpt.RESOLVE] == ["two.example:443:8.8.8.8"]
+
+
+def test_pooled_stream_yields_before_body_completes_and_reuses_connection(monkeypatch) -> None:
+    connections: list[str] = []
+    release_tail = Event()
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def setup(self) -> None:
+            super().setup()
+            connections.append(self.client_address[0])
+
+        def do_GET(self) -> None:
+            payload = b"x" * 64 if self.path == "/overflow" else b"head" + b"t" * 4096
+            self.send_response(200)
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload[:4])
+            self.wfile.flush()
+            if self.path == "/slow":
+                release_tail.wait(timeout=2)
+            self.wfile.write(payload[4:])
+
+        def log_message(self, _format: str, *_args: object) -> None:
+            return
+
+    class LoopbackHarnessPolicy:
+        @staticmethod
+        def resolve_public_addresses(_url: str) -> tuple[str, ...]:
+            return ("127.0.0.1",)
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    monkeypatch.setattr(
+        pinned_transport_module,
+        "curl_resolve_options",
+        lambda *_args, **_kwargs: {CurlOpt.PROXY: ""},
+    )
+    pool = PinnedSessionPool()
+    transport = PooledPinnedTransport(policy=LoopbackHarnessPolicy(), pool=pool, timeout=5)
+    base_url = f"http://127.0.0.1:{server.server_port}"
+    try:
+        with transport.stream("GET", f"{base_url}/slow", headers={}) as response:
+            assert response.status_code == 200
+            assert response.peek(4) == b"head"
+            release_tail.set()
+            assert b"".join(response.iter_content(1024)) == b"head" + b"t" * 4096
+        for _ in range(3):
+            assert transport.request("GET", f"{base_url}/fast", headers={}).status_code == 200
+        assert len(connections) == 1
+        assert pool.stats()["reused"] == 3
+
+        small = PooledPinnedTransport(policy=LoopbackHarnessPolicy(), pool=pool, max_response_bytes=8)
+        with pytest.raises(DomainPolicyViolation, match="size limit"):
+            small.request("GET", f"{base_url}/overflow", headers={})
+    finally:
+        pool.close()
+        server.shutdown()
+        server.server_close()
+        thread.join(timeout=2)
+
+
 def test_media_subprocess_environment_drops_proxy_and_cookie_variables(monkeypatch) -> None:
     monkeypatch.setenv("SystemRoot", r"C:\Windows")
     monkeypatch.setenv("PATH", r"C:\Windows\System32")
@@ -0,0 +1,55 @@
+from __future__ import annotations
+
+from shared.frontend_row_delta import apply_row_delta
+
+
+def _snapshot() -> dict:
+    return {
+        "queue_items": [{"id": "q1"}, {"id": "q2"}],
+        "active_downloads": [{"id": "a1", "progress": 10}],
+        "completed_items": [{"id": "c1"}],
+    }
+
+
+def test_row_delta_replaces_row_in_place() -> None:
+    snapshot = _snapshot()
+    rows = {
+        "sections": ["queue_items", "active_downloads", "completed_items"],
+        "ids": ["a1"],
+        "upserts": {"active_downloads": [{"index": 0, "row": {"id": "a1", "progress": 50}}]},
+        "counts": {"queue_items": 2, "active_downloads": 1, "completed_items": 1},
+    }
+
+    assert apply_row_delta(snapshot, rows) == {"active_downloads"}
+    assert snapshot["active_downloads"] == [{"id": "a1", "progress": 50}]
+    assert snapshot["queue_items"] == [{"id": "q1"}, {"id": "q2"}]
+
+
+def test_row_delta_moves_and_removes_rows_across_sections() -> None:
+    snapshot = _snapshot()
+    rows = {
+        "sections": ["queue_items", "active_downloads", "completed_items"],
+        "ids": ["q1", "a1"],
+        "upserts": {"active_downloads": [{"index": 0, "row": {"id": "q1", "progress": 0}}]},
+        "counts": {"queue_items": 1, "active_downloads": 1, "completed_items": 1},
+    }
+
+    assert apply_row_delta(snapshot, rows) == {"queue_items", "active_downloads"}
+    assert snapshot["queue_items"] == [{"id": "q2"}]
+    assert snapshot["active_downloads"] == [{"id": "q1", "progress": 0}]
+
+
+def test_row_delta_only_touches_covered_sections() -> None:
+    snapshot = _snapshot()
+    rows = {"sections": ["queue_items"], "ids": ["a1"], "upserts": {}, "counts": {"queue_items": 2}}
+
+    assert apply_row_delta(snapshot, rows) == set()
+    assert snapshot["active_downloads"] == [{"id": "a1", "progress": 10}]
+
+
+def test_count_mismatch_requests_full_resync() -> None:
+    snapshot = _snapshot()
+    rows = {"sections": ["queue_items"], "ids": [], "upserts": {}, "counts": {"queue_items": 5}}
+
+    assert apply_row_delta(snapshot, rows) is None
+    assert snapshot == _snapshot()
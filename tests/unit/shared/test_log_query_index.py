@@ -0,0 +1,91 @@
+from __future__ import annotations
+
+from datetime import datetime
+
+from shared.log_platforms import builtin_platform_metas
+from shared.log_query_index import LogQueryIndex
+
+CATEGORIES = ("all", "crawl", "download", "system", "performance", "error")
+
+
+def _rows(count: int, *, start: int = 0) -> list[dict]:
+    return [
+        {
+            "id": f"row-{index}",
+            "time": f"2026-06-30 10:{index:02d}:00",
+            "level": "ERROR" if index % 3 == 0 else "INFO",
+            "source": "DownloadWorker",
+            "message": f"segment{index} finished",
+            "trace_id": f"trace-{index % 2}",
+        }
+        for index in range(start, start + count)
+    ]
+
+
+def _sync(index: LogQueryIndex, rows: list[dict]) -> None:
+    metas = builtin_platform_metas()
+    index.sync(rows, platform_options=tuple(metas.values()), platform_meta_by_id=metas)
+
+
+def _query(index: LogQueryIndex, **overrides):
+    values = {
+        "categories": CATEGORIES,
+        "category": "all",
+        "level": "全部",
+        "time_range": "全部",
+        "platform_id": None,
+        "trace_query": "",
+        "keyword": "",
+        "page": 1,
+        "page_size": 3,
+    }
+    values.update(overrides)
+    return index.query(**values)
+
+
+def test_sliding_window_only_indexes_new_rows():
+    index = LogQueryIndex()
+    _sync(index, _rows(10))
+    _sync(index, _rows(10, start=4))
+
+    page = _query(index)
+
+    assert index.stats()["indexed"] == 14
+    assert index.stats()["rebuilds"] == 1
+    assert page.total_count == 10
+    assert [row["id"] for row in page.rows] == ["row-13", "row-12", "row-11"]
+
+
+def test_rewritten_window_reuses_rows_by_identity():
+    index = LogQueryIndex()
+    rows = _rows(6)
+    _sync(index, rows)
+    late = {"id": "late", "time": "2026-06-30 10:30:00", "level": "INFO", "message": "merged from file"}
+    _sync(index, [*rows[:3], late, *rows[3:]])
+
+    assert index.stats()["indexed"] == 7
+    assert index.stats()["rebuilds"] == 2
+    assert [row["id"] for row in _query(index).rows] == ["late", "row-5", "row-4"]
+
+
+def test_filters_intersect_level_trace_and_keyword_substrings():
+    index = LogQueryIndex()
+    _sync(index, _rows(12))
+
+    page = _query(index, level="ERROR", trace_query="trace-1", keyword="ment9 fin", page_size=0)
+
+    assert [row["id"] for row in page.rows] == ["row-9"]
+    assert page.first_trace_id == "trace-1"
+    assert page.category_counts["all"] == 1
+
+
+def test_time_range_uses_sorted_order_and_limit_keeps_newest_matches():
+    index = LogQueryIndex()
+    _sync(index, _rows(12))
+
+    recent = _query(index, time_range="30m", now=datetime(2026, 6, 30, 10, 39, 30), page_size=0)
+    limited = _query(index, limit=4, page=2, page_size=3)
+
+    assert [row["id"] for row in recent.rows] == ["row-11", "row-10"]
+    assert (limited.matched_count, limited.total_pages) == (4, 2)
+    assert [row["id"] for row in limited.rows] == ["row-8"]